@@ -0,0 +1,170 @@
+"""
+SYS-611: Benchmark of balking and reneging customers in the cafe model.
+
+This benchmark compares the two ways the week 12 cafe model
+(`QueuingSystem.py`) simulates customers who balk (do not join a long queue)
+and renege (leave the queue when their patience runs out):
+ * process customers (`lean=False`) wait for `request | env.timeout(patience)`,
+   so every customer who joins the queue schedules a timeout event which
+   stays in the event queue after the customer is served.
+ * lean customers (`lean=True`) are served by an `ImpatientPool` (see
+   `sys611.entities`) which keeps the abandonment deadlines in a heap beside
+   the queue and removes customers whose patience ran out whenever the queue
+   is read, without scheduling any events.
+It reports:
+ * Validation: the fractions of customers who balk and renege and the mean
+   wait of served customers (exponential patience) compared to the exact
+   birth-death Markov chain of the queue (M/M/c with balking and
+   exponential abandonment).
+ * Throughput: the time per arriving customer at a high load (most
+   customers are served before their patience runs out) without abandonment
+   and for several mean patiences (longer patience leaves more timeouts in
+   the event queue of process customers).
+
+Usage: python abandonmentBenchmark.py [num_runs] [sim_duration]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+import QueuingSystem
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications to validate
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+# simulation duration of each replication (minutes)
+SIM_DURATION = float(sys.argv[2]) if len(sys.argv) > 2 else 20000
+# parameters of the validated cafe (overloaded, so many customers abandon)
+VALIDATION = {'_lambda': 5.0, '_mu': 2.0, 'num_servers': 2, 'mean_patience': 5.0,
+              'balk_threshold': 10, 'balk_probability': 0.3}
+# parameters of the throughput comparison (high load, patient customers)
+THROUGHPUT = {'_lambda': 3.9, '_mu': 4.0, 'num_servers': 1}
+# mean patience of the throughput comparison (minutes)
+PATIENCES = [30, 300, 3000]
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def run(seed, **params):
+    """ Runs one replication of the cafe (not memoized).
+
+    Args:
+        seed (int): the random number seed
+        **params: the cafe parameters (see `run_cafe`)
+
+    Returns:
+        dict: the summary outputs
+    """
+    run_cafe = getattr(QueuingSystem.run_cafe, '__wrapped__', QueuingSystem.run_cafe)
+    return run_cafe(seed, sim_duration=SIM_DURATION, **params)[0]
+
+def birth_death(_lambda, _mu, num_servers, mean_patience, balk_threshold,
+                balk_probability, max_customers=1000):
+    """ Solves the birth-death Markov chain of the cafe with abandonment.
+
+    Args:
+        _lambda (float): the arrival rate (customers/minute)
+        _mu (float): the service rate (customers/minute)
+        num_servers (int): the number of servers
+        mean_patience (float): the mean (exponential) patience (minutes)
+        balk_threshold (int): the queue length above which customers balk
+        balk_probability (float): the probability to balk above the threshold
+        max_customers (int): the most customers of the truncated chain
+
+    Returns:
+        dict: the fractions of arriving customers who balk and renege, and the
+            mean time in system of served customers
+    """
+    n = np.arange(max_customers + 1)
+    queue = np.maximum(n - num_servers, 0)
+    balk = np.where(queue > balk_threshold, balk_probability, 0.0)
+    births = _lambda*(1 - balk[:-1])
+    deaths = np.minimum(n[1:], num_servers)*_mu + queue[1:]/mean_patience
+    # product form of the steady-state probabilities (in logs for stability)
+    log_p = np.concatenate(([0.0], np.cumsum(np.log(births) - np.log(deaths))))
+    p = np.exp(log_p - log_p.max())
+    p /= p.sum()
+    reneging = queue.dot(p)/mean_patience
+    # time in system of served customers from the customers in service (Little's
+    # law) and the waiting time of customers who are served (queue minus the
+    # reneging customers' share of the waiting time)
+    served = _lambda*(1 - balk.dot(p)) - reneging
+    # an arriving customer who joins with k waiting ahead is served if its
+    # patience outlasts the services and abandonments ahead (exponential)
+    wait_served = 0.0
+    for k in range(max_customers - num_servers):
+        if k > balk_threshold and balk_probability >= 1:
+            break
+        # state seen by an arrival which joins the queue with k waiting
+        joins = p[num_servers + k]*_lambda*(1 - balk[num_servers + k])
+        # stages ahead: rates of the k+1 departures before service (servers
+        # busy, customers ahead reneging) while this customer keeps waiting
+        rates = num_servers*_mu + np.arange(k, -1, -1)/mean_patience
+        survive = np.prod(rates/(rates + 1/mean_patience))
+        wait_served += joins*survive*np.sum(1/(rates + 1/mean_patience))
+    return {'balked': balk.dot(p), 'reneged': reneging/_lambda,
+            'wait': wait_served/served + 1/_mu}
+
+def mean_interval(values, scale=1.0):
+    """ Formats the mean and 95% confidence interval half-width of values. """
+    values = np.asarray(values)*scale
+    return '{:.4f} +/- {:.4f}'.format(np.mean(values),
+                                      1.96*np.std(values, ddof=1)/np.sqrt(len(values)))
+
+def timed(repeats=5, **params):
+    """ Runs one replication and measures the time per arriving customer.
+
+    Args:
+        repeats (int): the number of repetitions (the fastest is reported)
+        **params: the cafe parameters (see `run_cafe`)
+
+    Returns:
+        float: the time per arriving customer (microseconds)
+    """
+    elapsed = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        run(0, **params)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)/(params['_lambda']*SIM_DURATION)*1e6
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    exact = birth_death(**VALIDATION)
+    print('{:<10s}{:>10s}{:>22s}{:>22s}'.format('output', 'exact', 'process', 'lean'))
+    outputs = {lean: [run(seed, lean=lean, **VALIDATION) for seed in range(NUM_RUNS)]
+               for lean in [False, True]}
+    arrivals = VALIDATION['_lambda']*SIM_DURATION
+    for key in ['balked', 'reneged']:
+        print('{:<10s}{:>10.4f}{:>22s}{:>22s}'.format(
+                key, exact[key], *[mean_interval([o[key] for o in outputs[lean]], 1/arrivals)
+                                   for lean in [False, True]]))
+    print('{:<10s}{:>10.4f}{:>22s}{:>22s}'.format(
+            'wait', exact['wait'], *[mean_interval([o['wait'] for o in outputs[lean]])
+                                     for lean in [False, True]]))
+
+    print()
+    print('{:<10s}{:>10s}{:>14s}{:>14s}{:>10s}'.format(
+            'patience', 'reneged', 'process', 'lean', 'speedup'))
+    for patience in [None] + PATIENCES:
+        times = [timed(lean=lean, mean_patience=patience, **THROUGHPUT)
+                 for lean in [False, True]]
+        reneged = run(0, lean=True, mean_patience=patience, **THROUGHPUT)['reneged']
+        print('{:<10s}{:>10.4f}{:>12.2f}us{:>12.2f}us{:>9.1f}x'.format(
+                str(patience), reneged/THROUGHPUT['_lambda']/SIM_DURATION,
+                times[0], times[1], times[0]/times[1]))
@@ -0,0 +1,157 @@
+"""
+SYS-611: Benchmark of vectorized output analysis.
+
+This benchmark compares the vectorized functions in `sys611.analysis` with the
+loop-based computations previously used in the example scripts. Samples are
+stored in memory-mapped files and processed in chunks, so the default problem
+size (10^8 samples) does not need to fit in memory. Loop-based computations
+are too slow to run at full size, so they are timed on a smaller number of
+samples and extrapolated using their computational complexity.
+
+Usage: python analysisBenchmark.py [num_samples]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import tempfile
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.analysis import (CHUNK_SIZE, ecdf, iter_running_stats,
+                             state_occupancy, weighted_quantile)
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of samples to analyze
+NUM_SAMPLES = int(sys.argv[1]) if len(sys.argv) > 1 else 10**8
+# number of points to evaluate the empirical CDF
+NUM_POINTS = 1000
+# number of samples for loop-based (extrapolated) computations
+NUM_LOOP_SAMPLES = 10**4
+# number of discrete states (e.g. queue lengths) for occupancy
+NUM_STATES = 50
+# maximum number of samples to sort in memory for quantiles
+NUM_QUANTILE_SAMPLES = min(NUM_SAMPLES, 10**7)
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def timed(func, *args):
+    """ Times a function call.
+
+    Args:
+        func (function): the function
+        *args: the function arguments
+
+    Returns:
+        float: the elapsed wall time (seconds)
+        object: the function return value
+    """
+    start = time.perf_counter()
+    value = func(*args)
+    return time.perf_counter() - start, value
+
+def create_samples(directory):
+    """ Creates memory-mapped sample files one chunk at a time.
+
+    Args:
+        directory (str): the directory to store sample files
+
+    Returns:
+        numpy.memmap: the exponential samples (mean 2.0)
+        numpy.memmap: the discrete states (geometric queue lengths)
+    """
+    samples = np.lib.format.open_memmap(os.path.join(directory, 'samples.npy'),
+                                        mode='w+', dtype=np.float64, shape=(NUM_SAMPLES,))
+    states = np.lib.format.open_memmap(os.path.join(directory, 'states.npy'),
+                                       mode='w+', dtype=np.int8, shape=(NUM_SAMPLES,))
+    np.random.seed(0)
+    for i in range(0, NUM_SAMPLES, CHUNK_SIZE):
+        n = min(CHUNK_SIZE, NUM_SAMPLES - i)
+        samples[i:i+n] = np.random.exponential(2.0, n)
+        states[i:i+n] = np.minimum(np.random.geometric(0.1, n) - 1, NUM_STATES - 1)
+    samples.flush()
+    states.flush()
+    return samples, states
+
+def loop_ecdf(samples, x):
+    """ Computes the ECDF with one full-array comparison per point. """
+    return np.array([np.sum(samples < i)/len(samples) for i in x])
+
+def loop_running_stats(samples):
+    """ Computes the running mean and variance by re-averaging each prefix. """
+    return (np.array([np.average(samples[0:i+1]) for i in range(len(samples))]),
+            np.array([np.var(samples[0:i+1]) for i in range(len(samples))]))
+
+def loop_occupancy(states):
+    """ Computes the state occupancy with one full-array comparison per state. """
+    return np.array([np.sum(states == i) for i in range(NUM_STATES)])/len(states)
+
+def consume_running_stats(samples):
+    """ Computes the running mean and standard error (keeping the final values). """
+    for mean, sem in iter_running_stats(samples):
+        pass
+    return mean[-1], sem[-1]
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    print('creating {:d} samples in {}'.format(NUM_SAMPLES, directory))
+    samples, states = create_samples(directory)
+    x = np.linspace(0, 20, NUM_POINTS)
+
+    results = []
+    # empirical cdf: loop is linear in samples (one pass per point)
+    t_loop, _ = timed(loop_ecdf, samples[:NUM_LOOP_SAMPLES*100], x)
+    t_fast, F = timed(ecdf, samples, x, 'left')
+    results.append(('ECDF ({:d} points)'.format(NUM_POINTS),
+                    t_loop*NUM_SAMPLES/(NUM_LOOP_SAMPLES*100), t_fast))
+    # running mean/sem: loop is quadratic in samples (one pass per prefix)
+    t_loop, _ = timed(loop_running_stats, samples[:NUM_LOOP_SAMPLES])
+    t_fast, _ = timed(consume_running_stats, samples)
+    results.append(('running mean/SEM',
+                    t_loop*(NUM_SAMPLES/NUM_LOOP_SAMPLES)**2, t_fast))
+    # state occupancy: loop is linear in samples and states (one pass per state)
+    # note: with only a few states (e.g. weather model) both take similar time
+    t_loop, _ = timed(loop_occupancy, states[:NUM_LOOP_SAMPLES*100])
+    t_fast, pi = timed(state_occupancy, states, NUM_STATES)
+    results.append(('state occupancy ({:d} states)'.format(NUM_STATES),
+                    t_loop*NUM_SAMPLES/(NUM_LOOP_SAMPLES*100), t_fast))
+    # weighted quantiles: both sort in memory (no loop-based equivalent)
+    weights = np.random.rand(NUM_QUANTILE_SAMPLES)
+    t_fast, q = timed(weighted_quantile, samples[:NUM_QUANTILE_SAMPLES],
+                      [0.05, 0.5, 0.95], weights)
+    results.append(('weighted quantiles (n={:.0e})'.format(NUM_QUANTILE_SAMPLES),
+                    np.nan, t_fast))
+
+    print('{:<32s}{:>16s}{:>16s}{:>10s}'.format(
+            'analysis', 'loop (s)*', 'vectorized (s)', 'speedup'))
+    for name, t_loop, t_fast in results:
+        print('{:<32s}{:>16.3g}{:>16.3f}{:>10.0f}'.format(
+                name, t_loop, t_fast, t_loop/t_fast))
+    print('* extrapolated from a smaller number of samples')
+    print('F(2.0) = {:.4f} (exact {:.4f})'.format(
+            ecdf(samples, [2.0], 'left')[0], 1 - np.exp(-1)))
+    print('P(q=0) = {:.4f} (exact {:.4f})'.format(pi[0], 0.1))
+    # integer weights are equivalent to repeated samples
+    counts = np.random.randint(0, 5, NUM_LOOP_SAMPLES)
+    print('weighted quantiles identical to repeated samples: {}'.format(np.array_equal(
+            weighted_quantile(samples[:NUM_LOOP_SAMPLES], [0.05, 0.5, 0.95], counts),
+            np.quantile(np.repeat(samples[:NUM_LOOP_SAMPLES], counts), [0.05, 0.5, 0.95],
+                        method='inverted_cdf'))))
+
+    # remove the sample files
+    del samples, states
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
@@ -0,0 +1,95 @@
+"""
+SYS-611: Benchmark of the non-homogeneous Poisson process arrival generators.
+
+This benchmark generates one year of arrivals (time in minutes) with daily
+rate profiles using each rate function and generation method in
+`sys611.arrivals`, and compares the time to a loop-based thinning generator
+which draws one candidate arrival per Python iteration (timed on fewer days
+and extrapolated to one year). It also checks the average number of arrivals
+in each hour of the day against the expected number from the cumulative rate.
+
+Usage: python arrivalsBenchmark.py [num_days]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.arrivals import FourierRate, PiecewiseConstantRate, PiecewiseLinearRate
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of days of arrivals
+NUM_DAYS = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+# number of days for the loop-based generator (extrapolated to NUM_DAYS)
+NUM_LOOP_DAYS = min(NUM_DAYS, 7)
+# minutes per day
+DAY = 24*60
+
+# daily arrival rate profiles (customers per minute)
+RATES = [
+    ('piecewise-constant', PiecewiseConstantRate(
+            [0, 360, 660, 840, 1200], [0.2, 3.0, 1.5, 2.5, 0.0], period=DAY)),
+    ('piecewise-linear', PiecewiseLinearRate(
+            [0, 420, 540, 720, 1020, 1260], [0.0, 4.0, 1.0, 3.0, 2.0, 0.5], period=DAY)),
+    ('fourier', FourierRate(1.5, [-1.0, 0.3], [0.2, -0.2], period=DAY)),
+]
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def loop_thinning(rate_function, end, max_rate, rng):
+    """ Generates arrivals by thinning one candidate at a time.
+
+    Args:
+        rate_function (RateFunction): the arrival rate
+        end (float): the end time
+        max_rate (float): the maximum arrival rate
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        list: the arrival times
+    """
+    arrivals = []
+    t = 0.0
+    while True:
+        t += rng.exponential(1/max_rate)
+        if t >= end:
+            return arrivals
+        if rng.random()*max_rate < rate_function.rate(t):
+            arrivals.append(t)
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    hours = np.arange(0, DAY + 1, 60)
+    print('{:<20s}{:<12s}{:>12s}{:>12s}{:>10s}{:>12s}'.format(
+            'rate', 'method', 'arrivals', 'time (s)', 'speedup', 'hour error'))
+    for name, rate_function in RATES:
+        max_rate = np.max(rate_function.majorant(np.linspace(0, DAY, 97)))
+        start = time.perf_counter()
+        loop_thinning(rate_function, NUM_LOOP_DAYS*DAY, max_rate, rng)
+        loop_time = (time.perf_counter() - start)*NUM_DAYS/NUM_LOOP_DAYS
+        print('{:<20s}{:<12s}{:>12s}{:>12.3f}{:>10s}{:>12s}'.format(
+                name, 'loop', '-', loop_time, '-', '-'))
+        for method in ['inversion', 'thinning']:
+            start = time.perf_counter()
+            arrivals = rate_function.generate(0, NUM_DAYS*DAY, rng, method)
+            elapsed = time.perf_counter() - start
+            # compare the average arrivals per hour of the day to the expected number
+            counts = np.histogram(arrivals % DAY, hours)[0]/NUM_DAYS
+            expected = np.diff(rate_function.cumulative(hours))
+            error = np.max(np.abs(counts - expected)/np.maximum(expected, 1))
+            print('{:<20s}{:<12s}{:>12d}{:>12.3f}{:>10.0f}{:>12.4f}'.format(
+                    '', method, len(arrivals), elapsed, loop_time/elapsed, error))
@@ -0,0 +1,127 @@
+"""
+SYS-611: Benchmark of the multi-team combat engine.
+
+This benchmark measures the throughput (battles per second) of the vectorized
+combat engine for the example three-team battle and for a sweep of initial
+sizes, compared to a loop-based simulation of one battle at a time which
+rolls one random number per die (as in `week2/diceFightersOO.py`). It also
+reports the time of the mean-field (Lanchester) approximation of all sweep
+scenarios.
+
+Usage: python combatBenchmark.py [num_battles]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the week4 directory to the search path to import the combat engine
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'week4'))
+from combatEngine import example_combat
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of battles for vectorized simulation
+NUM_BATTLES = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+# number of battles for loop-based simulation
+NUM_LOOP_BATTLES = 10**4
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def loop_battle(combat, rng):
+    """ Simulates one battle with one random number per die.
+
+    Args:
+        combat (Combat): the battle
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        int: the winning team (-1 for no winner)
+        int: the number of rounds
+    """
+    counts = [int(count) for count in combat.initial]
+    num_teams = len(combat.teams)
+    round_number = 0
+    while round_number < combat.max_rounds:
+        sizes = [sum(counts[u] for u in range(len(counts)) if combat.team_of[u] == j)
+                 for j in range(num_teams)]
+        alive = [size > 0 for size in sizes]
+        if sum(alive) <= 1:
+            break
+        round_number += 1
+        if round_number in combat.reinforcements:
+            counts = [count + int(added) for count, added
+                      in zip(counts, combat.reinforcements[round_number])]
+            sizes = [sum(counts[u] for u in range(len(counts)) if combat.team_of[u] == j)
+                     for j in range(num_teams)]
+            alive = [size > 0 for size in sizes]
+        fractions = combat.fire_fractions(np.array([alive]))[0]
+        incoming = [0]*num_teams
+        for u, count in enumerate(counts):
+            # roll one die per unit and pick a target for each hit
+            hits = int(np.sum(rng.random(count) < combat.chance_hit[u]))
+            i = combat.team_of[u]
+            if hits > 0 and fractions[i].sum() > 0:
+                for j in rng.choice(num_teams, size=hits, p=fractions[i]):
+                    incoming[j] += 1
+        for j in range(num_teams):
+            # each hit eliminates a random unit of the target team
+            for hit in range(min(incoming[j], sizes[j])):
+                units = [u for u in range(len(counts)) if combat.team_of[u] == j]
+                weights = np.array([counts[u] for u in units], dtype=float)
+                counts[units[rng.choice(len(units), p=weights/weights.sum())]] -= 1
+    alive = [sum(counts[u] for u in range(len(counts)) if combat.team_of[u] == j) > 0
+             for j in range(num_teams)]
+    return (alive.index(True) if sum(alive) == 1 else -1), round_number
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    combat = example_combat()
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    results = [loop_battle(combat, rng) for i in range(NUM_LOOP_BATTLES)]
+    loop_rate = NUM_LOOP_BATTLES/(time.perf_counter() - start)
+    winners = np.array([result[0] for result in results])
+
+    print('{:<28s}{:>12s}{:>10s}{:>10s}{:>10s}'.format(
+            'simulation', 'battles/s', 'P(red)', 'P(green)', 'speedup'))
+    print('{:<28s}{:>12.3g}{:>10.4f}{:>10.4f}{:>10s}'.format(
+            'loop (one die per unit)', loop_rate, np.mean(winners == 0),
+            np.mean(winners == 2), '-'))
+
+    start = time.perf_counter()
+    winners, rounds, final = combat.simulate(NUM_BATTLES, rng)
+    rate = NUM_BATTLES/(time.perf_counter() - start)
+    print('{:<28s}{:>12.3g}{:>10.4f}{:>10.4f}{:>10.0f}'.format(
+            'vectorized', rate, np.mean(winners == 0), np.mean(winners == 2),
+            rate/loop_rate))
+
+    # sweep the initial sizes of red infantry and blue (one battle per row)
+    red_sizes, blue_sizes = np.meshgrid(np.arange(10, 31), np.arange(5, 21))
+    sizes = np.tile(combat.initial, (red_sizes.size, 1))
+    sizes[:, combat.types.index('red_infantry')] = red_sizes.ravel()
+    sizes[:, combat.types.index('blue')] = blue_sizes.ravel()
+    repeats = max(1, NUM_BATTLES//len(sizes))
+    start = time.perf_counter()
+    winners, rounds, final = combat.simulate(len(sizes)*repeats, rng,
+                                             np.repeat(sizes, repeats, axis=0))
+    rate = len(sizes)*repeats/(time.perf_counter() - start)
+    print('{:<28s}{:>12.3g}{:>10.4f}{:>10.4f}{:>10.0f}'.format(
+            'vectorized sweep ({:d})'.format(len(sizes)), rate,
+            np.mean(winners == 0), np.mean(winners == 2), rate/loop_rate))
+
+    start = time.perf_counter()
+    combat.mean_field(sizes)
+    print('mean-field sweep of {:d} scenarios: {:.3f} s'.format(
+            len(sizes), time.perf_counter() - start))
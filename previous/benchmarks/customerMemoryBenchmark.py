@@ -0,0 +1,89 @@
+"""
+SYS-611: Benchmark of memory use with many concurrent customers.
+
+This benchmark runs the cafe model of week 12 (`QueuingSystem.py`) with a
+very high arrival rate and a very slow server, so about 10^6 customers are in
+the cafe at the end of the simulation. It compares one process per customer
+(`lean=False`) to lean customers stored as rows of a table and served by one
+process per server (`lean=True`, see `sys611.entities`). Each mode runs in a
+separate Python process to measure its peak resident set size (RSS) above
+the memory used after importing the model, along with the time spent in
+garbage collection.
+
+Usage: python customerMemoryBenchmark.py [num_customers]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import warnings
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of concurrent customers (arrivals in one minute)
+NUM_CUSTOMERS = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+# service rate (customers/minute) so almost all customers are still waiting
+SERVICE_RATE = 1e-3
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def run_mode(lean):
+    """ Runs the cafe in this process and measures its memory and time.
+
+    Args:
+        lean (bool): True for lean customers, otherwise customer processes
+
+    Returns:
+        dict: the peak RSS increase (MB), time (s), garbage collection time
+            (s), and number of customers in the cafe
+    """
+    import QueuingSystem
+    run_cafe = getattr(QueuingSystem.run_cafe, '__wrapped__', QueuingSystem.run_cafe)
+    # measure the time spent in garbage collection
+    collecting = []
+    def on_collect(phase, info):
+        collecting.append(time.perf_counter()*(1 if phase == 'stop' else -1))
+    gc.callbacks.append(on_collect)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    summary, traces = run_cafe(0, _lambda=NUM_CUSTOMERS, _mu=SERVICE_RATE, sim_duration=1.0,
+                               lean=lean)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    gc.callbacks.remove(on_collect)
+    return {'rss': (peak - baseline)/1024, 'time': elapsed, 'gc': sum(collecting),
+            'customers': summary['max_queue']}
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    if os.environ.get('SYS611_BENCHMARK_MODE') is not None:
+        # run one mode in this (child) process and print the results (no
+        # customer departs, so ignore warnings of averages of empty arrays)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        print(json.dumps(run_mode(os.environ['SYS611_BENCHMARK_MODE'] == 'lean')))
+        sys.exit()
+    print('{:<24s}{:>12s}{:>14s}{:>10s}{:>10s}{:>14s}'.format(
+            'customers', 'max queue', 'peak RSS (MB)', 'time (s)', 'GC (s)', 'bytes/cust.'))
+    for mode in ['process', 'lean']:
+        output = subprocess.check_output(
+                [sys.executable, os.path.abspath(__file__), str(NUM_CUSTOMERS)],
+                env=dict(os.environ, SYS611_BENCHMARK_MODE=mode))
+        result = json.loads(output.decode().strip().splitlines()[-1])
+        print('{:<24s}{:>12d}{:>14.1f}{:>10.2f}{:>10.2f}{:>14.0f}'.format(
+                mode, result['customers'], result['rss'], result['time'], result['gc'],
+                result['rss']*2**20/result['customers']))
@@ -0,0 +1,227 @@
+"""
+SYS-611: Benchmark of the lean SimPy-compatible environment.
+
+This benchmark runs the week 12 scripts with SimPy and with the lean
+environment of `sys611.fastsim`, where the only difference is the module
+bound by their `import simpy` (the scripts are loaded a second time with
+`sys611.fastsim` in place of `simpy`):
+ * Identity: the printed outputs of the SimPy examples (`simpy1.py` to
+   `simpy5.py`), the log of processes waiting for one shared event (which
+   then request a resource and wait for zero-delay timeouts), and the
+   summary outputs and traces of replications of the
+   cafe (`QueuingSystem.py`, with and without reneging customers), factory
+   (`FactorySystem.py`, with a process per machine and with the fleet
+   scheduler), and inventory (`InventoryModel.py`) models with the same seed
+   are compared value by value, and the replications are timed.
+ * Kernel: models without model code (processes which only wait for
+   timeouts, and an M/M/1 queue of customer processes requesting a
+   `Resource`) measure the time of the kernels per timeout and per
+   customer.
+The speedup of a model is limited by the time spent in its own code (e.g.
+random number draws, statistics, and tracing), which is the same in both
+environments.
+
+Usage: python fastSimBenchmark.py [num_repeats]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sys
+import time
+
+# import the simpy package
+# see https://simpy.readthedocs.io/en/latest/api_reference for documentation
+import simpy
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+import sys611.fastsim
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of repetitions of each timing (the fastest is reported)
+NUM_REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+# SimPy examples (printed outputs are compared)
+EXAMPLES = ['simpy1', 'simpy2', 'simpy3', 'simpy4', 'simpy5']
+# model replications: (label, script, run function, parameters)
+MODELS = [('cafe', 'QueuingSystem', 'run_cafe', {'sim_duration': 20000}),
+          ('cafe reneging', 'QueuingSystem', 'run_cafe',
+           {'sim_duration': 20000, '_lambda': 7.5, 'num_servers': 2, 'mean_patience': 3.0,
+            'balk_threshold': 5}),
+          ('cafe lean', 'QueuingSystem', 'run_cafe', {'sim_duration': 20000, 'lean': True}),
+          ('factory', 'FactorySystem', 'run_factory', {'sim_duration': 20*5*8*52}),
+          ('factory 5000', 'FactorySystem', 'run_factory',
+           {'num_machines': 5000, 'num_repairers': 300, 'num_spares': 2000}),
+          ('factory fleet', 'FactorySystem', 'run_factory',
+           {'sim_duration': 20*5*8*52, 'use_fleet': True}),
+          ('inventory', 'InventoryModel', 'run_warehouse', {'sim_duration': 20000})]
+# duration of the kernel models
+KERNEL_DURATION = 20000
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def load(script, module):
+    """ Loads (runs) a week 12 script with a module bound to `import simpy`.
+
+    Args:
+        script (str): the script name (without `.py`)
+        module (module): the module imported as `simpy`
+
+    Returns:
+        module: the loaded script
+        str: the printed output of loading the script
+    """
+    spec = importlib.util.spec_from_file_location(
+            '{}_{}'.format(script, module.__name__.replace('.', '_')),
+            os.path.join(ROOT, 'week12', script + '.py'))
+    loaded = importlib.util.module_from_spec(spec)
+    output = io.StringIO()
+    sys.modules['simpy'] = module
+    try:
+        with contextlib.redirect_stdout(output):
+            spec.loader.exec_module(loaded)
+    finally:
+        sys.modules['simpy'] = simpy
+    return loaded, output.getvalue()
+
+def identical(a, b):
+    """ Checks if two outputs (nested dicts, lists, and arrays) are identical. """
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(identical(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(identical(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b, equal_nan=True)
+    if isinstance(a, float) and np.isnan(a):
+        return isinstance(b, float) and np.isnan(b)
+    return a == b
+
+def timed(function, *args, **kwargs):
+    """ Calls a function and measures the fastest of repeated calls.
+
+    Returns:
+        object: the result of the last call
+        float: the fastest time (seconds)
+    """
+    elapsed = []
+    for i in range(NUM_REPEATS):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed.append(time.perf_counter() - start)
+    return result, min(elapsed)
+
+def shared_event(module, num_waiters=4):
+    """ Runs processes which wait for one event, then request a resource.
+
+    Returns:
+        list: the log of (time, process, step) in the order processed
+    """
+    env = module.Environment()
+    server = module.Resource(env, capacity=2)
+    shared = env.event()
+    log = []
+    def waiter(name):
+        yield shared
+        log.append((env.now, name, 'woke'))
+        yield env.timeout(0)
+        log.append((env.now, name, 'timeout'))
+        with server.request() as request:
+            yield request
+            log.append((env.now, name, 'granted'))
+            yield env.timeout(1)
+        log.append((env.now, name, 'released'))
+    for i in range(num_waiters):
+        env.process(waiter(chr(ord('A') + i)))
+    env.timeout(1).callbacks.append(lambda event: shared.succeed())
+    env.run()
+    return log
+
+def timeouts(module, num_processes=100):
+    """ Runs processes which only wait for timeouts.
+
+    Returns:
+        int: the number of timeouts
+    """
+    env = module.Environment()
+    draw = random.Random(0).random
+    def wait():
+        while True:
+            yield env.timeout(2*draw())
+    for i in range(num_processes):
+        env.process(wait())
+    env.run(until=KERNEL_DURATION)
+    return num_processes*KERNEL_DURATION
+
+def mm1(module, _lambda=0.9, _mu=1.0):
+    """ Runs an M/M/1 queue of customer processes requesting a resource.
+
+    Returns:
+        int: the expected number of customers
+    """
+    env = module.Environment()
+    rng = random.Random(0)
+    server = module.Resource(env, capacity=1)
+    def customer():
+        with server.request() as request:
+            yield request
+            yield env.timeout(rng.expovariate(_mu))
+    def arrivals():
+        while True:
+            yield env.timeout(rng.expovariate(_lambda))
+            env.process(customer())
+    env.process(arrivals())
+    env.run(until=10*KERNEL_DURATION)
+    return int(_lambda*10*KERNEL_DURATION)
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    # load each script with simpy first (to import the sys611 modules with simpy)
+    scripts = {}
+    for script in EXAMPLES + sorted(set(model[1] for model in MODELS)):
+        scripts[script] = [load(script, module) for module in [simpy, sys611.fastsim]]
+    for script in EXAMPLES:
+        (_, output), (_, fast_output) = scripts[script]
+        print('{:<10s} {} lines printed, identical: {}'.format(
+                script, len(output.splitlines()), output == fast_output))
+    log, fast_log = [shared_event(module) for module in [simpy, sys611.fastsim]]
+    print('{:<10s} {} steps logged, identical: {}'.format('shared', len(log), log == fast_log))
+
+    print()
+    print('{:<16s}{:>12s}{:>12s}{:>10s}{:>11s}'.format(
+            'model', 'simpy (s)', 'fastsim (s)', 'speedup', 'identical'))
+    for label, script, name, params in MODELS:
+        results = []
+        for loaded, _ in scripts[script]:
+            function = getattr(loaded, name)
+            # call the replication directly (not memoized)
+            function = getattr(function, '__wrapped__', function)
+            results.append(timed(function, 0, **params))
+        (output, elapsed), (fast_output, fast_elapsed) = results
+        print('{:<16s}{:>12.3f}{:>12.3f}{:>9.2f}x{:>11s}'.format(
+                label, elapsed, fast_elapsed, elapsed/fast_elapsed,
+                str(identical(output, fast_output))))
+
+    print()
+    print('{:<16s}{:>12s}{:>14s}{:>10s}'.format('kernel', 'simpy (us)', 'fastsim (us)',
+                                                 'speedup'))
+    for kernel in [timeouts, mm1]:
+        (count, elapsed), (_, fast_elapsed) = [timed(kernel, module)
+                                                for module in [simpy, sys611.fastsim]]
+        print('{:<16s}{:>12.3f}{:>14.3f}{:>9.2f}x'.format(
+                kernel.__name__, elapsed/count*1e6, fast_elapsed/count*1e6,
+                elapsed/fast_elapsed))
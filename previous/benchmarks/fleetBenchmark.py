@@ -0,0 +1,142 @@
+"""
+SYS-611: Benchmark of the single-calendar fleet scheduler of the factory model.
+
+This benchmark runs the factory model of week 12 (`FactorySystem.py`) with
+one process per machine (`use_fleet=False`) and with all breakdowns
+dispatched from one calendar (`use_fleet=True`, see `sys611.fleet`).
+ * Equivalence: replications of the 50-machine factory in both modes are
+   compared by the two-sample Welch t-test (means) and Kolmogorov-Smirnov
+   test (distributions) of each output; the modes draw random numbers in a
+   different order, so outputs agree in distribution but not per seed.
+ * Scaling: plants of 10^2 to 10^5 machines (with repairers and spares
+   scaled in proportion) run for eight weeks (about two failures per
+   machine) in separate Python processes to measure the time and the peak
+   memory allocated by Python (a second run with `tracemalloc`).
+
+Usage: python fleetBenchmark.py [num_runs] [max_machines]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications of each mode to compare outputs
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+# largest number of machines of the scaling runs
+MAX_MACHINES = int(sys.argv[2]) if len(sys.argv) > 2 else 10**5
+# outputs to compare
+METRICS = ['cost', 'spares', 'max_stockout']
+# simulation duration of the scaling runs (hours)
+SCALING_DURATION = 8*5*8
+# significance level of the equivalence tests
+ALPHA = 0.01
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def replicate(use_fleet, seed, **params):
+    """ Runs one replication of the factory (not memoized).
+
+    Args:
+        use_fleet (bool): True to schedule breakdowns from one calendar
+        seed (int): the random number seed
+        **params: other parameters of `run_factory`
+
+    Returns:
+        dict: the summary outputs
+    """
+    import FactorySystem
+    run_factory = getattr(FactorySystem.run_factory, '__wrapped__', FactorySystem.run_factory)
+    summary, traces = run_factory(seed, use_fleet=use_fleet, **params)
+    return summary
+
+def run_scaling(use_fleet, num_machines):
+    """ Runs a scaled factory in this process and measures its time and memory.
+
+    Args:
+        use_fleet (bool): True to schedule breakdowns from one calendar
+        num_machines (int): the number of machines
+
+    Returns:
+        dict: the time (s), peak memory (MB), and cost per machine
+    """
+    params = {'num_machines': num_machines, 'num_repairers': max(1, 3*num_machines//50),
+              'num_spares': max(1, 20*num_machines//50), 'sim_duration': SCALING_DURATION}
+    # import the model before timing the first run
+    import FactorySystem
+    start = time.perf_counter()
+    summary = replicate(use_fleet, 0, **params)
+    elapsed = time.perf_counter() - start
+    # repeat the run to trace memory allocations (slower)
+    tracemalloc.start()
+    replicate(use_fleet, 0, **params)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'time': elapsed, 'memory': peak/2**20,
+            'cost': float(summary['cost'])/num_machines}
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    if os.environ.get('SYS611_BENCHMARK_MODE') is not None:
+        # run one scaling case in this (child) process and print the results
+        mode, num_machines = os.environ['SYS611_BENCHMARK_MODE'].split(':')
+        print(json.dumps(run_scaling(mode == 'fleet', int(num_machines))))
+        sys.exit()
+
+    # import the scipy stats package only for the equivalence tests
+    import scipy.stats as stats
+
+    samples = {}
+    print('{:<12s}{:>8s}{:>10s}'.format('mode', 'runs', 'time (s)'))
+    for mode in ['process', 'fleet']:
+        start = time.perf_counter()
+        results = [replicate(mode == 'fleet', seed) for seed in range(NUM_RUNS)]
+        print('{:<12s}{:>8d}{:>10.2f}'.format(mode, NUM_RUNS, time.perf_counter() - start))
+        samples[mode] = {metric: np.array([float(result[metric]) for result in results])
+                         for metric in METRICS}
+
+    print()
+    print('{:<14s}{:>22s}{:>22s}{:>10s}{:>10s}{:>8s}'.format(
+            'output', 'process (95% CI)', 'fleet (95% CI)', 't p-val', 'KS p-val', 'same'))
+    for metric in METRICS:
+        x, y = samples['process'][metric], samples['fleet'][metric]
+        p_t = stats.ttest_ind(x, y, equal_var=False).pvalue
+        p_ks = stats.ks_2samp(x, y).pvalue
+        print('{:<14s}{:>22s}{:>22s}{:>10.3f}{:>10.3f}{:>8s}'.format(
+                metric,
+                '{:.2f} +/- {:.2f}'.format(np.mean(x), 1.96*stats.sem(x)),
+                '{:.2f} +/- {:.2f}'.format(np.mean(y), 1.96*stats.sem(y)),
+                p_t, p_ks, 'yes' if min(p_t, p_ks) > ALPHA else 'NO'))
+
+    print()
+    print('{:<10s}{:>10s}{:>10s}{:>16s}{:>14s}'.format(
+            'mode', 'machines', 'time (s)', 'peak mem. (MB)', 'cost/machine'))
+    num_machines = 100
+    while num_machines <= MAX_MACHINES:
+        for mode in ['process', 'fleet']:
+            output = subprocess.check_output(
+                    [sys.executable, os.path.abspath(__file__)],
+                    env=dict(os.environ, SYS611_BENCHMARK_MODE='{}:{}'.format(mode, num_machines)))
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            print('{:<10s}{:>10d}{:>10.2f}{:>16.1f}{:>14.2f}'.format(
+                    mode, num_machines, result['time'], result['memory'], result['cost']))
+        num_machines *= 10
@@ -0,0 +1,126 @@
+"""
+SYS-611: Benchmark of the vectorized inverse transform process generators.
+
+This benchmark compares the time to generate exponential variates one per
+Python call (as in `generate_x()` of the week 9 examples) to the vectorized
+generators in `sys611.generators` using bulk draws (in chunks) and streams.
+It also compares the exact and tabulated inverse CDF for an expensive ppf
+(the gamma distribution from scipy) and a Weibull distribution.
+
+The per-call method is timed on a smaller number of samples and its time is
+extrapolated to the full number of samples.
+
+Usage: python generatorBenchmark.py [num_samples]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.generators import Exponential, InverseTransform, Weibull
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of samples for bulk draws
+NUM_SAMPLES = int(sys.argv[1]) if len(sys.argv) > 1 else 10**8
+# number of samples for per-call draws (extrapolated to NUM_SAMPLES)
+NUM_CALL_SAMPLES = min(NUM_SAMPLES, 10**6)
+# number of samples for streams and expensive ppfs
+NUM_STREAM_SAMPLES = min(NUM_SAMPLES, 10**7)
+# number of samples per bulk draw
+CHUNK_SIZE = 2**22
+
+# arrival rate (customers per minute)
+_lambda = 1/1.5
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def generate_x():
+    """ Generates one exponential variate per call (as in week 9). """
+    return -np.log(1-np.random.rand())/_lambda
+
+def bulk_mean(generator, num_samples, rng):
+    """ Computes the mean of variates drawn in chunks.
+
+    Args:
+        generator (InverseTransform): the process generator
+        num_samples (int): the number of samples
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        float: the sample mean
+    """
+    total = 0.0
+    for start in range(0, num_samples, CHUNK_SIZE):
+        total += np.sum(generator.sample(min(CHUNK_SIZE, num_samples - start), rng))
+    return total/num_samples
+
+def report(name, elapsed, num_samples, mean, baseline=None):
+    """ Prints a row of the benchmark results. """
+    rate = num_samples/elapsed
+    print('{:<36s}{:>12.3g}{:>12.3g}{:>10.4f}{:>10s}'.format(
+            name, num_samples, rate, mean,
+            '{:.0f}'.format(rate/baseline) if baseline is not None else '-'))
+    return rate
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    # import the scipy stats package only for the expensive ppf example
+    import scipy.stats as stats
+
+    rng = np.random.default_rng(0)
+    arrivals = Exponential(_lambda)
+    print('{:<36s}{:>12s}{:>12s}{:>10s}{:>10s}'.format(
+            'exponential (mean {:.2f})'.format(1/_lambda), 'samples', 'samples/s',
+            'mean', 'speedup'))
+
+    np.random.seed(0)
+    start = time.perf_counter()
+    samples = [generate_x() for i in range(NUM_CALL_SAMPLES)]
+    elapsed = time.perf_counter() - start
+    baseline = report('per-call generate_x()', elapsed, NUM_CALL_SAMPLES, np.mean(samples))
+    print('  (extrapolated time for {:.3g} samples: {:.0f} s)'.format(
+            NUM_SAMPLES, elapsed*NUM_SAMPLES/NUM_CALL_SAMPLES))
+
+    start = time.perf_counter()
+    stream = arrivals.stream(rng)
+    total = sum(next(stream) for i in range(NUM_STREAM_SAMPLES))
+    report('stream next()', time.perf_counter() - start, NUM_STREAM_SAMPLES,
+           total/NUM_STREAM_SAMPLES, baseline)
+
+    start = time.perf_counter()
+    mean = bulk_mean(arrivals, NUM_SAMPLES, rng)
+    report('bulk sample(size)', time.perf_counter() - start, NUM_SAMPLES, mean, baseline)
+
+    start = time.perf_counter()
+    mean = bulk_mean(arrivals.tabulate(), NUM_SAMPLES, rng)
+    report('bulk sample(size), tabulated', time.perf_counter() - start, NUM_SAMPLES,
+           mean, baseline)
+
+    # compare exact and tabulated ppfs of other distributions
+    for name, generator in [('weibull (k=1.5)', Weibull(1.5)),
+                            ('gamma (a=2.5, scipy ppf)', InverseTransform(stats.gamma(2.5).ppf))]:
+        print('{:<36s}'.format(name))
+        start = time.perf_counter()
+        mean = bulk_mean(generator, NUM_STREAM_SAMPLES, rng)
+        exact = report('  exact ppf', time.perf_counter() - start, NUM_STREAM_SAMPLES, mean)
+        start = time.perf_counter()
+        tabulated = generator.tabulate()
+        mean = bulk_mean(tabulated, NUM_STREAM_SAMPLES, rng)
+        report('  tabulated ppf (incl. table)', time.perf_counter() - start,
+               NUM_STREAM_SAMPLES, mean, exact)
+        r = rng.random(10**6)
+        print('  maximum interpolation error: {:.2g}'.format(
+                np.max(np.abs(tabulated.ppf(r) - generator.ppf(r)))))
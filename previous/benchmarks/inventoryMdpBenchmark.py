@@ -0,0 +1,156 @@
+"""
+SYS-611: Benchmark of the inventory Markov decision process.
+
+This benchmark solves the inventory MDP (see `sys611.mdp`) for the optimal
+ordering policy of the inventory model and cross-checks policies by
+simulation:
+ * Solution: the optimal profit per day and policy, the number of states,
+   iterations, and time.
+ * Cross-check: the optimal policy, the (s, S) policies of the week 9
+   (15, 20) and week 12 (10, 30) models, and the (s, S) policy closest to
+   the optimal policy are evaluated exactly with the MDP and simulated in
+   continuous time (the event model of week 9 with a policy table, reviewed
+   after each customer and delivery). The (10, 30) policy is also simulated
+   with the SimPy model of week 12 to validate the event model.
+ * Grid search: the time to estimate the profit of all (s, S) policies by
+   simulation is extrapolated from the time of one replication.
+
+Usage: python inventoryMdpBenchmark.py [num_runs] [period]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+from sys611.mdp import InventoryMDP, order_levels
+import InventoryModel
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications of each policy
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+# period of the MDP (days)
+PERIOD = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+# inventory capacity of the MDP (items)
+MAX_INVENTORY = 100
+# simulation duration of each replication (days, long enough that the
+# initial inventory has little effect on the profit per day)
+SIM_DURATION = 3650
+# hand-picked (s, S) policies of the week 9 and week 12 models
+POLICIES = [(15, 20), (10, 30)]
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def simulate(order, seed, duration=SIM_DURATION):
+    """ Simulates the inventory model with a policy in continuous time.
+
+    The inventory is reviewed after each customer and delivery, and the
+    model parameters are those of the week 12 inventory model.
+
+    Args:
+        order (numpy.ndarray): the order quantity of each inventory level
+            with nothing on order
+        seed (int): the random number seed
+        duration (float): the simulation duration (days)
+
+    Returns:
+        float: the profit per day
+    """
+    model = InventoryModel
+    rng = np.random.default_rng(seed)
+    order = np.asarray(order).tolist()
+    # start with the largest inventory the policy orders up to
+    inventory = max(i + q for i, q in enumerate(order) if q > 0)
+    num_ordered = 0
+    t = 0.0
+    t_customer = rng.exponential(1/model.arrival_rate)
+    t_delivery = float('inf')
+    profit = 0.0
+    while True:
+        t_next = min(t_customer, t_delivery)
+        if t_next > duration:
+            profit -= model.holding_cost*inventory*(duration - t)
+            break
+        profit -= model.holding_cost*inventory*(t_next - t)
+        t = t_next
+        if t == t_customer:
+            demand = int(rng.integers(model.demand_lb, model.demand_ub + 1))
+            sold = min(demand, inventory)
+            profit += model.product_price*sold
+            inventory -= sold
+            t_customer += rng.exponential(1/model.arrival_rate)
+        else:
+            inventory += num_ordered
+            num_ordered = 0
+            t_delivery = float('inf')
+        if num_ordered == 0 and order[inventory] > 0:
+            num_ordered = order[inventory]
+            profit -= model.product_cost*num_ordered
+            t_delivery = t + model.delivery_delay
+    return profit/duration
+
+def mean_interval(values):
+    """ Formats the mean and 95% confidence interval half-width of values. """
+    return '{:.1f} +/- {:.1f}'.format(np.mean(values),
+                                      1.96*np.std(values, ddof=1)/np.sqrt(len(values)))
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    mdp = InventoryMDP(max_inventory=MAX_INVENTORY, period=PERIOD)
+    gain, optimal = mdp.solve()
+    elapsed = time.perf_counter() - start
+    trigger, level = order_levels(optimal)
+    print('{} states ({} day periods): optimal profit {:.2f} $/day in {} iterations, '
+          '{:.2f} s'.format(mdp.num_states, PERIOD, gain, mdp.iterations, elapsed))
+    print('optimal order quantity (inventory 0 to {}): {}'.format(
+            trigger - 1, ' '.join(str(q) for q in optimal[:trigger])))
+    print('orders up to {} to {} items'.format(
+            min(i + optimal[i] for i in range(trigger)),
+            max(i + optimal[i] for i in range(trigger))))
+
+    print()
+    print('{:<16s}{:>12s}{:>10s}{:>20s}{:>20s}'.format(
+            'policy', 'MDP $/day', 'time (s)', 'simulated $/day', 'SimPy $/day'))
+    # the (s, S) policy closest to the optimal policy (median order-up-to level)
+    closest = (trigger, int(np.median([i + optimal[i] for i in range(trigger)])))
+    policies = [('optimal', optimal)] + [
+            ('(s, S) = ({}, {})'.format(*levels), mdp.order_up_to(*levels))
+            for levels in [closest] + POLICIES]
+    for name, order in policies:
+        start = time.perf_counter()
+        value = gain if name == 'optimal' else mdp.evaluate(order)
+        elapsed = time.perf_counter() - start
+        simulated = [simulate(order, seed) for seed in range(NUM_RUNS)]
+        simpy = '-'
+        if name == '(s, S) = (10, 30)':
+            run = getattr(InventoryModel.run_warehouse, '__wrapped__',
+                          InventoryModel.run_warehouse)
+            simpy = mean_interval([run(seed, 10, 30, sim_duration=SIM_DURATION)[0]['balance']
+                                   /SIM_DURATION for seed in range(NUM_RUNS)])
+        print('{:<16s}{:>12.2f}{:>10.2f}{:>20s}{:>20s}'.format(
+                name, value, elapsed, mean_interval(simulated), simpy))
+
+    print()
+    run = getattr(InventoryModel.run_warehouse, '__wrapped__', InventoryModel.run_warehouse)
+    start = time.perf_counter()
+    run(0, 10, 30, sim_duration=SIM_DURATION)
+    elapsed = time.perf_counter() - start
+    num_policies = (MAX_INVENTORY + 1)*(MAX_INVENTORY + 2)//2
+    print('grid search of {} (s, S) policies with {} SimPy runs each: {:.1f} hours '
+          '(extrapolated)'.format(num_policies, NUM_RUNS,
+                                  num_policies*NUM_RUNS*elapsed/3600))
@@ -0,0 +1,138 @@
+"""
+SYS-611: Benchmark of the vectorized jump chain of the M/M/1 queue.
+
+This benchmark compares the vectorized jump chain (see `sys611.jumpchain`) to
+the loop of the week 8 queuing Markov model (`queuingMarkovModel.py`):
+ * Identity: trajectories of the loop and the vectorized jump chain with the
+   same seed (M/M/1 with `run_queue`, and M/M/1/K with a loop with a
+   capacity) are compared value by value, and timed.
+ * Streaming: long trajectories (e.g. 10^9 events) are summarized in chunks
+   and the time-average number of customers and the occupancy of states are
+   compared to the steady-state probabilities of the M/M/1 and M/M/1/K
+   queues, with the time per event and the peak memory.
+
+Usage: python jumpChainBenchmark.py [num_events] [capacity]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import resource
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week8'))
+from sys611.jumpchain import jump_chain, jump_chain_summary
+import queuingMarkovModel
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of events of the streamed trajectories
+NUM_EVENTS = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**9
+# capacity of the M/M/1/K queue
+CAPACITY = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+# number of events of the compared trajectories
+COMPARE_EVENTS = 10**6
+# arrival and service rates of the week 8 model
+ARRIVAL_RATE = queuingMarkovModel._lambda
+SERVICE_RATE = queuingMarkovModel._mu
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def loop_queue(seed, num_events, capacity):
+    """ Generates the jump chain of the M/M/1/K queue one event at a time.
+
+    This is the loop of `run_queue` with an event at the capacity being a
+    service (arrivals are lost).
+
+    Args:
+        seed (int): the random number seed
+        num_events (int): the number of events
+        capacity (int): the most customers (K)
+
+    Returns:
+        numpy.ndarray: the time at each event and at the end
+        numpy.ndarray: the customers at each event and at the end
+    """
+    np.random.seed(seed)
+    t = np.zeros(num_events+1)
+    q = np.zeros(num_events+1)
+    for i in range(num_events):
+        t_arrival = queuingMarkovModel.gen_t_arrival()
+        t_service = queuingMarkovModel.gen_t_service()
+        if q[i] == 0 or (q[i] < capacity and t_arrival < t_service):
+            delta_t = t_arrival
+            q[i+1] = q[i] + 1
+        else:
+            delta_t = t_service
+            q[i+1] = q[i] - 1
+        t[i+1] = t[i] + delta_t
+    return t, q
+
+def steady_state(rho, capacity=None, size=None):
+    """ Computes the steady-state probabilities of customers (M/M/1 or M/M/1/K).
+
+    Args:
+        rho (float): the utilization (lambda/mu)
+        capacity (int): the most customers (K, None for no limit)
+        size (int): the number of probabilities without a capacity
+
+    Returns:
+        numpy.ndarray: the probability of each number of customers
+    """
+    p = rho**np.arange(capacity + 1 if capacity is not None else size)
+    return p/p.sum() if capacity is not None else (1 - rho)*p
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    print('{:<12s}{:>10s}{:>14s}{:>14s}{:>10s}{:>10s}'.format(
+            'model', 'events', 'loop (s)', 'vector (s)', 'speedup', 'identical'))
+    for capacity in [None, CAPACITY]:
+        start = time.perf_counter()
+        if capacity is None:
+            summary, traces = queuingMarkovModel.run_queue(0, COMPARE_EVENTS)
+            t, q = traces['t'], traces['q']
+        else:
+            t, q = loop_queue(0, COMPARE_EVENTS, capacity)
+        loop_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        np.random.seed(0)
+        traces = jump_chain(ARRIVAL_RATE, SERVICE_RATE, COMPARE_EVENTS, capacity)
+        elapsed = time.perf_counter() - start
+        print('{:<12s}{:>10d}{:>14.2f}{:>14.3f}{:>10.0f}{:>10s}'.format(
+                'M/M/1' if capacity is None else 'M/M/1/{}'.format(capacity),
+                COMPARE_EVENTS, loop_elapsed, elapsed, loop_elapsed/elapsed,
+                str(np.array_equal(t, traces['t']) and np.array_equal(q, traces['q']))))
+
+    print()
+    rho = ARRIVAL_RATE/SERVICE_RATE
+    for capacity in [None, CAPACITY]:
+        memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        summary = jump_chain_summary(ARRIVAL_RATE, SERVICE_RATE, NUM_EVENTS, capacity,
+                                     rng=np.random.default_rng(0))
+        elapsed = time.perf_counter() - start
+        memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory
+        occupancy = summary['occupancy']
+        exact = steady_state(rho, capacity, len(occupancy))
+        print('{} for {:.0e} events: {:.1f} s ({:.1f} ns/event), peak memory +{:.0f} MB, '
+              'time {:.4g}'.format('M/M/1' if capacity is None else 'M/M/1/{}'.format(capacity),
+                                   NUM_EVENTS, elapsed, elapsed/NUM_EVENTS*1e9, memory/1024,
+                                   summary['time']))
+        print('  mean customers {:.5f} (exact {:.5f})'.format(
+                summary['mean_customers'], rho/(1 - rho) if capacity is None
+                else exact.dot(np.arange(len(exact)))))
+        print('  occupancy {} (largest error {:.1e})'.format(
+                ' '.join('{:.5f}'.format(p) for p in occupancy[:6]),
+                np.abs(occupancy - exact).max()))
@@ -0,0 +1,117 @@
+"""
+SYS-611: Benchmark of the lazily-settled cost ledger of the SimPy models.
+
+This benchmark runs the factory, inventory, and cafe models of week 12 over
+long horizons, where costs accrue in a ledger (see `sys611.ledger`) rather
+than with bookkeeping events (a daily cost process, holding costs charged at
+each arrival, and an observation process). For each model it prints the
+number of events scheduled, the bookkeeping events removed from the previous
+models (one per day of the factory, and one per hour of the factory or 0.1
+day of the inventory observations; the cafe still observes the queue length
+each minute, and its server cost needs no event), and the run time. It then checks
+that the cost trajectory reconstructed at the end of the horizon equals the
+total, and that the factory costs equal the costs accounted per machine by
+the fleet scheduler (see `sys611.fleet`), and times the reconstruction of a
+cost trajectory at a fine resolution.
+
+Usage: python ledgerBenchmark.py [num_years]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+from sys611.profiling import Profile
+import FactorySystem
+import InventoryModel
+import QueuingSystem
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of years to simulate (working years of 2080 hours of the factory and
+# calendar years of 365 days of the inventory; the cafe, with many more
+# events, simulates one working week of minutes per year)
+NUM_YEARS = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+# number of times to repeat the timing (the minimum time is reported)
+NUM_REPEATS = 3
+
+# models (module, replication function name, parameters, and number of
+# bookkeeping events removed from the previous models)
+MODELS = [
+    ('factory', FactorySystem, 'run_factory', {'sim_duration': 2080*NUM_YEARS},
+     2080*NUM_YEARS/8 + 2080*NUM_YEARS),
+    ('inventory', InventoryModel, 'run_warehouse', {'sim_duration': 365*NUM_YEARS},
+     365*NUM_YEARS/0.1),
+    ('cafe', QueuingSystem, 'run_cafe', {'sim_duration': 60*40*NUM_YEARS}, 0),
+]
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def replicate(module, function, params, profile=None):
+    """ Runs one replication of a model (not memoized).
+
+    Args:
+        module (module): the model module
+        function (str): the replication function name
+        params (dict): the model parameters
+        profile (Profile): the profile to count events (None to not profile)
+
+    Returns:
+        dict: the summary outputs
+        dict: the observed traces
+    """
+    run = getattr(module, function)
+    run = getattr(run, '__wrapped__', run)
+    module.PROFILE = profile
+    try:
+        return run(0, **params)
+    finally:
+        module.PROFILE = None
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    print('{:<12s}{:>12s}{:>14s}{:>14s}{:>10s}'.format(
+            'model', 'duration', 'events', 'removed', 'time (s)'))
+    for name, module, function, params, removed in MODELS:
+        # count the events scheduled (with a sparse sample of steps)
+        profile = Profile(interval=2**20)
+        replicate(module, function, params, profile)
+        elapsed = float('inf')
+        for repeat in range(NUM_REPEATS):
+            start = time.perf_counter()
+            replicate(module, function, params)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        print('{:<12s}{:>12.0f}{:>14d}{:>14.0f}{:>10.3f}'.format(
+                name, params['sim_duration'], profile.num_scheduled, removed, elapsed))
+
+    print()
+    # check the reconstructed trajectory at the end of the horizon
+    duration = 2080*NUM_YEARS
+    replicate(FactorySystem, 'run_factory', {'sim_duration': duration, 'use_fleet': True})
+    ledger, fleet = FactorySystem.ledger, FactorySystem.fleet
+    end = ledger.trajectory([duration])[0]
+    print('factory ledger total {:.6f}, trajectory at end {:.6f}'.format(ledger.total(), end))
+    # downtime of replaced machines and of machines still out of service
+    downtime = fleet.downtime.sum() + np.nansum(duration - fleet.broken_since)
+    print('factory downtime cost {:.6f}, from per-machine accounting {:.6f}'.format(
+            ledger.total('downtime'), 20*downtime))
+    start = time.perf_counter()
+    times = np.linspace(0, duration, 10**6, endpoint=False)
+    ledger.trajectory(times)
+    print('trajectory at {} times in {:.3f} s ({} breakpoints)'.format(
+            len(times), time.perf_counter() - start,
+            sum(len(stream.times) for stream in ledger.streams.values())))
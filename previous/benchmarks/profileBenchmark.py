@@ -0,0 +1,95 @@
+"""
+SYS-611: Benchmark of the profiling hooks of the SimPy models.
+
+This benchmark runs replications of the factory, cafe, and inventory models
+of week 12 with and without profiling (see `sys611.profiling`), prints the
+overhead of profiling, and prints the profile of each model (a summary table
+by process type). With an output directory, it also writes the folded stacks
+of each model for flame graph tools (e.g. `flamegraph.pl factory.folded`).
+
+Usage: python profileBenchmark.py [num_runs] [output_directory]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+from sys611.profiling import Profile
+import FactorySystem
+import InventoryModel
+import QueuingSystem
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications of each model
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+# directory to write folded stacks (None to not write)
+OUTPUT_DIRECTORY = sys.argv[2] if len(sys.argv) > 2 else None
+# number of times to repeat the timing, alternating runs with and without
+# profiling (the minimum time is reported)
+NUM_REPEATS = 5
+
+# models (module, replication function name, and parameters)
+MODELS = [
+    ('factory', FactorySystem, 'run_factory', {}),
+    ('cafe', QueuingSystem, 'run_cafe', {'sim_duration': 2000}),
+    ('inventory', InventoryModel, 'run_warehouse', {'sim_duration': 1000}),
+]
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def time_runs(module, function, params, profile):
+    """ Measures the time of replications of a model.
+
+    Args:
+        module (module): the model module
+        function (str): the replication function name
+        params (dict): the model parameters
+        profile (Profile): the profile (None to not profile)
+
+    Returns:
+        float: the time (s) of the replications
+    """
+    # replications are not memoized so each replication is timed
+    replicate = getattr(module, function)
+    replicate = getattr(replicate, '__wrapped__', replicate)
+    module.PROFILE = profile
+    try:
+        start = time.perf_counter()
+        for seed in range(NUM_RUNS):
+            replicate(seed, **params)
+        return time.perf_counter() - start
+    finally:
+        module.PROFILE = None
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    profiles = []
+    print('{:<12s}{:>8s}{:>14s}{:>14s}{:>12s}'.format(
+            'model', 'runs', 'plain (s)', 'profiled (s)', 'overhead'))
+    for name, module, function, params in MODELS:
+        profile = Profile()
+        plain, profiled = float('inf'), float('inf')
+        for repeat in range(NUM_REPEATS):
+            plain = min(plain, time_runs(module, function, params, None))
+            profiled = min(profiled, time_runs(module, function, params, profile))
+        print('{:<12s}{:>8d}{:>14.3f}{:>14.3f}{:>12.1%}'.format(
+                name, NUM_RUNS, plain, profiled, profiled/plain - 1))
+        profiles.append((name, profile))
+
+    for name, profile in profiles:
+        print()
+        print(name)
+        print(profile)
+        if OUTPUT_DIRECTORY is not None:
+            profile.write_folded(os.path.join(OUTPUT_DIRECTORY, name + '.folded'))
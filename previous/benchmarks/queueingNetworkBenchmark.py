@@ -0,0 +1,213 @@
+"""
+SYS-611: Benchmark of the queueing network simulation.
+
+This benchmark compares the queueing network simulation (see
+`sys611.network`), which serves all stations from one event calendar with a
+queue per station, to the product-form (Jackson) results and to a SimPy
+reference with one process per customer visiting `simpy.Resource` stations
+(as in the week 12 cafe model):
+ * Validation: replications of a cafe network (order, pay, barista with
+   remakes, and pickup with returning customers) are compared by the mean
+   number of customers at each station and the mean sojourn time (95%
+   confidence interval) to the Jackson results, with the SimPy reference.
+ * Scaling: a random network of stations (each routing to a few random
+   stations) is simulated for a number of customers and compared to the
+   Jackson results; the SimPy time is extrapolated from a shorter run.
+
+Usage: python queueingNetworkBenchmark.py [num_runs] [num_stations] [num_customers]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the simpy package
+# see https://simpy.readthedocs.io/en/latest/api_reference for documentation
+import simpy
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.network import QueueingNetwork
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications to validate
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+# number of stations and customers of the large network
+NUM_STATIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+NUM_CUSTOMERS = int(float(sys.argv[3])) if len(sys.argv) > 3 else 10**7
+# simulation duration and warm-up of the validation (minutes)
+SIM_DURATION = 20000
+WARMUP = 500
+# customers of the SimPy run of the large network
+SIMPY_CUSTOMERS = 10**5
+
+# cafe network: customers order, pay, wait for a barista (10% of drinks are
+# remade), and pick up (5% return to order again)
+CAFE = {'defaults': {'num_servers': 1},
+        'stations': [{'name': 'order', 'service_rate': 1.2, 'arrival_rate': 1.0,
+                      'routing': {'pay': 1.0}},
+                     {'name': 'pay', 'service_rate': 2.0, 'routing': {'barista': 1.0}},
+                     {'name': 'barista', 'num_servers': 2, 'service_rate': 0.8,
+                      'routing': {'barista': 0.1, 'pickup': 0.9}},
+                     {'name': 'pickup', 'service_rate': 3.0, 'routing': {'order': 0.05}}]}
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def random_config(num_stations, seed=0, arrival_rate=10.0, stay=0.8):
+    """ Creates the configuration of a random network.
+
+    Each station has external arrivals, 1 to 4 servers, and routes to 3
+    random stations (staying in the network with a total probability), with
+    service rates set for a random utilization between 0.5 and 0.9.
+
+    Args:
+        num_stations (int): the number of stations
+        seed (int): the random number seed of the network
+        arrival_rate (float): the total external arrival rate (customers/minute)
+        stay (float): the probability to move to another station after service
+
+    Returns:
+        dict: the configuration
+    """
+    rng = np.random.default_rng(seed)
+    external = rng.random(num_stations)
+    external *= arrival_rate/external.sum()
+    routing = np.zeros((num_stations, num_stations))
+    for i in range(num_stations):
+        destinations = rng.choice(num_stations, 3, replace=False)
+        routing[i, destinations] = stay*rng.dirichlet(np.ones(3))
+    # arrival rates solving the traffic equations
+    rates = np.linalg.solve(np.eye(num_stations) - routing.T, external)
+    servers = rng.integers(1, 5, num_stations)
+    utilization = rng.uniform(0.5, 0.9, num_stations)
+    return {'stations': [{'name': 's{}'.format(i), 'num_servers': int(servers[i]),
+                          'service_rate': float(rates[i]/servers[i]/utilization[i]),
+                          'arrival_rate': float(external[i]),
+                          'routing': {'s{}'.format(j): float(routing[i, j])
+                                      for j in np.flatnonzero(routing[i])}}
+                         for i in range(num_stations)]}
+
+def run_simpy(config, seed, sim_duration, warmup=0.0):
+    """ Runs one replication of the SimPy reference of a queueing network.
+
+    Args:
+        config (dict): the configuration (see `QueueingNetwork.from_config`)
+        seed (int): the random number seed
+        sim_duration (float): the simulation duration (minutes)
+        warmup (float): the time after which outputs are recorded
+
+    Returns:
+        dict: the mean number of customers of each station name and the mean
+            sojourn time of the `network`
+    """
+    np.random.seed(seed)
+    network = QueueingNetwork.from_config(config)
+    stations = list(network.stations.values())
+    names = [station.name for station in stations]
+    env = simpy.Environment()
+    resources = [simpy.Resource(env, capacity=station.num_servers) for station in stations]
+    # time-average number of customers of each station
+    number = [0]*len(stations)
+    area = [0.0]*len(stations)
+    last = [0.0]*len(stations)
+    sojourn = []
+
+    def change(j, delta):
+        """ Settles the area of a station and changes its number of customers. """
+        now = max(env.now, warmup)
+        area[j] += number[j]*(now - last[j])
+        last[j] = now
+        number[j] += delta
+
+    def customer(j):
+        """ Process of a customer visiting stations until leaving. """
+        born = env.now
+        while j < len(stations):
+            change(j, 1)
+            with resources[j].request() as request:
+                yield request
+                yield env.timeout(np.random.exponential(1/stations[j].service_rate))
+            change(j, -1)
+            j = np.random.choice(len(stations) + 1, p=network.routing[j])
+        if env.now > warmup:
+            sojourn.append(env.now - born)
+
+    def arrivals():
+        """ Process of the external arrivals of all stations. """
+        total = network.arrival_rates.sum()
+        while True:
+            yield env.timeout(np.random.exponential(1/total))
+            env.process(customer(np.random.choice(len(stations),
+                                                  p=network.arrival_rates/total)))
+
+    env.process(arrivals())
+    env.run(until=sim_duration)
+    outputs = {}
+    for j, name in enumerate(names):
+        change(j, 0)
+        outputs[name] = {'number': area[j]/(sim_duration - warmup)}
+    outputs['network'] = {'sojourn': np.mean(sojourn)}
+    return outputs
+
+def mean_interval(values):
+    """ Formats the mean and 95% confidence interval half-width of values. """
+    return '{:.3f} +/- {:.3f}'.format(np.mean(values),
+                                      1.96*np.std(values, ddof=1)/np.sqrt(len(values)))
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    network = QueueingNetwork.from_config(CAFE, rng=np.random.default_rng(0))
+    jackson = network.jackson()
+    start = time.perf_counter()
+    outputs = [network.run(SIM_DURATION, WARMUP) for seed in range(NUM_RUNS)]
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    references = [run_simpy(CAFE, seed, SIM_DURATION, WARMUP) for seed in range(NUM_RUNS)]
+    simpy_elapsed = time.perf_counter() - start
+    print('cafe network, {} runs of {} minutes: calendar {:.2f} s, SimPy {:.2f} s'.format(
+            NUM_RUNS, SIM_DURATION, elapsed, simpy_elapsed))
+    print('{:<10s}{:>10s}{:>20s}{:>20s}'.format('station', 'Jackson', 'calendar', 'SimPy'))
+    for name in network.stations:
+        print('{:<10s}{:>10.3f}{:>20s}{:>20s}'.format(
+                name, jackson[name]['number'],
+                mean_interval([o[name]['number'] for o in outputs]),
+                mean_interval([o[name]['number'] for o in references])))
+    print('{:<10s}{:>10.3f}{:>20s}{:>20s}'.format(
+            'sojourn', jackson['network']['sojourn'],
+            mean_interval([o['network']['sojourn'] for o in outputs]),
+            mean_interval([o['network']['sojourn'] for o in references])))
+
+    print()
+    config = random_config(NUM_STATIONS)
+    network = QueueingNetwork.from_config(config, rng=np.random.default_rng(0))
+    jackson = network.jackson()
+    throughput = jackson['network']['throughput']
+    duration = NUM_CUSTOMERS/throughput
+    start = time.perf_counter()
+    output = network.run(duration, warmup=0.01*duration)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    run_simpy(config, 0, SIMPY_CUSTOMERS/throughput)
+    simpy_elapsed = (time.perf_counter() - start)*NUM_CUSTOMERS/SIMPY_CUSTOMERS
+    visits = network.traffic().sum()/throughput
+    print('{} stations, {} customers ({:.1f} visits each): calendar {:.1f} s '
+          '({:.2f} us/visit), SimPy {:.0f} s (extrapolated)'.format(
+                  NUM_STATIONS, NUM_CUSTOMERS, visits, elapsed,
+                  elapsed/NUM_CUSTOMERS/visits*1e6, simpy_elapsed))
+    errors = [abs(output[name]['number']/jackson[name]['number'] - 1)
+              for name in network.stations]
+    print('sojourn {:.3f} (Jackson {:.3f}), throughput {:.3f} (Jackson {:.3f}), '
+          'largest error of the mean number at a station {:.2%}'.format(
+                  output['network']['sojourn'], jackson['network']['sojourn'],
+                  output['network']['throughput'], throughput, max(errors)))
@@ -0,0 +1,133 @@
+"""
+SYS-611: Benchmark of the Markov model of the factory repair system.
+
+This benchmark compares the Markov model of the machine repair system (see
+`sys611.repair`) to the SimPy factory model of week 12 (`FactorySystem.py`,
+with the fleet scheduler):
+ * Screening: the time to solve one design and a grid of designs (numbers of
+   repairers and spares) with the Markov model, and the cheapest design.
+ * Accuracy: the cost rate (dollars/hour) of several designs from the
+   Markov model (steady state with exponential times, and with Erlang repair
+   and breakdown times) and from the factory model over one year (with the
+   burst of breakdowns of the new machines) and over a long horizon. The
+   exact expected cost of the first year from the initial state is checked
+   against simulations of the Markov model (`markov=True`).
+ * Control variate: the cost of one year is estimated from replications of
+   the factory model with and without the cost of the Markov model run with
+   the same seed as a control variate with a known mean.
+
+Usage: python repairBenchmark.py [num_runs] [num_years]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+from sys611.repair import MachineRepair, screen
+from sys611.variance import compare, replicate_control_variates
+import FactorySystem
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications of one year
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+# number of years of the long horizon (10 replications)
+NUM_YEARS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+# working hours per year
+YEAR = 2080
+# designs (repairers, spares) to compare
+DESIGNS = [(3, 20), (3, 8), (4, 4)]
+# ranges of the screened grid of designs
+REPAIRERS = range(1, 11)
+SPARES = range(0, 31)
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def replicate(seed, num_repairers, num_spares, sim_duration=YEAR, markov=False):
+    """ Computes the cost rate of one replication of the factory (not memoized).
+
+    Args:
+        seed (int): the random number seed
+        num_repairers (int): the number of repairers (R)
+        num_spares (int): the number of spares (S)
+        sim_duration (float): the simulation duration (hours)
+        markov (bool): True for exponential times (the Markov model)
+
+    Returns:
+        float: the cost rate (dollars/hour)
+    """
+    run = getattr(FactorySystem.run_factory, '__wrapped__', FactorySystem.run_factory)
+    summary, traces = run(seed, num_repairers=num_repairers, num_spares=num_spares,
+                          sim_duration=sim_duration, use_fleet=True, markov=markov)
+    return summary['cost']/sim_duration
+
+def mean_interval(values):
+    """ Formats the mean and 95% confidence interval half-width of values. """
+    return '{:.2f} +/- {:.2f}'.format(np.mean(values),
+                                      1.96*np.std(values, ddof=1)/np.sqrt(len(values)))
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    # screening with the Markov model (the first solve loads scipy)
+    MachineRepair(3, 20).expected(YEAR)
+    repeats = 1000
+    start = time.perf_counter()
+    for i in range(repeats):
+        MachineRepair(3, 20).metrics()
+    elapsed = (time.perf_counter() - start)/repeats
+    start = time.perf_counter()
+    costs = screen(REPAIRERS, SPARES)
+    grid_elapsed = time.perf_counter() - start
+    best = np.unravel_index(np.argmin(costs), costs.shape)
+    print('one design {:.0f} us, {} designs {:.3f} s: cheapest R={} S={} ({:.2f} $/h)'.format(
+            elapsed*1e6, costs.size, grid_elapsed, REPAIRERS[best[0]], SPARES[best[1]],
+            costs[best]))
+
+    print()
+    print('{:<8s}{:>9s}{:>9s}{:>9s}{:>18s}{:>16s}{:>10s}{:>18s}'.format(
+            'design', 'CTMC', 'Erlang', 'Erlang2', 'SimPy (long)', 'SimPy (1 y)',
+            'CTMC 1 y', 'Markov sim 1 y'))
+    for num_repairers, num_spares in DESIGNS:
+        model = MachineRepair(num_repairers, num_spares)
+        long_run = [replicate(seed, num_repairers, num_spares, NUM_YEARS*YEAR)
+                    for seed in range(10)]
+        one_year = [replicate(seed, num_repairers, num_spares) for seed in range(NUM_RUNS)]
+        markov = [replicate(seed, num_repairers, num_spares, markov=True)
+                  for seed in range(NUM_RUNS)]
+        print('{:<8s}{:>9.2f}{:>9.2f}{:>9.2f}{:>18s}{:>16s}{:>10.2f}{:>18s}'.format(
+                'R={} S={}'.format(num_repairers, num_spares), model.metrics()['cost_rate'],
+                MachineRepair(num_repairers, num_spares,
+                              repair_phases=4).metrics()['cost_rate'],
+                MachineRepair(num_repairers, num_spares, lifetime_phases=2,
+                              repair_phases=4).metrics()['cost_rate'],
+                mean_interval(long_run), mean_interval(one_year),
+                model.expected(YEAR)['cost_rate'], mean_interval(markov)))
+
+    print()
+    num_repairers, num_spares = DESIGNS[-1]
+    expected = MachineRepair(num_repairers, num_spares).expected(YEAR)['cost_rate']
+
+    def paired(seed):
+        """ Runs the factory and the Markov model with the same seed. """
+        return {'cost': replicate(seed, num_repairers, num_spares),
+                'markov': replicate(seed, num_repairers, num_spares, markov=True)}
+
+    crude, controlled = replicate_control_variates(paired, NUM_RUNS, 'cost',
+                                                   {'markov': expected})
+    print('control variate for R={} S={} (coefficient {:.3f}):'.format(
+            num_repairers, num_spares, controlled.beta[0]))
+    print(compare([crude, controlled]))
@@ -0,0 +1,147 @@
+"""
+SYS-611: Benchmark of the vectorized inventory simulation of many SKUs.
+
+This benchmark compares the vectorized inventory simulation (see
+`sys611.inventory`) to the SimPy inventory model of week 12
+(`InventoryModel.py`, with a constant arrival rate):
+ * Validation: replications of the SimPy model are compared to as many
+   identical SKUs of the vectorized simulation, for several bucket durations,
+   by the mean net revenue balance (95% confidence interval) and the
+   two-sample Welch t-test.
+ * Scaling: a warehouse of SKUs with random parameters (arrival rates,
+   demands, order policies, and delivery delays) is simulated for a year,
+   and the time is compared to the time of SimPy runs of a few SKUs
+   extrapolated to all SKUs.
+
+Usage: python skuInventoryBenchmark.py [num_runs] [num_skus]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week12'))
+from sys611.inventory import SkuInventory
+import InventoryModel
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications of the SimPy model to validate
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+# number of SKUs of the warehouse
+NUM_SKUS = int(sys.argv[2]) if len(sys.argv) > 2 else 10**4
+# simulation duration of the validation (days)
+SIM_DURATION = 100
+# bucket durations of the validation (days)
+BUCKETS = [0.1, 0.02, 0.005]
+# simulation duration of the warehouse (days)
+WAREHOUSE_DURATION = 365
+# number of SKUs simulated with SimPy to extrapolate the time
+NUM_SIMPY_SKUS = 20
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def week12_skus(num_skus):
+    """ Creates SKUs with the parameters of the week 12 inventory model.
+
+    Args:
+        num_skus (int): the number of SKUs
+
+    Returns:
+        SkuInventory: the SKUs
+    """
+    model = InventoryModel
+    return SkuInventory(np.full(num_skus, model.arrival_rate), model.demand_lb, model.demand_ub,
+                        model.ORDER_THRESHOLD, model.ORDER_UP_TO, model.delivery_delay,
+                        model.product_price, model.product_cost, model.holding_cost)
+
+def warehouse_skus(num_skus, rng):
+    """ Creates SKUs with random parameters.
+
+    Args:
+        num_skus (int): the number of SKUs
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        SkuInventory: the SKUs
+    """
+    arrival_rate = rng.lognormal(np.log(2.0), 1.0, num_skus)
+    demand_lb = rng.integers(1, 3, num_skus)
+    demand_ub = demand_lb + rng.integers(0, 6, num_skus)
+    delivery_delay = rng.choice([1.0, 2.0, 3.5, 7.0], num_skus)
+    # order when the inventory covers less than the expected demand during
+    # the delivery delay (with safety stock)
+    lead_demand = arrival_rate*(demand_lb + demand_ub)/2*delivery_delay
+    order_trigger = np.ceil(1.5*lead_demand)
+    order_target = order_trigger + np.ceil(rng.uniform(0.5, 2.0, num_skus)*lead_demand)
+    product_cost = rng.uniform(5, 100, num_skus)
+    return SkuInventory(arrival_rate, demand_lb, demand_ub, order_trigger, order_target,
+                        delivery_delay, product_price=2*product_cost, product_cost=product_cost,
+                        holding_cost=0.04*product_cost)
+
+def simpy_balances(num_runs, sim_duration):
+    """ Runs replications of the SimPy inventory model (not memoized).
+
+    Args:
+        num_runs (int): the number of replications
+        sim_duration (float): the simulation duration (days)
+
+    Returns:
+        numpy.ndarray: the net revenue balance of each replication
+    """
+    run = getattr(InventoryModel.run_warehouse, '__wrapped__', InventoryModel.run_warehouse)
+    return np.array([run(seed, sim_duration=sim_duration)[0]['balance']
+                     for seed in range(num_runs)])
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    # import the scipy stats package only for the validation tests
+    import scipy.stats as stats
+
+    print('{:<22s}{:>10s}{:>24s}{:>10s}{:>10s}'.format(
+            'model', 'time (s)', 'balance (95% CI)', 't p-val', 'fill rate'))
+    start = time.perf_counter()
+    simpy = simpy_balances(NUM_RUNS, SIM_DURATION)
+    print('{:<22s}{:>10.2f}{:>24s}{:>10s}{:>10s}'.format(
+            'SimPy', time.perf_counter() - start,
+            '{:.1f} +/- {:.1f}'.format(np.mean(simpy), 1.96*stats.sem(simpy)), '-', '-'))
+    for bucket in BUCKETS:
+        start = time.perf_counter()
+        results = week12_skus(NUM_RUNS).run(SIM_DURATION, bucket, np.random.default_rng(0))
+        elapsed = time.perf_counter() - start
+        balance = results['profit']
+        print('{:<22s}{:>10.2f}{:>24s}{:>10.3f}{:>10.3f}'.format(
+                'vectorized ({} day)'.format(bucket), elapsed,
+                '{:.1f} +/- {:.1f}'.format(np.mean(balance), 1.96*stats.sem(balance)),
+                stats.ttest_ind(simpy, balance, equal_var=False).pvalue,
+                np.mean(results['fill_rate'])))
+
+    print()
+    rng = np.random.default_rng(0)
+    skus = warehouse_skus(NUM_SKUS, rng)
+    start = time.perf_counter()
+    results = skus.run(WAREHOUSE_DURATION, rng=rng)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    simpy_balances(NUM_SIMPY_SKUS, WAREHOUSE_DURATION)
+    simpy_elapsed = (time.perf_counter() - start)/NUM_SIMPY_SKUS*NUM_SKUS
+    print('{} SKUs for {} days: vectorized {:.2f} s, SimPy (extrapolated) {:.0f} s'.format(
+            NUM_SKUS, WAREHOUSE_DURATION, elapsed, simpy_elapsed))
+    print('revenue {:.0f}, order costs {:.0f}, holding costs {:.0f}, profit {:.0f}'.format(
+            *(results[name].sum() for name in ['revenue', 'cost_orders', 'cost_holding', 'profit'])))
+    print('fill rate: mean {:.3f}, 5th percentile {:.3f}, SKUs below 0.9: {}'.format(
+            np.mean(results['fill_rate']), np.percentile(results['fill_rate'], 5),
+            np.sum(results['fill_rate'] < 0.9)))
@@ -0,0 +1,83 @@
+"""
+SYS-611: Benchmark of model cold-start time.
+
+This benchmark measures the time to import the simulation core of each model
+registered in `sys611.models` in a new Python process (a "cold start", as in
+a batch job) and subtracts the time to start Python itself. It also checks
+that no plotting or reporting packages are imported by the simulation core.
+The benchmark exits with a non-zero status if any model exceeds the budget.
+
+Usage: python startupBenchmark.py [model ...]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import subprocess
+import sys
+import time
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+from sys611.models import MODELS
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# maximum cold-start time (seconds) beyond the python start time
+STARTUP_BUDGET = 0.3
+# number of repetitions per model (the minimum time is reported)
+NUM_REPEATS = 3
+# packages which must not be imported by the simulation core
+DEFERRED_PACKAGES = ['matplotlib', 'scipy', 'pandas']
+
+#%% SECTION TO DEFINE BENCHMARK
+
+# code to load a model core and list any deferred packages which were imported
+LOAD_CODE = """
+import sys
+from sys611.models import load_model
+load_model(sys.argv[1])
+print(','.join(p for p in sys.argv[2:] if p in sys.modules))
+"""
+
+def cold_start(args):
+    """ Times a new python process.
+
+    Args:
+        args (list): the python arguments
+
+    Returns:
+        float: the minimum elapsed wall time (seconds)
+        str: the standard output of the process
+    """
+    elapsed = []
+    for i in range(NUM_REPEATS):
+        start = time.perf_counter()
+        output = subprocess.check_output([sys.executable] + args, cwd=ROOT,
+                                         universal_newlines=True)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed), output.strip()
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    models = sys.argv[1:] or sorted(MODELS)
+    t_python, _ = cold_start(['-c', 'pass'])
+    print('python start time: {:.3f} s (budget {:.3f} s per model)'.format(
+            t_python, STARTUP_BUDGET))
+    print('{:<20s}{:>12s}  {}'.format('model', 'import (s)', 'deferred packages'))
+    failures = []
+    for name in models:
+        t_model, imported = cold_start(['-c', LOAD_CODE, name] + DEFERRED_PACKAGES)
+        t_import = t_model - t_python
+        if t_import > STARTUP_BUDGET or imported:
+            failures.append(name)
+        print('{:<20s}{:>12.3f}  {}'.format(name, t_import, imported or '-'))
+    if failures:
+        print('over budget or imported deferred packages: {}'.format(', '.join(failures)))
+        sys.exit(1)
+    print('all models within budget')
@@ -0,0 +1,212 @@
+"""
+SYS-611: Benchmark of the multi-echelon supply chain simulation.
+
+This benchmark compares the supply chain simulation (see `sys611.supplychain`),
+which batches customer demand on a single event calendar, to a SimPy
+reference of the same network with one process per customer stream and one
+process per shipment (customers served one at a time, as in the week 12
+inventory model):
+ * Validation: replications of a small network (a factory, 2 distribution
+   centers, and 4 warehouses) are compared by the system fill rate and cost
+   (95% confidence interval) and the two-sample Welch t-test for several
+   demand periods.
+ * Scaling: a network of a factory, distribution centers, and warehouses
+   (hundreds of nodes) is simulated for a year with both simulations.
+
+Usage: python supplyChainBenchmark.py [num_runs] [num_dcs] [warehouses_per_dc]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the simpy package
+# see https://simpy.readthedocs.io/en/latest/api_reference for documentation
+import simpy
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.supplychain import SupplyChain
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of replications to validate
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+# number of distribution centers and warehouses per center of the large network
+NUM_DCS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+NUM_WAREHOUSES = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+# simulation duration of the validation (days)
+SIM_DURATION = 100
+# demand periods of the validation (days)
+PERIODS = [0.1, 0.02, 0.005]
+# simulation duration of the large network (days)
+NETWORK_DURATION = 365
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def tree_config(num_dcs, num_warehouses, period=0.02):
+    """ Creates the configuration of a factory, centers, and warehouses.
+
+    Each warehouse has the demand of the week 12 inventory model (5
+    customers/day of 1 to 4 items) and orders from its center, which orders
+    from the factory, which orders from an infinite supplier.
+
+    Args:
+        num_dcs (int): the number of distribution centers
+        num_warehouses (int): the number of warehouses per center
+        period (float): the period of customer demand batches (days)
+
+    Returns:
+        dict: the configuration
+    """
+    nodes = [{'name': 'factory', 'order_trigger': 40*num_dcs*num_warehouses,
+              'order_up_to': 70*num_dcs*num_warehouses, 'lead_time': 5,
+              'holding_cost': 0.5}]
+    for i in range(num_dcs):
+        nodes.append({'name': 'dc{}'.format(i), 'upstream': 'factory',
+                      'order_trigger': 24*num_warehouses, 'order_up_to': 40*num_warehouses,
+                      'lead_time': 3, 'holding_cost': 1.0})
+        for j in range(num_warehouses):
+            nodes.append({'name': 'wh{}-{}'.format(i, j), 'upstream': 'dc{}'.format(i),
+                          'order_trigger': 10, 'order_up_to': 20, 'lead_time': 1,
+                          'arrival_rate': 5, 'demand_lb': 1, 'demand_ub': 4})
+    return {'period': period, 'nodes': nodes,
+            'defaults': {'holding_cost': 2.0, 'backorder_cost': 5.0, 'order_cost': 100.0}}
+
+def run_simpy(config, seed, sim_duration):
+    """ Runs one replication of the SimPy reference of a supply chain.
+
+    Args:
+        config (dict): the configuration (see `SupplyChain.from_config`)
+        seed (int): the random number seed
+        sim_duration (float): the simulation duration (days)
+
+    Returns:
+        dict: the outputs (see `SupplyChain.summary`)
+    """
+    np.random.seed(seed)
+    env = simpy.Environment()
+    chain = SupplyChain.from_config(config)
+    nodes = chain.nodes
+
+    def ship(node, quantity):
+        """ Process to ship items to a node. """
+        yield env.timeout(node.lead_time)
+        node.settle(env.now)
+        node.on_order -= quantity
+        node.on_hand += quantity
+        while node.backorders and node.on_hand > 0:
+            child, owed = node.backorders[0]
+            shipped = min(owed, node.on_hand)
+            node.on_hand -= shipped
+            node.owed -= shipped
+            env.process(ship(child, shipped))
+            if shipped < owed:
+                node.backorders[0][1] -= shipped
+            else:
+                node.backorders.popleft()
+
+    def review(node):
+        """ Orders up to the target of a node if below its trigger. """
+        if node.position >= node.order_trigger:
+            return
+        quantity = node.order_up_to - node.position
+        node.on_order += quantity
+        node.num_orders += 1
+        if node.upstream is None:
+            env.process(ship(node, quantity))
+            return
+        supplier = nodes[node.upstream]
+        supplier.settle(env.now)
+        supplier.demanded += quantity
+        shipped = min(quantity, supplier.on_hand)
+        if shipped > 0:
+            supplier.on_hand -= shipped
+            supplier.filled += shipped
+            env.process(ship(node, shipped))
+        if shipped < quantity:
+            supplier.backorders.append([node, quantity - shipped])
+            supplier.owed += quantity - shipped
+        review(supplier)
+
+    def customers(node):
+        """ Process to serve the customers of a node one at a time. """
+        while True:
+            yield env.timeout(np.random.exponential(1/node.arrival_rate))
+            node.settle(env.now)
+            demand = np.random.randint(node.demand_lb, node.demand_ub + 1)
+            sold = min(demand, node.on_hand)
+            node.on_hand -= sold
+            node.demanded += demand
+            node.filled += sold
+            node.lost += demand - sold
+            review(node)
+
+    for node in nodes.values():
+        if node.arrival_rate > 0:
+            env.process(customers(node))
+    env.run(until=sim_duration)
+    for node in nodes.values():
+        node.settle(sim_duration)
+    return chain.summary()
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    # import the scipy stats package only for the validation tests
+    import scipy.stats as stats
+
+    def row(label, elapsed, fill_rate, cost, reference=None):
+        """ Prints the outputs of replications (and t-test p-values). """
+        print('{:<20s}{:>10.2f}{:>20s}{:>24s}{:>9s}{:>9s}'.format(
+                label, elapsed,
+                '{:.4f} +/- {:.4f}'.format(np.mean(fill_rate), 1.96*stats.sem(fill_rate)),
+                '{:.0f} +/- {:.0f}'.format(np.mean(cost), 1.96*stats.sem(cost)),
+                *(['-', '-'] if reference is None else [
+                    '{:.3f}'.format(stats.ttest_ind(reference[0], fill_rate,
+                                                    equal_var=False).pvalue),
+                    '{:.3f}'.format(stats.ttest_ind(reference[1], cost,
+                                                    equal_var=False).pvalue)])))
+
+    print('{:<20s}{:>10s}{:>20s}{:>24s}{:>9s}{:>9s}'.format(
+            'model', 'time (s)', 'fill rate (95% CI)', 'cost (95% CI)', 'fill p', 'cost p'))
+    config = tree_config(2, 2)
+    start = time.perf_counter()
+    outputs = [run_simpy(config, seed, SIM_DURATION)['system'] for seed in range(NUM_RUNS)]
+    reference = (np.array([o['fill_rate'] for o in outputs]), np.array([o['cost'] for o in outputs]))
+    row('SimPy', time.perf_counter() - start, *reference)
+    for period in PERIODS:
+        config['period'] = period
+        chain = SupplyChain.from_config(config, rng=np.random.default_rng(0))
+        start = time.perf_counter()
+        outputs = [chain.run(SIM_DURATION)['system'] for seed in range(NUM_RUNS)]
+        row('calendar ({} day)'.format(period), time.perf_counter() - start,
+            [o['fill_rate'] for o in outputs], [o['cost'] for o in outputs], reference)
+
+    print()
+    config = tree_config(NUM_DCS, NUM_WAREHOUSES)
+    chain = SupplyChain.from_config(config, rng=np.random.default_rng(0))
+    start = time.perf_counter()
+    outputs = chain.run(NETWORK_DURATION)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    run_simpy(config, 0, NETWORK_DURATION)
+    simpy_elapsed = time.perf_counter() - start
+    print('{} nodes for {} days: calendar {:.2f} s, SimPy {:.2f} s'.format(
+            len(chain.nodes), NETWORK_DURATION, elapsed, simpy_elapsed))
+    for name in ['factory', 'dc0', 'wh0-0', 'system']:
+        print('{:<8s} fill rate {:.3f}, orders {:>5d}, holding {:>10.0f}, backorder {:>9.0f}, '
+              'ordering {:>9.0f}'.format(name, outputs[name]['fill_rate'],
+                                         outputs[name]['num_orders'],
+                                         outputs[name]['cost_holding'],
+                                         outputs[name]['cost_backorder'],
+                                         outputs[name]['cost_orders']))
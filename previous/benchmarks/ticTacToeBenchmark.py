@@ -0,0 +1,122 @@
+"""
+SYS-611: Benchmark of the tic-tac-toe solver and batch game simulation.
+
+This benchmark measures the time to solve tic-tac-toe (and the 4x4 game with
+k=4) with the bitboard solver and the throughput (games per second) of
+vectorized random and policy-driven games for several m,n,k boards. Games are
+compared to a loop-based simulation of one game at a time with a list of
+lists board (as in `week2/ticTacToe.py`).
+
+Usage: python ticTacToeBenchmark.py [num_games]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the week2 directory to the search path to import the solver
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'week2'))
+from ticTacToeSolver import Game, greedy_policy
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of games for vectorized random games
+NUM_GAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+# number of games for vectorized policy-driven games
+NUM_POLICY_GAMES = max(1, NUM_GAMES//10)
+# number of games for loop-based games
+NUM_LOOP_GAMES = 10**4
+# boards to simulate (rows, columns, marks in a row)
+BOARDS = [(3, 3, 3), (4, 4, 4), (5, 5, 4)]
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def loop_games(m, n, k, num_games, rng):
+    """ Simulates random games one move at a time with a list of lists board.
+
+    Args:
+        m (int): the number of rows
+        n (int): the number of columns
+        k (int): the number of marks in a row to win
+        num_games (int): the number of games
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        list: the winner of each game (1 for x, -1 for o, 0 for tie)
+    """
+    directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+    winners = []
+    for game in range(num_games):
+        state = [[' ']*n for row in range(m)]
+        empty = [(row, col) for row in range(m) for col in range(n)]
+        winner = 0
+        for t in range(m*n):
+            mark = 'x' if t % 2 == 0 else 'o'
+            row, col = empty.pop(rng.integers(len(empty)))
+            state[row][col] = mark
+            # check each line through the new mark
+            for d_row, d_col in directions:
+                count = 1
+                for sign in (1, -1):
+                    r, c = row + sign*d_row, col + sign*d_col
+                    while 0 <= r < m and 0 <= c < n and state[r][c] == mark:
+                        count += 1
+                        r, c = r + sign*d_row, c + sign*d_col
+                if count >= k:
+                    winner = 1 if mark == 'x' else -1
+            if winner != 0:
+                break
+        winners.append(winner)
+    return winners
+
+def timed(func, *args):
+    """ Times a function call.
+
+    Args:
+        func (function): the function
+        *args: the function arguments
+
+    Returns:
+        float: the elapsed wall time (seconds)
+        object: the function return value
+    """
+    start = time.perf_counter()
+    value = func(*args)
+    return time.perf_counter() - start, value
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    print('{:<28s}{:>12s}{:>14s}'.format('solve', 'time (s)', 'positions'))
+    for m, n, k in [(3, 3, 3), (4, 4, 4)]:
+        game = Game(m, n, k)
+        t_solve, value = timed(game.solve)
+        print('{:<28s}{:>12.3f}{:>14d}'.format(
+                '{}x{} k={} (value {:d})'.format(m, n, k, value), t_solve, len(game.table)))
+
+    print('{:<28s}{:>12s}{:>14s}{:>10s}'.format('games', 'games/s', 'P(x wins)', 'speedup'))
+    rng = np.random.default_rng(0)
+    for m, n, k in BOARDS:
+        game = Game(m, n, k)
+        name = '{}x{} k={}'.format(m, n, k)
+        t_loop, winners = timed(loop_games, m, n, k, NUM_LOOP_GAMES, rng)
+        loop_rate = NUM_LOOP_GAMES/t_loop
+        print('{:<28s}{:>12.3g}{:>14.4f}{:>10s}'.format(
+                name + ' random (loop)', loop_rate, np.mean(np.array(winners) == 1), '-'))
+        t_fast, (winners, lengths) = timed(game.random_playouts, NUM_GAMES, rng)
+        print('{:<28s}{:>12.3g}{:>14.4f}{:>10.0f}'.format(
+                name + ' random', NUM_GAMES/t_fast, np.mean(winners == 1),
+                NUM_GAMES/t_fast/loop_rate))
+        t_fast, (winners, lengths) = timed(game.playouts, NUM_POLICY_GAMES,
+                                           (greedy_policy, greedy_policy), rng)
+        print('{:<28s}{:>12.3g}{:>14.4f}{:>10s}'.format(
+                name + ' greedy', NUM_POLICY_GAMES/t_fast, np.mean(winners == 1), '-'))
@@ -0,0 +1,103 @@
+"""
+SYS-611: Benchmark of event tracing.
+
+This benchmark runs the event-based queuing model of week 9
+(`eventQueuingModel.py`) for about 10^6 events and compares the time to run
+it without tracing, with a disabled tracer (level OFF), with tracing to a
+ring buffer in memory and to a trace file (see `sys611.trace`), and with a
+printed line per event (the previous `verbose` option) written to a file
+(printing to a terminal is slower still). It also times the replay of the
+trace file to the printed lines.
+
+Usage: python traceBenchmark.py [duration]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import tempfile
+import time
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'week9'))
+from sys611.trace import EVENTS, OFF, load
+import eventQueuingModel
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# time after which no more customers arrive (about 1.33 events per minute)
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 750000
+
+#%% SECTION TO DEFINE BENCHMARK
+
+class PrintingTracer(object):
+    """ Defines a tracer which prints a line per event (as `verbose`). """
+    level = EVENTS
+
+    def __init__(self, output):
+        """ Initializes this tracer.
+
+        Args:
+            output (file): the output file
+        """
+        self.output = output
+        self.count = 0
+
+    def record(self, time, entity, kind, *state):
+        """ Prints an event (see `Tracer.record`). """
+        print('{:10.2f}{:10.2f}{:10.2f}{:10.0f}{:10.0f}{:10.0f}{:10.2f}'.format(time, *state),
+              file=self.output)
+        self.count += 1
+
+def report(name, elapsed, num_events, baseline=None):
+    """ Prints a row of the benchmark results. """
+    print('{:<28s}{:>10d}{:>10.2f}{:>12.2f}{:>10s}'.format(
+            name, num_events, elapsed, 1e6*elapsed/num_events,
+            '{:.2f}'.format(elapsed/baseline) if baseline is not None else '-'))
+    return elapsed
+
+def run(tracer):
+    """ Runs the model with a tracer and measures the time. """
+    start = time.perf_counter()
+    summary, traces = eventQueuingModel.run_events(seed=0, duration=DURATION, tracer=tracer)
+    return time.perf_counter() - start, len(traces['t']) + 1
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    trace_path = os.path.join(directory, 'events.trace')
+    print_path = os.path.join(directory, 'events.txt')
+
+    print('{:<28s}{:>10s}{:>10s}{:>12s}{:>10s}'.format(
+            'tracing', 'events', 'time (s)', 'us/event', 'relative'))
+    elapsed, num_events = run(None)
+    baseline = report('none', elapsed, num_events)
+    tracer = eventQueuingModel.create_tracer()
+    tracer.level = OFF
+    report('disabled (level OFF)', *run(tracer), baseline=baseline)
+    report('ring buffer (memory)', *run(eventQueuingModel.create_tracer()), baseline=baseline)
+    tracer = eventQueuingModel.create_tracer(trace_path)
+    elapsed, num_events = run(tracer)
+    tracer.flush()
+    report('trace file', elapsed, num_events, baseline=baseline)
+    with open(print_path, 'w') as output:
+        report('printed lines (file)', *run(PrintingTracer(output)), baseline=baseline)
+
+    # replay the trace file to printed lines
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as output:
+        for line in load(trace_path).lines():
+            print(line, file=output)
+    report('replay of trace file', time.perf_counter() - start, num_events)
+    print('trace file {:.1f} MB, printed lines {:.1f} MB'.format(
+            os.path.getsize(trace_path)/2**20, os.path.getsize(print_path)/2**20))
+    os.remove(trace_path)
+    os.remove(print_path)
+    os.rmdir(directory)
@@ -0,0 +1,122 @@
+"""
+SYS-611: Benchmark of variance reduction methods for Monte Carlo models.
+
+This benchmark compares the variance reduction methods in `sys611.variance`
+for the Monte Carlo models of Buffon's needle (probability of crossing a
+line), dice fighters (probability of a red win), and the M&M jar (mean
+number of M&Ms), and control variates (average service and inter-arrival
+times) for the average waiting time of the cafe replications in week 12. For
+each model it prints the effective sample size (ESS) per CPU-second of each
+method and its gain relative to crude sampling.
+
+Usage: python varianceBenchmark.py [num_samples]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import os
+import sys
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+for week in ['week4', 'week10', 'week12']:
+    sys.path.insert(0, os.path.join(ROOT, week))
+from sys611.variance import (antithetic, compare, conditional, control_variates, crude,
+                             latin_hypercube, replicate_control_variates, stratified)
+import buffonsNeedle
+import diceFightersMC
+import mm
+import QueuingSystem
+
+#%% SECTION TO CONFIGURE BENCHMARK
+
+# number of samples of each Monte Carlo model
+NUM_SAMPLES = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+# number of samples of the dice fighters model (slower per sample)
+NUM_BATTLES = NUM_SAMPLES//10
+# number of cafe replications
+NUM_REPLICATIONS = 200
+
+#%% SECTION TO DEFINE BENCHMARK
+
+def sampled_controls(f, controls, means, num_samples, dimension, rng):
+    """ Estimates the mean of f(u) with controls of the same random numbers.
+
+    Args:
+        f (function): the output of each row of random numbers (vectorized)
+        controls (function): the controls of each row of random numbers
+        means (list): the known mean of each control
+        num_samples (int): the number of samples
+        dimension (int): the number of random numbers per sample
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        VarianceResult: the estimate
+    """
+    start = time.process_time()
+    u = rng.random((num_samples, dimension))
+    values = f(u)
+    return control_variates(values, controls(u), means, time.process_time() - start)
+
+def report(name, results):
+    """ Prints the comparison of methods for a model. """
+    print(name)
+    print(compare(results))
+    print()
+
+#%% SECTION TO RUN BENCHMARK
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    f = buffonsNeedle.needle_crosses
+    exact = 2*buffonsNeedle.needle_length/(buffonsNeedle.line_width*np.pi)
+    report("Buffon's needle: P(cross) (exact {:.6f})".format(exact), [
+        crude(f, NUM_SAMPLES, 2, rng),
+        antithetic(f, NUM_SAMPLES, 2, rng),
+        latin_hypercube(f, NUM_SAMPLES, 2, rng),
+        stratified(f, NUM_SAMPLES, 2, rng, strata_dimensions=2),
+        # the sine of the angle has a known mean 2/pi
+        sampled_controls(f, lambda u: np.sin(u[:,1]*np.pi/2), [2/np.pi], NUM_SAMPLES, 2, rng),
+        conditional(buffonsNeedle.crossing_probability, NUM_SAMPLES, 2, rng),
+    ])
+
+    f = diceFightersMC.red_wins
+    dimension = 2*diceFightersMC.MAX_ROUNDS
+    report('Dice fighters: P(red wins)', [
+        crude(f, NUM_BATTLES, dimension, rng),
+        antithetic(f, NUM_BATTLES, dimension, rng),
+        latin_hypercube(f, NUM_BATTLES, dimension, rng),
+        stratified(f, NUM_BATTLES, dimension, rng, strata_dimensions=2),
+        # the random numbers of the first round hits have known mean 1/2
+        sampled_controls(f, lambda u: u[:,:2], [0.5, 0.5], NUM_BATTLES, dimension, rng),
+    ])
+
+    f = mm.jar_count
+    report('M&M jar: mean number of M&Ms', [
+        crude(f, NUM_SAMPLES, 4, rng),
+        antithetic(f, NUM_SAMPLES, 4, rng),
+        latin_hypercube(f, NUM_SAMPLES, 4, rng),
+        stratified(f, NUM_SAMPLES, 4, rng, strata_dimensions=4),
+        # the inputs have known means (the modes of symmetric distributions)
+        sampled_controls(f, lambda u: np.column_stack([inputs.ppf(u[:,i]) for i, inputs
+                                                       in enumerate(mm.JAR_INPUTS)]),
+                         [inputs.mode for inputs in mm.JAR_INPUTS], NUM_SAMPLES, 4, rng),
+        conditional(mm.expected_jar_count, NUM_SAMPLES, 4, rng),
+    ])
+
+    # replications are not memoized so each method is timed
+    run_cafe = getattr(QueuingSystem.run_cafe, '__wrapped__', QueuingSystem.run_cafe)
+    _lambda, _mu = 3.0, 4.0
+    report('Cafe replications: average waiting time', replicate_control_variates(
+            lambda seed: run_cafe(seed, _lambda=_lambda, _mu=_mu), NUM_REPLICATIONS, 'wait',
+            {'service': 1/_mu, 'interarrival': 1/_lambda}))
@@ -0,0 +1,9 @@
+"""
+SYS-611: Shared simulation utilities for the example models.
+
+The modules in this package are imported by the example scripts in the week
+directories. Each module is imported on its own (e.g. `sys611.cache`) so that
+a script only pays for the utilities it actually uses.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
@@ -0,0 +1,139 @@
+"""
+SYS-611: Command line interface to run example models without plotting.
+
+Runs replications of a registered model (see `sys611.models`) for one or more
+scenarios and writes the summary outputs of each replication as
+comma-separated values. No plotting or reporting packages are imported and
+matplotlib (if imported by a model) uses a non-interactive backend, so models
+can run in batch jobs without a display.
+
+Model parameters are set by name or alias with `--set KEY=VALUE` or
+`--KEY VALUE`, where values can be ranges (`3..8` or `0.5..1.0..0.1`) or
+comma-separated lists to sweep all combinations. Experiments can also be
+defined in a JSON or YAML manifest (see `sys611.experiment`).
+
+Usage (from the directory containing `sys611`):
+    python -m sys611 list
+    python -m sys611 run factory --seed 0 --runs 10 --set num_spares=25
+    python -m sys611 run factory --R 3..8 --S 10..30 --runs 1000 --workers 32 --output factory.csv
+    python -m sys611 sweep factorySweep.yaml --workers 32
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import os
+import sys
+
+def parse_params(assignments, extras=()):
+    """ Parses parameter assignments from the command line.
+
+    Args:
+        assignments (list): the `key=value` assignments
+        extras (list): other arguments (`--key value` or `--key=value`)
+
+    Returns:
+        dict: the parameter values (text to be expanded)
+    """
+    params = {}
+    for assignment in assignments:
+        key, separator, value = assignment.partition('=')
+        if not separator:
+            raise ValueError('parameter {} must be key=value'.format(assignment))
+        params[key.strip()] = value.strip()
+    extras = list(extras)
+    while extras:
+        option = extras.pop(0)
+        if not option.startswith('--') or len(option) <= 2:
+            raise ValueError('unrecognized argument {}'.format(option))
+        key, separator, value = option[2:].partition('=')
+        if not separator:
+            if not extras:
+                raise ValueError('parameter {} requires a value'.format(option))
+            value = extras.pop(0)
+        params[key] = value
+    return params
+
+def main(argv=None):
+    """ Runs the command line interface.
+
+    Args:
+        argv (list): the command line arguments (None for `sys.argv`)
+
+    Returns:
+        int: the exit status
+    """
+    parser = argparse.ArgumentParser(prog='python -m sys611',
+                                     description='Runs SYS-611 example models.')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('list', help='list the available models')
+    run = commands.add_parser('run', help='run replications of a model',
+                              allow_abbrev=False)
+    run.add_argument('model', help='the model name')
+    sweep = commands.add_parser('sweep', help='run an experiment manifest',
+                                allow_abbrev=False)
+    sweep.add_argument('manifest', help='the JSON or YAML manifest file')
+    for command in (run, sweep):
+        command.add_argument('--seed', type=int, help='the first seed (default 0)')
+        command.add_argument('--runs', type=int, help='the runs per scenario (default 1)')
+        command.add_argument('--workers', type=int, help='the worker processes (default 1)')
+        command.add_argument('--output', help='the CSV file for resumable results')
+        command.add_argument('--quiet', action='store_true', help='do not report progress')
+    run.add_argument('--set', dest='params', action='append', default=[],
+                     metavar='KEY=VALUE', help='a model parameter value or range')
+    args, extras = parser.parse_known_args(argv)
+
+    # never open a display for plots (must be set before importing matplotlib)
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+
+    from sys611.models import MODELS
+    from sys611.experiment import (expand_scenarios, load_manifest,
+                                   manifest_scenarios, run_experiment)
+
+    if args.command == 'list':
+        for name in sorted(MODELS):
+            path, function, aliases = MODELS[name]
+            print('{:<20s}{}:{} {}'.format(name, path, function, ' '.join(
+                    '{}={}'.format(alias, aliases[alias]) for alias in sorted(aliases))))
+        return 0
+    if args.command == 'run':
+        manifest = {'model': args.model}
+        try:
+            scenarios = expand_scenarios(parse_params(args.params, extras))
+        except ValueError as error:
+            parser.exit(2, 'error: {}\n'.format(error))
+    elif args.command == 'sweep':
+        if extras:
+            parser.error('unrecognized arguments: {}'.format(' '.join(extras)))
+        try:
+            manifest = load_manifest(args.manifest)
+        except (IOError, ValueError, ImportError) as error:
+            parser.exit(2, 'error: {}\n'.format(error))
+        scenarios = manifest_scenarios(manifest)
+    else:
+        parser.print_help()
+        return 2
+
+    # command line options override the manifest
+    output = args.output or manifest.get('output')
+    try:
+        run_experiment(manifest['model'], scenarios,
+                       runs=args.runs or manifest.get('runs', 1),
+                       first_seed=args.seed if args.seed is not None else manifest.get('seed', 0),
+                       workers=args.workers or manifest.get('workers', 1),
+                       output=output,
+                       progress=not args.quiet and (output is not None or sys.stderr.isatty()))
+    except (KeyError, ValueError, ImportError) as error:
+        parser.exit(2, 'error: {}\n'.format(error.args[0] if error.args else error))
+    if output is not None:
+        # print the consolidated summary of all scenarios
+        root, extension = os.path.splitext(output)
+        with open(root + '-summary' + (extension or '.csv')) as summary:
+            sys.stdout.write(summary.read())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+SYS-611: Vectorized output analysis for simulation samples.
+
+The functions in this module compute common statistics of simulation outputs
+(empirical CDFs, running means and standard errors, state occupancy, and
+weighted quantiles) using a small number of vectorized numpy operations rather
+than Python loops over samples or prefixes of samples.
+
+Functions accepting a `chunk_size` argument also work on arrays which do not
+fit in memory, such as `numpy.memmap` arrays or lists of array chunks, by
+processing one chunk at a time.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# default number of samples processed at once by chunked functions
+CHUNK_SIZE = 2**22
+
+def iter_chunks(samples, chunk_size=CHUNK_SIZE):
+    """ Iterates over chunks of samples.
+
+    Args:
+        samples (numpy.ndarray or list): the samples (an array, a memory-mapped
+            array, or a list or generator of array chunks)
+        chunk_size (int): the maximum number of samples per chunk
+
+    Returns:
+        generator: the chunks (numpy arrays)
+    """
+    if hasattr(samples, '__next__') or (isinstance(samples, (list, tuple))
+            and len(samples) > 0 and not np.isscalar(samples[0])):
+        # samples are already split into chunks
+        chunks = samples
+    else:
+        chunks = [samples]
+    for chunk in chunks:
+        # note: slicing a memory-mapped array only reads the slice from disk
+        chunk = np.asarray(chunk).ravel()
+        for i in range(0, len(chunk), chunk_size):
+            yield chunk[i:i+chunk_size]
+
+def ecdf(samples, x=None, side='right', chunk_size=CHUNK_SIZE):
+    """ Computes the empirical cumulative distribution function (ECDF).
+
+    If `x` is None, returns the sorted samples and the ECDF evaluated at each
+    sample (suitable for a step plot). Otherwise, evaluates the ECDF at each
+    point in `x` by sorting the evaluation points once and counting samples
+    with a binary search (`searchsorted`), one chunk at a time.
+
+    Args:
+        samples (numpy.ndarray or list): the samples
+        x (numpy.ndarray): the evaluation points (None for all samples)
+        side (str): 'right' for F(x) = P(X <= x) or 'left' for P(X < x)
+        chunk_size (int): the maximum number of samples per chunk
+
+    Returns:
+        numpy.ndarray: the sorted samples (only if `x` is None)
+        numpy.ndarray: the ECDF values
+    """
+    if side not in ('left', 'right'):
+        raise ValueError('side must be left or right')
+    if x is None:
+        values = np.sort(np.concatenate(list(iter_chunks(samples, chunk_size))))
+        return values, np.searchsorted(values, values, side=side)/len(values)
+    x = np.asarray(x, dtype=float)
+    order = np.argsort(x, kind='stable')
+    x_sorted = x[order]
+    counts = np.zeros(len(x) + 1, dtype=np.int64)
+    n = 0
+    for chunk in iter_chunks(samples, chunk_size):
+        # index of the first evaluation point which counts each sample
+        # (x >= sample for P(X <= x) or x > sample for P(X < x))
+        index = np.searchsorted(x_sorted, chunk, side='left' if side == 'right' else 'right')
+        counts += np.bincount(index, minlength=len(x) + 1)
+        n += len(chunk)
+    F = np.empty(len(x))
+    F[order] = np.cumsum(counts[:-1])/n
+    return F
+
+def running_mean(samples):
+    """ Computes the running mean after each sample using a cumulative sum.
+
+    Args:
+        samples (numpy.ndarray): the samples
+
+    Returns:
+        numpy.ndarray: the mean of samples[0:i+1] for each i
+    """
+    samples = np.asarray(samples, dtype=float)
+    return np.cumsum(samples)/np.arange(1, len(samples) + 1)
+
+def running_sem(samples):
+    """ Computes the running standard error of the mean after each sample.
+
+    Uses cumulative sums of the samples and squared samples (shifted by the
+    first sample to limit round-off error). The standard error is undefined
+    (NaN) after the first sample, consistent with `scipy.stats.sem`.
+
+    Args:
+        samples (numpy.ndarray): the samples
+
+    Returns:
+        numpy.ndarray: the standard error of samples[0:i+1] for each i
+    """
+    samples = np.asarray(samples, dtype=float)
+    if len(samples) == 0:
+        return np.zeros(0)
+    shifted = samples - samples[0]
+    n = np.arange(1, len(samples) + 1)
+    s_1 = np.cumsum(shifted)
+    s_2 = np.cumsum(shifted**2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.maximum(s_2 - s_1**2/n, 0)/(n - 1)
+        return np.sqrt(variance/n)
+
+def iter_running_stats(samples, chunk_size=CHUNK_SIZE):
+    """ Computes the running mean and standard error one chunk at a time.
+
+    Args:
+        samples (numpy.ndarray or list): the samples
+        chunk_size (int): the maximum number of samples per chunk
+
+    Returns:
+        generator: the running mean and standard error arrays for each chunk
+    """
+    n_0 = 0
+    s_1 = 0.0
+    s_2 = 0.0
+    shift = None
+    for chunk in iter_chunks(samples, chunk_size):
+        if shift is None:
+            shift = float(chunk[0]) if len(chunk) > 0 else 0.0
+        shifted = np.asarray(chunk, dtype=float) - shift
+        n = n_0 + np.arange(1, len(chunk) + 1)
+        c_1 = s_1 + np.cumsum(shifted)
+        c_2 = s_2 + np.cumsum(shifted**2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sem = np.sqrt(np.maximum(c_2 - c_1**2/n, 0)/(n - 1)/n)
+        yield shift + c_1/n, sem
+        if len(chunk) > 0:
+            n_0, s_1, s_2 = n[-1], c_1[-1], c_2[-1]
+
+def state_occupancy(states, num_states=None, weights=None, chunk_size=CHUNK_SIZE):
+    """ Computes the fraction of samples in each discrete state.
+
+    Args:
+        states (numpy.ndarray or list): the integer states (0, 1, ...)
+        num_states (int): the number of states (None for the largest state + 1)
+        weights (numpy.ndarray or list): the weight (e.g. duration) of each
+            sample (chunked independently of the states)
+        chunk_size (int): the maximum number of samples per chunk
+
+    Returns:
+        numpy.ndarray: the occupancy frequency of each state
+    """
+    counts = np.zeros(num_states or 0)
+    weight_chunks = iter_chunks(weights, chunk_size) if weights is not None else None
+    pending = np.zeros(0)
+    for chunk in iter_chunks(states, chunk_size):
+        w = None
+        if weight_chunks is not None:
+            # take the weights aligned with this chunk of states
+            while len(pending) < len(chunk):
+                weight_chunk = next(weight_chunks, None)
+                if weight_chunk is None:
+                    raise ValueError('there are fewer weights than states')
+                pending = np.concatenate((pending, weight_chunk))
+            w, pending = pending[:len(chunk)], pending[len(chunk):]
+        chunk_counts = np.bincount(np.asarray(chunk, dtype=np.int64), weights=w,
+                                   minlength=num_states or 0)
+        if len(chunk_counts) > len(counts):
+            counts = np.pad(counts, (0, len(chunk_counts) - len(counts)))
+        counts[:len(chunk_counts)] += chunk_counts
+    return counts/np.sum(counts)
+
+def weighted_quantile(values, quantiles, weights=None):
+    """ Computes quantiles of (optionally weighted) samples.
+
+    Without weights, interpolates linearly between sorted samples (the
+    default method of `numpy.quantile`). With weights, inverts the weighted
+    empirical CDF: the quantile q is the smallest sample whose cumulative
+    weight reaches the fraction q of the total weight. For integer weights
+    this is identical to `numpy.quantile` of the samples repeated by their
+    weights with the 'inverted_cdf' method.
+
+    Args:
+        values (numpy.ndarray): the samples
+        quantiles (float or numpy.ndarray): the quantile(s) between 0 and 1
+        weights (numpy.ndarray): the sample weights (None for equal weights)
+
+    Returns:
+        float or numpy.ndarray: the quantile value(s)
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    if weights is None:
+        return np.quantile(values, quantiles)
+    weights = np.asarray(weights, dtype=float).ravel()
+    order = np.argsort(values, kind='stable')
+    values = values[order]
+    weights = weights[order]
+    # drop zero-weight samples, which cannot affect any quantile
+    values = values[weights > 0]
+    weights = weights[weights > 0]
+    # first sample whose cumulative weight reaches each quantile of the total
+    cumulative = np.cumsum(weights)
+    index = np.searchsorted(cumulative, np.asarray(quantiles)*cumulative[-1], side='left')
+    return values[np.minimum(index, len(values) - 1)]
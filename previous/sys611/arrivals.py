@@ -0,0 +1,426 @@
+"""
+SYS-611: Non-homogeneous Poisson process (NHPP) arrival generators.
+
+Customer arrivals often follow daily or weekly cycles which a constant rate
+cannot capture. A non-homogeneous Poisson process has a time-varying arrival
+rate lambda(t) and expected number of arrivals Lambda(t), the integral of the
+rate from 0 to t (the cumulative rate). This module defines rate functions
+which repeat with a period (e.g. one day):
+ * `PiecewiseConstantRate` - a constant rate between breakpoints
+ * `PiecewiseLinearRate` - a rate interpolated linearly between breakpoints
+ * `FourierRate` - a mean rate plus sinusoidal harmonics of the period
+
+Arrivals are generated in bulk for all blocks (e.g. days) of a time horizon
+at once with one of two methods:
+ * inversion: the arrival times of a unit-rate Poisson process are mapped
+   through the inverse cumulative rate, t = Lambda^-1(s).
+ * thinning: candidate arrivals are generated from a piecewise-constant
+   majorant rate lambda*(t) >= lambda(t) (the maximum rate over short
+   intervals, so few candidates are rejected) and each candidate is kept with
+   probability lambda(t)/lambda*(t).
+
+Sorted uniform random numbers within each block are computed from cumulative
+sums of exponential spacings, so no loop over blocks or sort is required.
+
+Random numbers are drawn from a `numpy.random.Generator` or `RandomState` if
+given, otherwise from the global numpy state (set by `np.random.seed`).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import copy
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+def sorted_uniforms(counts, rng=None):
+    """ Generates sorted uniform random numbers in each of several blocks.
+
+    The k-th smallest of n uniform random numbers has the distribution of
+    the sum of k exponential spacings divided by the sum of n+1 spacings.
+
+    Args:
+        counts (numpy.ndarray): the number of random numbers in each block
+        rng (numpy.random.Generator): the random number generator (None for
+            the global numpy random state)
+
+    Returns:
+        numpy.ndarray: the sorted random numbers in (0, 1) of all blocks
+        numpy.ndarray: the block index of each random number
+    """
+    rng = np.random if rng is None else rng
+    counts = np.asarray(counts, dtype=np.int64)
+    sums = np.cumsum(rng.exponential(1.0, int(np.sum(counts)) + len(counts)))
+    # index of the last spacing of each block (and the sum before each block)
+    ends = np.cumsum(counts + 1) - 1
+    before = np.concatenate([[0.0], sums[ends[:-1]]])
+    block = np.repeat(np.arange(len(counts)), counts + 1)
+    keep = np.ones(len(sums), dtype=bool)
+    keep[ends] = False
+    block = block[keep]
+    u = (sums[keep] - before[block])/(sums[ends] - before)[block]
+    return u, block
+
+class RateFunction(object):
+    """ Defines a non-negative arrival rate function which repeats with a period. """
+    def __init__(self, period=None, scale=1.0):
+        """ Initializes this rate function.
+
+        Args:
+            period (float): the period of the rate (None if not periodic)
+            scale (float): the factor multiplying the rate
+        """
+        self.period = period
+        self.scale = scale
+
+    def _rate(self, s):
+        """ Evaluates the unscaled rate for times within the first period. """
+        raise NotImplementedError
+
+    def _cumulative(self, s):
+        """ Evaluates the unscaled cumulative rate for times within the first period. """
+        raise NotImplementedError
+
+    def _inverse(self, y):
+        """ Inverts the unscaled cumulative rate for values within the first period. """
+        raise NotImplementedError
+
+    def _majorant(self, starts, ends):
+        """ Bounds the unscaled rate on intervals within the first period. """
+        raise NotImplementedError
+
+    def scaled(self, factor):
+        """ Creates a copy of this rate function with the rate multiplied by a factor.
+
+        Args:
+            factor (float): the factor (e.g. the mean rate for a relative profile)
+
+        Returns:
+            RateFunction: the scaled rate function
+        """
+        other = copy.copy(self)
+        other.scale = self.scale*factor
+        return other
+
+    def _split(self, t):
+        """ Splits times into whole periods and times within the first period. """
+        t = np.asarray(t, dtype=float)
+        if self.period is None:
+            return np.zeros_like(t), t
+        cycles = np.floor(t/self.period)
+        return cycles, t - cycles*self.period
+
+    def rate(self, t):
+        """ Evaluates the arrival rate.
+
+        Args:
+            t (numpy.ndarray): the times
+
+        Returns:
+            numpy.ndarray: the arrival rates
+        """
+        cycles, s = self._split(t)
+        return self.scale*self._rate(s)
+
+    def cumulative(self, t):
+        """ Evaluates the cumulative rate (expected number of arrivals since 0).
+
+        Args:
+            t (numpy.ndarray): the times
+
+        Returns:
+            numpy.ndarray: the cumulative rates
+        """
+        cycles, s = self._split(t)
+        if self.period is None:
+            return self.scale*self._cumulative(s)
+        return self.scale*(cycles*self._cumulative(self.period) + self._cumulative(s))
+
+    def inverse_cumulative(self, y):
+        """ Inverts the cumulative rate (the first time with a cumulative rate y).
+
+        Args:
+            y (numpy.ndarray): the cumulative rates
+
+        Returns:
+            numpy.ndarray: the times
+        """
+        y = np.asarray(y, dtype=float)/self.scale
+        if self.period is None:
+            return self._inverse(y)
+        total = self._cumulative(self.period)
+        cycles = np.floor(y/total)
+        return cycles*self.period + self._inverse(y - cycles*total)
+
+    def majorant(self, edges):
+        """ Computes an upper bound of the rate on each interval between edges.
+
+        Args:
+            edges (numpy.ndarray): the increasing interval edges
+
+        Returns:
+            numpy.ndarray: the upper bounds of the rate (one per interval)
+        """
+        edges = np.asarray(edges, dtype=float)
+        starts, ends = edges[:-1], edges[1:]
+        if self.period is None:
+            return self.scale*self._majorant(starts, ends)
+        cycles, s = self._split(starts)
+        bounds = np.empty(len(starts))
+        # intervals within one period are bounded directly
+        within = ends - cycles*self.period <= self.period
+        bounds[within] = self._majorant(s[within], (ends - cycles*self.period)[within])
+        # intervals which wrap around the period are split in two parts
+        wrap = ~within
+        if np.any(wrap):
+            bounds[wrap] = np.maximum(
+                    self._majorant(s[wrap], np.full(np.sum(wrap), float(self.period))),
+                    self._majorant(np.zeros(np.sum(wrap)), np.minimum(
+                        ends[wrap] - (cycles[wrap] + 1)*self.period, self.period)))
+        return self.scale*bounds
+
+    def generate(self, start, end, rng=None, method='inversion', block=None, resolution=None):
+        """ Generates arrival times in bulk.
+
+        Args:
+            start (float): the start time
+            end (float): the end time
+            rng (numpy.random.Generator): the random number generator (None for
+                the global numpy random state)
+            method (str): 'inversion' or 'thinning'
+            block (float): the duration of blocks generated at once (None for
+                the period or the whole duration)
+            resolution (float): the duration of majorant intervals for thinning
+                (None for 1/96 of the block, e.g. 15 minutes of a day)
+
+        Returns:
+            numpy.ndarray: the sorted arrival times in [start, end)
+        """
+        rng = np.random if rng is None else rng
+        if block is None:
+            block = self.period if self.period is not None else end - start
+        if method == 'inversion':
+            edges = np.append(np.arange(start, end, block), end)
+            totals = self.cumulative(edges)
+            expected = np.maximum(np.diff(totals), 0)
+            u, index = sorted_uniforms(rng.poisson(expected), rng)
+            return self.inverse_cumulative(totals[index] + u*expected[index])
+        if method == 'thinning':
+            resolution = block/96 if resolution is None else resolution
+            edges = np.append(np.arange(start, end, resolution), end)
+            bounds = self.majorant(edges)
+            widths = np.diff(edges)
+            u, index = sorted_uniforms(rng.poisson(bounds*widths), rng)
+            t = edges[index] + u*widths[index]
+            accept = rng.random(len(t))*bounds[index] < self.rate(t)
+            return t[accept]
+        raise ValueError('unknown method {} (choose inversion or thinning)'.format(method))
+
+    def stream(self, start=0.0, rng=None, method='inversion', block=None):
+        """ Creates an iterator which generates arrival times one block at a time.
+
+        Args:
+            start (float): the start time
+            rng (numpy.random.Generator): the random number generator (None for
+                the global numpy random state)
+            method (str): 'inversion' or 'thinning'
+            block (float): the duration of blocks generated at once (None for
+                the period)
+
+        Returns:
+            generator: the arrival times (floats)
+        """
+        if block is None:
+            if self.period is None:
+                raise ValueError('block is required for rates without a period')
+            block = self.period
+        while True:
+            for t in self.generate(start, start + block, rng, method, block).tolist():
+                yield t
+            start += block
+
+class PiecewiseConstantRate(RateFunction):
+    """ Defines a rate which is constant between breakpoints. """
+    def __init__(self, times, rates, period=None, scale=1.0):
+        """ Initializes this rate function.
+
+        Args:
+            times (numpy.ndarray): the increasing breakpoints (starting at 0)
+            rates (numpy.ndarray): the rate from each breakpoint to the next
+                (the last rate continues to the period or forever)
+            period (float): the period of the rate (None if not periodic)
+            scale (float): the factor multiplying the rate
+        """
+        RateFunction.__init__(self, period, scale)
+        self.times = np.asarray(times, dtype=float)
+        self.rates = np.asarray(rates, dtype=float)
+        if (len(self.times) != len(self.rates) or self.times[0] != 0
+                or np.any(np.diff(self.times) <= 0) or np.any(self.rates < 0)
+                or (period is not None and self.times[-1] >= period)):
+            raise ValueError('times must increase from 0 with non-negative rates')
+        if not np.any(self.rates > 0):
+            raise ValueError('at least one rate must be positive')
+        widths = np.diff(np.append(self.times, period if period is not None else np.inf))
+        self.totals = np.concatenate([[0], np.cumsum(self.rates[:-1]*widths[:-1])])
+        # breakpoints of pieces with a positive rate (to invert the cumulative rate)
+        self._positive = self.rates > 0
+
+    def _rate(self, s):
+        return self.rates[np.searchsorted(self.times, s, side='right') - 1]
+
+    def _cumulative(self, s):
+        i = np.searchsorted(self.times, s, side='right') - 1
+        return self.totals[i] + self.rates[i]*(s - self.times[i])
+
+    def _inverse(self, y):
+        times = self.times[self._positive]
+        totals = self.totals[self._positive]
+        i = np.maximum(np.searchsorted(totals, y, side='right') - 1, 0)
+        return times[i] + (y - totals[i])/self.rates[self._positive][i]
+
+    def _majorant(self, starts, ends):
+        # maximum rate of all pieces which overlap each interval
+        first = np.searchsorted(self.times, starts, side='right') - 1
+        last = np.searchsorted(self.times, ends, side='left') - 1
+        bounds = self.rates[first]
+        for i in range(1, len(self.rates)):
+            # (few pieces, so loop over pieces rather than intervals)
+            inside = (first < i) & (i <= last)
+            bounds = np.where(inside, np.maximum(bounds, self.rates[i]), bounds)
+        return bounds
+
+class PiecewiseLinearRate(RateFunction):
+    """ Defines a rate which is linear between breakpoints. """
+    def __init__(self, times, rates, period=None, scale=1.0):
+        """ Initializes this rate function.
+
+        For a periodic rate, the rate after the last breakpoint is interpolated
+        to the first rate at the end of the period. Otherwise, the last rate
+        continues forever.
+
+        Args:
+            times (numpy.ndarray): the increasing breakpoints (starting at 0)
+            rates (numpy.ndarray): the rate at each breakpoint
+            period (float): the period of the rate (None if not periodic)
+            scale (float): the factor multiplying the rate
+        """
+        RateFunction.__init__(self, period, scale)
+        times = np.asarray(times, dtype=float)
+        rates = np.asarray(rates, dtype=float)
+        if (len(times) != len(rates) or times[0] != 0 or np.any(np.diff(times) <= 0)
+                or np.any(rates < 0) or (period is not None and times[-1] >= period)):
+            raise ValueError('times must increase from 0 with non-negative rates')
+        if period is not None:
+            times = np.append(times, period)
+            rates = np.append(rates, rates[0])
+        else:
+            # add a final breakpoint far away so the last rate continues
+            times = np.append(times, np.inf)
+            rates = np.append(rates, rates[-1])
+        if not np.any(rates > 0):
+            raise ValueError('at least one rate must be positive')
+        self.times = times
+        self.rates = rates
+        widths = np.diff(times)
+        self.slopes = np.divide(np.diff(rates), widths, out=np.zeros(len(widths)),
+                                where=np.isfinite(widths))
+        with np.errstate(invalid='ignore'):
+            areas = (rates[:-1] + rates[1:])/2*widths
+        self.totals = np.concatenate([[0], np.cumsum(areas)])
+        # segments with a positive area (to invert the cumulative rate)
+        self._positive = areas > 0
+
+    def _segment(self, s):
+        return np.minimum(np.searchsorted(self.times, s, side='right') - 1, len(self.slopes) - 1)
+
+    def _rate(self, s):
+        i = self._segment(s)
+        return self.rates[i] + self.slopes[i]*(s - self.times[i])
+
+    def _cumulative(self, s):
+        i = self._segment(s)
+        d = s - self.times[i]
+        return self.totals[i] + self.rates[i]*d + self.slopes[i]*d**2/2
+
+    def _inverse(self, y):
+        segments = np.flatnonzero(self._positive)
+        totals = self.totals[:-1][segments]
+        i = segments[np.maximum(np.searchsorted(totals, y, side='right') - 1, 0)]
+        area = y - self.totals[i]
+        # solve slope/2*d^2 + rate*d = area (a stable form of the quadratic formula)
+        root = np.sqrt(np.maximum(self.rates[i]**2 + 2*self.slopes[i]*area, 0))
+        return self.times[i] + np.divide(2*area, self.rates[i] + root,
+                                         out=np.zeros_like(area), where=self.rates[i] + root > 0)
+
+    def _majorant(self, starts, ends):
+        # a linear rate is largest at an interval end or an interior breakpoint
+        bounds = np.maximum(self._rate(starts), self._rate(np.minimum(ends, self.times[-1])))
+        for i in range(1, len(self.times) - 1):
+            inside = (starts < self.times[i]) & (self.times[i] < ends)
+            bounds = np.where(inside, np.maximum(bounds, self.rates[i]), bounds)
+        return bounds
+
+class FourierRate(RateFunction):
+    """ Defines a rate with a mean and sinusoidal harmonics of a period. """
+    def __init__(self, mean, cosines, sines, period, scale=1.0):
+        """ Initializes this rate function.
+
+        The rate is mean + sum_k (a_k cos(2 pi k t/P) + b_k sin(2 pi k t/P))
+        for harmonics k = 1, 2, ... which must be non-negative.
+
+        Args:
+            mean (float): the mean rate
+            cosines (list): the cosine coefficients (a_k)
+            sines (list): the sine coefficients (b_k)
+            period (float): the period (P)
+            scale (float): the factor multiplying the rate
+        """
+        RateFunction.__init__(self, period, scale)
+        self.mean = float(mean)
+        self.cosines = np.asarray(cosines, dtype=float)
+        self.sines = np.asarray(sines, dtype=float)
+        if self.cosines.shape != self.sines.shape:
+            raise ValueError('cosines and sines must have the same number of harmonics')
+        self.frequencies = 2*np.pi*np.arange(1, len(self.cosines) + 1)/period
+        # bound on the slope of the rate (to bound the rate between points)
+        self.lipschitz = np.sum(self.frequencies*np.hypot(self.cosines, self.sines))
+        # tabulate the cumulative rate for initial guesses of its inverse
+        self._grid = np.linspace(0, period, 4097)
+        if np.min(self._rate(self._grid)) < -self.lipschitz*period/8192 or self.mean <= 0:
+            raise ValueError('the rate must be non-negative')
+        self._grid_totals = self._cumulative(self._grid)
+
+    def _rate(self, s):
+        s = np.asarray(s, dtype=float)
+        phase = np.multiply.outer(s, self.frequencies)
+        return self.mean + np.cos(phase) @ self.cosines + np.sin(phase) @ self.sines
+
+    def _cumulative(self, s):
+        s = np.asarray(s, dtype=float)
+        phase = np.multiply.outer(s, self.frequencies)
+        return (self.mean*s + np.sin(phase) @ (self.cosines/self.frequencies)
+                + (1 - np.cos(phase)) @ (self.sines/self.frequencies))
+
+    def _inverse(self, y, num_iterations=1):
+        # interpolate the tabulated values and refine with Newton's method
+        s = np.interp(y, self._grid_totals, self._grid)
+        for i in range(num_iterations):
+            # evaluate the harmonics once for both the rate and cumulative rate
+            phase = np.multiply.outer(s, self.frequencies)
+            cos, sin = np.cos(phase), np.sin(phase)
+            rate = self.mean + cos @ self.cosines + sin @ self.sines
+            error = (self.mean*s + sin @ (self.cosines/self.frequencies)
+                     + (1 - cos) @ (self.sines/self.frequencies) - y)
+            s = np.clip(s - np.divide(error, rate, out=np.zeros_like(s), where=rate > 0),
+                        0, self.period)
+        return s
+
+    def _majorant(self, starts, ends, num_points=5):
+        # maximum rate at evenly-spaced points plus the largest rise between points
+        points = starts[:, np.newaxis] + np.linspace(0, 1, num_points)*(ends - starts)[:, np.newaxis]
+        spacing = (ends - starts)/(num_points - 1)
+        return self._rate(points).max(axis=1) + self.lipschitz*spacing/2
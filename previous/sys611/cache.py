@@ -0,0 +1,281 @@
+"""
+SYS-611: Memoized replication cache.
+
+Replication functions take the model parameters and a random number seed as
+arguments and return a tuple `(summary, traces)` where `summary` is a dict of
+scalar outputs and `traces` is a dict of numpy arrays. Because each replication
+is completely determined by its arguments and the model source code, results
+can be stored and re-used instead of re-simulating.
+
+Results are stored in a least-recently-used (LRU) cache in memory and in a
+size-bounded directory on disk. Cache keys hash the function name, the source
+code of the file defining the function and of the modules it depends on (by
+default, all modules of the sys611 package), and all bound argument values, so
+any change to the model source code invalidates previous results.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# default directory for cached results (override with SYS611_CACHE_DIR)
+DEFAULT_DIRECTORY = os.environ.get('SYS611_CACHE_DIR', os.path.join(
+        os.path.expanduser('~'), '.cache', 'sys611'))
+
+def package_sources():
+    """ Lists the source files of the modules of the sys611 package.
+
+    Returns:
+        list(str): the sorted paths of the source files
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.endswith('.py')]
+
+def source_digest(func, dependencies=()):
+    """ Computes a digest of the source code defining a function.
+
+    Args:
+        func (function): the function
+        dependencies (list): the modules (or source file paths) the function
+            depends on, whose source code is included in the digest
+
+    Returns:
+        str: the hexadecimal digest of the source file (or byte code if the
+            source file is not available, e.g. in an interactive session)
+    """
+    digest = hashlib.sha1()
+    try:
+        with open(inspect.getsourcefile(func), 'rb') as source:
+            digest.update(source.read())
+    except (TypeError, IOError, OSError):
+        code = func.__code__
+        digest.update(code.co_code)
+        digest.update(repr(code.co_consts).encode('utf-8'))
+    for dependency in dependencies:
+        path = dependency if isinstance(dependency, str) else inspect.getsourcefile(dependency)
+        with open(path, 'rb') as source:
+            digest.update(hashlib.sha1(source.read()).digest())
+    return digest.hexdigest()
+
+def _canonical(value):
+    """ Converts an argument value to a JSON-serializable canonical form.
+
+    Args:
+        value (object): the argument value
+
+    Returns:
+        object: the canonical value
+    """
+    if isinstance(value, np.ndarray):
+        return {'dtype': str(value.dtype), 'shape': value.shape,
+                'data': hashlib.sha1(np.ascontiguousarray(value)).hexdigest()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, float):
+        # use the exact representation so that 0.1 and 0.1000001 differ
+        return value.hex()
+    return value
+
+class ReplicationCache(object):
+    """ Defines a two-level (memory and disk) cache of replication results. """
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_entries=256,
+                 max_bytes=512*2**20):
+        """ Initializes this cache.
+
+        Args:
+            directory (str): the directory to store results (None for memory only)
+            max_entries (int): the maximum number of results kept in memory
+            max_bytes (int): the maximum total size of results kept on disk
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = collections.OrderedDict()
+        # running total size of files on disk (None until the directory is scanned)
+        self._disk_bytes = None
+        if self.directory is not None and not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def key(self, func, params, source=None):
+        """ Computes the cache key for a replication.
+
+        Args:
+            func (function): the replication function
+            params (dict): the bound argument values (including the seed)
+            source (str): the source digest (computed from `func` if None)
+
+        Returns:
+            str: the cache key
+        """
+        content = json.dumps({
+                'function': '{}.{}'.format(func.__module__, func.__name__),
+                'source': source if source is not None else source_digest(func),
+                'params': _canonical(params)
+            }, sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        """ Gets the disk path for a cache key. """
+        return os.path.join(self.directory, key + '.npz')
+
+    def get(self, key):
+        """ Gets a stored replication result.
+
+        Args:
+            key (str): the cache key
+
+        Returns:
+            tuple: the `(summary, traces)` result or None if not stored
+        """
+        # check the in-memory cache first
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        # otherwise check the disk cache
+        if self.directory is not None and os.path.exists(self._path(key)):
+            try:
+                with np.load(self._path(key), allow_pickle=False) as data:
+                    summary = json.loads(str(data['__summary__']))
+                    traces = {name: data[name] for name in data.files
+                              if name != '__summary__'}
+            except (IOError, OSError, ValueError, KeyError):
+                # treat a corrupted or partially-written file as a miss
+                self.misses += 1
+                return None
+            # mark the file as recently used for disk eviction
+            try:
+                os.utime(self._path(key), None)
+            except OSError:
+                # another process sharing the directory evicted the file
+                pass
+            self._remember(key, (summary, traces))
+            self.hits += 1
+            return summary, traces
+        self.misses += 1
+        return None
+
+    def put(self, key, summary, traces):
+        """ Stores a replication result.
+
+        Args:
+            key (str): the cache key
+            summary (dict): the scalar outputs
+            traces (dict): the trace arrays
+
+        Returns:
+            tuple: the stored `(summary, traces)` result
+        """
+        traces = {name: np.asarray(trace) for name, trace in traces.items()}
+        self._remember(key, (summary, traces))
+        if self.directory is None:
+            return summary, traces
+        # write to a temporary file and rename so readers never see partial files
+        handle, path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        with os.fdopen(handle, 'wb') as output:
+            np.savez(output, __summary__=np.array(json.dumps(
+                    summary, default=lambda value: value.item())), **traces)
+        size = os.path.getsize(path)
+        os.replace(path, self._path(key))
+        if self._disk_bytes is None:
+            self._evict_disk()
+        else:
+            # only scan the directory once the running total passes the bound
+            self._disk_bytes += size
+            if self._disk_bytes > self.max_bytes:
+                self._evict_disk()
+        return summary, traces
+
+    def _remember(self, key, result):
+        """ Adds a result to the in-memory cache, evicting the oldest entries. """
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """ Deletes the least-recently used files to respect the size bound.
+
+        Files may be added or deleted concurrently by other processes sharing
+        the directory, so files which disappear are skipped.
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+        self._disk_bytes = total
+
+    def clear(self):
+        """ Removes all stored results from memory and disk. """
+        self._memory.clear()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+            self._disk_bytes = 0
+
+    def memoize(self, func, dependencies=None):
+        """ Wraps a replication function to re-use stored results.
+
+        Args:
+            func (function): the replication function returning `(summary, traces)`
+            dependencies (list): the modules (or source file paths) the function
+                depends on (all modules of the sys611 package if None)
+
+        Returns:
+            function: the wrapped function with the same signature
+        """
+        signature = inspect.signature(func)
+        if dependencies is None:
+            dependencies = package_sources()
+        # digest the source once, when the function is wrapped
+        source = source_digest(func, dependencies)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # bind all arguments (including defaults) to build the key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = self.key(func, dict(bound.arguments), source)
+            result = self.get(key)
+            if result is None:
+                summary, traces = func(*bound.args, **bound.kwargs)
+                result = self.put(key, summary, traces)
+            return result
+        wrapper.cache = self
+        return wrapper
@@ -0,0 +1,296 @@
+"""
+SYS-611: Memory-lean entities for SimPy queuing models.
+
+Process-based models (e.g. `handle_customer` in week 12) create a generator
+(process), a resource request, and usually a name string for every customer,
+so memory and garbage collection time grow with the number of customers in
+the system. The classes in this module represent entities by integer IDs:
+ * `EntityTable` stores entity attributes (e.g. arrival and departure times)
+   in growing numpy arrays (one array per attribute, or struct-of-arrays)
+   rather than one object per entity.
+ * `ServerPool` serves a first-in first-out queue of entity IDs with one
+   process per server (rather than per entity), so entities only occupy a
+   slot in a deque while they wait.
+ * `ImpatientPool` also lets entities balk (not join the queue, with a
+   probability depending on the queue length) and renege (leave the queue
+   when their patience runs out). Rather than a timeout event per waiting
+   entity (`request | env.timeout(patience)`, which stays in the event queue
+   after the entity is served), the abandonment deadlines are kept in a heap
+   beside the queue (`ImpatientQueue`) and entities whose deadline has
+   passed are removed whenever the queue is read (e.g. by a server or by
+   the length of the queue). Served entities are only removed from the
+   heap when their deadline passes, so no events are scheduled for
+   abandonment at all.
+Entity names (e.g. 'Cust 12') are formatted from the ID only when they are
+printed.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import collections
+from heapq import heapify, heappop, heappush
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+class EntityTable(object):
+    """ Defines a table of entity attributes stored in numpy arrays. """
+    def __init__(self, columns, capacity=1024):
+        """ Initializes this table.
+
+        Args:
+            columns (list): the attribute names (float values, NaN if not set)
+            capacity (int): the initial number of rows (doubled when full)
+        """
+        self.size = 0
+        self.columns = {name: np.full(capacity, np.nan) for name in columns}
+
+    def add(self, **values):
+        """ Adds an entity.
+
+        Args:
+            **values: the initial attribute values
+
+        Returns:
+            int: the entity ID (row number)
+        """
+        entity = self.size
+        if entity == len(next(iter(self.columns.values()))):
+            # double the capacity of all columns
+            for name, column in self.columns.items():
+                self.columns[name] = np.concatenate((column, np.full(len(column), np.nan)))
+        for name, value in values.items():
+            self.columns[name][entity] = value
+        self.size += 1
+        return entity
+
+    def set(self, entity, name, value):
+        """ Sets an attribute of an entity.
+
+        Args:
+            entity (int): the entity ID
+            name (str): the attribute name
+            value (float): the attribute value
+        """
+        self.columns[name][entity] = value
+
+    def __getitem__(self, name):
+        """ Gets an attribute of all entities (a view of the used rows). """
+        return self.columns[name][:self.size]
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """ int: the number of bytes allocated by this table. """
+        return sum(column.nbytes for column in self.columns.values())
+
+class ServerPool(object):
+    """ Defines servers of a first-in first-out queue of entity IDs. """
+    def __init__(self, env, capacity, service_time, on_start=None, on_depart=None):
+        """ Initializes this server pool and launches one process per server.
+
+        Args:
+            env (simpy.Environment): the simulation environment
+            capacity (int): the number of servers
+            service_time (function): returns the service time of an entity
+            on_start (function): called with an entity when service starts
+            on_depart (function): called with an entity when service ends
+        """
+        self.env = env
+        self.capacity = capacity
+        self.service_time = service_time
+        self.on_start = on_start
+        self.on_depart = on_depart
+        # entities waiting for service (like `simpy.Resource.queue`)
+        self.queue = collections.deque()
+        # events which wake idle servers
+        self._idle = []
+        for server in range(capacity):
+            env.process(self._serve())
+
+    def arrive(self, entity):
+        """ Adds an entity to this queue (or hands it to an idle server).
+
+        Args:
+            entity (int): the entity ID
+
+        Returns:
+            bool: True if the entity joined (entities always join)
+        """
+        if self._idle:
+            self._idle.pop().succeed(entity)
+        else:
+            self.queue.append(entity)
+        return True
+
+    @property
+    def count(self):
+        """ int: the number of busy servers. """
+        return self.capacity - len(self._idle)
+
+    def _serve(self):
+        """ Process to serve entities until the end of the simulation. """
+        while True:
+            if self.queue:
+                entity = self.queue.popleft()
+            else:
+                # wait (idle) until an entity arrives
+                wake = self.env.event()
+                self._idle.append(wake)
+                entity = yield wake
+            if self.on_start is not None:
+                self.on_start(entity)
+            yield self.env.timeout(self.service_time(entity))
+            if self.on_depart is not None:
+                self.on_depart(entity)
+
+class ImpatientQueue(object):
+    """ Defines a first-in first-out queue of entity IDs with abandonment deadlines. """
+    def __init__(self, env, on_renege=None):
+        """ Initializes this queue.
+
+        Args:
+            env (simpy.Environment): the simulation environment (the clock)
+            on_renege (function): called with an entity and the time it
+                reneged (its deadline, which may be before the current time)
+        """
+        self.env = env
+        self.on_renege = on_renege
+        self._queue = collections.deque()
+        # deadline of each waiting entity (and entities which left the queue)
+        self._deadline = {}
+        self._left = set()
+        # heap of (deadline, entity) which may include entities which left
+        self._heap = []
+        self._reaping = False
+        self.num_reneged = 0
+
+    def append(self, entity, deadline=float('inf')):
+        """ Adds an entity to the end of this queue.
+
+        Args:
+            entity (int): the entity ID
+            deadline (float): the time the entity reneges if still waiting
+        """
+        self._queue.append(entity)
+        if deadline < float('inf'):
+            self._deadline[entity] = deadline
+            heappush(self._heap, (deadline, entity))
+
+    def reap(self, now=None):
+        """ Removes the entities whose deadline has passed.
+
+        Args:
+            now (float): the current time (None for the simulation time)
+        """
+        heap = self._heap
+        if not heap:
+            return
+        if now is None:
+            now = self.env.now
+        deadlines = self._deadline
+        # remove entities in order of deadline, so the queue length seen by
+        # the callback (not reaped again) is the length at the deadline
+        self._reaping = True
+        while heap and heap[0][0] <= now:
+            deadline, entity = heappop(heap)
+            # skip entities which were served (lazily invalidated)
+            if deadlines.get(entity) == deadline:
+                del deadlines[entity]
+                self._left.add(entity)
+                self.num_reneged += 1
+                if self.on_renege is not None:
+                    self.on_renege(entity, deadline)
+        self._reaping = False
+        # rebuild the heap when mostly entities which were served
+        if len(heap) > 64 and len(heap) > 4*len(deadlines):
+            self._heap = [(deadline, entity) for entity, deadline in deadlines.items()]
+            heapify(self._heap)
+
+    def popleft(self):
+        """ Removes the first waiting entity (after removing reneged entities).
+
+        Returns:
+            int: the entity ID
+        """
+        heap = self._heap
+        if heap and heap[0][0] <= self.env.now:
+            self.reap()
+        queue = self._queue
+        left = self._left
+        while True:
+            entity = queue.popleft()
+            if entity in left:
+                left.remove(entity)
+                continue
+            self._deadline.pop(entity, None)
+            return entity
+
+    def __len__(self):
+        # reap only if a deadline has passed (checked inline, as the length is
+        # read at most events)
+        heap = self._heap
+        if heap and heap[0][0] <= self.env.now and not self._reaping:
+            self.reap()
+        return len(self._queue) - len(self._left)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    __nonzero__ = __bool__
+
+class ImpatientPool(ServerPool):
+    """ Defines servers of a first-in first-out queue of balking and reneging entities. """
+    def __init__(self, env, capacity, service_time, patience=None, balk=None, on_start=None,
+                 on_depart=None, on_renege=None, on_balk=None):
+        """ Initializes this server pool and launches one process per server.
+
+        Args:
+            env (simpy.Environment): the simulation environment
+            capacity (int): the number of servers
+            service_time (function): returns the service time of an entity
+            patience (function): returns the longest time an entity waits in
+                the queue (None for entities which never renege)
+            balk (function): returns the probability that an entity balks
+                given the queue length (None for entities which never balk)
+            on_start (function): called with an entity when service starts
+            on_depart (function): called with an entity when service ends
+            on_renege (function): called with an entity and the time it
+                reneged (see `ImpatientQueue`)
+            on_balk (function): called with an entity when it balks
+        """
+        ServerPool.__init__(self, env, capacity, service_time, on_start, on_depart)
+        self.queue = ImpatientQueue(env, on_renege)
+        self.patience = patience
+        self.balk = balk
+        self.on_balk = on_balk
+        self.num_balked = 0
+
+    def arrive(self, entity):
+        """ Adds an entity to this queue (or hands it to an idle server) unless it balks.
+
+        Args:
+            entity (int): the entity ID
+
+        Returns:
+            bool: True if the entity joined (False if it balked)
+        """
+        if self._idle:
+            self._idle.pop().succeed(entity)
+            return True
+        if self.balk is not None and np.random.rand() < self.balk(len(self.queue)):
+            self.num_balked += 1
+            if self.on_balk is not None:
+                self.on_balk(entity)
+            return False
+        if self.patience is None:
+            self.queue.append(entity)
+        else:
+            self.queue.append(entity, self.env.now + self.patience(entity))
+        return True
@@ -0,0 +1,331 @@
+"""
+SYS-611: Experiment runner for parameter sweeps of the example models.
+
+An experiment runs a number of replications (seeds) of a registered model (see
+`sys611.models`) for each of several scenarios (sets of parameter values).
+Scenarios are written compactly as parameter values, ranges, or lists which
+are expanded to all combinations, e.g. `{'R': '3..8', 'S': [10, 20]}` defines
+12 scenarios. Experiments can also be read from a JSON or YAML manifest:
+
+    model: factory
+    runs: 1000
+    output: factory.csv
+    params: {T: 2080}
+    scenarios:
+      - {R: 3..8, S: 10..30}
+      - {R: 10, S: [40, 50]}
+
+Replications run in a local process pool and the results of each replication
+are appended to a CSV file as they complete, so an interrupted experiment
+resumes by skipping the replications already in the file. After all
+replications complete, the file is sorted and a summary file with the mean
+and 95% confidence interval of each output for each scenario is written.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import ast
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+from sys611.models import load_model, resolve_params
+
+def parse_value(text):
+    """ Parses a parameter value from text.
+
+    Args:
+        text (str): the value text (e.g. '3', '0.5', or 'abc')
+
+    Returns:
+        object: the value as a python literal (or the text if not a literal)
+    """
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+def expand_values(value):
+    """ Expands a parameter value, range, or list to a list of values.
+
+    Ranges `start..stop` or `start..stop..step` include both end points.
+
+    Args:
+        value (object): the value, the range text, comma-separated text, or a list
+
+    Returns:
+        list: the values
+    """
+    if isinstance(value, (list, tuple)):
+        return [v for item in value for v in expand_values(item)]
+    if not isinstance(value, str):
+        return [value]
+    if ',' in value:
+        return expand_values(value.split(','))
+    if '..' in value:
+        bounds = [parse_value(bound.strip()) for bound in value.split('..')]
+        if len(bounds) not in (2, 3) or not all(
+                isinstance(bound, (int, float)) for bound in bounds):
+            raise ValueError('range {} must be start..stop or start..stop..step'.format(value))
+        start, stop, step = bounds if len(bounds) == 3 else bounds + [1]
+        if step <= 0:
+            raise ValueError('range {} must have a positive step'.format(value))
+        # count the values with a small tolerance for floating point steps
+        count = int((stop - start)/step + 1e-9) + 1
+        return [start + i*step for i in range(count)]
+    return [parse_value(value.strip())]
+
+def expand_scenarios(params):
+    """ Expands parameter values to all combinations of values.
+
+    Args:
+        params (dict): the values, ranges, or lists of each parameter
+
+    Returns:
+        list: the scenarios (dicts of parameter values)
+    """
+    names = list(params)
+    values = [expand_values(params[name]) for name in names]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+def load_manifest(path):
+    """ Loads an experiment manifest from a JSON or YAML file.
+
+    Args:
+        path (str): the manifest path (.json, .yaml, or .yml)
+
+    Returns:
+        dict: the manifest
+    """
+    with open(path) as source:
+        if path.endswith(('.yaml', '.yml')):
+            # import the yaml package only for yaml manifests
+            # see https://pyyaml.org/wiki/PyYAMLDocumentation for documentation
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('YAML manifests require PyYAML (or use a JSON manifest)')
+            manifest = yaml.safe_load(source)
+        else:
+            manifest = json.load(source)
+    if not isinstance(manifest, dict) or 'model' not in manifest:
+        raise ValueError('manifest {} must define a model'.format(path))
+    return manifest
+
+def manifest_scenarios(manifest):
+    """ Expands the scenarios defined by a manifest.
+
+    Args:
+        manifest (dict): the manifest with optional `params` (common to all
+            scenarios) and `scenarios` (a list of parameter dicts)
+
+    Returns:
+        list: the scenarios (dicts of parameter values)
+    """
+    common = manifest.get('params') or {}
+    scenarios = []
+    for params in manifest.get('scenarios') or [{}]:
+        combined = dict(common)
+        combined.update(params)
+        scenarios.extend(expand_scenarios(combined))
+    return scenarios
+
+def _plain(value):
+    """ Converts numpy scalars to python numbers for output. """
+    return value.item() if hasattr(value, 'item') else value
+
+def _run_chunk(name, params, seeds):
+    """ Runs replications of a model (in a worker process).
+
+    Args:
+        name (str): the model name
+        params (dict): the parameter values (by name)
+        seeds (list): the random number seeds
+
+    Returns:
+        list: the summary outputs of each replication (traces are discarded)
+    """
+    replicate = load_model(name)
+    results = []
+    for seed in seeds:
+        summary, traces = replicate(seed, **params)
+        results.append({key: _plain(value) for key, value in summary.items()})
+    return results
+
+def _report_progress(done, total, start, stream=sys.stderr):
+    """ Reports the number of completed replications and estimated time left.
+
+    Args:
+        done (int): the number of completed replications
+        total (int): the total number of replications
+        start (float): the start time (seconds)
+        stream (file): the output stream
+    """
+    elapsed = time.time() - start
+    # the remaining time is unknown until the first replication completes
+    remaining = '{:.0f}'.format(elapsed*(total - done)/done) if done > 0 else '?'
+    stream.write('\r{:d}/{:d} runs ({:.0%}), {:.0f} s elapsed, {} s remaining'.format(
+            done, total, done/total if total > 0 else 1, elapsed, remaining))
+    if done >= total:
+        stream.write('\n')
+    stream.flush()
+
+def summarize(columns, rows, names, confidence_level=0.95):
+    """ Computes the mean and confidence interval of each output per scenario.
+
+    Args:
+        columns (list): the result columns (parameters, seed, and outputs)
+        rows (list): the result rows (lists of text values)
+        names (list): the parameter columns
+        confidence_level (float): the confidence level
+
+    Returns:
+        list: the summary columns
+        list: the summary rows
+    """
+    # import the numpy and scipy stats packages only to summarize results
+    import numpy as np
+    import scipy.stats as stats
+    metrics = columns[len(names) + 1:]
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[:len(names)]), []).append(row[len(names) + 1:])
+    summary_rows = []
+    for key, values in groups.items():
+        for j, metric in enumerate(metrics):
+            samples = np.array([float(value[j]) for value in values])
+            n = len(samples)
+            std = np.std(samples, ddof=1) if n > 1 else float('nan')
+            t_crit = stats.t.ppf(1 - (1 - confidence_level)/2, n - 1) if n > 1 else float('nan')
+            summary_rows.append(list(key) + [metric, n, np.mean(samples), std,
+                                             t_crit*std/np.sqrt(n)])
+    return names + ['metric', 'n', 'mean', 'std', 'half_width'], summary_rows
+
+def run_experiment(model, scenarios, runs=1, first_seed=0, workers=1, output=None,
+                   chunk_size=None, progress=True):
+    """ Runs replications of a model for each scenario.
+
+    Args:
+        model (str): the model name
+        scenarios (list): the scenarios (dicts of parameter values)
+        runs (int): the number of replications per scenario
+        first_seed (int): the seed of the first replication
+        workers (int): the number of parallel worker processes
+        output (str): the CSV file for results (None for the standard output)
+        chunk_size (int): the number of replications per task (None for automatic)
+        progress (bool): True, to report progress to the standard error
+
+    Returns:
+        list: the result columns (parameters, seed, and outputs)
+        list: the result rows (lists of text values)
+    """
+    # resolve parameter aliases (and check parameter names) before starting
+    scenarios = [resolve_params(model, scenario) for scenario in scenarios]
+    names = []
+    for scenario in scenarios:
+        names.extend(name for name in scenario if name not in names)
+
+    def key_of(scenario):
+        return tuple(str(scenario[name]) if name in scenario else '' for name in names)
+
+    # read the replications already completed (to resume an experiment)
+    columns = None
+    rows = []
+    if output is not None and os.path.exists(output) and os.path.getsize(output) > 0:
+        with open(output) as source:
+            reader = csv.reader(source)
+            columns = next(reader)
+            rows = [row for row in reader if len(row) == len(columns)]
+        if columns[:len(names) + 1] != names + ['seed']:
+            raise ValueError('existing file {} has different columns {}'.format(
+                    output, ', '.join(columns)))
+    done = set(tuple(row[:len(names) + 1]) for row in rows)
+
+    # define the tasks (scenarios and chunks of seeds) still to run
+    seeds = list(range(first_seed, first_seed + runs))
+    if chunk_size is None:
+        chunk_size = max(1, min(runs, len(scenarios)*runs//(8*max(workers, 1))))
+    tasks = []
+    for scenario in scenarios:
+        key = key_of(scenario)
+        pending = [seed for seed in seeds if key + (str(seed),) not in done]
+        for i in range(0, len(pending), chunk_size):
+            tasks.append((scenario, pending[i:i+chunk_size]))
+    total = sum(len(chunk) for _, chunk in tasks)
+
+    if output is not None:
+        # write rows to the file as they complete (flushed after each task)
+        target = open(output, 'a')
+    else:
+        target = sys.stdout
+    writer = csv.writer(target, lineterminator='\n')
+
+    def record(scenario, chunk, results):
+        # write the header once the output metrics are known
+        nonlocal columns
+        if columns is None:
+            columns = names + ['seed'] + list(results[0])
+            writer.writerow(columns)
+        for seed, result in zip(chunk, results):
+            row = list(key_of(scenario)) + [str(seed)] + [
+                    str(result[metric]) for metric in columns[len(names) + 1:]]
+            writer.writerow(row)
+            rows.append(row)
+        target.flush()
+
+    start = time.time()
+    status = {'completed': 0, 'reported': 0.0}
+    def advance(count):
+        # report progress at most a few times per second
+        status['completed'] += count
+        if progress and (status['completed'] >= total
+                         or time.time() - status['reported'] > 0.2):
+            _report_progress(status['completed'], total, start)
+            status['reported'] = time.time()
+
+    executor = None
+    try:
+        if workers > 1 and len(tasks) > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+            futures = {executor.submit(_run_chunk, model, scenario, chunk): (scenario, chunk)
+                       for scenario, chunk in tasks}
+            for future in concurrent.futures.as_completed(futures):
+                scenario, chunk = futures[future]
+                record(scenario, chunk, future.result())
+                advance(len(chunk))
+        else:
+            for scenario, chunk in tasks:
+                record(scenario, chunk, _run_chunk(model, scenario, chunk))
+                advance(len(chunk))
+    finally:
+        if executor is not None:
+            # do not start queued tasks after an error or interruption
+            executor.shutdown(wait=True, cancel_futures=True)
+        if output is not None:
+            target.close()
+
+    if output is not None and columns is not None:
+        # sort the results by scenario and seed and write the summary file
+        order = {key_of(scenario): i for i, scenario in enumerate(scenarios)}
+        rows.sort(key=lambda row: (order.get(tuple(row[:len(names)]), len(order)),
+                                   int(row[len(names)])))
+        temporary = output + '.tmp'
+        with open(temporary, 'w') as target:
+            writer = csv.writer(target, lineterminator='\n')
+            writer.writerow(columns)
+            writer.writerows(rows)
+        os.replace(temporary, output)
+        summary_columns, summary_rows = summarize(columns, rows, names)
+        root, extension = os.path.splitext(output)
+        with open(root + '-summary' + (extension or '.csv'), 'w') as target:
+            writer = csv.writer(target, lineterminator='\n')
+            writer.writerow(summary_columns)
+            writer.writerows(summary_rows)
+    return columns, rows
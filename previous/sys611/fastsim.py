@@ -0,0 +1,1025 @@
+"""
+SYS-611: Lean SimPy-compatible environment for timeout-dominated models.
+
+The week 12 models spend most of their time in the SimPy kernel rather than
+in model code: every `yield env.timeout(...)` creates an event with a list of
+callbacks, a bound method to resume the process, and an entry in the event
+queue (heap), and every resource request passes through the generic put and
+get queues of `simpy.resources`. This module is a drop-in replacement for the
+part of the SimPy API used by the models (`Environment` with `now`,
+`process`, `timeout`, `event`, `run`, and `active_process`, `Resource`,
+`Container`, conditions with `&` and `|`, and `Process.interrupt`):
+
+    import sys611.fastsim as simpy
+
+Events process in exactly the order of SimPy, so a model with the same
+random number seed has an identical trajectory:
+ * Events are ordered by (time, priority, event ID) as in SimPy, where the
+   event ID counts scheduled events. Only events in the future are kept in
+   the heap; events at the current time are appended to a FIFO queue of
+   urgent (process start and interrupts) or normal events, which is the
+   order of their event IDs. When the clock advances, all events of the new
+   time move from the heap to these FIFO queues.
+ * Events have `__slots__` and no list of callbacks until one is needed: a
+   process waiting for an event (e.g. a timeout) is stored in place of the
+   list and resumed directly. The public `callbacks` list is created when it
+   is read (e.g. to append a callback).
+ * A process which is the only waiter of an event and yields the next event
+   to be processed (e.g. an uncontested resource request, granted at the
+   current time) processes it and continues at once rather than returning
+   to the event loop. Processes resumed among other callbacks of an event
+   (e.g. several processes waiting for one event) always return to the
+   event loop, so the other callbacks run first as in SimPy.
+ * Uncontested requests and container puts and gets are granted without
+   searching the queues, and releasing a resource with no waiting requests
+   does not schedule an event (it would not grant anything).
+
+Interrupts raise `simpy.Interrupt` (SimPy is still required) so models and
+utilities (e.g. `sys611.fleet`) catch them whichever environment they run in.
+Priority and preemptive resources, stores, and real-time environments are not
+provided, and a run until a time does not leave its stop event in the event
+queue (so `peek` after the run returns the time of the next model event).
+See `benchmarks/fastSimBenchmark.py` for the identity of trajectories and
+the speedup of the week 12 models.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import collections
+from heapq import heappop, heappush
+from itertools import count
+
+# import the simpy package (for its exceptions)
+# see https://simpy.readthedocs.io/en/latest/api_reference for documentation
+from simpy.exceptions import Interrupt
+
+# priorities of events at the same time (as in simpy)
+URGENT = 0
+NORMAL = 1
+# value of events which are not yet triggered
+PENDING = object()
+# callbacks of events without callbacks (a process waiting for an event is
+# stored in place of its callbacks)
+NO_CALLBACKS = ()
+
+Infinity = float('inf')
+
+class EmptySchedule(Exception):
+    """ Raised by `Environment.step` if there are no further events. """
+
+class StopSimulation(Exception):
+    """ Raised to stop `Environment.run` when its `until` event is processed. """
+    @classmethod
+    def callback(cls, event):
+        if event._ok:
+            raise cls(event._value)
+        raise event._value
+
+class Event(object):
+    """ Defines an event which may be triggered at most once. """
+    __slots__ = ('env', '_callbacks', '_value', '_ok', '_defused')
+
+    def __init__(self, env):
+        """ Initializes this event.
+
+        Args:
+            env (Environment): the simulation environment
+        """
+        self.env = env
+        self._callbacks = NO_CALLBACKS
+        self._value = PENDING
+
+    def __repr__(self):
+        return '<{}() object at {:#x}>'.format(self.__class__.__name__, id(self))
+
+    @property
+    def callbacks(self):
+        """ list: the functions called with this event when it is processed
+        (None once processed). """
+        callbacks = self._callbacks
+        if callbacks is NO_CALLBACKS:
+            callbacks = self._callbacks = []
+        elif callbacks is not None and callbacks.__class__ is not list:
+            # a waiting process
+            callbacks = self._callbacks = [callbacks._resume]
+        return callbacks
+
+    @callbacks.setter
+    def callbacks(self, callbacks):
+        self._callbacks = callbacks
+
+    @property
+    def triggered(self):
+        """ bool: True if this event has been triggered. """
+        return self._value is not PENDING
+
+    @property
+    def processed(self):
+        """ bool: True if this event has been processed. """
+        return self._callbacks is None
+
+    @property
+    def ok(self):
+        """ bool: True if this event has been triggered successfully. """
+        return self._ok
+
+    @property
+    def defused(self):
+        """ bool: True if the failure of this event has been handled. """
+        return hasattr(self, '_defused')
+
+    @defused.setter
+    def defused(self, value):
+        self._defused = True
+
+    @property
+    def value(self):
+        """ object: the value of this event once triggered. """
+        if self._value is PENDING:
+            raise AttributeError('Value of {} is not yet available'.format(self))
+        return self._value
+
+    def trigger(self, event):
+        """ Triggers this event with the state and value of another event. """
+        self._ok = event._ok
+        self._value = event._value
+        self.env._ready.append(self)
+
+    def succeed(self, value=None):
+        """ Triggers this event successfully.
+
+        Args:
+            value (object): the value of this event
+
+        Returns:
+            Event: this event
+        """
+        if self._value is not PENDING:
+            raise RuntimeError('{} has already been triggered'.format(self))
+        self._ok = True
+        self._value = value
+        self.env._ready.append(self)
+        return self
+
+    def fail(self, exception):
+        """ Triggers this event with a failure.
+
+        Args:
+            exception (Exception): the exception raised in waiting processes
+
+        Returns:
+            Event: this event
+        """
+        if self._value is not PENDING:
+            raise RuntimeError('{} has already been triggered'.format(self))
+        if not isinstance(exception, BaseException):
+            raise TypeError('{} is not an exception.'.format(exception))
+        self._ok = False
+        self._value = exception
+        self.env._ready.append(self)
+        return self
+
+    def __and__(self, other):
+        return Condition(self.env, Condition.all_events, [self, other])
+
+    def __or__(self, other):
+        return Condition(self.env, Condition.any_events, [self, other])
+
+class Timeout(Event):
+    """ Defines an event which is triggered after a delay. """
+    __slots__ = ()
+
+    def __init__(self, env, delay, value=None):
+        """ Initializes and schedules this timeout.
+
+        Args:
+            env (Environment): the simulation environment
+            delay (float): the delay
+            value (object): the value of this event
+        """
+        if delay < 0:
+            raise ValueError('Negative delay {}'.format(delay))
+        self.env = env
+        self._callbacks = NO_CALLBACKS
+        self._value = value
+        self._ok = True
+        env.schedule(self, NORMAL, delay)
+
+class Initialize(Event):
+    """ Defines the event which starts a process (created by `Process`). """
+    __slots__ = ()
+
+class Interruption(Event):
+    """ Defines the event which throws an `Interrupt` into a process. """
+    __slots__ = ('process',)
+
+    def __init__(self, process, cause):
+        self.env = process.env
+        self._callbacks = [self._interrupt]
+        self._value = Interrupt(cause)
+        self._ok = False
+        self._defused = True
+        if process._value is not PENDING:
+            raise RuntimeError('{} has terminated and cannot be interrupted.'.format(process))
+        if process is self.env._active_proc:
+            raise RuntimeError('A process is not allowed to interrupt itself.')
+        self.process = process
+        self.env._urgent.append(self)
+
+    def _interrupt(self, event):
+        process = self.process
+        if process._value is not PENDING:
+            return
+        # stop waiting for the target event
+        target = process._target
+        if target._callbacks is process:
+            target._callbacks = NO_CALLBACKS
+        else:
+            target._callbacks.remove(process._resume)
+        process._resume(self)
+
+class Process(Event):
+    """ Defines a process which runs a generator of events. """
+    __slots__ = ('_generator', '_target')
+
+    def __init__(self, env, generator):
+        """ Initializes this process and schedules its start.
+
+        Args:
+            env (Environment): the simulation environment
+            generator (generator): the generator which yields events
+        """
+        if not hasattr(generator, 'throw'):
+            raise ValueError('{} is not a generator.'.format(generator))
+        self.env = env
+        self._callbacks = NO_CALLBACKS
+        self._value = PENDING
+        self._generator = generator
+        # start the process with an urgent event
+        start = _new(Initialize)
+        start.env = env
+        start._callbacks = self
+        start._value = None
+        start._ok = True
+        env._urgent.append(start)
+        self._target = start
+
+    def __repr__(self):
+        return '<Process({}) object at {:#x}>'.format(self.name, id(self))
+
+    @property
+    def target(self):
+        """ Event: the event this process is waiting for. """
+        return self._target
+
+    @property
+    def name(self):
+        """ str: the name of the generator function. """
+        return self._generator.__name__
+
+    @property
+    def is_alive(self):
+        """ bool: True until the generator of this process returns. """
+        return self._value is PENDING
+
+    def interrupt(self, cause=None):
+        """ Interrupts this process (raises an `Interrupt` in it).
+
+        Args:
+            cause (object): the cause of the interrupt
+        """
+        Interruption(self, cause)
+
+    def _resume(self, event):
+        """ Resumes this process with a processed event. """
+        env = self.env
+        env._active_proc = self
+        self._step(event)
+        env._active_proc = None
+
+    def _step(self, event, inline=False):
+        """ Sends the value of a processed event to the generator until it
+        yields an event to wait for (or returns).
+
+        Args:
+            event (Event): the processed event
+            inline (bool): True if this process is the only callback of the
+                event (see `_wait`)
+        """
+        while True:
+            try:
+                if event._ok:
+                    event = self._generator.send(event._value)
+                else:
+                    # throw a copy of the exception (the event keeps its own)
+                    event._defused = True
+                    exception = type(event._value)(*event._value.args)
+                    exception.__cause__ = event._value
+                    event = self._generator.throw(exception)
+            except BaseException as e:
+                self._terminate(e)
+                return
+            if self._wait(event, inline):
+                return
+
+    def _wait(self, event, inline=False):
+        """ Waits for an event yielded by the generator.
+
+        Args:
+            event (Event): the event
+            inline (bool): True if this process is the only callback of the
+                processed event which resumed it, so the yielded event may
+                be processed here if it is next (otherwise the remaining
+                callbacks, e.g. other processes waiting for the same event,
+                run first)
+
+        Returns:
+            bool: True if waiting, False if the event is processed (and its
+                value is sent to the generator)
+        """
+        try:
+            callbacks = event._callbacks
+        except AttributeError:
+            raise RuntimeError('Invalid yield value "{}"'.format(event))
+        if callbacks is None:
+            # already processed
+            return False
+        env = self.env
+        ready = env._ready
+        if inline and ready and ready[0] is event and not env._urgent:
+            # the event is processed next: process it here and continue
+            if callbacks is NO_CALLBACKS:
+                ready.popleft()
+                event._callbacks = None
+                return False
+            if callbacks.__class__ is list and event is not env._until:
+                ready.popleft()
+                event._callbacks = None
+                env._active_proc = None
+                for callback in callbacks:
+                    callback(event)
+                env._active_proc = self
+                return False
+        if callbacks is NO_CALLBACKS:
+            event._callbacks = self
+        elif callbacks.__class__ is list:
+            callbacks.append(self._resume)
+        else:
+            event._callbacks = [callbacks._resume, self._resume]
+        self._target = event
+        return True
+
+    def _terminate(self, exception):
+        """ Triggers this process when its generator returns or raises. """
+        if isinstance(exception, StopIteration):
+            self._ok = True
+            self._value = exception.args[0] if len(exception.args) else None
+        else:
+            self._ok = False
+            self._value = exception
+        self._target = None
+        self.env._ready.append(self)
+
+class ConditionValue(object):
+    """ Defines the values of the events of a processed condition. """
+    def __init__(self):
+        self.events = []
+
+    def __getitem__(self, key):
+        if key not in self.events:
+            raise KeyError(str(key))
+        return key._value
+
+    def __contains__(self, key):
+        return key in self.events
+
+    def __eq__(self, other):
+        if isinstance(other, ConditionValue):
+            return self.events == other.events
+        elif isinstance(other, dict):
+            return self.todict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<ConditionValue {}>'.format(self.todict())
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        return (event for event in self.events)
+
+    def values(self):
+        return (event._value for event in self.events)
+
+    def items(self):
+        return ((event, event._value) for event in self.events)
+
+    def todict(self):
+        return {event: event._value for event in self.events}
+
+class Condition(Event):
+    """ Defines an event which is triggered when a condition of events holds. """
+    __slots__ = ('_evaluate', '_events', '_count')
+
+    def __init__(self, env, evaluate, events):
+        """ Initializes this condition.
+
+        Args:
+            env (Environment): the simulation environment
+            evaluate (function): returns True if the condition holds given
+                the events and the number of processed events
+            events (list): the events
+        """
+        Event.__init__(self, env)
+        self._evaluate = evaluate
+        self._events = tuple(events)
+        self._count = 0
+        if not self._events:
+            self.succeed(ConditionValue())
+            return
+        for event in self._events:
+            if self.env != event.env:
+                raise ValueError('It is not allowed to mix events from different environments')
+        for event in self._events:
+            if event._callbacks is None:
+                self._check(event)
+            else:
+                event.callbacks.append(self._check)
+        self.callbacks.append(self._build_value)
+
+    def _populate_value(self, value):
+        for event in self._events:
+            if isinstance(event, Condition):
+                event._populate_value(value)
+            elif event._callbacks is None:
+                value.events.append(event)
+
+    def _build_value(self, event):
+        self._remove_check_callbacks()
+        if event._ok:
+            self._value = ConditionValue()
+            self._populate_value(self._value)
+
+    def _remove_check_callbacks(self):
+        for event in self._events:
+            callbacks = event._callbacks
+            if callbacks.__class__ is list and self._check in callbacks:
+                callbacks.remove(self._check)
+            if isinstance(event, Condition):
+                event._remove_check_callbacks()
+
+    def _check(self, event):
+        if self._value is not PENDING:
+            return
+        self._count += 1
+        if not event._ok:
+            event._defused = True
+            self.fail(event._value)
+        elif self._evaluate(self._events, self._count):
+            self.succeed()
+
+    @staticmethod
+    def all_events(events, count):
+        return len(events) == count
+
+    @staticmethod
+    def any_events(events, count):
+        return count > 0 or len(events) == 0
+
+class AllOf(Condition):
+    """ Defines a condition which holds when all events are processed. """
+    __slots__ = ()
+
+    def __init__(self, env, events):
+        Condition.__init__(self, env, Condition.all_events, events)
+
+class AnyOf(Condition):
+    """ Defines a condition which holds when any event is processed. """
+    __slots__ = ()
+
+    def __init__(self, env, events):
+        Condition.__init__(self, env, Condition.any_events, events)
+
+class Environment(object):
+    """ Defines a simulation environment which processes events in time order. """
+    def __init__(self, initial_time=0):
+        """ Initializes this environment.
+
+        Args:
+            initial_time (float): the initial simulation time
+        """
+        self._now = initial_time
+        # heap of (time, event ID, event) of future events
+        self._queue = []
+        # urgent and normal events at the current time (in event ID order)
+        self._urgent = collections.deque()
+        self._ready = collections.deque()
+        self._eid = count()
+        # IDs of urgent events in the future (before normal events at the
+        # same time)
+        self._urgent_eid = count(-2**62)
+        self._active_proc = None
+        # event which stops `run` (if any)
+        self._until = None
+
+    @property
+    def now(self):
+        """ float: the current simulation time. """
+        return self._now
+
+    @property
+    def active_process(self):
+        """ Process: the process which is running (None between events). """
+        return self._active_proc
+
+    def process(self, generator):
+        """ Starts a process.
+
+        Args:
+            generator (generator): the generator which yields events
+
+        Returns:
+            Process: the process (an event triggered when it returns)
+        """
+        return Process(self, generator)
+
+    def timeout(self, delay=0, value=None):
+        """ Creates a timeout event.
+
+        Args:
+            delay (float): the delay
+            value (object): the value of the event
+
+        Returns:
+            Timeout: the event
+        """
+        if delay < 0:
+            raise ValueError('Negative delay {}'.format(delay))
+        event = _new(Timeout)
+        event.env = self
+        event._callbacks = NO_CALLBACKS
+        event._value = value
+        event._ok = True
+        now = self._now
+        at = now + delay
+        if at == now:
+            self._ready.append(event)
+        else:
+            heappush(self._queue, (at, next(self._eid), event))
+        return event
+
+    def event(self):
+        """ Creates an event to be triggered by the model.
+
+        Returns:
+            Event: the event
+        """
+        return Event(self)
+
+    def all_of(self, events):
+        """ Creates a condition which holds when all events are processed. """
+        return AllOf(self, events)
+
+    def any_of(self, events):
+        """ Creates a condition which holds when any event is processed. """
+        return AnyOf(self, events)
+
+    def schedule(self, event, priority=NORMAL, delay=0):
+        """ Schedules a triggered event.
+
+        Args:
+            event (Event): the event
+            priority (int): the priority among events at the same time
+            delay (float): the delay
+        """
+        at = self._now + delay
+        if at == self._now:
+            (self._urgent if priority == URGENT else self._ready).append(event)
+        elif priority == URGENT:
+            heappush(self._queue, (at, next(self._urgent_eid), event))
+        else:
+            heappush(self._queue, (at, next(self._eid), event))
+
+    def peek(self):
+        """ Gets the time of the next event (infinity if there is none). """
+        if self._urgent or self._ready:
+            return self._now
+        return self._queue[0][0] if self._queue else Infinity
+
+    def _drain(self, at):
+        """ Moves the other events at the current time from the heap to the
+        queues of the current time (after the first, which is processed). """
+        queue = self._queue
+        while queue and queue[0][0] == at:
+            eid, event = heappop(queue)[1:]
+            (self._urgent if eid < 0 else self._ready).append(event)
+
+    def step(self):
+        """ Processes the next event. """
+        if self._urgent:
+            event = self._urgent.popleft()
+        elif self._ready:
+            event = self._ready.popleft()
+        elif self._queue:
+            self._now, eid, event = heappop(self._queue)
+            self._drain(self._now)
+        else:
+            raise EmptySchedule()
+        _process(event)
+
+    def run(self, until=None):
+        """ Processes events until a time or an event.
+
+        Args:
+            until (float or Event): the time to stop (events at that time are
+                not processed), the event to stop after, or None to stop when
+                there are no further events
+
+        Returns:
+            object: the value of the `until` event
+        """
+        stop = Infinity
+        if until is not None:
+            if isinstance(until, Event):
+                if until._callbacks is None:
+                    return until._value
+                until.callbacks.append(StopSimulation.callback)
+                self._until = until
+            else:
+                at = until if isinstance(until, int) else float(until)
+                if at <= self._now:
+                    raise ValueError('until ({}) must be greater than the current '
+                                     'simulation time'.format(at))
+                # the stop time of simpy (an urgent event after the delay)
+                stop = self._now + (at - self._now)
+        urgent = self._urgent
+        ready = self._ready
+        queue = self._queue
+        try:
+            while True:
+                if urgent:
+                    event = urgent.popleft()
+                elif ready:
+                    event = ready.popleft()
+                elif queue:
+                    at = queue[0][0]
+                    if at >= stop:
+                        break
+                    event = heappop(queue)[2]
+                    self._now = at
+                    if queue and queue[0][0] == at:
+                        self._drain(at)
+                else:
+                    break
+                callbacks = event._callbacks
+                event._callbacks = None
+                if callbacks is NO_CALLBACKS:
+                    pass
+                elif callbacks.__class__ is list:
+                    for callback in callbacks:
+                        callback(event)
+                elif event._ok:
+                    # resume the waiting process (`Process._resume` inline)
+                    self._active_proc = callbacks
+                    try:
+                        target = callbacks._generator.send(event._value)
+                    except BaseException as e:
+                        callbacks._terminate(e)
+                    else:
+                        try:
+                            waiting = target._callbacks
+                        except AttributeError:
+                            waiting = None
+                        if waiting is NO_CALLBACKS and (not ready or ready[0] is not target):
+                            target._callbacks = callbacks
+                            callbacks._target = target
+                        elif not callbacks._wait(target, True):
+                            callbacks._step(target, True)
+                    self._active_proc = None
+                    continue
+                else:
+                    callbacks._resume(event)
+                if not event._ok and not hasattr(event, '_defused'):
+                    _raise(event)
+        except StopSimulation as e:
+            return e.args[0]
+        finally:
+            self._until = None
+        if stop < Infinity:
+            self._now = stop
+        elif until is not None:
+            raise RuntimeError('No scheduled events left but "until" event was not '
+                               'triggered: {}'.format(until))
+        return None
+
+# creates an object without calling its initializer
+_new = object.__new__
+
+def _process(event):
+    """ Processes an event (calls its callbacks). """
+    callbacks = event._callbacks
+    event._callbacks = None
+    if callbacks is NO_CALLBACKS:
+        pass
+    elif callbacks.__class__ is list:
+        for callback in callbacks:
+            callback(event)
+    else:
+        callbacks._resume(event)
+    if not event._ok and not hasattr(event, '_defused'):
+        _raise(event)
+
+def _raise(event):
+    """ Raises a copy of the exception of a failed event which was not handled. """
+    exception = type(event._value)(*event._value.args)
+    exception.__cause__ = event._value
+    raise exception
+
+class Request(Event):
+    """ Defines a request for a resource (released on leaving a `with` block). """
+    __slots__ = ('resource', 'proc', 'usage_since')
+
+    def __init__(self, resource):
+        """ Initializes this request and grants it if a unit is available.
+
+        Args:
+            resource (Resource): the resource
+        """
+        env = resource._env
+        self.env = env
+        self._callbacks = NO_CALLBACKS
+        self.resource = resource
+        self.proc = env._active_proc
+        self.usage_since = None
+        users = resource.users
+        queue = resource.queue
+        if not queue and len(users) < resource._capacity:
+            # uncontested: granted at once
+            users.append(self)
+            self.usage_since = env._now
+            self._ok = True
+            self._value = None
+            env._ready.append(self)
+        else:
+            self._value = PENDING
+            queue.append(self)
+            if len(users) < resource._capacity:
+                # a unit was released but its release is not yet processed
+                resource._grant()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cancel()
+        if exc_type is not GeneratorExit:
+            self.resource._release(self)
+
+    def cancel(self):
+        """ Removes this request from the queue if it is not yet granted. """
+        if self._value is PENDING:
+            self.resource.queue.remove(self)
+
+class Release(Event):
+    """ Defines the release of a resource (grants the next request when processed). """
+    __slots__ = ('resource', 'proc', 'request')
+
+    def __init__(self, resource, request):
+        """ Initializes and triggers this release.
+
+        Args:
+            resource (Resource): the resource
+            request (Request): the released request
+        """
+        env = resource._env
+        self.env = env
+        self._callbacks = [resource._trigger_put]
+        self.resource = resource
+        self.proc = env._active_proc
+        self.request = request
+        try:
+            resource.users.remove(request)
+        except ValueError:
+            pass
+        self._ok = True
+        self._value = None
+        env._ready.append(self)
+
+class Resource(object):
+    """ Defines a resource with a number of units shared by requests in FIFO order. """
+    def __init__(self, env, capacity=1):
+        """ Initializes this resource.
+
+        Args:
+            env (Environment): the simulation environment
+            capacity (int): the number of units
+        """
+        if capacity <= 0:
+            raise ValueError('"capacity" must be > 0.')
+        self._env = env
+        self._capacity = capacity
+        self.users = []
+        self.queue = self.put_queue = collections.deque()
+        self.get_queue = []
+
+    @property
+    def capacity(self):
+        """ int: the number of units. """
+        return self._capacity
+
+    @property
+    def count(self):
+        """ int: the number of granted requests. """
+        return len(self.users)
+
+    def request(self):
+        """ Requests a unit of this resource.
+
+        Returns:
+            Request: the request (an event triggered when granted)
+        """
+        return Request(self)
+
+    def release(self, request):
+        """ Releases a granted request.
+
+        Args:
+            request (Request): the request
+
+        Returns:
+            Release: the release (an event)
+        """
+        return Release(self, request)
+
+    def _release(self, request):
+        """ Releases a request on leaving its `with` block. """
+        if self.queue:
+            Release(self, request)
+        else:
+            # the release would not grant a request when processed
+            try:
+                self.users.remove(request)
+            except ValueError:
+                pass
+
+    def _grant(self):
+        """ Grants the first waiting request. """
+        request = self.queue.popleft()
+        self.users.append(request)
+        request.usage_since = self._env._now
+        request._ok = True
+        request._value = None
+        self._env._ready.append(request)
+
+    def _trigger_put(self, event):
+        """ Grants the first waiting request if a unit is available. """
+        if self.queue and len(self.users) < self._capacity:
+            self._grant()
+
+class ContainerEvent(Event):
+    """ Defines a put or get of an amount of a container. """
+    __slots__ = ('resource', 'proc', 'amount')
+
+    def __init__(self, container, amount, callback):
+        if amount <= 0:
+            raise ValueError('amount(={}) must be > 0.'.format(amount))
+        env = container._env
+        self.env = env
+        # trigger waiting events of the other queue when processed
+        self._callbacks = [callback]
+        self.resource = container
+        self.proc = env._active_proc
+        self.amount = amount
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cancel()
+
+    def _succeed(self):
+        self._ok = True
+        self._value = None
+        self.env._ready.append(self)
+
+class ContainerPut(ContainerEvent):
+    """ Defines a put of an amount into a container. """
+    __slots__ = ()
+
+    def __init__(self, container, amount):
+        """ Initializes this put and triggers it if the amount fits.
+
+        Args:
+            container (Container): the container
+            amount (float): the amount
+        """
+        ContainerEvent.__init__(self, container, amount, container._trigger_get)
+        if not container.put_queue and container._capacity - container._level >= amount:
+            # uncontested: triggered at once
+            container._level += amount
+            self._succeed()
+        else:
+            self._value = PENDING
+            container.put_queue.append(self)
+            container._trigger_put(None)
+
+    def cancel(self):
+        """ Removes this put from the queue if it is not yet triggered. """
+        if self._value is PENDING:
+            self.resource.put_queue.remove(self)
+
+class ContainerGet(ContainerEvent):
+    """ Defines a get of an amount from a container. """
+    __slots__ = ()
+
+    def __init__(self, container, amount):
+        """ Initializes this get and triggers it if the amount is available.
+
+        Args:
+            container (Container): the container
+            amount (float): the amount
+        """
+        ContainerEvent.__init__(self, container, amount, container._trigger_put)
+        if not container.get_queue and container._level >= amount:
+            # uncontested: triggered at once
+            container._level -= amount
+            self._succeed()
+        else:
+            self._value = PENDING
+            container.get_queue.append(self)
+            container._trigger_get(None)
+
+    def cancel(self):
+        """ Removes this get from the queue if it is not yet triggered. """
+        if self._value is PENDING:
+            self.resource.get_queue.remove(self)
+
+class Container(object):
+    """ Defines a container of a continuous or discrete amount. """
+    def __init__(self, env, capacity=Infinity, init=0):
+        """ Initializes this container.
+
+        Args:
+            env (Environment): the simulation environment
+            capacity (float): the largest amount
+            init (float): the initial amount
+        """
+        if capacity <= 0:
+            raise ValueError('"capacity" must be > 0.')
+        if init < 0:
+            raise ValueError('"init" must be >= 0.')
+        if init > capacity:
+            raise ValueError('"init" must be <= "capacity".')
+        self._env = env
+        self._capacity = capacity
+        self._level = init
+        self.put_queue = collections.deque()
+        self.get_queue = collections.deque()
+
+    @property
+    def capacity(self):
+        """ float: the largest amount. """
+        return self._capacity
+
+    @property
+    def level(self):
+        """ float: the current amount. """
+        return self._level
+
+    def put(self, amount):
+        """ Puts an amount into this container.
+
+        Returns:
+            ContainerPut: the put (an event triggered when the amount fits)
+        """
+        return ContainerPut(self, amount)
+
+    def get(self, amount):
+        """ Gets an amount from this container.
+
+        Returns:
+            ContainerGet: the get (an event triggered when the amount is available)
+        """
+        return ContainerGet(self, amount)
+
+    def _trigger_put(self, event):
+        """ Triggers waiting puts in FIFO order while they fit. """
+        queue = self.put_queue
+        while queue and self._capacity - self._level >= queue[0].amount:
+            put = queue.popleft()
+            self._level += put.amount
+            put._succeed()
+
+    def _trigger_get(self, event):
+        """ Triggers waiting gets in FIFO order while they are available. """
+        queue = self.get_queue
+        while queue and self._level >= queue[0].amount:
+            get = queue.popleft()
+            self._level -= get.amount
+            get._succeed()
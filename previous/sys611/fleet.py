@@ -0,0 +1,150 @@
+"""
+SYS-611: Single-calendar scheduler of machine fleet breakdowns for SimPy.
+
+The factory model in week 12 runs one `operate_machine` process per machine
+(sleeping on its own timeout until the machine breaks) and one
+`repair_machine` process per breakdown, so plants with 10^4 to 10^5 machines
+need as many generators and scheduled timeouts. A `Fleet` instead keeps the
+next failure times of all machines in one calendar (a heap stored in a list)
+and runs a single SimPy process which sleeps until the earliest failure and
+dispatches the breakdown:
+ * a repairer is requested from the repairers `Resource`; when granted, the
+   repair time elapses and the machine is put in the spares `Container`.
+ * a spare is requested from the spares `Container`; when granted, the
+   machine is replaced and its next failure time enters the calendar.
+Requests are handled by event callbacks rather than processes. Failure and
+repair times are drawn in blocks from process generators (see
+`sys611.generators`), and the number of failures and downtime of each
+machine are accounted in arrays. Callbacks (`on_break`, `on_replace`, and
+`on_repair`) let models account costs or trace events as the process version
+does.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import functools
+from heapq import heapify, heappop, heappush
+
+# import the simpy package
+# see https://simpy.readthedocs.io/en/latest/api_reference for documentation
+import simpy
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+from sys611.generators import BLOCK_SIZE
+
+class Fleet(object):
+    """ Defines a fleet of machines with one calendar of failure times. """
+    def __init__(self, env, num_machines, lifetime, repair_time, repairers, spares,
+                 rng=None, block_size=BLOCK_SIZE, on_break=None, on_replace=None,
+                 on_repair=None):
+        """ Initializes this fleet (all machines start new).
+
+        Args:
+            env (simpy.Environment): the simulation environment
+            num_machines (int): the number of machines
+            lifetime (InverseTransform): the generator of times to failure
+            repair_time (InverseTransform): the generator of repair times
+            repairers (simpy.Resource): the repairers resource
+            spares (simpy.Container): the spares container
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+            block_size (int): the maximum number of times drawn at once
+            on_break (function): called with a machine when it breaks
+            on_replace (function): called with a machine and the time it
+                broke when it is replaced
+            on_repair (function): called when a repaired machine is put in the
+                spares container
+        """
+        self.env = env
+        self.num_machines = num_machines
+        self.repairers = repairers
+        self.spares = spares
+        self.on_break = on_break
+        self.on_replace = on_replace
+        self.on_repair = on_repair
+        self._lifetimes = lifetime.stream(rng, block_size)
+        self._repair_times = repair_time.stream(rng, block_size)
+        # number of failures, total downtime, and time of the current
+        # breakdown (NaN if operating) of each machine
+        self.failures = np.zeros(num_machines, dtype=int)
+        self.downtime = np.zeros(num_machines)
+        self.broken_since = np.full(num_machines, np.nan)
+        # calendar of (failure time, machine) of operating machines
+        self._calendar = list(zip((env.now + lifetime.sample(num_machines, rng)).tolist(),
+                                  range(num_machines)))
+        heapify(self._calendar)
+        # time of the next wake-up of the fleet process
+        self._alarm = np.inf
+        self.process = None
+
+    @property
+    def num_operating(self):
+        """ int: the number of operating machines. """
+        return len(self._calendar)
+
+    def run(self):
+        """ Process to dispatch breakdowns at the failure times of the machines. """
+        env = self.env
+        calendar = self._calendar
+        self.process = env.active_process
+        while True:
+            # wait until the next failure (or until woken by a replacement)
+            self._alarm = calendar[0][0] if calendar else np.inf
+            try:
+                yield env.timeout(self._alarm - env.now) if calendar else env.event()
+            except simpy.Interrupt:
+                continue
+            # dispatch all failures due now
+            while calendar and calendar[0][0] <= env.now:
+                self._break(heappop(calendar)[1])
+
+    def _break(self, machine):
+        """ Dispatches the breakdown of a machine.
+
+        Args:
+            machine (int): the machine index
+        """
+        self.failures[machine] += 1
+        self.broken_since[machine] = self.env.now
+        if self.on_break is not None:
+            self.on_break(machine)
+        # request a repairer (the machine is repaired into the spares pool)
+        self.repairers.request().callbacks.append(self._start_repair)
+        # request a spare to replace the machine
+        self.spares.get(1).callbacks.append(functools.partial(self._replace, machine))
+
+    def _start_repair(self, request):
+        """ Starts a repair when a repairer is granted. """
+        self.env.timeout(next(self._repair_times)).callbacks.append(
+                functools.partial(self._finish_repair, request))
+
+    def _finish_repair(self, request, event):
+        """ Puts a repaired machine in the spares container. """
+        self.spares.put(1).callbacks.append(functools.partial(self._release, request))
+
+    def _release(self, request, event):
+        """ Releases the repairer after the repaired machine is put away. """
+        if self.on_repair is not None:
+            self.on_repair()
+        self.repairers.release(request)
+
+    def _replace(self, machine, event):
+        """ Replaces a machine with a spare and schedules its next failure. """
+        now = self.env.now
+        time_broken = float(self.broken_since[machine])
+        self.downtime[machine] += now - time_broken
+        self.broken_since[machine] = np.nan
+        if self.on_replace is not None:
+            self.on_replace(machine, time_broken)
+        time = now + next(self._lifetimes)
+        heappush(self._calendar, (time, machine))
+        if time < self._alarm and self.process is not None:
+            # wake the fleet process to sleep until the earlier failure
+            self._alarm = time
+            self.process.interrupt()
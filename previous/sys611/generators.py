@@ -0,0 +1,256 @@
+"""
+SYS-611: Vectorized inverse transform process generators.
+
+The inverse transform method generates a random variate x = F^-1(r) from a
+uniform random number r using the inverse of the cumulative distribution
+function (CDF), also known as the percent point function (ppf). The samplers
+in this module evaluate the inverse CDF for whole arrays of random numbers at
+once, so many variates cost about the same as one Python function call:
+
+    arrivals = Exponential(1/1.5)
+    x = arrivals.sample(1000)         # bulk draws (a numpy array)
+    stream = arrivals.stream()        # streaming draws (one at a time)
+    t_A = next(stream)
+
+Streams draw random numbers in blocks and return one variate per call, which
+suits event-based models that need one variate at a time. Samplers for an
+expensive ppf (e.g. from `scipy.stats`) can be tabulated once and evaluated
+by linear interpolation (see `InverseTransform.tabulate`).
+
+Random numbers are drawn from a `numpy.random.Generator` or `RandomState` if
+given, otherwise from the global numpy state (set by `np.random.seed`).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# maximum number of random numbers drawn at once by streams
+BLOCK_SIZE = 2**12
+
+class InverseTransform(object):
+    """ Defines a process generator using the inverse transform method. """
+    def __init__(self, ppf):
+        """ Initializes this process generator.
+
+        Args:
+            ppf (function): the inverse CDF (vectorized over numpy arrays)
+        """
+        self._ppf = ppf
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF.
+
+        Args:
+            r (numpy.ndarray): the uniform random numbers in [0, 1)
+
+        Returns:
+            numpy.ndarray: the variates
+        """
+        return self._ppf(r)
+
+    def sample(self, size=None, rng=None):
+        """ Generates variates.
+
+        Args:
+            size (int or tuple): the number (or array shape) of variates (None
+                for a single variate)
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+
+        Returns:
+            numpy.ndarray: the variates (a float if size is None)
+        """
+        r = (np.random if rng is None else rng).random(size)
+        if size is None:
+            return float(self.ppf(np.array([r]))[0])
+        return self.ppf(r)
+
+    def stream(self, rng=None, block_size=BLOCK_SIZE):
+        """ Creates an iterator which generates one variate at a time.
+
+        Random numbers are drawn in blocks (starting small and doubling up to
+        the block size) when the first variate of a block is requested.
+
+        Args:
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+            block_size (int): the maximum number of variates per block
+
+        Returns:
+            generator: the variates (floats)
+        """
+        size = min(64, block_size)
+        while True:
+            for value in self.sample(size, rng).tolist():
+                yield value
+            size = min(2*size, block_size)
+
+    def tabulate(self, num_points=2**14, tail=2**-8):
+        """ Creates a process generator which interpolates a table of the ppf.
+
+        Args:
+            num_points (int): the number of table intervals between 0 and 1
+            tail (float): the probability in each tail which uses the exact
+                ppf (where the ppf has high curvature or is infinite)
+
+        Returns:
+            Tabulated: the tabulated process generator
+        """
+        return Tabulated(self.ppf, num_points, tail)
+
+class Tabulated(InverseTransform):
+    """ Defines a process generator which interpolates a table of the ppf. """
+    def __init__(self, ppf, num_points=2**14, tail=2**-8):
+        """ Initializes this process generator.
+
+        The ppf is evaluated once at equally-spaced points between 0 and 1,
+        so each variate needs only a table lookup and a linear interpolation
+        (no search). Random numbers in the tails, and in any table interval
+        with a non-finite endpoint (e.g. an infinite ppf at 0 or 1), use the
+        exact ppf.
+
+        Args:
+            ppf (function): the inverse CDF (vectorized over numpy arrays)
+            num_points (int): the number of table intervals between 0 and 1
+            tail (float): the probability in each tail which uses the exact ppf
+                (widened to at least one table interval)
+        """
+        InverseTransform.__init__(self, ppf)
+        self.num_points = num_points
+        self.tail = max(tail, 1/num_points)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.table = np.asarray(ppf(np.linspace(0, 1, num_points + 1)), dtype=float)
+        # intervals which cannot be interpolated (a non-finite endpoint)
+        finite = np.isfinite(self.table)
+        self._exact = ~(finite[:-1] & finite[1:])
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF by linear interpolation of the table.
+
+        Args:
+            r (numpy.ndarray): the uniform random numbers in [0, 1)
+
+        Returns:
+            numpy.ndarray: the variates
+        """
+        r = np.asarray(r, dtype=float)
+        position = r*self.num_points
+        index = np.minimum(position.astype(np.intp), self.num_points - 1)
+        lower = self.table[index]
+        with np.errstate(invalid='ignore'):
+            x = lower + (position - index)*(self.table[index + 1] - lower)
+        tails = (r < self.tail) | (r > 1 - self.tail) | self._exact[index]
+        if np.any(tails):
+            x[tails] = self._ppf(r[tails])
+        return x
+
+class Uniform(InverseTransform):
+    """ Defines a uniform process generator. """
+    def __init__(self, low, high):
+        """ Initializes this process generator.
+
+        Args:
+            low (float): the lower bound
+            high (float): the upper bound
+        """
+        InverseTransform.__init__(self, None)
+        self.low = low
+        self.high = high
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF x = low + r*(high - low). """
+        return self.low + np.asarray(r)*(self.high - self.low)
+
+class Exponential(InverseTransform):
+    """ Defines an exponential process generator. """
+    def __init__(self, rate):
+        """ Initializes this process generator.
+
+        Args:
+            rate (float): the rate parameter (lambda, the inverse of the mean)
+        """
+        InverseTransform.__init__(self, None)
+        self.rate = rate
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF x = -ln(1-r)/lambda. """
+        return -np.log1p(-np.asarray(r))/self.rate
+
+class Weibull(InverseTransform):
+    """ Defines a Weibull process generator. """
+    def __init__(self, shape, scale=1.0):
+        """ Initializes this process generator.
+
+        Args:
+            shape (float): the shape parameter (k)
+            scale (float): the scale parameter (lambda)
+        """
+        InverseTransform.__init__(self, None)
+        self.shape = shape
+        self.scale = scale
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF x = lambda*(-ln(1-r))^(1/k). """
+        return self.scale*(-np.log1p(-np.asarray(r)))**(1/self.shape)
+
+class Triangular(InverseTransform):
+    """ Defines a triangular process generator. """
+    def __init__(self, low, mode, high):
+        """ Initializes this process generator.
+
+        Args:
+            low (float): the lower bound
+            mode (float): the mode (most likely value)
+            high (float): the upper bound
+        """
+        if not low <= mode <= high or low == high:
+            raise ValueError('triangular bounds must satisfy low <= mode <= high')
+        InverseTransform.__init__(self, None)
+        self.low = low
+        self.mode = mode
+        self.high = high
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF (one square root branch each side of the mode). """
+        r = np.asarray(r)
+        width = self.high - self.low
+        split = (self.mode - self.low)/width
+        return np.where(r < split,
+                        self.low + np.sqrt(r*width*(self.mode - self.low)),
+                        self.high - np.sqrt((1 - r)*width*(self.high - self.mode)))
+
+class Empirical(InverseTransform):
+    """ Defines an empirical continuous process generator (piecewise-linear CDF). """
+    def __init__(self, values, cdf=None):
+        """ Initializes this process generator.
+
+        Args:
+            values (numpy.ndarray): the observed values (or the breakpoints of
+                the CDF if cdf is given)
+            cdf (numpy.ndarray): the CDF at each breakpoint from 0 to 1 (None
+                for observed values with CDF (i-1)/(n-1) at the i-th smallest)
+        """
+        InverseTransform.__init__(self, None)
+        values = np.asarray(values, dtype=float)
+        if cdf is None:
+            self.values = np.sort(values)
+            self.cdf = np.linspace(0, 1, len(values))
+        else:
+            self.values = values
+            self.cdf = np.asarray(cdf, dtype=float)
+            if (self.cdf.shape != self.values.shape or self.cdf[0] != 0
+                    or self.cdf[-1] != 1 or np.any(np.diff(self.cdf) < 0)
+                    or np.any(np.diff(self.values) < 0)):
+                raise ValueError('cdf must increase from 0 to 1 at increasing values')
+        if len(self.values) < 2:
+            raise ValueError('at least two values are required')
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF by linear interpolation between breakpoints. """
+        return np.interp(r, self.cdf, self.values)
@@ -0,0 +1,163 @@
+"""
+SYS-611: Vectorized inventory simulation of many products (SKUs).
+
+The inventory models of week 9 (`inventoryModel.py`) and week 12
+(`InventoryModel.py`) simulate one product with one event per customer, so a
+warehouse of 10^4 products (SKUs) needs 10^4 runs. `SkuInventory` instead
+advances the inventory of all SKUs in lockstep over time buckets (e.g. 0.02
+day), with numpy arrays of one element per SKU:
+ * deliveries due in the bucket are added to the inventory from a pipeline
+   of orders (a ring buffer with a row per bucket of the delivery delay).
+ * the demand in the bucket is compound Poisson: a Poisson number of
+   customers, each demanding a uniform number of items. Customers are served
+   in order, so the items sold are the smaller of the demand and the
+   inventory (each customer buys what remains).
+ * at the end of the bucket, an SKU with customers in the bucket, an
+   inventory below its order trigger, and nothing on order orders up to its
+   order target (the policy of the week 9 model, which reviews the inventory
+   after each customer); the order arrives after the delivery delay (rounded
+   to buckets).
+Holding costs accrue on the average of the inventory at the start (after
+deliveries) and end of each bucket. Compared to the event models, orders are
+placed at the end of a bucket rather than after the customer who triggered
+them, so smaller buckets are more accurate (see
+`benchmarks/skuInventoryBenchmark.py`).
+
+Each SKU has its own parameters (arrays, or scalars shared by all SKUs), so
+the SKUs of a warehouse (or replications of one product) run together:
+
+    skus = SkuInventory(arrival_rate=rates, demand_lb=1, demand_ub=4,
+                        order_trigger=15, order_target=20, delivery_delay=2)
+    results = skus.run(365, rng=np.random.default_rng(0))
+    print(results['profit'].sum(), results['fill_rate'].mean())
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+class SkuInventory(object):
+    """ Defines the inventory of many products (SKUs) simulated in lockstep. """
+    def __init__(self, arrival_rate, demand_lb, demand_ub, order_trigger, order_target,
+                 delivery_delay, product_price=100.00, product_cost=50.00, holding_cost=2.00):
+        """ Initializes these SKUs (parameters are arrays with one element per
+        SKU, or scalars for all SKUs).
+
+        Args:
+            arrival_rate (numpy.ndarray): the customer arrival rates
+                (customers/day)
+            demand_lb (numpy.ndarray): the least items per customer
+            demand_ub (numpy.ndarray): the most items per customer
+            order_trigger (numpy.ndarray): the inventory levels which trigger
+                an order (items)
+            order_target (numpy.ndarray): the inventory levels to order up to
+                (and the initial inventory, items)
+            delivery_delay (numpy.ndarray): the delivery delays (days)
+            product_price (numpy.ndarray): the prices (dollars/item)
+            product_cost (numpy.ndarray): the costs (dollars/item ordered)
+            holding_cost (numpy.ndarray): the holding costs (dollars/item/day)
+        """
+        (self.arrival_rate, self.demand_lb, self.demand_ub, self.order_trigger,
+         self.order_target, self.delivery_delay, self.product_price, self.product_cost,
+         self.holding_cost) = np.broadcast_arrays(
+                *(np.atleast_1d(np.asarray(value, dtype=float)) for value in (
+                        arrival_rate, demand_lb, demand_ub, order_trigger, order_target,
+                        delivery_delay, product_price, product_cost, holding_cost)))
+        if self.arrival_rate.ndim != 1:
+            raise ValueError('parameters must be scalars or one-dimensional arrays')
+
+    @property
+    def num_skus(self):
+        """ int: the number of SKUs. """
+        return len(self.arrival_rate)
+
+    def demand(self, bucket, rng=None):
+        """ Generates the compound Poisson demand of all SKUs in a bucket.
+
+        Args:
+            bucket (float): the bucket duration (days)
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+
+        Returns:
+            numpy.ndarray: the number of customers of each SKU
+            numpy.ndarray: the items demanded of each SKU
+        """
+        rng = np.random if rng is None else rng
+        counts = rng.poisson(self.arrival_rate*bucket)
+        # draw the demand of each customer (grouped by SKU)
+        sku = np.repeat(np.arange(self.num_skus), counts)
+        low = self.demand_lb[sku]
+        items = low + np.floor(rng.random(len(sku))*(self.demand_ub[sku] - low + 1))
+        return counts, np.bincount(sku, weights=items, minlength=self.num_skus)
+
+    def run(self, duration, bucket=0.02, rng=None):
+        """ Simulates these SKUs.
+
+        Args:
+            duration (float): the simulation duration (days)
+            bucket (float): the bucket duration (days)
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+
+        Returns:
+            dict: the outputs of each SKU (arrays): revenue, order costs,
+                holding costs, profit, items demanded, items sold, fill rate
+                (fraction of items demanded which were sold), number of
+                orders, and final inventory
+        """
+        num_skus = self.num_skus
+        # delivery delays in buckets and the pipeline of items due in each
+        # bucket (a ring buffer of rows)
+        lag = np.rint(self.delivery_delay/bucket).astype(int)
+        pipeline = np.zeros((lag.max() + 1, num_skus))
+        # state variables
+        inventory = self.order_target.copy()
+        on_order = np.zeros(num_skus)
+        # accumulated outputs (items and item-days)
+        demanded = np.zeros(num_skus)
+        sold = np.zeros(num_skus)
+        ordered = np.zeros(num_skus)
+        num_orders = np.zeros(num_skus, dtype=int)
+        item_days = np.zeros(num_skus)
+
+        for k in range(int(np.ceil(duration/bucket))):
+            # receive the deliveries due in this bucket
+            row = k % len(pipeline)
+            inventory += pipeline[row]
+            on_order -= pipeline[row]
+            pipeline[row] = 0
+            start = inventory.copy()
+            # serve the demand (customers buy what remains)
+            customers, demand = self.demand(bucket, rng)
+            sales = np.minimum(demand, inventory)
+            inventory -= sales
+            demanded += demand
+            sold += sales
+            item_days += 0.5*(start + inventory)*bucket
+            # order up to the target if below the trigger with nothing on order
+            # (reviewed after customers, as in the event models)
+            order = np.flatnonzero((inventory < self.order_trigger) & (on_order == 0)
+                                   & (customers > 0))
+            if len(order) > 0:
+                quantity = self.order_target[order] - inventory[order]
+                # deliver at the start of the bucket after the delay
+                pipeline[(k + 1 + lag[order]) % len(pipeline), order] += quantity
+                on_order[order] += quantity
+                ordered[order] += quantity
+                num_orders[order] += 1
+
+        revenue = self.product_price*sold
+        cost_orders = self.product_cost*ordered
+        cost_holding = self.holding_cost*item_days
+        with np.errstate(invalid='ignore'):
+            fill_rate = np.where(demanded > 0, sold/demanded, 1.0)
+        return {'revenue': revenue, 'cost_orders': cost_orders, 'cost_holding': cost_holding,
+                'profit': revenue - cost_orders - cost_holding, 'demanded': demanded,
+                'sold': sold, 'fill_rate': fill_rate, 'num_orders': num_orders,
+                'inventory': inventory}
@@ -0,0 +1,228 @@
+"""
+SYS-611: Vectorized jump chain of the M/M/1 and M/M/1/K queues.
+
+The queuing Markov model of week 8 (`queuingMarkovModel.py`) generates the
+jump chain of the M/M/1 queue one event at a time: each event draws an
+inter-arrival and a service duration, and the event is an arrival if the
+queue is empty or the arrival is first, otherwise a service. Without the
+boundary, the number of customers q is a random walk with steps x = +1 (the
+arrival is first) or -1, and the boundary only changes the step at q = 0 to
++1 (and at q = K to -1 with a capacity K). Since each step changes the parity
+of q, the boundary is a clamp to the nearest level of the right parity,
+
+    q(n+1) = min(max(q(n) + x(n), lo(n+1)), hi(n+1))
+
+with lo(n) = (q(0) + n) mod 2 and hi(n) the largest level up to K with the
+parity of lo(n). Without a capacity, this is a reflected random walk with the
+closed form q(n) = S(n) + max(q(0), max_{k<=n} (lo(k) - S(k))) for the
+cumulative sums S of the steps, computed with a cumulative sum and a running
+maximum. With a capacity, the clamps are composed (a composition of clamps
+is a clamp) by a blocked prefix scan. The event durations are the winning
+(arrival or service) durations, so the event times are cumulative sums.
+
+The random numbers are drawn in the same order and transformed by the same
+inverse CDF as the loop, so a seeded trajectory is identical to the loop
+version. Long trajectories (e.g. 10^9 events) are generated in chunks of
+events (see `iter_jump_chain`) and summarized without storing them (see
+`jump_chain_summary`, and `benchmarks/jumpChainBenchmark.py`).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# default number of events generated at once
+CHUNK_SIZE = 2**16
+# number of steps composed per block by the scan with a capacity
+SCAN_BLOCK = 32
+
+def _compose(shift, low, high, length):
+    """ Composes clamp maps in place with a prefix scan along the last axis.
+
+    The map q -> min(max(q + shift, low), high) followed by the map with
+    (shift2, low2, high2) is the map with shift + shift2, and the bounds
+    low + shift2 and high + shift2 clamped to [low2, high2].
+
+    Args:
+        shift (numpy.ndarray): the shifts of the maps
+        low (numpy.ndarray): the lower bounds of the maps
+        high (numpy.ndarray): the upper bounds of the maps
+        length (int): the length of the last axis
+    """
+    d = 1
+    while d < length:
+        later = shift[..., d:]
+        low_d, high_d = low[..., d:], high[..., d:]
+        new_low = np.minimum(np.maximum(low[..., :-d] + later, low_d), high_d)
+        new_high = np.minimum(np.maximum(high[..., :-d] + later, low_d), high_d)
+        shift[..., d:] = shift[..., :-d] + later
+        low[..., d:] = new_low
+        high[..., d:] = new_high
+        d *= 2
+
+def reflect(steps, initial=0, capacity=None):
+    """ Computes the number of customers of the jump chain from its steps.
+
+    Args:
+        steps (numpy.ndarray): the steps without the boundary (+1 if the
+            arrival is first, otherwise -1)
+        initial (int): the initial number of customers
+        capacity (int): the most customers (K, None for no limit)
+
+    Returns:
+        numpy.ndarray: the number of customers before each step and after
+            the last step (one more value than steps)
+    """
+    n = len(steps)
+    if capacity is not None and not 0 <= initial <= capacity:
+        raise ValueError('the initial customers must be between 0 and the capacity')
+    if capacity is not None and capacity < 1:
+        raise ValueError('the capacity must be at least one')
+    k = np.arange(n + 1)
+    low = (initial + k) & 1
+    if capacity is None:
+        # reflected random walk: S(n) + max(q(0), max_k (lo(k) - S(k)))
+        walk = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(steps, out=walk[1:])
+        floor = low - walk
+        floor[0] = initial
+        np.maximum.accumulate(floor, out=floor)
+        return walk + floor
+    high = capacity - ((capacity - initial - k) & 1)
+    # clamp maps of each step in blocks (padded with steps which keep q),
+    # with 32-bit levels (the shifts are at most the number of steps)
+    num_blocks = -(-n//SCAN_BLOCK)
+    size = num_blocks*SCAN_BLOCK
+    shift = np.zeros(size, dtype=np.int32)
+    shift[:n] = steps
+    low = np.append(low[1:], np.full(size - n, -1)).astype(np.int32)
+    high = np.append(high[1:], np.full(size - n, capacity + 1)).astype(np.int32)
+    shift, low, high = (a.reshape(num_blocks, SCAN_BLOCK) for a in (shift, low, high))
+    # compose the maps within each block, then the maps of the blocks
+    _compose(shift, low, high, SCAN_BLOCK)
+    block_shift, block_low, block_high = shift[:, -1].copy(), low[:, -1].copy(), high[:, -1].copy()
+    _compose(block_shift, block_low, block_high, num_blocks)
+    start = np.empty(num_blocks, dtype=np.int32)
+    start[0] = initial
+    start[1:] = np.minimum(np.maximum(initial + block_shift[:-1], block_low[:-1]),
+                           block_high[:-1])
+    q = np.empty(n + 1, dtype=np.int64)
+    q[0] = initial
+    q[1:] = np.minimum(np.maximum(start[:, None] + shift, low), high).ravel()[:n]
+    return q
+
+def iter_jump_chain(arrival_rate, service_rate, num_events, capacity=None, initial=0,
+                    rng=None, chunk_size=CHUNK_SIZE):
+    """ Generates the jump chain of the M/M/1 (or M/M/1/K) queue in chunks.
+
+    Args:
+        arrival_rate (float): the arrival rate (lambda)
+        service_rate (float): the service rate (mu)
+        num_events (int): the number of events
+        capacity (int): the most customers (K, None for no limit)
+        initial (int): the initial number of customers
+        rng (numpy.random.Generator): the random number generator (None
+            for the global numpy random state)
+        chunk_size (int): the number of events per chunk
+
+    Returns:
+        generator: the chunks of (time, customers, inter-arrival duration,
+            service duration, event duration) arrays of the events, with the
+            time and customers at the start of each event and after the last
+            event of the chunk (one more value)
+    """
+    rng = np.random if rng is None else rng
+    t = 0.0
+    q = initial
+    for start in range(0, num_events, chunk_size):
+        n = min(chunk_size, num_events - start)
+        # draw the random numbers in the order of the loop (arrival, service)
+        r = rng.random((n, 2))
+        t_arrival = -np.log(1 - r[:, 0])/arrival_rate
+        t_service = -np.log(1 - r[:, 1])/service_rate
+        steps = np.where(t_arrival < t_service, 1, -1)
+        customers = reflect(steps, q, capacity)
+        # each event lasts for the duration of its winner
+        delta_t = np.where(customers[1:] > customers[:-1], t_arrival, t_service)
+        # accumulate the times in the order of the loop
+        times = np.empty(n + 1)
+        times[0] = t
+        times[1:] = delta_t
+        np.cumsum(times, out=times)
+        yield times, customers, t_arrival, t_service, delta_t
+        t = float(times[-1])
+        q = int(customers[-1])
+
+def jump_chain(arrival_rate, service_rate, num_events, capacity=None, initial=0, rng=None,
+               chunk_size=CHUNK_SIZE):
+    """ Generates the jump chain of the M/M/1 (or M/M/1/K) queue.
+
+    Args:
+        arrival_rate (float): the arrival rate (lambda)
+        service_rate (float): the service rate (mu)
+        num_events (int): the number of events
+        capacity (int): the most customers (K, None for no limit)
+        initial (int): the initial number of customers
+        rng (numpy.random.Generator): the random number generator (None
+            for the global numpy random state)
+        chunk_size (int): the number of events generated at once
+
+    Returns:
+        dict: the traces (time and customers at each event and at the end,
+            sampled durations, and event durations) as in `run_queue` of
+            `queuingMarkovModel.py`
+    """
+    chunks = list(iter_jump_chain(arrival_rate, service_rate, num_events, capacity,
+                                  initial, rng, chunk_size))
+    if not chunks:
+        return {'t': np.zeros(1), 'q': np.full(1, float(initial)), 't_arrival': np.zeros(0),
+                't_service': np.zeros(0), 'delta_t': np.zeros(0)}
+    # join the chunks (each ends with the start of the next)
+    t = np.concatenate([c[0][:-1] for c in chunks] + [chunks[-1][0][-1:]])
+    q = np.concatenate([c[1][:-1] for c in chunks] + [chunks[-1][1][-1:]]).astype(float)
+    t_arrival, t_service, delta_t = (np.concatenate([c[i] for c in chunks])
+                                     for i in range(2, 5))
+    return {'t': t, 'q': q, 't_arrival': t_arrival, 't_service': t_service,
+            'delta_t': delta_t}
+
+def jump_chain_summary(arrival_rate, service_rate, num_events, capacity=None, initial=0,
+                       rng=None, chunk_size=CHUNK_SIZE):
+    """ Summarizes a jump chain generated in chunks (without storing it).
+
+    Args:
+        arrival_rate (float): the arrival rate (lambda)
+        service_rate (float): the service rate (mu)
+        num_events (int): the number of events
+        capacity (int): the most customers (K, None for no limit)
+        initial (int): the initial number of customers
+        rng (numpy.random.Generator): the random number generator (None
+            for the global numpy random state)
+        chunk_size (int): the number of events generated at once
+
+    Returns:
+        dict: the time and customers at the end, the time-average number of
+            customers, and the fraction of time with each number of
+            customers (`occupancy`)
+    """
+    t = 0.0
+    q = initial
+    area = 0.0
+    occupancy = np.zeros(1 if capacity is None else capacity + 1)
+    for times, customers, t_arrival, t_service, delta_t in iter_jump_chain(
+            arrival_rate, service_rate, num_events, capacity, initial, rng, chunk_size):
+        # time spent with each number of customers
+        before = customers[:-1]
+        area += before.dot(delta_t)
+        counts = np.bincount(before, weights=delta_t)
+        if len(counts) > len(occupancy):
+            occupancy = np.append(occupancy, np.zeros(len(counts) - len(occupancy)))
+        occupancy[:len(counts)] += counts
+        t = float(times[-1])
+        q = int(customers[-1])
+    return {'time': t, 'customers': q, 'mean_customers': area/t if t > 0 else 0.0,
+            'occupancy': occupancy/t if t > 0 else occupancy}
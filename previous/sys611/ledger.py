@@ -0,0 +1,196 @@
+"""
+SYS-611: Lazily-settled cost ledger for simulation models.
+
+Models often account costs with bookkeeping events: a process which adds a
+fixed daily cost every day, a charge at each event proportional to the time
+since the previous event (e.g. holding costs), and an observation process
+which samples the total cost at regular times. Over long horizons these
+events outnumber the events of the model itself. A `Ledger` instead keeps
+cost streams which accrue continuously at a rate of `unit_cost*level`:
+ * a fixed-rate stream (e.g. wages of repairers) has a constant level.
+ * a state-dependent stream (e.g. holding costs) has a level which the model
+   sets when the state changes (e.g. the inventory level).
+A stream is only settled (its accrued cost added to its total) when its
+level changes, when a lump-sum amount is charged, or when a total is
+queried, so totals are exact integrals without any scheduled event. Each
+settlement records a breakpoint (time, total, level), so the cost and level
+trajectories are reconstructed after a run at any times with `trajectory`
+and `levels` (a stream with a unit cost of 0 only records a level, e.g. the
+number of spares available, in place of an observation process).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import collections
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+class Stream(object):
+    """ Defines a cost stream accrued at a rate proportional to a level. """
+    def __init__(self, unit_cost, level, time):
+        """ Initializes this stream.
+
+        Args:
+            unit_cost (float): the cost per unit of level per unit time
+            level (float): the initial level
+            time (float): the initial time
+        """
+        self.unit_cost = unit_cost
+        self.level = level
+        # time and total cost of the last settlement
+        self.time = time
+        self.total = 0.0
+        # breakpoints (time, total, and level after each settlement)
+        self.times = [time]
+        self.totals = [0.0]
+        self.levels = [level]
+
+    def settle(self, now):
+        """ Adds the cost accrued since the last settlement to the total.
+
+        Args:
+            now (float): the simulation time
+        """
+        if now > self.time:
+            self.total += self.unit_cost*self.level*(now - self.time)
+            self.time = now
+
+    def record(self):
+        """ Records a breakpoint at the last settlement (replacing a
+        breakpoint at the same time). """
+        if self.times[-1] == self.time:
+            self.totals[-1] = self.total
+            self.levels[-1] = self.level
+        else:
+            self.times.append(self.time)
+            self.totals.append(self.total)
+            self.levels.append(self.level)
+
+class Ledger(object):
+    """ Defines a ledger of cost streams settled lazily. """
+    def __init__(self, env, record=True):
+        """ Initializes this ledger.
+
+        Args:
+            env (simpy.Environment): the simulation environment (or any
+                object with the simulation time `now`)
+            record (bool): True to record breakpoints for trajectories
+        """
+        self.env = env
+        self.record = record
+        self.streams = collections.OrderedDict()
+
+    def add_stream(self, name, unit_cost=0.0, level=0):
+        """ Adds a cost stream.
+
+        Args:
+            name (str): the stream name
+            unit_cost (float): the cost per unit of level per unit time (0
+                to only record the level)
+            level (float): the initial level (e.g. 1 for a fixed rate of
+                `unit_cost`)
+        """
+        self.streams[name] = Stream(unit_cost, level, self.env.now)
+
+    def level(self, name):
+        """ Gets the level of a stream.
+
+        Args:
+            name (str): the stream name
+
+        Returns:
+            float: the level
+        """
+        return self.streams[name].level
+
+    def set_level(self, name, level):
+        """ Changes the level of a stream (settling the accrued cost).
+
+        Args:
+            name (str): the stream name
+            level (float): the new level
+        """
+        # settle inline (called at every state change of a model)
+        stream = self.streams[name]
+        now = self.env.now
+        if now > stream.time:
+            stream.total += stream.unit_cost*stream.level*(now - stream.time)
+            stream.time = now
+        stream.level = level
+        if self.record:
+            stream.record()
+
+    def charge(self, name, amount):
+        """ Charges a lump-sum amount to a stream (negative for revenue).
+
+        Args:
+            name (str): the stream name
+            amount (float): the amount
+        """
+        stream = self.streams[name]
+        stream.settle(self.env.now)
+        stream.total += amount
+        if self.record:
+            stream.record()
+
+    def total(self, name=None):
+        """ Gets the total cost accrued until now.
+
+        Args:
+            name (str): the stream name (None for all streams)
+
+        Returns:
+            float: the total cost
+        """
+        now = self.env.now
+        total = 0.0
+        for stream in ([self.streams[name]] if name is not None else self.streams.values()):
+            stream.settle(now)
+            total += stream.total
+        return total
+
+    def totals(self):
+        """ Gets the total cost of each stream accrued until now.
+
+        Returns:
+            dict: the total cost of each stream name
+        """
+        return collections.OrderedDict((name, self.total(name)) for name in self.streams)
+
+    def trajectory(self, times, name=None):
+        """ Reconstructs the total cost at times (from recorded breakpoints).
+
+        Args:
+            times (numpy.ndarray): the times (in the simulated period)
+            name (str): the stream name (None for all streams)
+
+        Returns:
+            numpy.ndarray: the total cost at each time (including changes and
+                charges at that time)
+        """
+        times = np.asarray(times, dtype=float)
+        cost = np.zeros(times.shape)
+        for stream in ([self.streams[name]] if name is not None else self.streams.values()):
+            index = np.searchsorted(stream.times, times, side='right') - 1
+            cost += (np.asarray(stream.totals)[index] + stream.unit_cost
+                     * np.asarray(stream.levels)[index]*(times - np.asarray(stream.times)[index]))
+        return cost
+
+    def levels(self, times, name):
+        """ Reconstructs the level of a stream at times (from recorded breakpoints).
+
+        Args:
+            times (numpy.ndarray): the times (in the simulated period)
+            name (str): the stream name
+
+        Returns:
+            numpy.ndarray: the level at each time (after changes at that time)
+        """
+        stream = self.streams[name]
+        index = np.searchsorted(stream.times, np.asarray(times, dtype=float), side='right') - 1
+        return np.asarray(stream.levels)[index]
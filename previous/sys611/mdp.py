@@ -0,0 +1,283 @@
+"""
+SYS-611: Markov decision process of the inventory model for optimal ordering.
+
+The inventory models of week 9 (`inventoryModel.py`) and week 12
+(`InventoryModel.py`) order up to a target S when the inventory falls below
+a trigger s (with at most one order outstanding), with hand-picked s and S.
+An `InventoryMDP` finds the ordering policy which maximizes the long-run
+profit per day of the same model (Poisson customers demanding a uniform
+number of items, lost sales, a fixed delivery delay, and per-item price,
+cost, and holding cost) in discrete periods (e.g. 0.1 day):
+ * the state is the inventory on hand i (0 to a capacity I) and the pipeline:
+   nothing on order, or an order of q items arriving in r periods (1 to the
+   delivery delay in periods L), so there are (I + 1)*(1 + I*L) states.
+ * at the start of a period with nothing on order, the action is the number
+   of items to order (0 to I - i); the demand of the period is compound
+   Poisson and sales are the smaller of the demand and the inventory; the
+   pipeline advances at the end of the period (delivering the order after L
+   periods).
+The expected rewards (sales revenue, order costs, and holding costs of the
+average inventory during the period) and transitions are arrays, so one
+Bellman update of all states is a gather of the pipeline transitions, a
+product with the (I + 1) x (I + 1) matrix of inventory transitions of the
+demand, and a maximum over order quantities. Relative value iteration
+converges to the optimal gain (profit per day) and policy. A given policy
+(e.g. an (s, S) policy) is evaluated exactly by the stationary distribution
+of its Markov chain, restricted to the states reachable from an empty
+inventory with nothing on order: a sparse linear system (of a few thousand
+states for (s, S) policies) solved in a fraction of a second, whereas value
+iteration converges slowly for the nearly periodic chains of such policies.
+Shorter periods approach the continuous review of the simulation models with
+more states (see `benchmarks/inventoryMdpBenchmark.py`, which cross-checks
+the policies by simulation).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+def compound_poisson_pmf(rate, low, high, size, tail=1e-12):
+    """ Computes the distribution of a compound Poisson demand.
+
+    Args:
+        rate (float): the mean number of customers
+        low (int): the least items per customer
+        high (int): the most items per customer
+        size (int): the number of demand values (the last value includes all
+            larger demands)
+        tail (float): the Poisson tail probability to neglect
+
+    Returns:
+        numpy.ndarray: the probability of each demand value
+    """
+    items = np.zeros(size)
+    items[low:high + 1] = 1.0/(high - low + 1)
+    pmf = np.zeros(size)
+    # add the demand of n customers (n-fold convolutions of the items)
+    total = np.zeros(size)
+    total[0] = 1.0
+    probability = np.exp(-rate)
+    n = 0
+    while True:
+        pmf += probability*total
+        n += 1
+        probability *= rate/n
+        if n > rate and probability < tail:
+            break
+        total = np.convolve(total, items)[:size]
+    # lump larger demands in the last value
+    pmf[-1] += 1 - pmf.sum()
+    return pmf
+
+class InventoryMDP(object):
+    """ Defines an inventory Markov decision process with one outstanding order. """
+    def __init__(self, arrival_rate=5.0, demand_lb=1, demand_ub=4, delivery_delay=2.0,
+                 product_price=100.00, product_cost=50.00, holding_cost=2.00,
+                 max_inventory=60, period=0.1):
+        """ Initializes this MDP and its rewards and transitions.
+
+        Args:
+            arrival_rate (float): the customer arrival rate (customers/day)
+            demand_lb (int): the least items per customer
+            demand_ub (int): the most items per customer
+            delivery_delay (float): the delivery delay (days, rounded to
+                periods)
+            product_price (float): the price (dollars/item sold)
+            product_cost (float): the cost (dollars/item ordered)
+            holding_cost (float): the holding cost (dollars/item/day)
+            max_inventory (int): the inventory capacity (items)
+            period (float): the period duration (days)
+        """
+        self.period = period
+        self.max_inventory = I = max_inventory
+        self.product_cost = product_cost
+        self.lead = L = int(round(delivery_delay/period))
+        if L < 1:
+            raise ValueError('the delivery delay must be at least one period')
+        # demand in a period (the last value includes larger demands)
+        pmf = compound_poisson_pmf(arrival_rate*period, demand_lb, demand_ub, I + 2)
+        # inventory transition matrix of the demand: M[i, j] = P(j left of i)
+        inventory = np.arange(I + 1)
+        left = inventory[:, None] - np.arange(I + 2)[None, :]
+        self._demand = np.zeros((I + 1, I + 1))
+        np.add.at(self._demand, (np.repeat(inventory, I + 2), np.maximum(left, 0).ravel()),
+                  np.tile(pmf, I + 1))
+        # expected reward of a period without an order (sales and holding)
+        sales = np.minimum(inventory[:, None], np.arange(I + 2)[None, :]).dot(pmf)
+        remaining = inventory - sales
+        self._reward = (product_price*sales
+                        - holding_cost*period*(inventory + remaining)/2)
+        # pipeline states: 0 for nothing on order, 1 + (q - 1)*L + (r - 1)
+        # for q items arriving in r periods
+        num_pipeline = 1 + I*L
+        q = np.repeat(np.arange(1, I + 1), L)
+        r = np.tile(np.arange(1, L + 1), I)
+        # next state (flat index) of each state after the pipeline advances
+        next_inventory = np.repeat(inventory[:, None], num_pipeline, axis=1)
+        next_pipeline = np.zeros(num_pipeline, dtype=int)
+        next_pipeline[1:] = np.where(r > 1, 1 + (q - 1)*L + (r - 2), 0)
+        next_inventory[:, 1:] += np.where(r == 1, q, 0)[None, :]
+        # orders which exceed the capacity are never placed (clip to keep
+        # the index in range)
+        next_inventory = np.minimum(next_inventory, I)
+        self._next = next_inventory*num_pipeline + next_pipeline[None, :]
+        # pipeline state of an order of 1 to I items (arriving in L periods)
+        self._ordered = 1 + (np.arange(1, I + 1) - 1)*L + (L - 1)
+        # order quantities which fit in the capacity
+        self._feasible = inventory[:, None] + np.arange(1, I + 1)[None, :] <= I
+        self.shape = (I + 1, num_pipeline)
+
+    @property
+    def num_states(self):
+        """ int: the number of states. """
+        return self.shape[0]*self.shape[1]
+
+    def _backup(self, values, order=None):
+        """ Applies the Bellman operator to values.
+
+        Args:
+            values (numpy.ndarray): the values of the states (inventory rows
+                and pipeline columns)
+            order (numpy.ndarray): the order quantity of each inventory with
+                nothing on order (None to maximize)
+
+        Returns:
+            numpy.ndarray: the updated values
+            numpy.ndarray: the (best) order quantity of each inventory with
+                nothing on order
+        """
+        # values after the pipeline advances, expected over the demand
+        expected = self._demand.dot(values.ravel()[self._next])
+        updated = self._reward[:, None] + expected
+        # value of ordering 1 to I items with nothing on order
+        ordering = (self._reward[:, None] + expected[:, self._ordered]
+                    - self.product_cost*np.arange(1, self.max_inventory + 1)[None, :])
+        ordering = np.where(self._feasible, ordering, -np.inf)
+        choices = np.column_stack((updated[:, 0], ordering))
+        if order is None:
+            order = np.argmax(choices, axis=1)
+        updated[:, 0] = choices[np.arange(len(order)), order]
+        return updated, order
+
+    def _iterate(self, order=None, tolerance=1e-6, max_iterations=10**5, damping=0.5):
+        """ Runs relative value iteration (for a fixed policy if given).
+
+        Policies which order right after each delivery are nearly periodic,
+        so each update is averaged with the previous values (the
+        aperiodicity transformation, which keeps the optimal policy and
+        scales the gain by the damping).
+        """
+        values = np.zeros(self.shape)
+        for iteration in range(max_iterations):
+            updated, best = self._backup(values, order)
+            difference = updated - values
+            # the gain per period is between the least and most difference
+            low, high = difference.min(), difference.max()
+            values = values + damping*(difference - difference[0, 0])
+            if high - low < tolerance*self.period:
+                break
+        else:
+            raise RuntimeError('value iteration did not converge')
+        self.iterations = iteration + 1
+        return (low + high)/2/self.period, best, values
+
+    def solve(self, tolerance=1e-6, max_iterations=10**5):
+        """ Finds the optimal ordering policy by relative value iteration.
+
+        Args:
+            tolerance (float): the precision of the gain (dollars/day)
+            max_iterations (int): the most iterations
+
+        Returns:
+            float: the optimal long-run profit per day (gain)
+            numpy.ndarray: the optimal order quantity of each inventory level
+                with nothing on order
+        """
+        gain, order, values = self._iterate(None, tolerance, max_iterations)
+        self.values = values
+        return gain, order
+
+    def evaluate(self, order):
+        """ Computes the long-run profit per day of a policy.
+
+        Args:
+            order (numpy.ndarray): the order quantity of each inventory level
+                with nothing on order
+
+        Returns:
+            float: the long-run profit per day (gain)
+        """
+        order = np.asarray(order, dtype=int)
+        if np.any(order[self._feasible.sum(axis=1) < order]):
+            raise ValueError('orders must fit in the inventory capacity')
+        # import the scipy sparse packages only to evaluate policies
+        import scipy.sparse as sparse
+        import scipy.sparse.csgraph as csgraph
+        import scipy.sparse.linalg as linalg
+        num_pipeline = self.shape[1]
+        # pipeline state after the action (an order placed with nothing on order)
+        pipeline = np.tile(np.arange(num_pipeline), (self.max_inventory + 1, 1))
+        ordering = order > 0
+        pipeline[ordering, 0] = self._ordered[order[ordering] - 1]
+        # expected reward of each state (orders are paid when placed)
+        reward = np.repeat(self._reward[:, None], num_pipeline, axis=1)
+        reward[:, 0] -= self.product_cost*order
+        # transitions of each state (i, p) for each demand leaving j of i
+        inventory, left = np.nonzero(self._demand)
+        rows = (inventory[:, None]*num_pipeline + np.arange(num_pipeline)[None, :]).ravel()
+        cols = self._next[left[:, None], pipeline[inventory]].ravel()
+        P = sparse.csr_matrix((np.repeat(self._demand[inventory, left], num_pipeline),
+                               (rows, cols)), shape=(self.num_states, self.num_states))
+        # an empty inventory with nothing on order is reachable from every
+        # state (the demand may exceed the inventory), so the states reachable
+        # from it are the one recurrent class of the policy
+        states = np.sort(csgraph.breadth_first_order(P, 0, return_predecessors=False))
+        P = P[states][:, states]
+        # solve pi P = pi with the first balance equation replaced by sum(pi) = 1
+        m = len(states)
+        A = (P.T - sparse.identity(m, format='csr')).tolil()
+        A[0, :] = 1.0
+        rhs = np.zeros(m)
+        rhs[0] = 1.0
+        pi = linalg.spsolve(A.tocsc(), rhs)
+        return pi.dot(reward.ravel()[states])/self.period
+
+    def order_up_to(self, order_trigger, order_up_to):
+        """ Creates the policy which orders up to S below the trigger s.
+
+        Args:
+            order_trigger (int): the inventory level which triggers an order (s)
+            order_up_to (int): the inventory level to order up to (S)
+
+        Returns:
+            numpy.ndarray: the order quantity of each inventory level with
+                nothing on order
+        """
+        inventory = np.arange(self.max_inventory + 1)
+        return np.where(inventory < order_trigger, np.maximum(order_up_to - inventory, 0), 0)
+
+def order_levels(order):
+    """ Finds the (s, S) levels of a policy (if it orders up to one level).
+
+    Args:
+        order (numpy.ndarray): the order quantity of each inventory level
+            with nothing on order
+
+    Returns:
+        int: the order trigger s (orders below this level)
+        int: the order-up-to level S (None if orders reach different levels)
+    """
+    order = np.asarray(order)
+    ordering = np.flatnonzero(order > 0)
+    if len(ordering) == 0:
+        return 0, None
+    levels = np.unique(ordering + order[ordering])
+    trigger = ordering.max() + 1
+    if len(levels) > 1 or np.any(order[:trigger] == 0):
+        return trigger, None
+    return trigger, int(levels[0])
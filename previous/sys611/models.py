@@ -0,0 +1,103 @@
+"""
+SYS-611: Registry of example models for batch execution.
+
+Each model is an example script in a week directory which defines a
+replication function taking a random number seed (and optional model
+parameters) and returning a tuple `(summary, traces)`. Scripts are imported as
+modules (not run as scripts), so only the simulation core is loaded and no
+plotting or reporting packages are imported.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import importlib
+import inspect
+import os
+import sys
+
+# root directory containing the week directories
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# map from model name to the script path (relative to ROOT), the function
+# name, and short aliases for parameter names (e.g. R for num_repairers)
+MODELS = {
+    'dice': ('week2/diceFighters.py', 'run_battle', {}),
+    'dice-oo': ('week2/diceFightersOO.py', 'run_battle', {}),
+    'dice-binomial': ('week3/diceFightersBinomial.py', 'run_battle', {}),
+    'tictactoe-mcts': ('week2/ticTacToeMCTS.py', 'run_match', {'n': 'num_playouts'}),
+    'arrivals': ('week3/arrivalGeneratorIVT.py', 'run_arrivals', {'n': 'num_samples'}),
+    'demand-ivt': ('week3/demandGeneratorIVT.py', 'run_demands', {'n': 'num_samples'}),
+    'demand-arm': ('week3/demandGeneratorARM.py', 'run_demands', {'n': 'num_samples'}),
+    'buffon': ('week4/buffonsNeedle.py', 'run_needles', {}),
+    'buffon-antithetic': ('week4/buffonsNeedleAntithetic.py', 'run_needles', {}),
+    'dice-mc': ('week4/diceFightersMC.py', 'run_battles', {'n': 'num_battles'}),
+    'combat': ('week4/combatEngine.py', 'run_combat', {'n': 'num_battles'}),
+    'markov-queue': ('week8/queuingMarkovModel.py', 'run_queue', {'n': 'num_events'}),
+    'weather': ('week8/weatherMarkovModel.py', 'run_weather', {'n': 'num_samples'}),
+    'customers': ('week9/customerQueuingModel.py', 'run_customers', {'n': 'num_customers'}),
+    'events': ('week9/eventQueuingModel.py', 'run_events', {'T': 'duration'}),
+    'inventory-events': ('week9/inventoryModel.py', 'run_inventory', {'T': 'duration'}),
+    'balk': ('week9/queuingBalkModel.py', 'run_cafe', {'T': 'duration'}),
+    'jar': ('week10/mm.py', 'run_jar', {'n': 'num_runs'}),
+    'jar-contest': ('week10/mm.py', 'run_contest', {'opponents': 'num_opponents'}),
+    'cafe': ('week12/QueuingSystem.py', 'run_cafe',
+             {'lambda': '_lambda', 'mu': '_mu', 'c': 'num_servers', 'T': 'sim_duration',
+              'profile': 'arrival_profile'}),
+    'factory': ('week12/FactorySystem.py', 'run_factory',
+                {'R': 'num_repairers', 'S': 'num_spares', 'T': 'sim_duration'}),
+    'inventory': ('week12/InventoryModel.py', 'run_warehouse',
+                  {'Q': 'order_threshold', 'S': 'order_up_to', 'T': 'sim_duration',
+                   'profile': 'arrival_profile'}),
+    'cafe-oo': ('week12/object-oriented/QueuingSystemOO.py', 'run_cafe',
+                {'lambda': '_lambda', 'mu': '_mu', 'c': 'num_servers', 'T': 'sim_duration'}),
+    'factory-oo': ('week12/object-oriented/FactorySystemOO.py', 'run_factory',
+                   {'R': 'num_repairers', 'S': 'num_spares', 'T': 'sim_duration'}),
+    'inventory-oo': ('week12/object-oriented/InventoryModelOO.py', 'run_warehouse',
+                     {'Q': 'order_threshold', 'S': 'order_up_to', 'T': 'sim_duration'}),
+}
+
+def load_model(name):
+    """ Loads the replication function of a model.
+
+    The script directory is added to the search path and the script is
+    imported by its module name, so the function can be pickled and sent to
+    worker processes.
+
+    Args:
+        name (str): the model name
+
+    Returns:
+        function: the replication function
+    """
+    if name not in MODELS:
+        raise KeyError('unknown model {} (choose from {})'.format(
+                name, ', '.join(sorted(MODELS))))
+    path, function, aliases = MODELS[name]
+    directory, filename = os.path.split(os.path.normpath(os.path.join(ROOT, path)))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    module = importlib.import_module(os.path.splitext(filename)[0])
+    return getattr(module, function)
+
+def resolve_params(name, params):
+    """ Replaces parameter aliases by parameter names and checks the names.
+
+    Args:
+        name (str): the model name
+        params (dict): the parameter values (by name or alias)
+
+    Returns:
+        dict: the parameter values by name
+    """
+    aliases = MODELS[name][2]
+    resolved = {aliases.get(key, key): value for key, value in params.items()}
+    # check the names against the replication function (after the seed)
+    names = list(inspect.signature(load_model(name)).parameters)[1:]
+    for key in resolved:
+        if key not in names:
+            raise KeyError('unknown parameter {} for model {} (choose from {})'.format(
+                    key, name, ', '.join(names)))
+    return resolved
@@ -0,0 +1,400 @@
+"""
+SYS-611: Open queueing network simulation on a single event calendar.
+
+The cafe models of weeks 9 and 12 have one station (a queue and its servers).
+A `QueueingNetwork` connects stations (e.g. order, pay, barista, and pickup)
+with probabilistic routing, including rework loops:
+ * each station has a number of servers, a service time distribution (any
+   process generator of `sys611.generators`, exponential by default), and an
+   optional rate of external (Poisson) customer arrivals.
+ * customers are served first come, first served at each station, then
+   move to another station with the routing probabilities of the station
+   (a row of the routing matrix) or leave the network with the remaining
+   probability.
+All stations share one calendar (a heap stored in a list) of service
+completions and each station keeps a queue (a deque) of waiting customers, so
+a customer is only a tuple of (completion time, station, network arrival
+time) while in service and a network arrival time while waiting, rather than
+one SimPy process per customer per station. External arrivals, service
+times, and routing decisions are drawn in blocks with numpy (and routing is
+not drawn at all for stations with one destination). The number of customers
+and busy servers of each station are settled only at the events of the
+station.
+
+A network is defined by a configuration (e.g. read from a JSON or YAML file)
+with default station parameters and a list of stations with their routing:
+
+    defaults: {num_servers: 1}
+    stations:
+      - {name: order, service_rate: 1.2, arrival_rate: 1.0, routing: {pay: 1.0}}
+      - {name: pay, service_rate: 2.0, routing: {barista: 1.0}}
+      - {name: barista, num_servers: 2, service_rate: 0.8,
+         routing: {barista: 0.1, pickup: 0.9}}
+      - {name: pickup, service_rate: 3.0}
+
+The outputs of each station (and of the network) are the throughput, the
+utilization of servers, the time-average number of customers, and the mean
+time per visit; the network outputs are the throughput and the mean and
+standard deviation of the sojourn time (time in the network) of departing
+customers. The product-form (Jackson) results of networks of exponential
+stations are computed by `QueueingNetwork.jackson` to validate the simulation
+(see `benchmarks/queueingNetworkBenchmark.py`).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import collections
+from heapq import heappop, heappush
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+from sys611.generators import Exponential
+
+# number of variates of each kind drawn at once
+BLOCK_SIZE = 2**12
+
+class Station(object):
+    """ Defines a station (a queue and its servers) of a queueing network. """
+    def __init__(self, name, num_servers=1, service_rate=1.0, service=None,
+                 arrival_rate=0.0, routing=None):
+        """ Initializes this station.
+
+        Args:
+            name (str): the station name
+            num_servers (int): the number of servers
+            service_rate (float): the service rate of each server
+                (customers/minute, the inverse of the mean service time)
+            service (InverseTransform): the service time generator (None for
+                exponential service times at the service rate)
+            arrival_rate (float): the external arrival rate (customers/minute)
+            routing (dict): the probability to move to each station name
+                after service (the remaining probability leaves the network)
+        """
+        if num_servers < 1 or service_rate <= 0 or arrival_rate < 0:
+            raise ValueError('station {} has invalid servers or rates'.format(name))
+        self.name = name
+        self.num_servers = num_servers
+        self.service_rate = service_rate
+        self.service = Exponential(service_rate) if service is None else service
+        self.arrival_rate = arrival_rate
+        self.routing = dict(routing or {})
+
+class QueueingNetwork(object):
+    """ Defines an open queueing network of stations on one event calendar. """
+    def __init__(self, stations, rng=None, block_size=BLOCK_SIZE):
+        """ Initializes this queueing network.
+
+        Args:
+            stations (list): the stations (`Station`)
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+            block_size (int): the number of variates of each kind drawn at once
+        """
+        self.stations = collections.OrderedDict()
+        for station in stations:
+            if station.name in self.stations or station.name == 'network':
+                raise ValueError('duplicate or reserved station name {}'.format(station.name))
+            self.stations[station.name] = station
+        names = list(self.stations)
+        n = len(names)
+        # routing matrix (the last column is the probability to leave)
+        self.routing = np.zeros((n, n + 1))
+        for i, station in enumerate(stations):
+            for name, probability in station.routing.items():
+                if name not in self.stations:
+                    raise ValueError('station {} routes to unknown station {}'.format(
+                            station.name, name))
+                if probability < 0:
+                    raise ValueError('station {} has a negative routing probability'.format(
+                            station.name))
+                self.routing[i, names.index(name)] += probability
+            total = self.routing[i, :n].sum()
+            if total > 1 + 1e-9:
+                raise ValueError('routing probabilities of station {} exceed one'.format(
+                        station.name))
+            self.routing[i, n] = max(1 - total, 0.0)
+        self.arrival_rates = np.array([station.arrival_rate for station in stations])
+        if self.arrival_rates.sum() <= 0:
+            raise ValueError('at least one station must have external arrivals')
+        # every customer must eventually leave (I - P is invertible)
+        if not np.all(np.isfinite(self.traffic())):
+            raise ValueError('customers can never leave some stations')
+        self.rng = np.random if rng is None else rng
+        self.block_size = block_size
+        # the only destination of stations which route without a draw
+        self._fixed = [int(np.flatnonzero(row)[0]) if np.count_nonzero(row) == 1 else None
+                       for row in self.routing]
+        self.now = 0.0
+
+    @classmethod
+    def from_config(cls, config, rng=None):
+        """ Creates a queueing network from a configuration.
+
+        Args:
+            config (dict): the configuration with a list of `stations` (dicts
+                of `Station` arguments) and optional `defaults` (station
+                arguments common to all stations)
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+
+        Returns:
+            QueueingNetwork: the queueing network
+        """
+        defaults = config.get('defaults', {})
+        stations = []
+        for params in config['stations']:
+            args = dict(defaults)
+            args.update(params)
+            stations.append(Station(**args))
+        return cls(stations, rng=rng)
+
+    def traffic(self):
+        """ Solves the traffic equations for the arrival rate of each station.
+
+        Returns:
+            numpy.ndarray: the total (external and routed) arrival rate of
+                each station (customers/minute), infinite if customers can
+                never leave
+        """
+        n = len(self.stations)
+        matrix = np.eye(n) - self.routing[:, :n].T
+        try:
+            rates = np.linalg.solve(matrix, self.arrival_rates)
+        except np.linalg.LinAlgError:
+            return np.full(n, np.inf)
+        if np.any(rates < -1e-9):
+            return np.full(n, np.inf)
+        return rates
+
+    def jackson(self):
+        """ Computes the product-form results of this network (exact for
+        exponential service times).
+
+        Each station behaves as an independent M/M/c queue at the arrival
+        rate solving the traffic equations, and the mean sojourn time
+        follows from the total number of customers by Little's law.
+
+        Returns:
+            dict: the outputs of each station name and of the `network` (see
+                `summary`), infinite for unstable stations
+        """
+        rates = self.traffic()
+        outputs = collections.OrderedDict()
+        total = 0.0
+        for rate, (name, station) in zip(rates, self.stations.items()):
+            c = station.num_servers
+            offered = rate/station.service_rate
+            utilization = offered/c
+            if utilization < 1:
+                # Erlang C (probability to wait) from the Erlang B recursion
+                blocking = 1.0
+                for k in range(1, c + 1):
+                    blocking = offered*blocking/(k + offered*blocking)
+                waiting = blocking/(1 - utilization*(1 - blocking))
+                number = offered + waiting*utilization/(1 - utilization)
+            else:
+                number = np.inf
+            total += number
+            outputs[name] = {'throughput': float(rate), 'utilization': float(utilization),
+                             'number': float(number),
+                             'time': float(number/rate) if rate > 0 else 0.0}
+        throughput = float(self.arrival_rates.sum())
+        outputs['network'] = {'throughput': throughput, 'number': float(total),
+                              'sojourn': float(total/throughput)}
+        return outputs
+
+    def _refill(self, kind, index):
+        """ Draws a block of variates (stored in reverse order to pop).
+
+        Args:
+            kind (str): 'service' or 'route'
+            index (int): the station index
+
+        Returns:
+            float or int: the first variate of the block (removed)
+        """
+        if kind == 'service':
+            block = self._services[index]
+            block.extend(self._station_list[index].service.sample(
+                    self.block_size, self.rng).tolist()[::-1])
+        else:
+            block = self._routes[index]
+            row = self.routing[index]
+            block.extend(np.searchsorted(np.cumsum(row[:-1]),
+                                         self.rng.random(self.block_size),
+                                         side='right').tolist())
+        return block.pop()
+
+    def _arrival_block(self):
+        """ Draws a block of external arrivals after the current arrival time.
+
+        Returns:
+            list: the (time, station index) of the arrivals in reverse order
+        """
+        total = self.arrival_rates.sum()
+        times = self._next_time + np.cumsum(self.rng.exponential(1/total, self.block_size))
+        self._next_time = float(times[-1])
+        stations = np.searchsorted(np.cumsum(self.arrival_rates/total)[:-1],
+                                   self.rng.random(self.block_size), side='right')
+        return list(zip(times.tolist(), stations.tolist()))[::-1]
+
+    def _advance(self, until):
+        """ Processes the events of this network up to a time.
+
+        Args:
+            until (float): the time to stop (events after it are kept)
+        """
+        # load the state into local variables (used at every event)
+        calendar = self._calendar
+        queues = self._queues
+        number = self._number
+        servers = self._servers
+        last = self._last
+        area = self._area
+        busy_area = self._busy_area
+        visited = self._visited
+        services = self._services
+        routes = self._routes
+        fixed = self._fixed
+        refill = self._refill
+        leave = len(number)
+        arrivals = self._arrivals
+        departures, sojourn, sojourn_squares = self._departures, self._sojourn, self._squares
+        arrival_time, arrival_station = arrivals[-1]
+        while True:
+            if calendar and calendar[0][0] < arrival_time:
+                if calendar[0][0] > until:
+                    break
+                # complete a service and start the next in the queue
+                now, j, born = heappop(calendar)
+                k = number[j]
+                c = servers[j]
+                elapsed = now - last[j]
+                area[j] += k*elapsed
+                busy_area[j] += (k if k < c else c)*elapsed
+                last[j] = now
+                number[j] = k - 1
+                visited[j] += 1
+                if k > c:
+                    pool = services[j]
+                    heappush(calendar, (now + (pool.pop() if pool else refill('service', j)),
+                                        j, queues[j].popleft()))
+                # route the customer to the next station (or out)
+                s = fixed[j]
+                if s is None:
+                    pool = routes[j]
+                    s = pool.pop() if pool else refill('route', j)
+                if s == leave:
+                    departures += 1
+                    time = now - born
+                    sojourn += time
+                    sojourn_squares += time*time
+                    continue
+            else:
+                if arrival_time > until:
+                    break
+                # an external arrival (and draw the next)
+                now = born = arrival_time
+                s = arrival_station
+                arrivals.pop()
+                if not arrivals:
+                    arrivals.extend(self._arrival_block())
+                arrival_time, arrival_station = arrivals[-1]
+            # arrive at station s: start service if a server is idle
+            k = number[s]
+            c = servers[s]
+            elapsed = now - last[s]
+            area[s] += k*elapsed
+            busy_area[s] += (k if k < c else c)*elapsed
+            last[s] = now
+            number[s] = k + 1
+            if k < c:
+                pool = services[s]
+                heappush(calendar, (now + (pool.pop() if pool else refill('service', s)),
+                                    s, born))
+            else:
+                queues[s].append(born)
+        self._departures, self._sojourn, self._squares = departures, sojourn, sojourn_squares
+        self.now = until
+
+    def _settle(self, now):
+        """ Accumulates the areas of all stations up to a time.
+
+        Args:
+            now (float): the simulation time
+        """
+        for j in range(len(self._number)):
+            k = self._number[j]
+            elapsed = now - self._last[j]
+            self._area[j] += k*elapsed
+            self._busy_area[j] += min(k, self._servers[j])*elapsed
+            self._last[j] = now
+
+    def run(self, duration, warmup=0.0):
+        """ Simulates this network from empty.
+
+        Args:
+            duration (float): the simulation duration (minutes)
+            warmup (float): the time after which outputs are recorded
+
+        Returns:
+            dict: the outputs (see `summary`)
+        """
+        n = len(self.stations)
+        self._station_list = list(self.stations.values())
+        self._calendar = []
+        self._queues = [collections.deque() for j in range(n)]
+        self._servers = [station.num_servers for station in self._station_list]
+        self._number = [0]*n
+        self._last = [0.0]*n
+        self._services = [[] for j in range(n)]
+        self._routes = [[] for j in range(n)]
+        self._next_time = 0.0
+        self._arrivals = self._arrival_block()
+        self._area = [0.0]*n
+        self._busy_area = [0.0]*n
+        self.now = 0.0
+        for until in ([warmup] if warmup > 0 else []) + [duration]:
+            # discard the outputs before the warm-up
+            self._settle(self.now)
+            self._start = self.now
+            self._area = [0.0]*n
+            self._busy_area = [0.0]*n
+            self._visited = [0]*n
+            self._departures = 0
+            self._sojourn = self._squares = 0.0
+            self._advance(until)
+        self._settle(duration)
+        return self.summary()
+
+    def summary(self):
+        """ Gets the outputs of the stations and of the network.
+
+        Returns:
+            dict: the throughput (customers/minute), utilization, time-average
+                number of customers, and mean time per visit of each station
+                name, and the throughput, time-average number of customers,
+                mean and standard deviation of the sojourn time, and number of
+                departures of the `network`
+        """
+        elapsed = self.now - self._start
+        outputs = collections.OrderedDict()
+        for j, (name, station) in enumerate(self.stations.items()):
+            visited = self._visited[j]
+            outputs[name] = {'throughput': visited/elapsed,
+                             'utilization': self._busy_area[j]/station.num_servers/elapsed,
+                             'number': self._area[j]/elapsed,
+                             'time': self._area[j]/visited if visited > 0 else 0.0}
+        departures = self._departures
+        mean = self._sojourn/departures if departures > 0 else 0.0
+        variance = self._squares/departures - mean**2 if departures > 0 else 0.0
+        outputs['network'] = {'throughput': departures/elapsed,
+                              'number': sum(self._area)/elapsed,
+                              'sojourn': mean, 'sojourn_std': float(np.sqrt(max(variance, 0.0))),
+                              'departures': departures}
+        return outputs
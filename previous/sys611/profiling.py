@@ -0,0 +1,313 @@
+"""
+SYS-611: Profiling hooks for SimPy models.
+
+Python profilers attribute the run time of a SimPy model to the simulation
+kernel (`Environment.step`) rather than to the model processes which it
+resumes. A `ProfiledEnvironment` is a drop-in replacement for
+`simpy.Environment` which accounts, per process type (the generator function
+name, e.g. `operate_machine`):
+ * the number of events scheduled by the process,
+ * the number of events processed which resume the process (process steps),
+   by event type (e.g. Timeout or ContainerGet), and
+ * the wall time of each step (the process code between two `yield`s,
+   including random number draws).
+It also records the size of the event queue (heap) and the number of
+requests waiting in watched resources or containers over time.
+
+To keep the overhead small, only a random sample of scheduled events (one in
+`interval` on average) is accounted: a sampled event gets callbacks which
+time the callbacks of its step, and counts and times are scaled by the exact
+number of scheduled events (the event IDs drawn by simpy). Event queue and
+resource sizes are observed at sampled events. Sampling uses its own random number generator,
+so the random numbers (and results) of the model are unchanged. An interval
+of 1 accounts all events exactly at a higher overhead.
+
+Accounting is collected in a `Profile` shared by all environments it creates,
+so replications are aggregated. Models create the environment from a profile
+only when profiling is enabled, e.g.:
+
+    env = PROFILE.environment() if PROFILE is not None else simpy.Environment()
+
+so a disabled profile costs nothing. Results are available as a summary table
+(`Profile.table`) and as folded stacks (`Profile.write_folded`) for flame
+graph tools such as `flamegraph.pl` or speedscope.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import collections
+from heapq import heappush
+import random
+import time
+
+# import the simpy package
+# see https://simpy.readthedocs.io/en/latest/api_reference for documentation
+import simpy
+from simpy.core import BoundClass
+from simpy.events import NORMAL, Process
+
+# name of events scheduled or processed outside of a process (e.g. callbacks
+# of resources or the end of a simulation run)
+KERNEL = '(kernel)'
+
+class ResourceStats(object):
+    """ Defines the time-weighted statistics of requests waiting in a resource. """
+    def __init__(self):
+        """ Initializes these statistics. """
+        self.area = 0.0
+        self.duration = 0.0
+        self.maximum = 0
+        # time and number of waiting requests at each change (last run)
+        self.times = []
+        self.waiting = []
+
+    @property
+    def mean(self):
+        """ float: the time-average number of waiting requests. """
+        return self.area/self.duration if self.duration > 0 else 0.0
+
+    def update(self, now, waiting):
+        """ Records the number of waiting requests if it changed.
+
+        Args:
+            now (float): the simulation time
+            waiting (int): the number of waiting requests
+        """
+        if waiting != self.waiting[-1]:
+            self.area += self.waiting[-1]*(now - self.times[-1])
+            self.duration += now - self.times[-1]
+            self.maximum = max(self.maximum, waiting)
+            self.times.append(now)
+            self.waiting.append(waiting)
+
+class Profile(object):
+    """ Defines the accounting of processes in profiled environments. """
+    def __init__(self, interval=256, seed=0):
+        """ Initializes this profile.
+
+        Args:
+            interval (int): the average number of scheduled events per
+                sampled event (1 to account all events)
+            seed (int): the seed of the sampling random number generator
+        """
+        self.interval = interval
+        self._random = random.Random(seed)
+        # sampled events scheduled by each process type
+        self.scheduled = collections.Counter()
+        # sampled steps and their time (s) by process type and event type
+        self.steps = collections.defaultdict(lambda: [0, 0.0])
+        # statistics of each watched resource
+        self.resources = collections.OrderedDict()
+        # number of events scheduled and processed (exact), and sampled
+        self.num_scheduled = 0
+        self.num_steps = 0
+        self.num_sampled = 0
+        # sum of event queue sizes and the largest size (at sampled events)
+        self.heap_total = 0
+        self.heap_max = 0
+        # number of environments (replications)
+        self.num_runs = 0
+
+    def environment(self, initial_time=0):
+        """ Creates an environment profiled by this profile.
+
+        Args:
+            initial_time (float): the initial simulation time
+
+        Returns:
+            ProfiledEnvironment: the environment
+        """
+        self.num_runs += 1
+        return ProfiledEnvironment(self, initial_time)
+
+    def skip(self):
+        """ Draws the number of scheduled events until the next sample.
+
+        Returns:
+            int: the number of events (uniform with mean `interval`)
+        """
+        return 1 if self.interval <= 1 else self._random.randint(1, 2*self.interval - 1)
+
+    @property
+    def scale(self):
+        """ float: the number of scheduled events per sampled event. """
+        return self.num_scheduled/self.num_sampled if self.num_sampled > 0 else 0.0
+
+    def processes(self):
+        """ Summarizes the (estimated) accounting by process type.
+
+        Returns:
+            list: tuples of process type, events scheduled, steps, and time
+                (s), sorted by decreasing time
+        """
+        totals = collections.defaultdict(lambda: [0, 0.0])
+        for (process, event), (count, elapsed) in self.steps.items():
+            totals[process][0] += count
+            totals[process][1] += elapsed
+        for process in self.scheduled:
+            totals[process]
+        scale = self.scale
+        return sorted(((process, self.scheduled[process]*scale, count*scale, elapsed*scale)
+                       for process, (count, elapsed) in totals.items()),
+                      key=lambda row: -row[3])
+
+    def table(self):
+        """ Formats the accounting as a summary table.
+
+        Returns:
+            str: the table of process types (and watched resources)
+        """
+        rows = self.processes()
+        total = sum(row[3] for row in rows)
+        lines = ['{:<24s}{:>12s}{:>12s}{:>12s}{:>10s}{:>10s}'.format(
+                'process', 'scheduled', 'steps', 'time (s)', 'time (%)', 'us/step')]
+        for process, scheduled, count, elapsed in rows:
+            lines.append('{:<24s}{:>12.0f}{:>12.0f}{:>12.3f}{:>10.1f}{:>10.2f}'.format(
+                    process, scheduled, count, elapsed, 100*elapsed/total if total > 0 else 0,
+                    1e6*elapsed/count if count > 0 else 0))
+        lines.append('{} runs, {} events scheduled, {} processed ({} sampled); '
+                     'event queue size mean {:.1f}, max {}'.format(
+                self.num_runs, self.num_scheduled, self.num_steps, self.num_sampled,
+                self.heap_total/self.num_sampled if self.num_sampled > 0 else 0,
+                self.heap_max))
+        if self.resources:
+            lines.append('{:<24s}{:>12s}{:>12s}'.format('resource', 'mean wait.', 'max wait.'))
+            for name, stats in self.resources.items():
+                lines.append('{:<24s}{:>12.2f}{:>12d}'.format(name, stats.mean, stats.maximum))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.table()
+
+    def folded(self):
+        """ Formats the (estimated) step times as folded stacks for flame graphs.
+
+        Returns:
+            list: lines 'process;event type microseconds'
+        """
+        return ['{};{} {:.0f}'.format(process, event, 1e6*elapsed*self.scale)
+                for (process, event), (count, elapsed) in sorted(self.steps.items())]
+
+    def write_folded(self, path):
+        """ Writes the step times as folded stacks for flame graphs.
+
+        Args:
+            path (str): the output file (e.g. for `flamegraph.pl path`)
+        """
+        with open(path, 'w') as output:
+            output.write('\n'.join(self.folded()) + '\n')
+
+class ProfiledEnvironment(simpy.Environment):
+    """ Defines a simpy environment which accounts sampled process steps. """
+    def __init__(self, profile, initial_time=0):
+        """ Initializes this environment.
+
+        Args:
+            profile (Profile): the profile to account process steps
+            initial_time (float): the initial simulation time
+        """
+        super(ProfiledEnvironment, self).__init__(initial_time)
+        # bind the event constructors (e.g. `timeout`) of simpy.Environment to
+        # this environment, as simpy only binds those of the class itself
+        for name, attribute in simpy.Environment.__dict__.items():
+            if type(attribute) is BoundClass:
+                setattr(self, name, getattr(self, name))
+        self.profile = profile
+        # event ID (number of scheduled events) of the next sample
+        self._next_sample = profile.skip() - 1
+        # events scheduled and processed (accounted to the profile), and
+        # event IDs drawn to count the scheduled events
+        self._num_scheduled = 0
+        self._num_steps = 0
+        self._num_counts = 0
+        # watched resources (resource, statistics)
+        self._watched = []
+
+    @property
+    def heap_size(self):
+        """ int: the number of scheduled events (size of the event queue). """
+        return len(self._queue)
+
+    def watch(self, name, resource):
+        """ Records the number of requests waiting in a resource over time
+        (at sampled events).
+
+        Args:
+            name (str): the resource name
+            resource (simpy.Resource or simpy.Container): the resource
+        """
+        stats = self.profile.resources.setdefault(name, ResourceStats())
+        stats.times, stats.waiting = [self._now], [0]
+        self._watched.append((resource, stats))
+
+    def run(self, until=None):
+        """ Executes steps until a criterion (see `simpy.Environment.run`). """
+        try:
+            return super(ProfiledEnvironment, self).run(until)
+        finally:
+            profile = self.profile
+            # account scheduled events (the next event ID, less the IDs drawn
+            # by previous counts) and processed events (not in the queue)
+            num_scheduled = next(self._eid) - self._num_counts
+            self._num_counts += 1
+            profile.num_scheduled += num_scheduled - self._num_scheduled
+            self._num_scheduled = num_scheduled
+            num_steps = num_scheduled - len(self._queue)
+            profile.num_steps += num_steps - self._num_steps
+            self._num_steps = num_steps
+            for resource, stats in self._watched:
+                # close the time-weighted statistics at the end of the run
+                stats.area += stats.waiting[-1]*(self._now - stats.times[-1])
+                stats.duration += self._now - stats.times[-1]
+                stats.times.append(self._now)
+                stats.waiting.append(stats.waiting[-1])
+
+    def schedule(self, event, priority=NORMAL, delay=0):
+        """ Schedules an event (see `simpy.Environment.schedule`). """
+        eid = next(self._eid)
+        heappush(self._queue, (self._now + delay, priority, eid, event))
+        if eid >= self._next_sample:
+            self._sample(event, eid)
+
+    def _sample(self, event, eid):
+        """ Accounts a sampled scheduled event and times its step.
+
+        Args:
+            event (simpy.Event): the scheduled event
+            eid (int): the event ID
+        """
+        profile = self.profile
+        self._next_sample = eid + profile.skip()
+        profile.num_sampled += 1
+        process = self._active_proc
+        profile.scheduled[process._generator.__name__ if process is not None else KERNEL] += 1
+        size = len(self._queue)
+        profile.heap_total += size
+        profile.heap_max = max(profile.heap_max, size)
+        for resource, stats in self._watched:
+            stats.update(self._now, len(resource.put_queue) + len(resource.get_queue))
+
+        callbacks = event.callbacks
+        if callbacks is None:
+            return
+        clock = []
+        def start(event):
+            # runs first when the event is processed: time the callbacks
+            # until `stop` (appended as the last callback)
+            clock.append(time.perf_counter())
+            callbacks.append(stop)
+        def stop(event):
+            elapsed = time.perf_counter() - clock[0]
+            name = KERNEL
+            for callback in callbacks:
+                process = getattr(callback, '__self__', None)
+                if type(process) is Process:
+                    name = process._generator.__name__
+                    break
+            steps = profile.steps[name, type(event).__name__]
+            steps[0] += 1
+            steps[1] += elapsed
+        callbacks.insert(0, start)
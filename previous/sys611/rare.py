@@ -0,0 +1,266 @@
+"""
+SYS-611: Rare-event simulation with importance sampling and splitting.
+
+A rare event with probability p (e.g. 1e-6) is observed in about one of 1/p
+replications, so the relative error (standard error divided by the estimate)
+of the naive estimator is about 1/sqrt(n*p) with n replications: estimating
+p = 1e-6 with 10% relative error needs about 1e8 replications. This module
+provides two methods which need far fewer replications:
+ * importance sampling: random variates are drawn from an exponentially
+   tilted distribution g(x) proportional to exp(theta*x)*f(x) which makes the
+   event more likely, and each replication is weighted by the likelihood
+   ratio f(x)/g(x) of all variates it drew so the estimate is unbiased.
+ * fixed-effort multilevel splitting: an importance function (e.g. the queue
+   length) defines increasing levels up to the rare event. A fixed number of
+   trajectories is started from the states which entered the previous level
+   and the fraction reaching the next level estimates each conditional
+   probability. The estimate is the product of the conditional probabilities.
+
+Both methods report the estimate with its standard error, relative error, and
+the number of naive replications which would give the same relative error.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import concurrent.futures
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+from sys611.generators import Exponential, InverseTransform
+from sys611.sequential import _as_outputs
+
+class TiltedExponential(Exponential):
+    """ Defines an exponentially tilted exponential process generator. """
+    def __init__(self, rate, theta):
+        """ Initializes this process generator.
+
+        Tilting an exponential distribution with rate lambda by theta gives an
+        exponential distribution with rate lambda - theta.
+
+        Args:
+            rate (float): the rate parameter of the original distribution
+            theta (float): the tilting parameter (less than the rate)
+        """
+        if theta >= rate:
+            raise ValueError('theta must be less than the rate')
+        Exponential.__init__(self, rate - theta)
+        self.original_rate = rate
+        self.theta = theta
+
+    def log_likelihood_ratio(self, x):
+        """ Computes the log likelihood ratio ln(f(x)/g(x)) of variates.
+
+        Args:
+            x (numpy.ndarray): the variates
+
+        Returns:
+            numpy.ndarray: the log likelihood ratios
+        """
+        return np.log(self.original_rate/self.rate) - self.theta*np.asarray(x)
+
+class TiltedUniform(InverseTransform):
+    """ Defines an exponentially tilted uniform process generator. """
+    def __init__(self, low, high, theta):
+        """ Initializes this process generator.
+
+        Tilting a uniform distribution on [low, high] by theta gives a
+        truncated exponential density proportional to exp(theta*x), which
+        favors large values if theta > 0 and small values if theta < 0.
+
+        Args:
+            low (float): the lower bound
+            high (float): the upper bound
+            theta (float): the tilting parameter (0 for no tilting)
+        """
+        InverseTransform.__init__(self, None)
+        self.low = low
+        self.high = high
+        self.theta = theta
+        width = (high - low)*theta
+        # log of the moment generating function of (x - low)
+        self._log_mgf = np.log(np.expm1(width)/width) if theta != 0 else 0.0
+
+    def ppf(self, r):
+        """ Evaluates the inverse CDF x = low + ln(1 + r*(exp(theta*w) - 1))/theta. """
+        r = np.asarray(r)
+        if self.theta == 0:
+            return self.low + r*(self.high - self.low)
+        return self.low + np.log1p(r*np.expm1(self.theta*(self.high - self.low)))/self.theta
+
+    def log_likelihood_ratio(self, x):
+        """ Computes the log likelihood ratio ln(f(x)/g(x)) of variates.
+
+        Args:
+            x (numpy.ndarray): the variates
+
+        Returns:
+            numpy.ndarray: the log likelihood ratios
+        """
+        return self._log_mgf - self.theta*(np.asarray(x) - self.low)
+
+class RareEventResult(object):
+    """ Defines the estimate of a rare-event probability. """
+    def __init__(self, method, values, elapsed, num_hits, work=None):
+        """ Initializes this result.
+
+        Args:
+            method (str): the estimation method
+            values (numpy.ndarray): the independent unbiased observations (one
+                per replication or per repetition of splitting)
+            elapsed (float): the computation time (seconds)
+            num_hits (int): the number of replications or trajectories which
+                reached the rare event
+            work (int): the number of simulated steps (None if not counted)
+        """
+        values = np.asarray(values, dtype=float)
+        self.method = method
+        self.num_runs = len(values)
+        self.estimate = np.mean(values)
+        self.std_error = np.std(values, ddof=1)/np.sqrt(len(values)) if len(values) > 1 else np.inf
+        self.num_hits = num_hits
+        self.elapsed = elapsed
+        self.work = work
+
+    @property
+    def relative_error(self):
+        """ float: the standard error divided by the estimate. """
+        return self.std_error/self.estimate if self.estimate > 0 else np.inf
+
+    @property
+    def naive_runs(self):
+        """ float: the naive replications needed for the same relative error. """
+        p = self.estimate
+        if p <= 0 or not np.isfinite(self.relative_error) or self.relative_error == 0:
+            return np.nan
+        return (1 - p)/(p*self.relative_error**2)
+
+    def half_width(self, confidence_level=0.95):
+        """ Computes the (normal) confidence interval half-width.
+
+        Args:
+            confidence_level (float): the confidence level
+
+        Returns:
+            float: the half-width
+        """
+        # import the scipy stats package only when needed (it is slow to load)
+        import scipy.stats as stats
+        return stats.norm.ppf(1 - (1 - confidence_level)/2)*self.std_error
+
+    def __str__(self):
+        return '{}: p = {:.3e} (std. error {:.2e}, relative error {:.1%}, n={}, hits={}, {:.2f} s)'.format(
+                self.method, self.estimate, self.std_error, self.relative_error,
+                self.num_runs, self.num_hits, self.elapsed)
+
+def _weighted_value(replicate, seed, indicator, log_weight):
+    """ Computes the weighted observation of one replication (in a worker process). """
+    outputs = _as_outputs(replicate(seed))
+    return float(outputs[indicator])*np.exp(outputs[log_weight]), bool(outputs[indicator])
+
+def importance_sampling(replicate, num_runs, indicator='hit', log_weight='log_weight',
+                        first_seed=0, workers=1):
+    """ Estimates a rare-event probability from weighted replications.
+
+    Each replication samples under a tilted (importance) distribution and
+    returns an indicator of the rare event and the log likelihood ratio of
+    all variates it drew. The estimate is the mean of indicator*weight.
+
+    Args:
+        replicate (function): the replication function called with a seed
+        num_runs (int): the number of replications
+        indicator (str): the output name of the rare-event indicator
+        log_weight (str): the output name of the log likelihood ratio
+        first_seed (int): the seed of the first replication
+        workers (int): the number of parallel worker processes
+
+    Returns:
+        RareEventResult: the estimate (with `effective_hits`, the effective
+            number of hits of the weights, which is much smaller than the
+            number of hits if a few large weights dominate the estimate)
+    """
+    start = time.time()
+    seeds = range(first_seed, first_seed + num_runs)
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_weighted_value, [replicate]*num_runs, seeds,
+                                        [indicator]*num_runs, [log_weight]*num_runs,
+                                        chunksize=max(1, num_runs//(4*workers))))
+    else:
+        results = [_weighted_value(replicate, seed, indicator, log_weight) for seed in seeds]
+    values = np.array([value for value, hit in results])
+    result = RareEventResult('importance sampling', values, time.time() - start,
+                             sum(hit for value, hit in results))
+    result.effective_hits = np.sum(values)**2/np.sum(values**2) if np.any(values > 0) else 0.0
+    return result
+
+def fixed_effort_splitting(initial, advance, importance, levels, effort,
+                           num_repetitions=10, rng=None):
+    """ Estimates the probability of reaching a rare level with multilevel splitting.
+
+    Trajectories are simulated in batches (one row per trajectory). Each
+    stage starts `effort` trajectories from the states which entered the
+    previous level (re-using each state about equally often) and simulates
+    them until they reach the next level or end. Independent repetitions of
+    the whole procedure estimate the standard error.
+
+    Args:
+        initial (function): returns initial states given a number of
+            trajectories and the random number generator
+        advance (function): returns the next states (one step) and a mask of
+            trajectories which end (e.g. return to an empty system) given the
+            states and the random number generator
+        importance (function): returns the importance of each state
+        levels (list): the increasing importance levels (the last level
+            defines the rare event)
+        effort (int): the number of trajectories per stage
+        num_repetitions (int): the number of independent repetitions
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        RareEventResult: the estimate (with `stage_probabilities`, the mean
+            conditional probability of reaching each level)
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    start = time.time()
+    estimates = []
+    stages = np.zeros((num_repetitions, len(levels)))
+    num_hits = 0
+    work = 0
+    for repetition in range(num_repetitions):
+        entrance = initial(effort, rng)
+        estimate = 1.0
+        for k, level in enumerate(levels):
+            # start the fixed number of trajectories from the entrance states
+            if k == 0:
+                states = entrance
+            else:
+                order = rng.permutation(len(entrance))
+                states = entrance[order[np.arange(effort) % len(entrance)]]
+            reached = np.zeros(effort, dtype=bool)
+            active = importance(states) < level
+            reached[~active] = True
+            while np.any(active):
+                next_states, ended = advance(states[active], rng)
+                work += int(np.sum(active))
+                states[active] = next_states
+                index = np.flatnonzero(active)
+                up = importance(next_states) >= level
+                reached[index[up]] = True
+                active[index[up | ended]] = False
+            stages[repetition, k] = np.mean(reached)
+            estimate *= stages[repetition, k]
+            if not np.any(reached):
+                break
+            entrance = states[reached]
+        num_hits += int(np.sum(reached))
+        estimates.append(estimate)
+    result = RareEventResult('fixed-effort splitting', estimates, time.time() - start,
+                             num_hits, work)
+    result.stage_probabilities = np.mean(stages, axis=0)
+    return result
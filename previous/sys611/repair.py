@@ -0,0 +1,344 @@
+"""
+SYS-611: Markov model of the finite-source machine repair system.
+
+The factory of week 12 (`FactorySystem.py`) is a machine repair system: a
+number of machines operate until they break, broken machines are replaced by
+spares (or wait for one, out of service), and repairers repair broken
+machines (one at a time each) into spares. Its state is the number of broken
+machines n (in repair or waiting for a repairer): min(n, R) repairers are
+busy, max(S - n, 0) spares are available, and max(n - S, 0) machines are out
+of service. With exponential breakdown and repair times this is a birth-death
+continuous-time Markov chain (CTMC) of N + S + 1 states, solved in well under
+a millisecond for any (R, S, N), so costs of a grid of designs are screened
+without simulation (see `screen`).
+
+The uniform breakdown (132 to 182 hours) and repair (4 to 10 hours) times of
+the factory are much less variable than exponential times. A phase-type
+(Erlang) approximation with k phases matches the mean and the squared
+coefficient of variation 1/k (see `uniform_phases`): the state then also
+counts the operating machines and the busy repairers in each phase, which
+grows quickly (C(N + k - 1, k - 1) for the machines). The steady state of
+large chains is solved iteratively (BiCGSTAB), in under a second for about
+10^5 states and in seconds up to the default limit of 10^6 states (e.g. 3
+phases of both times with 5 repairers and 20 spares), but Erlang breakdown
+times need few phases or machines. With many
+machines the breakdowns of the fleet are close to a Poisson process in steady
+state (each machine is one of many renewal processes), so exponential
+breakdown times lose little accuracy.
+
+`expected` computes the exact time averages over a finite horizon from the
+initial state (all machines new and all spares available) by the matrix
+exponential. The factory model with `markov=True` simulates this Markov model
+(exponential times with the same means), so its cost has a known mean: it
+validates the simulation exactly, and it is an unbiased control variate for
+the cost of the factory model run with the same seed (see
+`sys611.variance.control_variates`). The variance reduction depends on the
+correlation of the two runs, which is weak for the week 12 factory: its new
+machines with nearly constant lifetimes break in bursts which the Markov
+model does not reproduce (see `benchmarks/repairBenchmark.py`).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# largest state space solved with dense matrices
+DENSE_STATES = 2000
+# relative residual tolerance of the iterative (sparse) steady-state solver
+STEADY_STATE_TOL = 1e-12
+# largest state space with a dense matrix exponential (independent of the
+# horizon, unlike the sparse exponential)
+DENSE_EXPM_STATES = 500
+
+def uniform_phases(low, high):
+    """ Computes the Erlang phases which match the variability of a uniform time.
+
+    Args:
+        low (float): the lower bound
+        high (float): the upper bound
+
+    Returns:
+        int: the number of phases k (the Erlang distribution with k phases
+            has the squared coefficient of variation 1/k)
+    """
+    scv = (high - low)**2/12/((low + high)/2)**2
+    return max(1, int(round(1/scv)))
+
+class MachineRepair(object):
+    """ Defines a Markov model of a machine repair system with spares. """
+    def __init__(self, num_repairers, num_spares, num_machines=50, mean_lifetime=157.0,
+                 mean_repair=7.0, lifetime_phases=1, repair_phases=1, repairer_cost=3.75,
+                 spare_cost=30/8, downtime_cost=20.0, max_states=10**6):
+        """ Initializes this model and enumerates its states.
+
+        Args:
+            num_repairers (int): the number of repairers (R)
+            num_spares (int): the number of spares (S)
+            num_machines (int): the number of machines (N)
+            mean_lifetime (float): the mean time to breakdown (hours)
+            mean_repair (float): the mean repair time (hours)
+            lifetime_phases (int): the Erlang phases of the time to breakdown
+                (1 for exponential)
+            repair_phases (int): the Erlang phases of the repair time (1 for
+                exponential)
+            repairer_cost (float): the cost of a repairer (dollars/hour)
+            spare_cost (float): the cost of a spare (dollars/hour)
+            downtime_cost (float): the cost of a machine out of service
+                (dollars/hour)
+            max_states (int): the largest state space to enumerate
+        """
+        if num_repairers < 1 or num_spares < 0 or num_machines < 1:
+            raise ValueError('the system needs repairers and machines')
+        if lifetime_phases < 1 or repair_phases < 1:
+            raise ValueError('phases must be positive')
+        self.num_repairers = num_repairers
+        self.num_spares = num_spares
+        self.num_machines = num_machines
+        self.mean_lifetime = mean_lifetime
+        self.mean_repair = mean_repair
+        self.lifetime_phases = lifetime_phases
+        self.repair_phases = repair_phases
+        self.repairer_cost = repairer_cost
+        self.spare_cost = spare_cost
+        self.downtime_cost = downtime_cost
+        self._enumerate(max_states)
+
+    def _enumerate(self, max_states):
+        """ Enumerates the states reachable from the initial state and the
+        transition rates of the generator. """
+        R, S, N = self.num_repairers, self.num_spares, self.num_machines
+        kl, kr = self.lifetime_phases, self.repair_phases
+        lifetime_rate = kl/self.mean_lifetime
+        repair_rate = kr/self.mean_repair
+        # a state is (broken machines, operating machines in each lifetime
+        # phase, busy repairers in each repair phase)
+        initial = (0, (N,) + (0,)*(kl - 1), (0,)*kr)
+        self.states = [initial]
+        index = {initial: 0}
+        rows, cols, rates = [], [], []
+
+        def add(source, target, rate):
+            """ Adds a transition (enumerating a new target state). """
+            if target not in index:
+                if len(self.states) >= max_states:
+                    raise ValueError('more than {} states (use fewer phases)'.format(max_states))
+                index[target] = len(self.states)
+                self.states.append(target)
+            rows.append(source)
+            cols.append(index[target])
+            rates.append(rate)
+
+        # breadth-first search of the states (the list grows during the loop)
+        k = 0
+        while k < len(self.states):
+            n, a, b = self.states[k]
+            for i in range(kl):
+                if a[i] == 0:
+                    continue
+                a_next = list(a)
+                a_next[i] -= 1
+                b_next = list(b)
+                if i < kl - 1:
+                    # the machine enters its next lifetime phase
+                    a_next[i + 1] += 1
+                    add(k, (n, tuple(a_next), b), a[i]*lifetime_rate)
+                    continue
+                # the machine breaks (replaced by a new spare if available)
+                # and starts repair if a repairer is idle
+                if n < S:
+                    a_next[0] += 1
+                if n < R:
+                    b_next[0] += 1
+                add(k, (n + 1, tuple(a_next), tuple(b_next)), a[i]*lifetime_rate)
+            for j in range(kr):
+                if b[j] == 0:
+                    continue
+                a_next = list(a)
+                b_next = list(b)
+                b_next[j] -= 1
+                if j < kr - 1:
+                    # the repair enters its next phase
+                    b_next[j + 1] += 1
+                    add(k, (n, a, tuple(b_next)), b[j]*repair_rate)
+                    continue
+                # the repair completes: the repairer starts the next broken
+                # machine and the spare replaces a waiting machine
+                if n > R:
+                    b_next[0] += 1
+                if n > S:
+                    a_next[0] += 1
+                add(k, (n - 1, tuple(a_next), tuple(b_next)), b[j]*repair_rate)
+            k += 1
+
+        self._rows = np.array(rows, dtype=int)
+        self._cols = np.array(cols, dtype=int)
+        self._rates = np.array(rates)
+        # broken machines in each state
+        self.broken = np.array([state[0] for state in self.states])
+
+    @property
+    def num_states(self):
+        """ int: the number of states. """
+        return len(self.states)
+
+    def generator(self):
+        """ Builds the generator matrix Q of this CTMC.
+
+        Returns:
+            numpy.ndarray: the generator (a scipy sparse matrix for more than
+                `DENSE_STATES` states)
+        """
+        m = self.num_states
+        exits = np.bincount(self._rows, weights=self._rates, minlength=m)
+        rows = np.concatenate((self._rows, np.arange(m)))
+        cols = np.concatenate((self._cols, np.arange(m)))
+        rates = np.concatenate((self._rates, -exits))
+        if m <= DENSE_STATES:
+            Q = np.zeros((m, m))
+            np.add.at(Q, (rows, cols), rates)
+            return Q
+        # import the scipy sparse package only for large state spaces
+        import scipy.sparse as sparse
+        return sparse.csr_matrix((rates, (rows, cols)), shape=(m, m))
+
+    def steady_state(self):
+        """ Solves the steady-state probabilities of the states.
+
+        Returns:
+            numpy.ndarray: the probability of each state
+        """
+        m = self.num_states
+        # solve pi Q = 0 with the balance equation of the initial state
+        # replaced by pi[0] = 1 (which keeps the matrix sparse), then normalize
+        rhs = np.zeros(m)
+        rhs[0] = 1.0
+        if m <= DENSE_STATES:
+            A = self.generator().T.copy()
+            A[0] = rhs
+            pi = np.linalg.solve(A, rhs)
+        else:
+            # import the scipy sparse packages only for large state spaces
+            import scipy.sparse as sparse
+            import scipy.sparse.linalg as linalg
+            # a direct (LU) solve fills in badly for multi-dimensional chains,
+            # so solve iteratively with the normalization sum(pi) = 1 in place
+            # of the first balance equation and a diagonal (Jacobi) preconditioner
+            A = sparse.vstack([sparse.csr_matrix((np.ones(m), (np.zeros(m), np.arange(m))),
+                                                 shape=(1, m)),
+                               sparse.csr_matrix(self.generator().T)[1:]], format='csr')
+            diagonal = A.diagonal()
+            diagonal[diagonal == 0] = 1.0
+            preconditioner = linalg.LinearOperator((m, m), matvec=lambda x: x/diagonal)
+            pi, info = linalg.bicgstab(A, rhs, M=preconditioner, rtol=STEADY_STATE_TOL,
+                                       atol=0, maxiter=10*m)
+            if info != 0:
+                pi, info = linalg.gmres(A, rhs, M=preconditioner, rtol=STEADY_STATE_TOL,
+                                        atol=0, maxiter=10*m)
+            if info != 0:
+                raise RuntimeError('steady-state solver did not converge')
+        return pi/pi.sum()
+
+    def distribution(self, probabilities=None):
+        """ Computes the distribution of the number of broken machines.
+
+        Args:
+            probabilities (numpy.ndarray): the state probabilities (None for
+                the steady state)
+
+        Returns:
+            numpy.ndarray: the probability of 0 to N + S broken machines
+        """
+        probabilities = self.steady_state() if probabilities is None else probabilities
+        return np.bincount(self.broken, weights=probabilities,
+                           minlength=self.num_machines + self.num_spares + 1)
+
+    def metrics(self, probabilities=None):
+        """ Computes the mean outputs for state probabilities.
+
+        Args:
+            probabilities (numpy.ndarray): the state probabilities (or time
+                averages; None for the steady state)
+
+        Returns:
+            dict: the mean broken machines, machines out of service (`down`),
+                spares available, busy repairers, operating machines,
+                availability (fraction of machines operating), and cost rate
+                (dollars/hour)
+        """
+        p = self.distribution(probabilities)
+        n = np.arange(len(p))
+        down = p.dot(np.maximum(n - self.num_spares, 0))
+        return {'broken': p.dot(n), 'down': down,
+                'spares': p.dot(np.maximum(self.num_spares - n, 0)),
+                'busy': p.dot(np.minimum(n, self.num_repairers)),
+                'operating': self.num_machines - down,
+                'availability': 1 - down/self.num_machines,
+                'cost_rate': (self.repairer_cost*self.num_repairers
+                              + self.spare_cost*self.num_spares + self.downtime_cost*down)}
+
+    def expected(self, duration):
+        """ Computes the exact time averages over a horizon from the initial state.
+
+        The time average of the state probabilities p(t) = p(0) exp(Q t) over
+        [0, T] is computed from the matrix exponential of the generator
+        augmented with the integral [[Q', 0], [I, 0]].
+
+        Args:
+            duration (float): the horizon T (hours)
+
+        Returns:
+            dict: the time averages of the outputs (see `metrics`), with the
+                expected total cost and downtime (machine-hours out of
+                service) over the horizon
+        """
+        m = self.num_states
+        initial = np.zeros(2*m)
+        initial[0] = 1.0
+        if m <= DENSE_EXPM_STATES:
+            # import the scipy linalg package only when needed (slow to load)
+            import scipy.linalg
+            augmented = np.zeros((2*m, 2*m))
+            augmented[:m, :m] = self.generator().T
+            augmented[m:, :m] = np.eye(m)
+            integral = scipy.linalg.expm(augmented*duration).dot(initial)[m:]
+        else:
+            # import the scipy sparse packages only when needed (slow to load)
+            import scipy.sparse as sparse
+            import scipy.sparse.linalg as linalg
+            Q = sparse.csr_matrix(self.generator())
+            zeros = sparse.csr_matrix((m, m))
+            augmented = sparse.bmat([[Q.T, zeros], [sparse.identity(m), zeros]], format='csr')
+            integral = linalg.expm_multiply(augmented*duration, initial)[m:]
+        outputs = self.metrics(integral/duration)
+        outputs['cost'] = outputs['cost_rate']*duration
+        outputs['downtime'] = outputs['down']*duration
+        return outputs
+
+def screen(repairers, spares, duration=None, **kwargs):
+    """ Computes the costs of a grid of designs with the Markov model.
+
+    Args:
+        repairers (list): the numbers of repairers (R)
+        spares (list): the numbers of spares (S)
+        duration (float): the horizon (hours) for the expected total costs
+            from the initial state (None for the steady-state cost rates)
+        **kwargs: other arguments of `MachineRepair`
+
+    Returns:
+        numpy.ndarray: the cost of each number of repairers (rows) and spares
+            (columns)
+    """
+    costs = np.zeros((len(repairers), len(spares)))
+    for i, num_repairers in enumerate(repairers):
+        for j, num_spares in enumerate(spares):
+            model = MachineRepair(num_repairers, num_spares, **kwargs)
+            if duration is None:
+                costs[i, j] = model.metrics()['cost_rate']
+            else:
+                costs[i, j] = model.expected(duration)['cost']
+    return costs
@@ -0,0 +1,217 @@
+"""
+SYS-611: Sequential stopping rule for terminating simulations.
+
+Rather than performing a fixed number of replications, the controller in this
+module performs replications in batches and stops when the confidence interval
+for every output metric meets a target precision. Precision can be specified
+as an absolute half-width (e.g. +/- 0.01) or a relative half-width (e.g. 1% of
+the mean estimate). When several metrics are controlled at once, a Bonferroni
+adjustment is applied so the joint confidence level of all intervals is at
+least the requested confidence level.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import concurrent.futures
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+class OnlineStatistics(object):
+    """ Defines running mean and variance statistics for several metrics. """
+    def __init__(self, metrics):
+        """ Initializes these statistics.
+
+        Args:
+            metrics (list): the metric names
+        """
+        self.metrics = list(metrics)
+        self.n = 0
+        self.mean = np.zeros(len(self.metrics))
+        # sum of squared deviations from the mean
+        self.m2 = np.zeros(len(self.metrics))
+
+    def update(self, values):
+        """ Merges a batch of observations into these statistics.
+
+        Uses the pairwise update of Chan, Golub, and LeVeque (1979) so that a
+        whole batch is merged at once without loss of numerical precision.
+
+        Args:
+            values (numpy.ndarray): the observations (one row per replication)
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, len(self.metrics))
+        n_b = len(values)
+        if n_b == 0:
+            return
+        mean_b = np.mean(values, axis=0)
+        m2_b = np.sum((values - mean_b)**2, axis=0)
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta*n_b/n
+        self.m2 = self.m2 + m2_b + delta**2*self.n*n_b/n
+        self.n = n
+
+    @property
+    def variance(self):
+        """ numpy.ndarray: the sample variance of each metric. """
+        if self.n < 2:
+            return np.full(len(self.metrics), np.inf)
+        return self.m2/(self.n - 1)
+
+    def half_width(self, confidence_level=0.95):
+        """ Computes the confidence interval half-widths.
+
+        Args:
+            confidence_level (float): the joint confidence level
+
+        Returns:
+            numpy.ndarray: the Bonferroni-adjusted half-width for each metric
+        """
+        if self.n < 2:
+            return np.full(len(self.metrics), np.inf)
+        # import the scipy stats package only when needed (it is slow to load)
+        # see http://docs.scipy.org/doc/scipy/reference/stats.html for documentation
+        import scipy.stats as stats
+        # split the significance level among all metrics (Bonferroni)
+        alpha = (1 - confidence_level)/len(self.metrics)
+        t_crit = stats.t.ppf(1 - alpha/2, self.n - 1)
+        return t_crit*np.sqrt(self.variance/self.n)
+
+class SequentialResult(object):
+    """ Defines the results of a sequential stopping procedure. """
+    def __init__(self, statistics, samples, confidence_level, converged):
+        """ Initializes these results.
+
+        Args:
+            statistics (OnlineStatistics): the final statistics
+            samples (dict): the observations for each metric
+            confidence_level (float): the joint confidence level
+            converged (bool): True, if the precision targets were met
+        """
+        self.num_runs = statistics.n
+        self.mean = dict(zip(statistics.metrics, statistics.mean))
+        self.half_width = dict(zip(statistics.metrics,
+                                   statistics.half_width(confidence_level)))
+        self.samples = samples
+        self.confidence_level = confidence_level
+        self.converged = converged
+
+    def __str__(self):
+        return '\n'.join('{} = {:.3f} +/- {:.3f} ({:.0%} CI, n={})'.format(
+                metric, self.mean[metric], self.half_width[metric],
+                self.confidence_level, self.num_runs) for metric in self.mean)
+
+def _as_outputs(result):
+    """ Converts the result of a replication to a dict of scalar outputs.
+
+    Args:
+        result (object): a number, a dict of numbers, or a `(summary, traces)`
+            tuple returned by a replication function
+
+    Returns:
+        dict: the scalar outputs
+    """
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], dict):
+        return result[0]
+    if isinstance(result, dict):
+        return result
+    return {'value': result}
+
+def _targets(precision, metrics):
+    """ Expands a precision target to an array with one entry per metric. """
+    if precision is None:
+        return np.full(len(metrics), np.nan)
+    if isinstance(precision, dict):
+        return np.array([precision.get(m, np.nan) for m in metrics], dtype=float)
+    return np.full(len(metrics), precision, dtype=float)
+
+def run_until_precision(replicate, metrics=None, abs_precision=None,
+                        rel_precision=None, confidence_level=0.95,
+                        batch_size=100, min_runs=10, max_runs=100000,
+                        workers=1, first_seed=0):
+    """ Performs replications until all confidence intervals are precise enough.
+
+    Each metric stops being limiting once its half-width is below the absolute
+    target or below the relative target times the absolute mean estimate.
+
+    Args:
+        replicate (function): the replication function called with a seed
+        metrics (list): the output metrics to control (None for all outputs)
+        abs_precision (float or dict): the absolute half-width target(s)
+        rel_precision (float or dict): the relative half-width target(s)
+        confidence_level (float): the joint confidence level of all intervals
+        batch_size (int): the minimum number of replications per batch
+        min_runs (int): the number of replications before checking precision
+        max_runs (int): the maximum number of replications
+        workers (int): the number of parallel worker processes
+        first_seed (int): the seed of the first replication
+
+    Returns:
+        SequentialResult: the results
+    """
+    if abs_precision is None and rel_precision is None:
+        raise ValueError('requires an absolute or relative precision target')
+
+    # use a process pool to perform batches in parallel, if requested
+    executor = None
+    if workers > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        statistics = None
+        samples = None
+        num_runs = 0
+        batch = max(min_runs, 2)
+        converged = False
+        while num_runs < max_runs:
+            # perform the next batch of replications
+            seeds = range(first_seed + num_runs,
+                          first_seed + num_runs + min(batch, max_runs - num_runs))
+            if executor is None:
+                results = [_as_outputs(replicate(seed)) for seed in seeds]
+            else:
+                results = [_as_outputs(result) for result in executor.map(
+                        replicate, seeds, chunksize=max(1, len(seeds)//(4*workers)))]
+            if statistics is None:
+                # define the metrics from the first replication, if needed
+                if metrics is None:
+                    metrics = sorted(results[0].keys())
+                statistics = OnlineStatistics(metrics)
+                samples = {metric: [] for metric in metrics}
+                abs_target = _targets(abs_precision, metrics)
+                rel_target = _targets(rel_precision, metrics)
+            values = np.array([[result[m] for m in metrics] for result in results],
+                              dtype=float)
+            statistics.update(values)
+            for j, metric in enumerate(metrics):
+                samples[metric].extend(values[:, j])
+            num_runs = statistics.n
+
+            # check if each metric meets its absolute or relative target
+            half_width = statistics.half_width(confidence_level)
+            target = np.fmax(abs_target, rel_target*np.abs(statistics.mean))
+            # metrics without any target do not limit the stopping rule
+            target[np.isnan(target)] = np.inf
+            if np.all(half_width <= target):
+                converged = True
+                break
+
+            # project the number of runs required by the limiting metric
+            # (half-width shrinks with the square root of the number of runs)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.nanmax(half_width/target)
+            required = int(np.ceil(num_runs*ratio**2)) if np.isfinite(ratio) else 0
+            # at most double the runs at once (the variance estimate is uncertain)
+            batch = max(batch_size, min(required - num_runs, num_runs))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return SequentialResult(
+            statistics,
+            {metric: np.array(samples[metric]) for metric in metrics},
+            confidence_level, converged)
@@ -0,0 +1,388 @@
+"""
+SYS-611: Multi-echelon supply chain simulation on a single event calendar.
+
+The warehouse of the week 12 inventory models orders from an infinite
+supplier which always delivers after a fixed delay. A `SupplyChain` instead
+connects stocking nodes in a tree (e.g. a factory supplying distribution
+centers supplying warehouses), where each node runs an (s, S) policy against
+the actual stock of its upstream node:
+ * a node orders up to its target level `order_up_to` (S) when its inventory
+   position (on hand, plus on order, minus backorders owed downstream) falls
+   below its trigger level `order_trigger` (s).
+ * the upstream node ships what it has on hand; the rest is backordered and
+   shipped as deliveries arrive (first come, first served). A node without
+   an upstream node (e.g. the factory) orders from an infinite supplier.
+ * shipments arrive after the lead time of the receiving node.
+ * customers demand items at the nodes with a customer arrival rate (e.g.
+   warehouses); demand which is not on hand is lost, as in the week 12
+   models.
+All nodes share one calendar (a heap stored in a list) of shipment arrivals
+and demand batches. Rather than one process per customer, the customer demand
+of all nodes is batched every `period` (e.g. 0.02 day): the number of
+customers of each node is Poisson and each customer demands a uniform number
+of items, drawn for all nodes and many periods at once with numpy, and only
+the nodes with customers are visited. Smaller periods are closer to the
+per-customer models (see `benchmarks/supplyChainBenchmark.py`).
+
+A network is defined by a configuration (e.g. read from a JSON or YAML file)
+with default node parameters and a list of nodes:
+
+    period: 0.02
+    defaults: {lead_time: 2, holding_cost: 2.0, order_cost: 100.0}
+    nodes:
+      - {name: factory, order_trigger: 400, order_up_to: 800, lead_time: 5}
+      - {name: dc1, upstream: factory, order_trigger: 100, order_up_to: 200}
+      - {name: store1, upstream: dc1, order_trigger: 10, order_up_to: 20,
+         arrival_rate: 5, demand_lb: 1, demand_ub: 4}
+
+The outputs of each node (and of the system) are the fill rate (fraction of
+items demanded which were shipped or sold from stock on hand), the items
+demanded and lost, the number of orders, and the holding, backorder, and
+ordering costs.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import collections
+from heapq import heappop, heappush
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# number of demand periods drawn at once
+BLOCK_PERIODS = 256
+
+class Node(object):
+    """ Defines a stocking node of a supply chain. """
+    def __init__(self, name, upstream=None, order_trigger=0, order_up_to=0, lead_time=1.0,
+                 arrival_rate=0.0, demand_lb=1, demand_ub=1, holding_cost=0.0,
+                 backorder_cost=0.0, order_cost=0.0):
+        """ Initializes this node (with its target level on hand).
+
+        Args:
+            name (str): the node name
+            upstream (str): the name of the upstream node (None for an
+                infinite supplier)
+            order_trigger (float): the inventory position which triggers an
+                order (s, items)
+            order_up_to (float): the inventory position to order up to (S,
+                items)
+            lead_time (float): the time for shipments to arrive (days)
+            arrival_rate (float): the customer arrival rate (customers/day)
+            demand_lb (int): the least items per customer
+            demand_ub (int): the most items per customer
+            holding_cost (float): the holding cost (dollars/item/day)
+            backorder_cost (float): the cost of backorders owed downstream
+                (dollars/item/day)
+            order_cost (float): the fixed cost of an order (dollars/order)
+        """
+        if order_up_to < order_trigger:
+            raise ValueError('node {} must order up to at least its trigger'.format(name))
+        if lead_time < 0 or arrival_rate < 0 or demand_ub < demand_lb:
+            raise ValueError('node {} has an invalid lead time or demand'.format(name))
+        self.name = name
+        self.upstream = upstream
+        self.order_trigger = order_trigger
+        self.order_up_to = order_up_to
+        self.lead_time = lead_time
+        self.arrival_rate = arrival_rate
+        self.demand_lb = demand_lb
+        self.demand_ub = demand_ub
+        self.holding_cost = holding_cost
+        self.backorder_cost = backorder_cost
+        self.order_cost = order_cost
+        self.reset()
+
+    def reset(self):
+        """ Resets the state and outputs of this node. """
+        # items on hand, on order (not yet received), and owed downstream
+        self.on_hand = self.order_up_to
+        self.on_order = 0
+        self.owed = 0
+        # queue of [node, quantity] backorders owed downstream
+        self.backorders = collections.deque()
+        # time of the last settlement and accumulated item-days
+        self.time = 0.0
+        self.item_days = 0.0
+        self.backorder_days = 0.0
+        # items demanded, filled from stock on hand, and lost
+        self.demanded = 0
+        self.filled = 0
+        self.lost = 0
+        self.num_orders = 0
+
+    @property
+    def position(self):
+        """ float: the inventory position (on hand + on order - owed). """
+        return self.on_hand + self.on_order - self.owed
+
+    def settle(self, now):
+        """ Accumulates the item-days on hand and owed since the last settlement.
+
+        Args:
+            now (float): the simulation time
+        """
+        elapsed = now - self.time
+        self.item_days += self.on_hand*elapsed
+        self.backorder_days += self.owed*elapsed
+        self.time = now
+
+    def summary(self):
+        """ Gets the outputs of this node.
+
+        Returns:
+            dict: the fill rate, items demanded and lost, number of orders,
+                holding, backorder, and ordering costs, and total cost
+        """
+        holding = self.holding_cost*self.item_days
+        backorder = self.backorder_cost*self.backorder_days
+        ordering = self.order_cost*self.num_orders
+        return {'fill_rate': self.filled/self.demanded if self.demanded > 0 else 1.0,
+                'demanded': self.demanded, 'lost': self.lost, 'num_orders': self.num_orders,
+                'cost_holding': holding, 'cost_backorder': backorder, 'cost_orders': ordering,
+                'cost': holding + backorder + ordering}
+
+class SupplyChain(object):
+    """ Defines a supply chain of stocking nodes on one event calendar. """
+    def __init__(self, nodes, period=0.02, rng=None, block_periods=BLOCK_PERIODS):
+        """ Initializes this supply chain.
+
+        Args:
+            nodes (list): the nodes (`Node`), upstream nodes in any order
+            period (float): the period of customer demand batches (days)
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+            block_periods (int): the number of demand periods drawn at once
+        """
+        self.nodes = collections.OrderedDict()
+        for node in nodes:
+            if node.name in self.nodes or node.name == 'system':
+                raise ValueError('duplicate or reserved node name {}'.format(node.name))
+            self.nodes[node.name] = node
+        for node in nodes:
+            if node.upstream is not None and node.upstream not in self.nodes:
+                raise ValueError('node {} has unknown upstream node {}'.format(
+                        node.name, node.upstream))
+            # follow the upstream nodes to check the network is a tree
+            seen = set([node.name])
+            upstream = node.upstream
+            while upstream is not None:
+                if upstream in seen:
+                    raise ValueError('node {} is in a supply cycle'.format(node.name))
+                seen.add(upstream)
+                upstream = self.nodes[upstream].upstream
+        if period <= 0:
+            raise ValueError('period must be positive')
+        self.period = period
+        self.rng = np.random if rng is None else rng
+        self.block_periods = block_periods
+        # nodes with customers and their demand parameters (arrays)
+        self._customer_nodes = [node for node in nodes if node.arrival_rate > 0]
+        self._rates = np.array([node.arrival_rate for node in self._customer_nodes])
+        self._demand_lb = np.array([node.demand_lb for node in self._customer_nodes])
+        self._demand_ub = np.array([node.demand_ub for node in self._customer_nodes])
+        self.now = 0.0
+        # calendar of (time, sequence, node, quantity) of shipment arrivals,
+        # with a node of None for demand batches
+        self._calendar = []
+        self._sequence = 0
+
+    @classmethod
+    def from_config(cls, config, rng=None):
+        """ Creates a supply chain from a configuration.
+
+        Args:
+            config (dict): the configuration with a list of `nodes` (dicts of
+                `Node` arguments), optional `defaults` (node arguments
+                common to all nodes), and an optional `period`
+            rng (numpy.random.Generator): the random number generator (None
+                for the global numpy random state)
+
+        Returns:
+            SupplyChain: the supply chain
+        """
+        defaults = config.get('defaults', {})
+        nodes = []
+        for params in config['nodes']:
+            args = dict(defaults)
+            args.update(params)
+            nodes.append(Node(**args))
+        return cls(nodes, period=config.get('period', 0.02), rng=rng)
+
+    def _schedule(self, time, node, quantity):
+        """ Adds an event to the calendar.
+
+        Args:
+            time (float): the event time
+            node (Node): the node receiving a shipment (None for a demand batch)
+            quantity (int): the quantity shipped
+        """
+        self._sequence += 1
+        heappush(self._calendar, (time, self._sequence, node, quantity))
+
+    def _ship(self, node, quantity):
+        """ Ships items to a node (arriving after its lead time).
+
+        Args:
+            node (Node): the receiving node
+            quantity (int): the quantity shipped
+        """
+        self._schedule(self.now + node.lead_time, node, quantity)
+
+    def _review(self, node):
+        """ Orders up to the target of a node if its position is below the trigger.
+
+        Args:
+            node (Node): the node
+        """
+        position = node.on_hand + node.on_order - node.owed
+        if position >= node.order_trigger:
+            return
+        quantity = node.order_up_to - position
+        node.on_order += quantity
+        node.num_orders += 1
+        if node.upstream is None:
+            # an infinite supplier ships the whole order
+            self._ship(node, quantity)
+            return
+        # the upstream node ships what it has and backorders the rest
+        supplier = self.nodes[node.upstream]
+        supplier.settle(self.now)
+        supplier.demanded += quantity
+        shipped = min(quantity, supplier.on_hand)
+        if shipped > 0:
+            supplier.on_hand -= shipped
+            supplier.filled += shipped
+            self._ship(node, shipped)
+        if shipped < quantity:
+            supplier.backorders.append([node, quantity - shipped])
+            supplier.owed += quantity - shipped
+        # the order reduces the position of the upstream node
+        self._review(supplier)
+
+    def _receive(self, node, quantity):
+        """ Receives a shipment at a node and ships its backorders.
+
+        Args:
+            node (Node): the receiving node
+            quantity (int): the quantity received
+        """
+        node.settle(self.now)
+        node.on_order -= quantity
+        node.on_hand += quantity
+        # ship backorders first come, first served (the position is unchanged)
+        backorders = node.backorders
+        while backorders and node.on_hand > 0:
+            backorder = backorders[0]
+            shipped = min(backorder[1], node.on_hand)
+            node.on_hand -= shipped
+            node.owed -= shipped
+            self._ship(backorder[0], shipped)
+            if shipped < backorder[1]:
+                backorder[1] -= shipped
+            else:
+                backorders.popleft()
+
+    def _demand_blocks(self):
+        """ Generates the customer demand of the nodes with customers.
+
+        Returns:
+            generator: the lists of (node index, items) with customers in
+                each period
+        """
+        num_nodes = len(self._customer_nodes)
+        while True:
+            counts = self.rng.poisson(self._rates*self.period, (self.block_periods, num_nodes))
+            # draw the demand of each customer (grouped by period and node)
+            cell = np.repeat(np.arange(counts.size), counts.ravel())
+            low = self._demand_lb[cell % num_nodes]
+            items = low + np.floor(self.rng.random(len(cell))
+                                   * (self._demand_ub[cell % num_nodes] - low + 1))
+            demand = np.bincount(cell, weights=items, minlength=counts.size).astype(int)
+            # split the (node, items) with customers by period
+            cells = np.flatnonzero(counts)
+            bounds = np.searchsorted(cells, np.arange(1, self.block_periods + 1)*num_nodes)
+            batch = list(zip((cells % num_nodes).tolist(), demand[cells].tolist()))
+            start = 0
+            for stop in bounds.tolist():
+                yield batch[start:stop]
+                start = stop
+
+    def _serve(self, batch):
+        """ Serves a batch of customer demand (lost if not on hand).
+
+        Args:
+            batch (list): the (node index, items) with customers
+        """
+        nodes = self._customer_nodes
+        now = self.now
+        for index, items in batch:
+            node = nodes[index]
+            # settle and sell inline (visited for most periods with customers)
+            on_hand = node.on_hand
+            elapsed = now - node.time
+            node.item_days += on_hand*elapsed
+            node.backorder_days += node.owed*elapsed
+            node.time = now
+            sold = items if items < on_hand else on_hand
+            node.on_hand = on_hand - sold
+            node.demanded += items
+            node.filled += sold
+            node.lost += items - sold
+            if node.on_hand + node.on_order - node.owed < node.order_trigger:
+                self._review(node)
+
+    def run(self, duration):
+        """ Simulates this supply chain from its initial state.
+
+        Args:
+            duration (float): the simulation duration (days)
+
+        Returns:
+            dict: the outputs (see `summary`)
+        """
+        for node in self.nodes.values():
+            node.reset()
+        self.now = 0.0
+        self._calendar = []
+        self._sequence = 0
+        demand = self._demand_blocks()
+        calendar = self._calendar
+        if self._customer_nodes:
+            self._schedule(self.period, None, 0)
+        while calendar and calendar[0][0] <= duration:
+            self.now, _, node, quantity = heappop(calendar)
+            if node is None:
+                # serve the demand of the past period and schedule the next
+                self._serve(next(demand))
+                self._schedule(self.now + self.period, None, 0)
+            else:
+                self._receive(node, quantity)
+        self.now = duration
+        for node in self.nodes.values():
+            node.settle(duration)
+        return self.summary()
+
+    def summary(self):
+        """ Gets the outputs of the nodes and of the system.
+
+        Returns:
+            dict: the outputs of each node name (see `Node.summary`) and of
+                the `system` (with the fill rate of customer demand and the
+                total of the other outputs)
+        """
+        outputs = collections.OrderedDict(
+                (name, node.summary()) for name, node in self.nodes.items())
+        system = {key: sum(outputs[name][key] for name in outputs)
+                  for key in ['lost', 'num_orders', 'cost_holding', 'cost_backorder',
+                              'cost_orders', 'cost']}
+        demanded = sum(node.demanded for node in self._customer_nodes)
+        filled = sum(node.filled for node in self._customer_nodes)
+        system['demanded'] = demanded
+        system['fill_rate'] = filled/demanded if demanded > 0 else 1.0
+        outputs['system'] = system
+        return outputs
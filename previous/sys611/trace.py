@@ -0,0 +1,267 @@
+"""
+SYS-611: Level-gated event tracing for simulation models.
+
+Printing a line for every event (e.g. 'Cust 12 enters cafe at t=3.40')
+dominates the run time of models with many events, and the printed text is
+hard to analyze afterwards. A `Tracer` instead stores typed event records
+(time, entity ID, event kind, and a snapshot of state variables) in a numpy
+structured array:
+ * without a file, the array is a ring buffer which keeps the most recent
+   records (e.g. to inspect the events before an error).
+ * with a file, full buffers are appended to a binary file whose first line is
+   a JSON header with the record fields and event kinds.
+
+Tracing is gated by a level (OFF, EVENTS, or DETAILS) which models check
+before recording, e.g.:
+
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, customer, 'enter', len(servers.queue))
+
+so a disabled tracer only costs one attribute comparison per event. Each
+event kind has a format string of the record fields (or None to format all
+fields as a table row), so printouts are rebuilt from the records after a
+run with `Trace.lines`, or from a trace file with the replay tool:
+
+    python -m sys611.trace cafe.trace [--kind enter] [--head 20] [--tail 20]
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import collections
+import json
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# tracing levels (models record events at EVENTS and details, e.g. each
+# customer of an inventory model, at DETAILS)
+OFF = 0
+EVENTS = 1
+DETAILS = 2
+LEVELS = {'off': OFF, 'events': EVENTS, 'details': DETAILS}
+
+# first word of the header of a trace file
+MAGIC = 'sys611-trace'
+
+def _dtype(state):
+    """ Creates the record type with the fields of a state snapshot.
+
+    Args:
+        state (list): the state variable names
+
+    Returns:
+        numpy.dtype: the record type (time, entity, kind, state variables)
+    """
+    return np.dtype([('time', 'f8'), ('entity', 'i8'), ('kind', 'u1')]
+                    + [(name, 'f8') for name in state])
+
+class Trace(object):
+    """ Defines a sequence of event records. """
+    def __init__(self, records, kinds, header=None, dropped=0):
+        """ Initializes this trace.
+
+        Args:
+            records (numpy.ndarray): the records (structured array)
+            kinds (OrderedDict): the format string of each event kind (None
+                for a table row of all fields)
+            header (str): the table header printed before the first line
+            dropped (int): the number of earlier records overwritten in a
+                ring buffer
+        """
+        self.records = records
+        self.kinds = kinds
+        self.header = header
+        self.dropped = dropped
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, name):
+        """ Gets a field of all records (e.g. 'time'), or the kind names. """
+        if name == 'kind':
+            return np.array(list(self.kinds))[self.records['kind']]
+        return self.records[name]
+
+    def select(self, *kinds):
+        """ Selects the records of event kinds.
+
+        Args:
+            *kinds: the event kind names
+
+        Returns:
+            Trace: the records of the event kinds
+        """
+        codes = [list(self.kinds).index(kind) for kind in kinds]
+        return Trace(self.records[np.isin(self.records['kind'], codes)], self.kinds,
+                     self.header, self.dropped)
+
+    def lines(self):
+        """ Formats the records as lines of text.
+
+        Returns:
+            generator: the header (if any) and one line per record
+        """
+        if self.dropped:
+            yield '({} earlier records dropped)'.format(self.dropped)
+        if self.header is not None:
+            yield self.header
+        names = self.records.dtype.names
+        formats = list(self.kinds.values())
+        kinds = list(self.kinds)
+        for record in self.records.tolist():
+            fields = dict(zip(names, record))
+            fields['kind'] = kinds[record[2]]
+            fmt = formats[record[2]]
+            if fmt is None:
+                yield ''.join('{:>12}'.format(value if not isinstance(value, float)
+                                              else '{:.4g}'.format(value))
+                              for value in (fields[name] for name in names))
+            else:
+                yield fmt.format(**fields)
+
+class Tracer(object):
+    """ Defines a level-gated recorder of typed event records. """
+    def __init__(self, kinds, state=(), level=EVENTS, capacity=2**16, path=None, header=None):
+        """ Initializes this tracer.
+
+        Args:
+            kinds (dict): the format string of each event kind using the
+                record fields, e.g. 'Cust {entity} enters at t={time:.2f}'
+                (None for a table row of all fields)
+            state (list): the names of state variables recorded with each
+                event (floats)
+            level (int): the tracing level (OFF, EVENTS, or DETAILS)
+            capacity (int): the number of records in the buffer
+            path (str): the trace file (None to keep the most recent records
+                in a ring buffer)
+            header (str): the table header printed before the first line
+        """
+        self.kinds = collections.OrderedDict(kinds)
+        if len(self.kinds) > 256:
+            raise ValueError('at most 256 event kinds are supported')
+        self.state = list(state)
+        self.level = level
+        self.capacity = capacity
+        self.path = path
+        self.header = header
+        self.dtype = _dtype(self.state)
+        # event kind codes (record field `kind`)
+        self._codes = {kind: code for code, kind in enumerate(self.kinds)}
+        # the buffer (zeros are only allocated by the system when written)
+        self.buffer = np.zeros(capacity, dtype=self.dtype)
+        self.clear()
+
+    def clear(self):
+        """ Discards all records (and truncates the trace file). """
+        # next buffer position, first position not written to the file, and
+        # number of records
+        self._next = 0
+        self._start = 0
+        self.count = 0
+        if self.path is not None:
+            with open(self.path, 'wb') as trace_file:
+                trace_file.write(json.dumps({
+                        'format': MAGIC, 'fields': self.dtype.descr,
+                        'kinds': list(self.kinds.items()), 'header': self.header
+                        }).encode('utf-8') + b'\n')
+
+    def record(self, time, entity, kind, *state):
+        """ Records an event.
+
+        Args:
+            time (float): the simulation time
+            entity (int): the entity ID (-1 for no entity)
+            kind (str): the event kind
+            *state: the state variable values (in order of `state`)
+        """
+        if self._next == self.capacity:
+            self._wrap()
+        self.buffer[self._next] = (time, entity, self._codes[kind]) + state
+        self._next += 1
+        self.count += 1
+
+    def _wrap(self):
+        """ Writes a full buffer to the trace file (or starts to overwrite
+        the oldest records of the ring buffer). """
+        self.flush()
+        self._next = 0
+        self._start = 0
+
+    def flush(self):
+        """ Appends the buffered records to the trace file. """
+        if self.path is not None and self._start < self._next:
+            with open(self.path, 'ab') as trace_file:
+                self.buffer[self._start:self._next].tofile(trace_file)
+            self._start = self._next
+
+    def trace(self):
+        """ Gets the recorded events.
+
+        Returns:
+            Trace: the records in order (only the most recent `capacity`
+                records of a ring buffer)
+        """
+        if self.path is not None:
+            self.flush()
+            return load(self.path)
+        if self.count <= self.capacity:
+            return Trace(self.buffer[:self.count].copy(), self.kinds, self.header)
+        # unroll the ring buffer from the oldest record
+        return Trace(np.concatenate((self.buffer[self._next:], self.buffer[:self._next])),
+                     self.kinds, self.header, self.count - self.capacity)
+
+def load(path):
+    """ Loads a trace file.
+
+    Args:
+        path (str): the trace file
+
+    Returns:
+        Trace: the records
+    """
+    with open(path, 'rb') as trace_file:
+        header = json.loads(trace_file.readline().decode('utf-8'))
+        if header.get('format') != MAGIC:
+            raise ValueError('{} is not a trace file'.format(path))
+        dtype = np.dtype([tuple(field) for field in header['fields']])
+        records = np.fromfile(trace_file, dtype=dtype)
+    return Trace(records, collections.OrderedDict(header['kinds']), header['header'])
+
+def main(argv=None):
+    """ Prints the events of a trace file (the replay tool).
+
+    Args:
+        argv (list): the command line arguments (None for sys.argv)
+    """
+    parser = argparse.ArgumentParser(prog='python -m sys611.trace',
+                                     description='print the events of a trace file')
+    parser.add_argument('path', help='trace file')
+    parser.add_argument('--kind', action='append', help='event kind to print (repeatable)')
+    parser.add_argument('--head', type=int, help='print only the first records')
+    parser.add_argument('--tail', type=int, help='print only the last records')
+    parser.add_argument('--count', action='store_true',
+                        help='print the number of records of each kind')
+    args = parser.parse_args(argv)
+
+    trace = load(args.path)
+    if args.kind:
+        trace = trace.select(*args.kind)
+    if args.count:
+        kinds, counts = np.unique(trace['kind'], return_counts=True)
+        for kind, count in zip(kinds, counts):
+            print('{:<20s}{:>12d}'.format(kind, count))
+        return
+    if args.head is not None:
+        trace.records = trace.records[:args.head]
+    if args.tail is not None:
+        trace.records = trace.records[-args.tail:]
+    for line in trace.lines():
+        print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+SYS-611: Variance reduction techniques for Monte Carlo estimators.
+
+A Monte Carlo estimator computes the mean of an output y = f(u) of uniform
+random numbers u in the unit hypercube [0, 1)^d. The functions in this module
+estimate the mean with the same (vectorized) function f using:
+ * crude sampling: independent uniform random numbers (the baseline).
+ * antithetic pairs: each sample u is paired with 1-u, which reduces variance
+   if f is monotone in each random number.
+ * Latin hypercube sampling: each of n samples falls in a different 1/n
+   interval of each dimension (the standard error is estimated from
+   independent batches).
+ * stratified sampling: the first dimensions are divided into equal strata
+   with the same number of samples in each stratum.
+ * control variates: outputs are corrected by the deviation of correlated
+   controls from their known means, with the optimal (regression)
+   coefficients estimated from the same samples. This also applies to the
+   summary outputs of simulation replications (e.g. the average service
+   time as a control for the average waiting time).
+ * conditional Monte Carlo: a function which computes the conditional mean
+   of the output given some of the random numbers (analytically) replaces
+   the function itself, and is sampled like the crude estimator.
+
+Each method returns a `VarianceResult` with the estimate, standard error,
+number of function evaluations, and computation time. The `compare` function
+tabulates the effective sample size (the number of crude samples with the
+same variance) per CPU-second of each method relative to the baseline, to
+select the cheapest method for a target precision.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+from sys611.sequential import _as_outputs
+
+# resolution of the CPU time clock (the least computation time of a result)
+CLOCK_RESOLUTION = time.get_clock_info('process_time').resolution
+
+class VarianceResult(object):
+    """ Defines the estimate of a mean with a variance reduction method. """
+    def __init__(self, method, estimate, std_error, num_samples, elapsed):
+        """ Initializes this result.
+
+        Args:
+            method (str): the estimation method
+            estimate (float): the estimate of the mean
+            std_error (float): the standard error of the estimate
+            num_samples (int): the number of function evaluations (or
+                replications)
+            elapsed (float): the computation (CPU) time (seconds)
+        """
+        self.method = method
+        self.estimate = estimate
+        self.std_error = std_error
+        self.num_samples = num_samples
+        self.elapsed = elapsed
+
+    def effective_samples(self, sample_variance):
+        """ Computes the effective sample size of this estimate.
+
+        Args:
+            sample_variance (float): the variance of one crude sample
+
+        Returns:
+            float: the number of crude samples with the same variance
+        """
+        return sample_variance/self.std_error**2 if self.std_error > 0 else np.inf
+
+    def __str__(self):
+        return '{}: {:.6g} +/- {:.3g} (std. error, n={}, {:.3f} s)'.format(
+                self.method, self.estimate, self.std_error, self.num_samples, self.elapsed)
+
+def _result(method, values, start):
+    """ Creates the result of independent observations. """
+    values = np.asarray(values, dtype=float)
+    return VarianceResult(method, np.mean(values), np.std(values, ddof=1)/np.sqrt(len(values)),
+                          len(values), time.process_time() - start)
+
+def crude(f, num_samples, dimension, rng=None, method='crude'):
+    """ Estimates the mean of f(u) with independent uniform random numbers.
+
+    Args:
+        f (function): the output of each row of random numbers (vectorized)
+        num_samples (int): the number of samples
+        dimension (int): the number of random numbers per sample
+        rng (numpy.random.Generator): the random number generator
+        method (str): the method name (e.g. 'conditional' if f computes a
+            conditional mean)
+
+    Returns:
+        VarianceResult: the estimate
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    start = time.process_time()
+    return _result(method, f(rng.random((num_samples, dimension))), start)
+
+def conditional(g, num_samples, dimension, rng=None):
+    """ Estimates the mean of f(u) by conditional Monte Carlo.
+
+    Args:
+        g (function): the conditional mean of f given the random numbers of
+            each row (vectorized, ignoring the random numbers integrated out)
+        num_samples (int): the number of samples
+        dimension (int): the number of random numbers per sample
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        VarianceResult: the estimate
+    """
+    return crude(g, num_samples, dimension, rng, method='conditional')
+
+def antithetic(f, num_samples, dimension, rng=None):
+    """ Estimates the mean of f(u) with antithetic pairs u and 1-u.
+
+    Args:
+        f (function): the output of each row of random numbers (vectorized)
+        num_samples (int): the number of samples (function evaluations)
+        dimension (int): the number of random numbers per sample
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        VarianceResult: the estimate (from the mean of each pair)
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    start = time.process_time()
+    u = rng.random((num_samples//2, dimension))
+    result = _result('antithetic', (f(u) + f(1 - u))/2, start)
+    result.num_samples = 2*len(u)
+    return result
+
+def latin_hypercube_sample(num_samples, dimension, rng=None):
+    """ Generates a Latin hypercube sample in the unit hypercube.
+
+    Args:
+        num_samples (int): the number of samples
+        dimension (int): the number of random numbers per sample
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        numpy.ndarray: the random numbers (one row per sample)
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    # one random permutation of the intervals per dimension
+    intervals = np.argsort(rng.random((dimension, num_samples)), axis=1).T
+    return (intervals + rng.random((num_samples, dimension)))/num_samples
+
+def latin_hypercube(f, num_samples, dimension, rng=None, num_batches=10):
+    """ Estimates the mean of f(u) with Latin hypercube sampling.
+
+    Args:
+        f (function): the output of each row of random numbers (vectorized)
+        num_samples (int): the number of samples
+        dimension (int): the number of random numbers per sample
+        rng (numpy.random.Generator): the random number generator
+        num_batches (int): the number of independent Latin hypercube samples
+            to estimate the standard error
+
+    Returns:
+        VarianceResult: the estimate
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    start = time.process_time()
+    batch_size = num_samples//num_batches
+    means = [np.mean(f(latin_hypercube_sample(batch_size, dimension, rng)))
+             for batch in range(num_batches)]
+    result = _result('latin hypercube', means, start)
+    result.num_samples = batch_size*num_batches
+    return result
+
+def stratified(f, num_samples, dimension, rng=None, num_strata=None, strata_dimensions=1):
+    """ Estimates the mean of f(u) with stratified sampling.
+
+    The first dimensions are divided into equal intervals, so each of the
+    num_strata**strata_dimensions strata has equal probability and the same
+    number of samples (proportional allocation).
+
+    Args:
+        f (function): the output of each row of random numbers (vectorized)
+        num_samples (int): the number of samples
+        dimension (int): the number of random numbers per sample
+        rng (numpy.random.Generator): the random number generator
+        num_strata (int): the number of intervals per stratified dimension
+            (None for about num_samples/10 strata in total)
+        strata_dimensions (int): the number of stratified dimensions
+
+    Returns:
+        VarianceResult: the estimate
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    start = time.process_time()
+    if num_strata is None:
+        num_strata = max(1, int((num_samples/10)**(1/strata_dimensions)))
+    num_cells = num_strata**strata_dimensions
+    per_cell = num_samples//num_cells
+    if per_cell < 2:
+        raise ValueError('at least two samples per stratum are required')
+    # index of each stratified interval of each sample (cell-major order)
+    cells = np.repeat(np.arange(num_cells), per_cell)
+    u = rng.random((num_cells*per_cell, dimension))
+    for k in range(strata_dimensions):
+        interval = (cells//num_strata**k) % num_strata
+        u[:, k] = (interval + u[:, k])/num_strata
+    values = np.asarray(f(u), dtype=float).reshape(num_cells, per_cell)
+    # each stratum has probability 1/num_cells
+    variance = np.sum(np.var(values, axis=1, ddof=1)/per_cell)/num_cells**2
+    return VarianceResult('stratified', np.mean(values), np.sqrt(variance), len(u),
+                          time.process_time() - start)
+
+def control_variates(values, controls, means, elapsed=0.0, method='control variates'):
+    """ Estimates a mean with control variates.
+
+    The estimate is mean(y) - beta*(mean(c) - E[c]), where the coefficients
+    beta minimizing the variance are estimated by least squares regression
+    of the outputs y on the controls c.
+
+    Args:
+        values (numpy.ndarray): the outputs
+        controls (numpy.ndarray): the controls (one column per control)
+        means (list): the known mean of each control
+        elapsed (float): the computation (CPU) time of the outputs (seconds)
+        method (str): the method name
+
+    Returns:
+        VarianceResult: the estimate (with the coefficients `beta`)
+    """
+    start = time.process_time()
+    values = np.asarray(values, dtype=float)
+    controls = np.asarray(controls, dtype=float).reshape(len(values), -1)
+    deviations = controls - np.asarray(means, dtype=float)
+    # regress the outputs on the control deviations (with an intercept,
+    # which is the control variate estimate)
+    design = np.column_stack((np.ones(len(values)), deviations))
+    coefficients, residuals, rank, singular = np.linalg.lstsq(design, values, rcond=None)
+    errors = values - design.dot(coefficients)
+    dof = len(values) - design.shape[1]
+    std_error = np.sqrt(np.sum(errors**2)/dof/len(values))
+    result = VarianceResult(method, coefficients[0], std_error, len(values),
+                            elapsed + time.process_time() - start)
+    result.beta = coefficients[1:]
+    return result
+
+def replicate_control_variates(replicate, num_runs, metric, controls, first_seed=0):
+    """ Estimates the mean of a replication output with and without controls.
+
+    Args:
+        replicate (function): the replication function called with a seed
+        num_runs (int): the number of replications
+        metric (str): the output name to estimate
+        controls (dict): the known mean of each control output name
+        first_seed (int): the seed of the first replication
+
+    Returns:
+        VarianceResult: the crude estimate
+        VarianceResult: the control variate estimate
+    """
+    start = time.process_time()
+    outputs = [_as_outputs(replicate(seed)) for seed in range(first_seed, first_seed + num_runs)]
+    values = [output[metric] for output in outputs]
+    baseline = _result('crude', values, start)
+    names = sorted(controls)
+    result = control_variates(values, [[output[name] for name in names] for output in outputs],
+                              [controls[name] for name in names], baseline.elapsed)
+    return baseline, result
+
+def compare(results, baseline=None):
+    """ Tabulates the efficiency of variance reduction methods.
+
+    The effective sample size (ESS) of each method is the number of baseline
+    samples with the same variance, so the ESS per CPU-second measures the
+    precision per unit of computation.
+
+    Args:
+        results (list): the results (VarianceResult) of each method
+        baseline (VarianceResult): the baseline (None for the first result)
+
+    Returns:
+        str: the table (with the gain of ESS per CPU-second relative to the
+            baseline)
+    """
+    baseline = results[0] if baseline is None else baseline
+    sample_variance = baseline.std_error**2*baseline.num_samples
+    # a fast method may finish within one tick of the clock
+    baseline_rate = baseline.num_samples/max(baseline.elapsed, CLOCK_RESOLUTION)
+    lines = ['{:<20s}{:>12s}{:>12s}{:>10s}{:>10s}{:>12s}{:>10s}'.format(
+            'method', 'estimate', 'std. error', 'samples', 'time (s)', 'ESS/s', 'gain')]
+    for result in results:
+        rate = result.effective_samples(sample_variance)/max(result.elapsed, CLOCK_RESOLUTION)
+        lines.append('{:<20s}{:>12.6g}{:>12.3g}{:>10d}{:>10.3f}{:>12.3g}{:>10.1f}'.format(
+                result.method, result.estimate, result.std_error, result.num_samples,
+                result.elapsed, rate, rate/baseline_rate))
+    return '\n'.join(lines)
@@ -12,22 +12,16 @@ from __future__ import absolute_import, division, print_function
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
-
-# import the scipy stats package and refer to it as `stats`
-# see http://docs.scipy.org/doc/scipy/reference/stats.html for documentation
-import scipy.stats as stats
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.generators import Triangular
 
 NUM_RUNS = 10000
 NUM_OPPONENTS = 50
 
 #%% Monte Carlo simulation for number of M&Ms
 
-# set the random number generator seed
-np.random.seed(0)
-
 # define a process generator for number of M&Ms in the jar
 def generate_N(size=1):
     # sample the jar volume
@@ -42,51 +36,159 @@ def generate_N(size=1):
     N = 6*V*mu/(np.pi*d**2*t)
     return N.astype(int)
 
-# generate NUM_RUNS samples
-N = generate_N(NUM_RUNS)
-
-# create a histogram to visualize results
-plt.figure()
-plt.hist(N,color='r')
-plt.xlabel('Number of M&Ms in Jar')
-plt.ylabel('Frequency')
-
-# print descriptive statistics
-print('N_bar = {:.0f}'.format(np.mean(N)))
-print('5th percentile = {:.0f}'.format(np.percentile(N,5)))
-print('95th percentile = {:.0f}'.format(np.percentile(N,95)))
+# define process generators for the jar volume, packing factor, average M&M
+# diameter, and average M&M thickness (for variance reduction methods)
+JAR_INPUTS = [Triangular(1890*.98, 1890, 1890*1.02),
+              Triangular(0.55*0.8, 0.55, 0.55*1.2),
+              Triangular(1.4*0.9, 1.4, 1.4*1.1),
+              Triangular(0.6*0.9, 0.6, 0.6*1.1)]
+
+def jar_count(u):
+    """ Computes the number of M&Ms in the jar (vectorized over random numbers).
+
+    Args:
+        u (numpy.ndarray): the random numbers for the volume, packing factor,
+            diameter, and thickness (one row per sample)
+
+    Returns:
+        numpy.ndarray: the number of M&Ms (not rounded down)
+    """
+    V, mu, d, t = [inputs.ppf(u[:,i]) for i, inputs in enumerate(JAR_INPUTS)]
+    return 6*V*mu/(np.pi*d**2*t)
+
+def expected_jar_count(u):
+    """ Computes the mean number of M&Ms given the diameter and thickness.
+
+    The volume and packing factor are independent with symmetric triangular
+    distributions, so their product has the mean of the modes.
+
+    Args:
+        u (numpy.ndarray): the random numbers for the volume and packing factor
+            (ignored), diameter, and thickness (one row per sample)
+
+    Returns:
+        numpy.ndarray: the conditional mean number of M&Ms
+    """
+    d = JAR_INPUTS[2].ppf(u[:,2])
+    t = JAR_INPUTS[3].ppf(u[:,3])
+    return 6*1890*0.55/(np.pi*d**2*t)
+
+def run_jar(seed, num_runs=NUM_RUNS):
+    """ Generates samples of the number of M&Ms in the jar.
+
+    Args:
+        seed (int): the random number seed
+        num_runs (int): the number of samples
+
+    Returns:
+        dict: the summary outputs (mean, 5th and 95th percentiles)
+        dict: the traces (samples)
+    """
+    # set the random number generator seed
+    np.random.seed(seed)
+    # generate num_runs samples
+    N = generate_N(num_runs)
+    summary = {'N_bar': np.mean(N), 'p5': np.percentile(N,5),
+               'p95': np.percentile(N,95)}
+    return summary, {'N': N}
 
 #%% Monte Carlo simulation for probability of winning (simple)
 
-# define the space of alternatives
-x = np.arange(0,2500,5)
-# define the outcomes (number of wins)
-w = np.zeros(np.size(x))
+def find_winners(x, num_opponents=NUM_OPPONENTS):
+    """ Samples one contest and finds the winning alternatives.
 
-# iterate over each run
-for run in range(NUM_RUNS):
-    # set the random number generator seed
-    np.random.seed(run)
+    Args:
+        x (numpy.ndarray): the alternatives (guesses)
+        num_opponents (int): the number of opponents
+
+    Returns:
+        numpy.ndarray: True for each winning alternative
+    """
     # generate a true number of M&Ms
     N_star = generate_N()
     # sample the opponents' guesses from a triangular distribution
-    y = np.random.triangular(500, 1600, 2500, NUM_OPPONENTS)
-    
+    y = np.random.triangular(500, 1600, 2500, num_opponents)
+
     if np.sum(y[y<=N_star]) > 0:
         # if at least one opponent has a winning choice
         # a winning alternative must be <= the true number of M&Ms
         # and >= the best opponent's guess
-        winners = np.logical_and(x<=N_star, x>=np.max(y[y<=N_star]))
+        return np.logical_and(x<=N_star, x>=np.max(y[y<=N_star]))
     else:
         # otherwise a winning alternative must be <= the true number of M&Ms
-        winners = x<=N_star
-    
-    # if any alternative is a winner, record the outcomes
-    if np.any(winners):
-        w[winners] += 1
-
-# plot a distribution of the probability of an alternative winning
-plt.figure()
-plt.plot(x,w/NUM_RUNS,'-r')
-plt.xlabel('Guess of Number of M&Ms in Jar')
-plt.ylabel('Probability of Winning')
\ No newline at end of file
+        return x<=N_star
+
+def run_contest(seed, guess=1500, num_opponents=NUM_OPPONENTS):
+    """ Runs one contest with a single guess.
+
+    Args:
+        seed (int): the random number seed
+        guess (int): the guess of the number of M&Ms in the jar
+        num_opponents (int): the number of opponents
+
+    Returns:
+        dict: the summary outputs (1 if the guess wins, otherwise 0)
+        dict: the traces (none)
+    """
+    # set the random number generator seed
+    np.random.seed(seed)
+    return {'win': int(find_winners(np.array([guess]), num_opponents)[0])}, {}
+
+def run_guesses(num_runs=NUM_RUNS, num_opponents=NUM_OPPONENTS):
+    """ Estimates the probability of winning for each guess (alternative).
+
+    Args:
+        num_runs (int): the number of runs (seeds 0 to num_runs-1)
+        num_opponents (int): the number of opponents
+
+    Returns:
+        dict: the summary outputs (best guess and its probability of winning)
+        dict: the traces (alternatives and probabilities of winning)
+    """
+    # define the space of alternatives
+    x = np.arange(0,2500,5)
+    # define the outcomes (number of wins)
+    w = np.zeros(np.size(x))
+
+    # iterate over each run
+    for run in range(num_runs):
+        # set the random number generator seed
+        np.random.seed(run)
+        # find the winning alternatives for this run
+        winners = find_winners(x, num_opponents)
+        # if any alternative is a winner, record the outcomes
+        if np.any(winners):
+            w[winners] += 1
+
+    summary = {'best_guess': x[np.argmax(w)], 'p_win': np.max(w)/num_runs}
+    return summary, {'x': x, 'p': w/num_runs}
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # generate NUM_RUNS samples with seed 0
+    summary, traces = run_jar(0)
+    N = traces['N']
+
+    # create a histogram to visualize results
+    plt.figure()
+    plt.hist(N,color='r')
+    plt.xlabel('Number of M&Ms in Jar')
+    plt.ylabel('Frequency')
+
+    # print descriptive statistics
+    print('N_bar = {:.0f}'.format(np.mean(N)))
+    print('5th percentile = {:.0f}'.format(np.percentile(N,5)))
+    print('95th percentile = {:.0f}'.format(np.percentile(N,95)))
+
+    # estimate the probability of winning for each alternative
+    summary, traces = run_guesses()
+    x, w = traces['x'], traces['p']*NUM_RUNS
+
+    # plot a distribution of the probability of an alternative winning
+    plt.figure()
+    plt.plot(x,w/NUM_RUNS,'-r')
+    plt.xlabel('Guess of Number of M&Ms in Jar')
+    plt.ylabel('Probability of Winning')
\ No newline at end of file
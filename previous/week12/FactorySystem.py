@@ -15,13 +15,21 @@ import simpy
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.cache import ReplicationCache
+from sys611.fleet import Fleet
+from sys611.generators import Exponential, Uniform
+from sys611.ledger import Ledger
+from sys611.profiling import Profile
+from sys611.rare import TiltedUniform
+from sys611.sequential import run_until_precision
+from sys611.trace import EVENTS, OFF, Tracer
 
 #%% SECTION TO CONFIGURE SIMULATION
 
-# number of simulation runs to perform
+# number of simulation runs to perform (maximum if REL_PRECISION is set)
 NUM_RUNS = 1
 # simulation duration (hours)
 SIM_DURATION = 5*8*52
@@ -29,29 +37,98 @@ SIM_DURATION = 5*8*52
 NUM_SPARES = 20
 # number of repairers to hire (R)
 NUM_REPAIRERS = 3
+# number of machines
+NUM_MACHINES = 50
+# schedule all breakdowns from one calendar (see `sys611.fleet`) rather than
+# one process per machine (for large numbers of machines)
+USE_FLEET = False
+# trace process events (only for a single run of this script), with the
+# number of spares available after each event
+TRACE = Tracer({'break': 'machine {entity} broke at {time:.2f} ({spares:.0f} spares available)',
+                'replace': 'machine {entity} replaced at {time:.2f}',
+                'repair': 'repair complete at {time:.2f} ({spares:.0f} spares available)'},
+               state=['spares'], level=EVENTS if NUM_RUNS <= 1 and __name__ == '__main__' else OFF)
+# profile of process steps (e.g. `Profile()`, see `sys611.profiling`) to print
+# a summary table and write folded stacks for flame graphs, or None
+PROFILE = None
+# re-use stored results for previously-simulated configurations
+USE_CACHE = True
+# relative precision (95% confidence interval half-width divided by mean)
+# to stop replications early, or None to perform exactly NUM_RUNS runs
+REL_PRECISION = None
+# number of parallel worker processes to perform replications
+NUM_WORKERS = 1
 
 #%% SECTION TO DEFINE SIMULATION
     
-def factory_run(env, repairers, spares):
-    """ Process to run this simulation. 
+def tilted(env, generator, low, high):
+    """ Draws a uniform variate from a tilted generator while tilting is active.
+
+    Args:
+        env (simpy.Environment): the simulation environment
+        generator (TiltedUniform): the tilted generator (None if not tilted)
+        low (float): the lower bound of the original distribution
+        high (float): the upper bound of the original distribution
+
+    Returns:
+        float: the variate
+    """
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global log_weight
+
+    if generator is None or env.now >= tilt_until:
+        return np.random.uniform(low, high)
+    x = generator.sample()
+    # accumulate the log likelihood ratio of the original and tilted densities
+    log_weight += float(generator.log_likelihood_ratio(x))
+    return x
+
+def factory_run(env, repairers, spares, num_machines, use_fleet, markov=False):
+    """ Starts this simulation (costs accrue in the ledger without a process).
         
     Args:
         env (simpy.Environment): the simulation environment
         repairers (simpy.Resource): the repairers resource
         spares (simpy.Container): the spares container
+        num_machines (int): the number of machines
+        use_fleet (bool): True to schedule breakdowns from one calendar
+        markov (bool): True for exponential breakdown and repair times with
+            the same means (requires the fleet)
     """
     # define global variables for inter-process communication
     # note: this is a bad practice; however, is OK in this small script
-    global cost
-    cost = 0
+    global ledger, num_waiting, stockout_start, max_stockout, fleet
+    # create the cost streams (hourly costs): daily wages of repairers and
+    # daily cost of spares purchased, out of service machines, and the spares
+    # available (no cost, only recorded for the observed traces)
+    ledger = Ledger(env)
+    ledger.add_stream('repairers', 3.75, repairers.capacity)
+    ledger.add_stream('spares', 30/8, spares.capacity)
+    ledger.add_stream('downtime', 20)
+    ledger.add_stream('available', level=spares.level)
+    num_waiting = 0
+    stockout_start = 0.0
+    max_stockout = 0.0
     
-    # launch the 50 machine processes
-    for i in range(50):
-        env.process(operate_machine(env, i+1, repairers, spares))
-    # update the daily costs each day
-    while True:
-        cost += 3.75*8*repairers.capacity + 30*spares.capacity
-        yield env.timeout(8.0)
+    if use_fleet:
+        # launch the fleet process which dispatches all breakdowns
+        if markov:
+            # the Markov model of the factory (see `sys611.repair`)
+            lifetime, repair_time = Exponential(1/157), Exponential(1/7)
+        else:
+            lifetime, repair_time = Uniform(132, 182), Uniform(4, 10)
+        fleet = Fleet(env, num_machines, lifetime, repair_time, repairers, spares,
+                      on_break=lambda machine: machine_broken(env, machine+1, spares),
+                      on_replace=lambda machine, time_broken: machine_replaced(
+                              env, machine+1, spares),
+                      on_repair=lambda: machine_repaired(env, spares))
+        env.process(fleet.run())
+    else:
+        # launch the machine processes
+        fleet = None
+        for i in range(num_machines):
+            env.process(operate_machine(env, i+1, repairers, spares))
     
 def operate_machine(env, machine, repairers, spares):
     """ Process to operate a machine.
@@ -62,26 +139,72 @@ def operate_machine(env, machine, repairers, spares):
         repairers (simpy.Resource): the repairers resource
         spares (simpy.Container): the spares container
     """
-    # define global variables for inter-process communication
-    # note: this is a bad practice; however, is OK in this small script
-    global cost
-    
+    # only tilt the first breakdown (all machines start new, so the first
+    # breakdowns of all machines cluster together)
+    generator = breakdown_generator
     while True:
         # wait until the machine breaks
-        yield env.timeout(np.random.uniform(132,182))
-        time_broken = env.now
-        if NUM_RUNS <= 1:
-            print('machine {} broke at {:.2f} ({} spares available)'.format(
-                    machine, time_broken, spares.level))
+        yield env.timeout(tilted(env, generator, 132, 182))
+        generator = None
+        machine_broken(env, machine, spares)
         # launch the repair process
         env.process(repair_machine(env, repairers, spares))
         # wait for a spare to become available
         yield spares.get(1)
-        time_replaced = env.now
-        if NUM_RUNS <= 1:
-            print('machine {} replaced at {:.2f}'.format(machine, time_replaced))
-        # update the cost for being out of service
-        cost += 20*(time_replaced-time_broken)
+        machine_replaced(env, machine, spares)
+
+def machine_broken(env, machine, spares):
+    """ Accounts a machine breakdown.
+
+    Args:
+        env (simpy.Environment): the simulation environment
+        machine (int): the machine number
+        spares (simpy.Container): the spares container
+    """
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global num_waiting, stockout_start
+
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, machine, 'break', spares.level)
+    # accrue the cost for being out of service (machines waiting for spares)
+    num_waiting += 1
+    ledger.set_level('downtime', num_waiting)
+    # record the start of a stockout
+    if num_waiting == 1:
+        stockout_start = env.now
+
+def machine_replaced(env, machine, spares):
+    """ Accounts the replacement of a broken machine with a spare.
+
+    Args:
+        env (simpy.Environment): the simulation environment
+        machine (int): the machine number
+        spares (simpy.Container): the spares container
+    """
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global num_waiting, max_stockout
+
+    # stop the cost for being out of service and record the end of a stockout
+    num_waiting -= 1
+    ledger.set_level('downtime', num_waiting)
+    ledger.set_level('available', spares.level)
+    if num_waiting == 0:
+        max_stockout = max(max_stockout, env.now - stockout_start)
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, machine, 'replace', spares.level)
+
+def machine_repaired(env, spares):
+    """ Accounts a repaired machine put back in the spares pool.
+
+    Args:
+        env (simpy.Environment): the simulation environment
+        spares (simpy.Container): the spares container
+    """
+    ledger.set_level('available', spares.level)
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, -1, 'repair', spares.level)
           
 def repair_machine(env, repairers, spares):
     """ Process to repair a machine. 
@@ -95,80 +218,155 @@ def repair_machine(env, repairers, spares):
         # wait for a repairer to become available
         yield request
         # perform the repair
-        yield env.timeout(np.random.uniform(4,10))
+        yield env.timeout(tilted(env, repair_generator, 4, 10))
         # put the machine back in the spares pool
         yield spares.put(1)
-        if NUM_RUNS <= 1:
-            print('repair complete at {:.2f} ({} spares available)'.format(
-                    env.now, spares.level))
+        machine_repaired(env, spares)
+
+def run_factory(seed, num_repairers=NUM_REPAIRERS, num_spares=NUM_SPARES,
+                sim_duration=SIM_DURATION, breakdown_tilt=0.0, repair_tilt=0.0,
+                tilt_duration=SIM_DURATION, stockout_level=8.0,
+                num_machines=NUM_MACHINES, use_fleet=USE_FLEET, markov=False):
+    """ Runs one replication of the factory simulation.
 
-def observe(env, spares):
-    """ Process to observe the factory during a simulation.
-    
     Args:
-        env (simpy.Environment): the simulation environment
-        factory (Factory): the factory
+        seed (int): the random number seed
+        num_repairers (int): the number of repairers to hire (R)
+        num_spares (int): the number of spares to purchase (S)
+        sim_duration (float): the simulation duration (hours)
+        breakdown_tilt (float): the exponential tilting parameter of the
+            first breakdown times (negative for earlier breakdowns) for
+            importance sampling (see `sys611.rare`)
+        repair_tilt (float): the exponential tilting parameter of repair
+            times (positive for longer repairs)
+        tilt_duration (float): the time until which repair times are tilted
+            (hours)
+        stockout_level (float): the stockout duration of the rare event `hit`
+            (a stockout is longer than this level)
+        num_machines (int): the number of machines
+        use_fleet (bool): True to schedule all breakdowns from one calendar
+            (see `sys611.fleet`; tilting is not supported)
+        markov (bool): True to draw exponential breakdown and repair times
+            with the same means, so the expected cost is known exactly from
+            the Markov model (see `sys611.repair`; requires the fleet)
+
+    Returns:
+        dict: the summary outputs (total cost, average spares available,
+            longest stockout, rare-event indicator, and log likelihood ratio
+            of the tilting)
+        dict: the observed traces (hourly time, cost, and spares available)
     """
-    while True:
-        obs_time.append(env.now)
-        obs_cost.append(cost)
-        obs_spares.append(spares.level)
-        yield env.timeout(1.0)
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global log_weight, tilt_until, breakdown_generator, repair_generator
+
+    if use_fleet and (breakdown_tilt != 0 or repair_tilt != 0):
+        raise ValueError('tilting is not supported with the fleet scheduler')
+    if markov and not use_fleet:
+        raise ValueError('the Markov model requires the fleet scheduler')
+
+    log_weight = 0.0
+
+    # create tilted generators for importance sampling (None if not tilted)
+    tilt_until = tilt_duration
+    breakdown_generator = TiltedUniform(132, 182, breakdown_tilt) if breakdown_tilt != 0 else None
+    repair_generator = TiltedUniform(4, 10, repair_tilt) if repair_tilt != 0 else None
 
-#%% SECTION TO RUN ANALYSIS
-        
-# array to store outputs
-COST = []
-
-for i in range(NUM_RUNS):
-    # arrays to record data
-    obs_time = []
-    obs_cost = []
-    obs_spares = []
-    
     # set the random number seed
-    np.random.seed(i)
-    
-    # create the simpy environment
-    env = simpy.Environment()
+    np.random.seed(seed)
+
+    # create the simpy environment (profiled if enabled)
+    env = PROFILE.environment() if PROFILE is not None else simpy.Environment()
     # create the resources
-    repairers = simpy.Resource(env, capacity=NUM_REPAIRERS) 
-    spares = simpy.Container(env, init=NUM_SPARES, capacity=NUM_SPARES)
-    # add the factory run process
-    env.process(factory_run(env, repairers, spares))
-    # add the observation process
-    env.process(observe(env, spares))
+    repairers = simpy.Resource(env, capacity=num_repairers)
+    spares = simpy.Container(env, init=num_spares, capacity=num_spares)
+    if PROFILE is not None:
+        # record machines waiting for repairers and spares
+        env.watch('repairers', repairers)
+        env.watch('spares', spares)
+    # start the factory
+    factory_run(env, repairers, spares, num_machines, use_fleet, markov)
     # run simulation
-    env.run(until=SIM_DURATION)
-    # record the final observed cost
-    COST.append(obs_cost[-1])
+    env.run(until=sim_duration)
+
+    # include a stockout in progress at the end of the simulation
+    longest = max(max_stockout, env.now - stockout_start if num_waiting > 0 else 0)
+    # reconstruct the hourly observations from the ledger
+    obs_time = np.arange(0, sim_duration, 1.0)
+    obs_spares = ledger.levels(obs_time, 'available')
+    summary = {'cost': ledger.total(), 'spares': np.mean(obs_spares),
+               'max_stockout': longest, 'hit': int(longest > stockout_level),
+               'log_weight': log_weight}
+    traces = {'time': obs_time, 'cost': ledger.trajectory(obs_time), 'spares': obs_spares}
+    return summary, traces
+
+if USE_CACHE:
+    # wrap the replication function to re-use stored results
+    run_factory = ReplicationCache().memoize(run_factory)
+
+#%% SECTION TO RUN ANALYSIS
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    if REL_PRECISION is not None:
+        # perform replications (at most NUM_RUNS) until the joint 95% confidence
+        # intervals for cost and average spares meet the relative precision
+        result = run_until_precision(run_factory, metrics=['cost', 'spares'],
+                                     rel_precision=REL_PRECISION, max_runs=NUM_RUNS,
+                                     workers=NUM_WORKERS)
+        print(result)
+        # array to store outputs
+        COST = list(result.samples['cost'])
+    else:
+        # array to store outputs
+        COST = []
+
+        for i in range(NUM_RUNS):
+            # run the replication with seed i (simulated, not stored, if traced
+            # or profiled)
+            TRACE.clear()
+            replicate = (run_factory if TRACE.level == OFF and PROFILE is None
+                         else getattr(run_factory, '__wrapped__', run_factory))
+            summary, traces = replicate(i)
+            # record the final observed cost
+            COST.append(summary['cost'])
+            # print out the traced process events
+            for line in TRACE.trace().lines():
+                print(line)
     
-    if NUM_RUNS <= 1:
-        # output the total cost
-        print('Total cost: {:.2f}'.format(obs_cost[-1]))
+            if NUM_RUNS <= 1:
+                # output the total cost
+                print('Total cost: {:.2f}'.format(summary['cost']))
         
-        # plot the number of spares available
-        plt.figure()
-        plt.step(obs_time, obs_spares, where='post')
-        plt.xlabel('Time (hour)')
-        plt.ylabel('Number Spares Available')
+                # plot the number of spares available
+                plt.figure()
+                plt.step(traces['time'], traces['spares'], where='post')
+                plt.xlabel('Time (hour)')
+                plt.ylabel('Number Spares Available')
         
-        # plot the total cost accumulation
-        plt.figure()
-        plt.step(obs_time, obs_cost, where='post')
-        plt.xlabel('Time (hour)')
-        plt.ylabel('Total Cost')
+                # plot the total cost accumulation
+                plt.figure()
+                plt.plot(traces['time'], traces['cost'])
+                plt.xlabel('Time (hour)')
+                plt.ylabel('Total Cost')
 
-# print final results to console
-print('Factory costs for N={:} runs with R={:} repairers and S={:} spares:'.format(
-        NUM_RUNS, NUM_REPAIRERS, NUM_SPARES))
-print('\n'.join('{:.2f}'.format(i) for i in COST))
+    # print final results to console
+    print('Factory costs for N={:} runs with R={:} repairers and S={:} spares:'.format(
+            len(COST), NUM_REPAIRERS, NUM_SPARES))
+    print('\n'.join('{:.2f}'.format(i) for i in COST))
+    if PROFILE is not None:
+        # print the profile (of replications in this process) to console
+        print(PROFILE)
+        PROFILE.write_folded('factory.folded')
 
-#%% SECTION TO WRITE RESULTS TO CSV FILE
+    #%% SECTION TO WRITE RESULTS TO CSV FILE
 
-import csv
+    import csv
 
-with open('factory.csv', 'w') as output:
-    writer = csv.writer(output)
-    for sample in COST:
-        writer.writerow([sample])
\ No newline at end of file
+    with open('factory.csv', 'w') as output:
+        writer = csv.writer(output)
+        for sample in COST:
+            writer.writerow([sample])
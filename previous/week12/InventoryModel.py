@@ -15,9 +15,13 @@ import simpy
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.arrivals import FourierRate, PiecewiseConstantRate
+from sys611.ledger import Ledger
+from sys611.profiling import Profile
+from sys611.trace import DETAILS, EVENTS, OFF, Tracer
 
 #%% SECTION TO CONFIGURE SIMULATION
 
@@ -29,6 +33,27 @@ SIM_DURATION = 100
 ORDER_THRESHOLD = 10
 # inventory level to order up to (S)
 ORDER_UP_TO = 30
+# profile of process steps (e.g. `Profile()`, see `sys611.profiling`) to print
+# a summary table and write folded stacks for flame graphs, or None
+PROFILE = None
+# trace process events (orders and deliveries) and details (customers) only
+# for a single run of this script, with the quantity and inventory level
+TRACE = Tracer({'demand': 'Cust {entity} demands {quantity:.0f} at t={time:.2f}',
+                'buy': 'Cust {entity} buys {quantity:.0f} at t={time:.2f} ({inventory:.0f} remaining)',
+                'order': 'order {quantity:.0f} at t={time}',
+                'delivery': 'delivery of {quantity:.0f} at t={time:.2f}'},
+               state=['quantity', 'inventory'],
+               level=DETAILS if NUM_RUNS <= 1 and __name__ == '__main__' else OFF)
+
+# define arrival rate profiles relative to the average arrival rate
+# (None for a constant rate)
+ARRIVAL_PROFILES = {
+    'constant': None,
+    # busy weekdays and quiet weekends (a 7-day period)
+    'weekday': PiecewiseConstantRate([0, 5], [1.2, 0.5], period=7),
+    # smooth weekly cycle peaking early in the week
+    'weekly': FourierRate(1.0, [0.3, 0.1], [0.4, 0.0], period=7),
+}
 
 #%% SECTION TO DEFINE SIMULATION
 
@@ -40,50 +65,60 @@ demand_lb = 1 # products per customer
 demand_ub = 4 # products per customer
 delivery_delay = 2 # days
 
-def warehouse_run(env, order_threshold, order_up_to):
+def warehouse_run(env, order_threshold, order_up_to, rate_function=None):
     """ Process to run this simulation. 
     
     Args:
         env (simpy.Environment): the simulation environment
         order_threshold (int): the threshold inventory level to place order
         order_up_to (int): the target inventory level
+        rate_function (RateFunction): the time-varying arrival rate (customers/
+            day) of a non-homogeneous Poisson process (None for arrival_rate)
     """
     # define global variables for inter-process communication
     # note: this is a bad practice; however, is OK in this small script
-    global inventory, balance, num_ordered
+    global inventory, ledger, num_ordered
     
     # initialize the customer counter
     i = 0
     # initialize the state variables
     inventory = order_up_to
-    balance = 0
     num_ordered = 0
+    # create the cost streams: holding costs (accrued at a rate proportional
+    # to the inventory level), sales (negative costs), and orders
+    ledger = Ledger(env)
+    ledger.add_stream('holding', holding_cost, inventory)
+    ledger.add_stream('sales')
+    ledger.add_stream('orders')
+    if rate_function is not None:
+        # generate arrival times one week (period) at a time
+        arrivals = rate_function.stream(env.now)
     
     # enter infinite loop
     while True:
         # wait for the next arrival
-        interarrival = np.random.exponential(1./arrival_rate)
+        if rate_function is None:
+            interarrival = np.random.exponential(1./arrival_rate)
+        else:
+            interarrival = next(arrivals) - env.now
         yield env.timeout(interarrival)
-        # subtract holding costs
-        balance -= holding_cost*inventory*interarrival
         # increment a counter
         i += 1
-        customer = 'Cust {}'.format(i)
         # generate demand
         demand = np.random.randint(demand_lb, demand_ub+1) 
-        if NUM_RUNS <= 1:
-            print('{} demands {} at t={:.2f}'.format(customer, demand, env.now))
+        if TRACE.level >= DETAILS:
+            TRACE.record(env.now, i, 'demand', demand, inventory)
         # handle demands
         if inventory > demand:
             num_sold = demand
         else:
             num_sold = inventory
-        balance += product_price*num_sold
-        inventory -= num_sold
         if num_sold > 0:
-            if NUM_RUNS <= 1:
-                print('{} buys {} at t={:.2f} ({} remaining)'.format(
-                        customer, demand, env.now, inventory))
+            ledger.charge('sales', -product_price*num_sold)
+            inventory -= num_sold
+            ledger.set_level('holding', inventory)
+            if TRACE.level >= DETAILS:
+                TRACE.record(env.now, i, 'buy', demand, inventory)
         # check for order
         if inventory < order_threshold and num_ordered == 0:
             quantity = order_up_to - inventory
@@ -98,78 +133,104 @@ def handle_order(env, quantity):
     """
     # define global variables to allow inter-process communication
     # note: this is a bad practice; however, is OK in this small script
-    global inventory, balance, num_ordered
+    global inventory, num_ordered
     
-    if NUM_RUNS <= 1:
-        print('order {} at t={}'.format(quantity, env.now))
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, -1, 'order', quantity, inventory)
     num_ordered = quantity
-    balance -= product_cost*quantity
+    ledger.charge('orders', product_cost*quantity)
     
     # wait for the delivery to arrive
     yield env.timeout(delivery_delay)
     
-    if NUM_RUNS <= 1:
-        print('delivery of {} at t={:.2f}'.format(quantity, env.now))
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, -1, 'delivery', quantity, inventory)
     inventory += quantity
+    ledger.set_level('holding', inventory)
     num_ordered = 0
 
-def observe(env):
-    """ Process to observe the warehouse inventory during a simulation.
-    
+def run_warehouse(seed, order_threshold=ORDER_THRESHOLD, order_up_to=ORDER_UP_TO,
+                  sim_duration=SIM_DURATION, arrival_profile='constant'):
+    """ Runs one replication of the inventory simulation.
+
     Args:
-        env (simpy.Environment): the simulation environment
-        warehouse (Warehouse): the warehouse
+        seed (int): the random number seed
+        order_threshold (int): the threshold inventory level to place order (Q)
+        order_up_to (int): the target inventory level (S)
+        sim_duration (float): the simulation duration (days)
+        arrival_profile (str): the name of the arrival rate profile (see
+            ARRIVAL_PROFILES)
+
+    Returns:
+        dict: the summary outputs (final net revenue balance)
+        dict: the observed traces (time, inventory level, and net revenue
+            balance every 0.1 day)
     """
-    while True:
-        # record the observation time and queue length
-        obs_time.append(env.now)
-        inventory_level.append(inventory)
-        # wait for the next minute
-        yield env.timeout(0.1)
-
-#%% SECTION TO RUN ANALYSIS
+    # scale the arrival rate profile to the average arrival rate
+    profile = ARRIVAL_PROFILES[arrival_profile]
+    rate_function = profile.scaled(arrival_rate) if profile is not None else None
 
-# array to store outputs
-BALANCE = []
-
-for i in range(NUM_RUNS):
     # set the random number seed
-    np.random.seed(i)
-    
-    # arrays to record data
-    obs_time = []
-    inventory_level = []
-    
-    # create the simpy environment
-    env = simpy.Environment()
+    np.random.seed(seed)
+
+    # create the simpy environment (profiled if enabled)
+    env = PROFILE.environment() if PROFILE is not None else simpy.Environment()
     # add the warehouse run process
-    env.process(warehouse_run(env, ORDER_THRESHOLD, ORDER_UP_TO))
-    # add the observation process
-    env.process(observe(env))
+    env.process(warehouse_run(env, order_threshold, order_up_to, rate_function))
     # run the simulation
-    env.run(until=SIM_DURATION)
-    # record the final observed net revenue
-    BALANCE.append(balance)
-    
-    if NUM_RUNS <= 1:
-        print('Final balance: {:.2f}'.format(balance))
-        
-        # plot the inventory over time
-        plt.figure()
-        plt.step(obs_time, inventory_level, where='post')
-        plt.xlabel('Time (day)')
-        plt.ylabel('Inventory Level')
-
-# print final results to console
-print('Net revenue balance for N={:} runs with Q={:} and S={:}:'.format(
-        NUM_RUNS, ORDER_THRESHOLD, ORDER_UP_TO))
-print('\n'.join('{:.2f}'.format(i) for i in BALANCE))
+    env.run(until=sim_duration)
 
-#%% SECTION TO WRITE RESULTS TO CSV FILE
+    # reconstruct the observations from the ledger (the balance is the
+    # negative total cost)
+    obs_time = np.arange(0, sim_duration, 0.1)
+    summary = {'balance': -ledger.total()}
+    traces = {'time': obs_time, 'inventory': ledger.levels(obs_time, 'holding'),
+              'balance': -ledger.trajectory(obs_time)}
+    return summary, traces
 
-import csv
+#%% SECTION TO RUN ANALYSIS
 
-with open('inventory.csv', 'w') as output:
-    writer = csv.writer(output)
-    for sample in BALANCE:
-        writer.writerow([sample])
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # array to store outputs
+    BALANCE = []
+
+    for i in range(NUM_RUNS):
+        # run the replication with seed i
+        TRACE.clear()
+        summary, traces = run_warehouse(i)
+        # record the final observed net revenue
+        BALANCE.append(summary['balance'])
+        # print out the traced process events
+        for line in TRACE.trace().lines():
+            print(line)
+    
+        if NUM_RUNS <= 1:
+            print('Final balance: {:.2f}'.format(summary['balance']))
+        
+            # plot the inventory over time
+            plt.figure()
+            plt.step(traces['time'], traces['inventory'], where='post')
+            plt.xlabel('Time (day)')
+            plt.ylabel('Inventory Level')
+
+    # print final results to console
+    print('Net revenue balance for N={:} runs with Q={:} and S={:}:'.format(
+            NUM_RUNS, ORDER_THRESHOLD, ORDER_UP_TO))
+    print('\n'.join('{:.2f}'.format(i) for i in BALANCE))
+    if PROFILE is not None:
+        # print the profile to console
+        print(PROFILE)
+        PROFILE.write_folded('inventory.folded')
+
+    #%% SECTION TO WRITE RESULTS TO CSV FILE
+
+    import csv
+
+    with open('inventory.csv', 'w') as output:
+        writer = csv.writer(output)
+        for sample in BALANCE:
+            writer.writerow([sample])
@@ -15,9 +15,18 @@ import simpy
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.analysis import running_mean
+from sys611.arrivals import PiecewiseLinearRate
+from sys611.cache import ReplicationCache
+from sys611.entities import EntityTable, ImpatientPool, ServerPool
+from sys611.generators import Exponential, Uniform, Weibull
+from sys611.ledger import Ledger
+from sys611.profiling import Profile
+from sys611.rare import TiltedExponential
+from sys611.trace import EVENTS, OFF, Tracer
 
 #%% SECTION TO CONFIGURE SIMULATION
 
@@ -25,61 +34,256 @@ import matplotlib.pyplot as plt
 NUM_RUNS = 1
 # simulation duration (minutes)
 SIM_DURATION = 100
+# cost of each server (dollars per minute)
+SERVER_COST = 0.25
+# trace process events (only for a single run of this script), with the
+# queue length after each event
+TRACE = Tracer({'enter': 'Cust {entity} enters cafe at t={time:.2f}',
+                'service': 'Cust {entity} gets service at t={time:.2f}',
+                'depart': 'Cust {entity} departs cafe at t={time:.2f}',
+                'balk': 'Cust {entity} balks at t={time:.2f}',
+                'renege': 'Cust {entity} reneges at t={time:.2f}'},
+               state=['queue'], level=EVENTS if NUM_RUNS <= 1 and __name__ == '__main__' else OFF)
+# profile of process steps (e.g. `Profile()`, see `sys611.profiling`) to print
+# a summary table and write folded stacks for flame graphs, or None
+PROFILE = None
+# re-use stored results for previously-simulated configurations
+USE_CACHE = True
+
+# define arrival rate profiles relative to the average arrival rate
+# (None for a constant rate)
+daily = PiecewiseLinearRate([0, 60, 120, 240, 300, 360], [0.5, 2.0, 0.8, 1.6, 0.8, 0.5],
+                            period=480)
+ARRIVAL_PROFILES = {
+    'constant': None,
+    # morning and lunch rush hours in an 8-hour (480 minute) business day
+    'daily': daily.scaled(480/daily.cumulative(480)),
+}
+
+# define patience distributions (the longest time customers wait in the queue)
+# with a mean of one minute, scaled by the mean patience
+PATIENCE_DISTRIBUTIONS = {
+    'exponential': Exponential(1.0),
+    'uniform': Uniform(0.0, 2.0),
+    # customers run out of patience faster the longer they wait
+    'weibull': Weibull(2.0, 2/np.sqrt(np.pi)),
+}
 
 #%% SECTION TO DEFINE SIMULATION
 
-def cafe_run(env, servers, _lambda, _mu):
+def tilted(generator, default, queue):
+    """ Draws a variate from a tilted generator while tilting is active.
+
+    Tilting is active while the queue is at least `tilt_queue_length` and until the
+    queue is longer than `tilt_level` (the rare event). Short queues are not
+    tilted so the simulation still samples many busy periods.
+
+    Args:
+        generator (TiltedExponential): the tilted generator (None if not tilted)
+        default (function): draws a variate from the original distribution
+        queue (int): the current queue length
+
+    Returns:
+        float: the variate
+    """
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global log_weight
+
+    if generator is None or queue < tilt_queue_length or max_queue > tilt_level:
+        return default()
+    x = generator.sample()
+    # accumulate the log likelihood ratio of the original and tilted densities
+    log_weight += float(generator.log_likelihood_ratio(x))
+    return x
+
+def balks(queue, balk_threshold, balk_probability):
+    """ Decides whether an arriving customer balks at the queue.
+
+    Args:
+        queue (int): the current queue length
+        balk_threshold (int): the queue length above which customers balk
+            (None for no balking)
+        balk_probability (float): the probability that a customer balks at a
+            queue longer than the threshold
+
+    Returns:
+        bool: True if the customer balks (does not join the queue)
+    """
+    return balk_threshold is not None and queue > balk_threshold and \
+        np.random.rand() < balk_probability
+
+def cafe_run(env, servers, _lambda, _mu, rate_function=None, patience=None,
+             balk_threshold=None, balk_probability=0.5):
     """ Process for simulating a cafe.
 
     Args:
         env (simpy.Environment): the simulation environment
-        servers (simpy.Resource): the servers resource
+        servers (simpy.Resource or ServerPool): the servers resource (or the
+            server pool of lean customers)
         _lambda (float): the average inter-arrival rate (customers/minute)
         _mu (float): the average service rate (customers/minute)
+        rate_function (RateFunction): the time-varying arrival rate (customers/
+            minute) of a non-homogeneous Poisson process (None for _lambda)
+        patience (function): returns the patience of a customer (minutes)
+            who reneges when it runs out (None for no reneging)
+        balk_threshold (int): the queue length above which arriving customers
+            balk (None for no balking)
+        balk_probability (float): the probability that a customer balks at a
+            queue longer than the threshold
     """
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global max_queue, num_balked
+
+    if rate_function is not None:
+        # generate arrival times one day (period) at a time
+        arrivals = rate_function.stream(env.now)
     # initialize the customer counter
     i = 0
     # enter infinite loop
     while True:
         # wait for the next arrival
-        yield env.timeout(np.random.exponential(1/_lambda))
+        if rate_function is None:
+            yield env.timeout(tilted(arrival_generator,
+                                     lambda: np.random.exponential(1/_lambda),
+                                     len(servers.queue)))
+        else:
+            yield env.timeout(next(arrivals) - env.now)
         # increment a counter
         i += 1
-        # launch the customer process
-        env.process(handle_customer(env, 'Cust {}'.format(i), servers, _mu))
+        if isinstance(servers, ServerPool):
+            # add a lean customer (a table row) to the queue unless it balks
+            if servers.arrive(customers.add(arrival=env.now)):
+                # record the longest queue (only arriving customers increase it)
+                max_queue = max(max_queue, len(servers.queue))
+                if TRACE.level >= EVENTS:
+                    TRACE.record(env.now, i, 'enter', len(servers.queue))
+        elif balks(len(servers.queue), balk_threshold, balk_probability):
+            # record the arrival of a customer which does not join the queue
+            arrival_times.append(env.now)
+            num_balked += 1
+            if TRACE.level >= EVENTS:
+                TRACE.record(env.now, i, 'balk', len(servers.queue))
+        else:
+            # launch the customer process
+            env.process(handle_customer(env, i, servers, _mu, patience))
 
-def handle_customer(env, customer, servers, _mu):
+def handle_customer(env, customer, servers, _mu, patience=None):
     """ Process for simulating a customer.
 
     Args:
         env (simpy.Environment): the simulation environment
-        customer (str): the customer name
+        customer (int): the customer number
         servers (simpy.Resource): the servers resource
         _mu (float): the average service rate (customer/minute)
+        patience (function): returns the patience of the customer (minutes)
+            who reneges when it runs out (None for no reneging)
     """
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global max_queue, reneged
+
     with servers.request() as request:
         arrival_time = env.now
-        if NUM_RUNS <= 1:
-            print('{} enters cafe at t={:.2f}'.format(customer, arrival_time))
-        # wait for the request to be fulfilled
-        yield request
+        arrival_times.append(arrival_time)
+        # record the longest queue (only arriving customers increase it)
+        max_queue = max(max_queue, len(servers.queue))
+        if TRACE.level >= EVENTS:
+            TRACE.record(arrival_time, customer, 'enter', len(servers.queue))
+        if patience is None:
+            # wait for the request to be fulfilled
+            yield request
+        else:
+            # wait for the request to be fulfilled or for the patience to run
+            # out (the timeout stays in the event queue if served first)
+            yield request | env.timeout(patience())
+            if not request.triggered:
+                # leave the queue (the request is cancelled on exit)
+                reneged.append(env.now)
+                if TRACE.level >= EVENTS:
+                    TRACE.record(env.now, customer, 'renege', len(servers.queue))
+                return
         service_time = env.now
         queue_wait.append(service_time - arrival_time)
-        if NUM_RUNS <= 1:
-            print('{} gets service at t={:.2f}'.format(customer, service_time))
+        if TRACE.level >= EVENTS:
+            TRACE.record(service_time, customer, 'service', len(servers.queue))
         # wait for the service to complete
-        yield env.timeout(np.random.exponential(1/_mu))
+        yield env.timeout(tilted(service_generator,
+                                 lambda: np.random.exponential(1/_mu),
+                                 len(servers.queue)))
         depart_time = env.now
-        if NUM_RUNS <= 1:
-            print('{} departs cafe at t={:.2f}'.format(customer, depart_time))
+        service_times.append(depart_time - service_time)
+        if TRACE.level >= EVENTS:
+            TRACE.record(depart_time, customer, 'depart', len(servers.queue))
         total_wait.append(depart_time - arrival_time)
 
+def start_service(env, servers, customer):
+    """ Records the start of service of a lean customer.
+
+    Args:
+        env (simpy.Environment): the simulation environment
+        servers (ServerPool): the server pool
+        customer (int): the customer ID (table row)
+    """
+    customers.set(customer, 'start', env.now)
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, customer + 1, 'service', len(servers.queue))
+
+def renege(servers, customer, time):
+    """ Records the abandonment of a lean customer.
+
+    Args:
+        servers (ImpatientPool): the server pool
+        customer (int): the customer ID (table row)
+        time (float): the time the customer reneged
+    """
+    customers.set(customer, 'renege', time)
+    if TRACE.level >= EVENTS:
+        TRACE.record(time, customer + 1, 'renege', len(servers.queue))
+
+def balk(env, servers, customer):
+    """ Records a lean customer which balks.
+
+    Args:
+        env (simpy.Environment): the simulation environment
+        servers (ImpatientPool): the server pool
+        customer (int): the customer ID (table row)
+    """
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, customer + 1, 'balk', len(servers.queue))
+
+def service_time(servers, _mu, customer):
+    """ Generates the service time of a lean customer.
+
+    Args:
+        servers (ServerPool): the server pool
+        _mu (float): the average service rate (customer/minute)
+        customer (int): the customer ID (table row)
+
+    Returns:
+        float: the service time
+    """
+    return tilted(service_generator, lambda: np.random.exponential(1/_mu), len(servers.queue))
+
+def depart(env, servers, customer):
+    """ Records the departure of a lean customer.
+
+    Args:
+        env (simpy.Environment): the simulation environment
+        servers (ServerPool): the server pool
+        customer (int): the customer ID (table row)
+    """
+    customers.set(customer, 'depart', env.now)
+    if TRACE.level >= EVENTS:
+        TRACE.record(env.now, customer + 1, 'depart', len(servers.queue))
+
 def observe(env, servers):
     """ Process to observe the queue length during a simulation.
 
     Args:
         env (simpy.Environment): the simulation environment
-        servers (simpy.Resource): the servers resource
+        servers (simpy.Resource or ServerPool): the servers resource
     """
     while True:
         # record the observation time and queue length
@@ -88,61 +292,220 @@ def observe(env, servers):
         # wait for the next minute
         yield env.timeout(1.0)
 
-#%% SECTION TO RUN ANALYSIS
+def run_cafe(seed, _lambda=3.0, _mu=4.0, num_servers=1, sim_duration=SIM_DURATION,
+             arrival_profile='constant', arrival_tilt=0.0, service_tilt=0.0,
+             tilt_queue=0, queue_level=20, lean=False, server_cost=SERVER_COST,
+             mean_patience=None, patience='exponential', balk_threshold=None,
+             balk_probability=0.5):
+    """ Runs one replication of the cafe simulation.
+
+    Args:
+        seed (int): the random number seed
+        _lambda (float): the average inter-arrival rate (customers/minute)
+        _mu (float): the average service rate (customers/minute)
+        num_servers (int): the number of servers
+        sim_duration (float): the simulation duration (minutes)
+        arrival_profile (str): the name of the arrival rate profile (see
+            ARRIVAL_PROFILES)
+        arrival_tilt (float): the exponential tilting parameter of inter-
+            arrival times (negative for more frequent arrivals) for importance
+            sampling (see `sys611.rare`), only for a constant arrival rate
+            (a ValueError is raised otherwise)
+        service_tilt (float): the exponential tilting parameter of service
+            times (positive for longer services)
+        tilt_queue (int): the queue length from which draws are tilted
+        queue_level (int): the queue length of the rare event `hit` (the
+            queue is longer than this level); tilting stops after the hit
+        lean (bool): True to store customers as rows of a table served by one
+            process per server (for many concurrent customers), otherwise
+            one process per customer
+        server_cost (float): the cost of each server (dollars/minute)
+        mean_patience (float): the mean patience of customers (minutes) who
+            renege (leave the queue) when it runs out (None for no reneging)
+        patience (str): the name of the patience distribution (see
+            PATIENCE_DISTRIBUTIONS)
+        balk_threshold (int): the queue length above which arriving customers
+            balk (None for no balking)
+        balk_probability (float): the probability that a customer balks at a
+            queue longer than the threshold
+
+    Returns:
+        dict: the summary outputs (average total waiting time, average service
+            and inter-arrival times (e.g. controls for variance reduction),
+            longest queue, rare-event indicator, log likelihood ratio of the
+            tilting, total server cost, and numbers of customers who balked
+            and reneged)
+        dict: the observed traces (queue wait, total wait, time, queue length,
+            and server cost)
+    """
+    # define global variables for inter-process communication
+    # note: this is a bad practice; however, is OK in this small script
+    global queue_wait, total_wait, obs_time, queue_length, arrival_times, service_times
+    global max_queue, log_weight, tilt_queue_length, tilt_level
+    global arrival_generator, service_generator, customers
+    global num_balked, reneged
 
-# array to store outputs
-AVERAGE_WAIT = []
+    if arrival_tilt != 0 and arrival_profile != 'constant':
+        # the likelihood ratio of a tilted time-varying arrival rate is not tracked
+        raise ValueError('arrival tilting requires a constant arrival rate')
 
-for i in range(NUM_RUNS):
     # arrays to record data
     queue_wait = []
     total_wait = []
     obs_time = []
     queue_length = []
+    arrival_times = []
+    service_times = []
+    max_queue = 0
+    log_weight = 0.0
+    num_balked = 0
+    reneged = []
+
+    # create tilted generators for importance sampling (None if not tilted)
+    tilt_queue_length = tilt_queue
+    tilt_level = queue_level
+    arrival_generator = TiltedExponential(_lambda, arrival_tilt) if arrival_tilt != 0 else None
+    service_generator = TiltedExponential(_mu, service_tilt) if service_tilt != 0 else None
+
+    # scale the arrival rate profile to the average arrival rate
+    profile = ARRIVAL_PROFILES[arrival_profile]
+    rate_function = profile.scaled(_lambda) if profile is not None else None
 
     # set the initial seed
-    np.random.seed(i)
+    np.random.seed(seed)
+    # create the patience stream (None if customers never renege)
+    patience_stream = (PATIENCE_DISTRIBUTIONS[patience].stream()
+                       if mean_patience is not None else None)
 
-    # create the simpy environment
-    env = simpy.Environment()
-    # create the servers resource
-    servers = simpy.Resource(env, capacity=1)
+    # create the simpy environment (profiled if enabled)
+    env = PROFILE.environment() if PROFILE is not None else simpy.Environment()
+    # create the cost stream of servers (a fixed rate settled only when queried)
+    ledger = Ledger(env)
+    ledger.add_stream('servers', server_cost, num_servers)
+    if lean:
+        # create the customer table and the server pool
+        customers = EntityTable(['arrival', 'start', 'depart', 'renege'])
+        if patience_stream is None and balk_threshold is None:
+            servers = ServerPool(env, num_servers,
+                                 lambda customer: service_time(servers, _mu, customer),
+                                 lambda customer: start_service(env, servers, customer),
+                                 lambda customer: depart(env, servers, customer))
+        else:
+            # keep the abandonment deadlines beside the queue (no events)
+            servers = ImpatientPool(
+                    env, num_servers, lambda customer: service_time(servers, _mu, customer),
+                    (lambda customer: mean_patience*next(patience_stream))
+                    if patience_stream is not None else None,
+                    (lambda queue: balk_probability if queue > balk_threshold else 0.0)
+                    if balk_threshold is not None else None,
+                    lambda customer: start_service(env, servers, customer),
+                    lambda customer: depart(env, servers, customer),
+                    lambda customer, time: renege(servers, customer, time),
+                    lambda customer: balk(env, servers, customer))
+    else:
+        # create the servers resource
+        servers = simpy.Resource(env, capacity=num_servers)
+        if PROFILE is not None:
+            # record customers waiting for servers
+            env.watch('servers', servers)
     # add the cafe process
-    env.process(cafe_run(env, servers, 3.0, 4.0))
+    env.process(cafe_run(env, servers, _lambda, _mu, rate_function,
+                         (lambda: mean_patience*next(patience_stream))
+                         if patience_stream is not None else None,
+                         balk_threshold, balk_probability))
     # add the observation process
     env.process(observe(env, servers))
     # run the simulation
-    env.run(until=SIM_DURATION)
-    # record the final average waiting time
-    AVERAGE_WAIT.append(np.mean(total_wait))
-
-    if NUM_RUNS <= 1:
-        # create a plot showing the queue length at each time
-        plt.figure()
-        plt.step(obs_time, queue_length, where='post')
-        plt.xlabel('Simulation Time (min)')
-        plt.ylabel('Queue Length')
-
-        # create a plot showing the histogram of waiting time
-        plt.figure()
-        plt.hist(total_wait)
-        plt.xlabel('Total Waiting Time (min)')
-        plt.ylabel('Number of Customers')
-
-        # create a plot showing the average queue length at each time
-        plt.figure()
-        plt.plot(obs_time, np.cumsum(queue_length)/np.arange(1,1+len(queue_length)))
-        plt.xlabel('Simulation Time (min)')
-        plt.ylabel('Average Queue Length')
-
-        # create a plot showing the average wait time (queue and total) at each time
-        plt.figure()
-        plt.plot(1+np.arange(len(queue_wait)), np.cumsum(queue_wait)/np.arange(1,1+len(queue_wait)), label='Wait in Queue')
-        plt.plot(1+np.arange(len(total_wait)), np.cumsum(total_wait)/np.arange(1,1+len(total_wait)), label='Total Wait')
-        plt.xlabel('Customer')
-        plt.ylabel('Average Wait (min)')
-        plt.legend(loc='best')
-
-# print final results to console
-print('Average waiting time for N={:} runs:'.format(NUM_RUNS))
-print('\n'.join('{:.2f}'.format(i) for i in AVERAGE_WAIT))
+    env.run(until=sim_duration)
+
+    if lean:
+        if isinstance(servers, ImpatientPool):
+            # remove the customers whose patience ran out before the end
+            servers.queue.reap()
+            num_balked = servers.num_balked
+            reneged = customers['renege'][~np.isnan(customers['renege'])]
+        # derive the records of customers from the table
+        arrival_times = customers['arrival']
+        served = ~np.isnan(customers['start'])
+        departed = ~np.isnan(customers['depart'])
+        queue_wait = (customers['start'] - arrival_times)[served]
+        total_wait = (customers['depart'] - arrival_times)[departed]
+        service_times = (customers['depart'] - customers['start'])[departed]
+
+    summary = {'wait': np.mean(total_wait), 'service': np.mean(service_times),
+               'interarrival': np.mean(np.diff(arrival_times, prepend=0)),
+               'max_queue': max_queue,
+               'hit': int(max_queue > queue_level), 'log_weight': log_weight,
+               'cost': ledger.total(), 'balked': num_balked, 'reneged': len(reneged)}
+    traces = {'queue_wait': queue_wait, 'total_wait': total_wait,
+              'time': obs_time, 'queue_length': queue_length,
+              'cost': ledger.trajectory(obs_time)}
+    return summary, traces
+
+if USE_CACHE:
+    # wrap the replication function to re-use stored results
+    run_cafe = ReplicationCache().memoize(run_cafe)
+
+#%% SECTION TO RUN ANALYSIS
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # array to store outputs
+    AVERAGE_WAIT = []
+
+    for i in range(NUM_RUNS):
+        # run the replication with seed i (simulated, not stored, if traced or
+        # profiled)
+        TRACE.clear()
+        replicate = (run_cafe if TRACE.level == OFF and PROFILE is None
+                     else getattr(run_cafe, '__wrapped__', run_cafe))
+        summary, traces = replicate(i)
+        # record the final average waiting time
+        AVERAGE_WAIT.append(summary['wait'])
+        # print out the traced process events
+        for line in TRACE.trace().lines():
+            print(line)
+
+        if NUM_RUNS <= 1:
+            # get the observed traces for plotting
+            queue_wait = traces['queue_wait']
+            total_wait = traces['total_wait']
+            obs_time = traces['time']
+            queue_length = traces['queue_length']
+
+            # create a plot showing the queue length at each time
+            plt.figure()
+            plt.step(obs_time, queue_length, where='post')
+            plt.xlabel('Simulation Time (min)')
+            plt.ylabel('Queue Length')
+
+            # create a plot showing the histogram of waiting time
+            plt.figure()
+            plt.hist(total_wait)
+            plt.xlabel('Total Waiting Time (min)')
+            plt.ylabel('Number of Customers')
+
+            # create a plot showing the average queue length at each time
+            plt.figure()
+            plt.plot(obs_time, running_mean(queue_length))
+            plt.xlabel('Simulation Time (min)')
+            plt.ylabel('Average Queue Length')
+
+            # create a plot showing the average wait time (queue and total) at each time
+            plt.figure()
+            plt.plot(1+np.arange(len(queue_wait)), running_mean(queue_wait), label='Wait in Queue')
+            plt.plot(1+np.arange(len(total_wait)), running_mean(total_wait), label='Total Wait')
+            plt.xlabel('Customer')
+            plt.ylabel('Average Wait (min)')
+            plt.legend(loc='best')
+
+    # print final results to console
+    print('Average waiting time for N={:} runs:'.format(NUM_RUNS))
+    print('\n'.join('{:.2f}'.format(i) for i in AVERAGE_WAIT))
+    if PROFILE is not None:
+        # print the profile to console
+        print(PROFILE)
+        PROFILE.write_folded('cafe.folded')
@@ -0,0 +1,227 @@
+"""
+SYS-611: Example rare-event estimation with importance sampling and splitting.
+
+This script estimates the probability that the queue at the cafe (see
+`QueuingSystem.py`) exceeds 20 customers during an 8-hour day when the
+arrival rate is much lower than the service rate (about 3e-7, so naive
+replication would see one hit in about three million days) using:
+ * importance sampling: inter-arrival and service times are exponentially
+   tilted to swap the arrival and service rates while the queue has at least
+   5 customers (so the queue tends to grow), with likelihood ratio weights.
+ * fixed-effort splitting: a vectorized birth-death model of the cafe queue
+   restarts trajectories from states which entered queue lengths 3, 6, ..., 21.
+Both estimates are compared to the exact probability (from the transient
+distribution of the continuous-time Markov chain) and to the computation
+time which naive replication would need for the same relative error.
+
+The script also estimates the probability that the factory (see
+`FactorySystem.py`) is out of spares for more than 8 hours during the first
+wave of breakdowns with tilted first breakdown and repair times. This event
+depends on many small deviations of 50 breakdown times and dozens of repair
+times (not one direction which exponential tilting can favor), so the weights
+are dominated by a few replications (see the effective number of hits) and
+importance sampling does not reliably save computation for this model.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import functools
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from sys611.rare import RareEventResult, fixed_effort_splitting, importance_sampling
+import FactorySystem
+import QueuingSystem
+
+#%% SECTION TO CONFIGURE SIMULATION
+
+# cafe arrival and service rates (customers/minute)
+_lambda = 1.5
+_mu = 4.0
+# cafe simulation duration (minutes)
+CAFE_DURATION = 8*60
+# queue length of the rare event (the queue is longer than this level)
+QUEUE_LEVEL = 20
+# queue length from which inter-arrival and service times are tilted
+TILT_QUEUE = 5
+# number of importance sampling replications
+NUM_IS_RUNS = 400
+# splitting levels (queue lengths) and trajectories per level
+SPLITTING_LEVELS = list(range(3, QUEUE_LEVEL + 2, 3))
+SPLITTING_EFFORT = 1000
+# number of independent repetitions of splitting
+NUM_REPETITIONS = 10
+# number of naive replications to time (and extrapolate)
+NUM_NAIVE_RUNS = 100
+
+# factory configuration (spares and simulation duration covering the first wave)
+NUM_SPARES = 33
+FACTORY_DURATION = 400
+# tilting parameters of the first breakdown and repair times
+BREAKDOWN_TILT = -0.01
+REPAIR_TILT = 0.1
+TILT_DURATION = 190
+# number of factory replications (for each method)
+NUM_FACTORY_RUNS = 2000
+
+#%% SECTION TO DEFINE SIMULATION
+
+# replications are not memoized: each method simulates thousands of
+# replications which are only needed once (and timing cached results would
+# not measure the computation)
+run_cafe = getattr(QueuingSystem.run_cafe, '__wrapped__', QueuingSystem.run_cafe)
+run_factory = getattr(FactorySystem.run_factory, '__wrapped__', FactorySystem.run_factory)
+
+def exact_probability(_lambda, _mu, queue_level, duration):
+    """ Computes the exact probability that an M/M/1 queue exceeds a level.
+
+    The queue length process is a birth-death continuous-time Markov chain
+    which is absorbed when the queue exceeds the level, so the probability is
+    the absorption probability of the transient distribution at the duration.
+
+    Args:
+        _lambda (float): the arrival rate
+        _mu (float): the service rate
+        queue_level (int): the queue length level
+        duration (float): the time horizon
+
+    Returns:
+        float: the probability starting from an empty system
+    """
+    # import the scipy linalg package only when needed (it is slow to load)
+    import scipy.linalg as linalg
+    # number in system (one in service) when the queue exceeds the level
+    absorbing = queue_level + 2
+    generator = np.zeros((absorbing + 1, absorbing + 1))
+    for n in range(absorbing):
+        generator[n, n+1] = _lambda
+        if n > 0:
+            generator[n, n-1] = _mu
+        generator[n, n] = -np.sum(generator[n])
+    return linalg.expm(generator*duration)[0, absorbing]
+
+def initial_states(num_trajectories, rng):
+    """ Creates initial states (number in system and time) of the cafe queue.
+
+    Args:
+        num_trajectories (int): the number of trajectories
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        numpy.ndarray: the states (one row per trajectory)
+    """
+    return np.zeros((num_trajectories, 2))
+
+def advance_states(states, rng):
+    """ Advances the cafe queue to the next arrival or departure.
+
+    Args:
+        states (numpy.ndarray): the states (number in system and time)
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        numpy.ndarray: the next states
+        numpy.ndarray: the mask of trajectories which reach the end of the day
+    """
+    number = states[:, 0]
+    rate = _lambda + _mu*(number > 0)
+    next_time = states[:, 1] + rng.exponential(1/rate)
+    ended = next_time > CAFE_DURATION
+    # the next event is an arrival with probability lambda/(lambda + mu)
+    arrival = rng.random(len(number))*rate < _lambda
+    number = np.where(ended, number, number + np.where(arrival, 1, -1))
+    return np.column_stack((number, np.minimum(next_time, CAFE_DURATION))), ended
+
+def queue_length(states):
+    """ Computes the importance (queue length) of cafe states.
+
+    Args:
+        states (numpy.ndarray): the states (number in system and time)
+
+    Returns:
+        numpy.ndarray: the queue lengths
+    """
+    return np.maximum(states[:, 0] - 1, 0)
+
+def naive_time(replicate, num_runs):
+    """ Measures the computation time of one naive replication.
+
+    Args:
+        replicate (function): the replication function called with a seed
+        num_runs (int): the number of replications to time
+
+    Returns:
+        float: the average time per replication (seconds)
+    """
+    start = time.time()
+    for seed in range(num_runs):
+        replicate(seed)
+    return (time.time() - start)/num_runs
+
+def report(result, exact, run_time):
+    """ Prints an estimate and its savings relative to naive replication.
+
+    Args:
+        result (RareEventResult): the estimate
+        exact (float): the exact probability (None if unknown)
+        run_time (float): the time per naive replication (seconds)
+    """
+    print(result)
+    if exact is not None:
+        print('  error relative to exact: {:+.1%}'.format(result.estimate/exact - 1))
+    print('  naive replications for the same relative error: {:.3g} ({:.3g} s, {:.0f} times longer)'.format(
+            result.naive_runs, result.naive_runs*run_time,
+            result.naive_runs*run_time/result.elapsed))
+
+#%% SECTION TO RUN ANALYSIS
+
+if __name__ == '__main__':
+    exact = exact_probability(_lambda, _mu, QUEUE_LEVEL, CAFE_DURATION)
+    print('Cafe: P(queue > {}) in {:.0f} min (lambda={}, mu={}), exact p = {:.3e}'.format(
+            QUEUE_LEVEL, CAFE_DURATION, _lambda, _mu, exact))
+    cafe = functools.partial(run_cafe, _lambda=_lambda, _mu=_mu, sim_duration=CAFE_DURATION,
+                             queue_level=QUEUE_LEVEL)
+    run_time = naive_time(cafe, NUM_NAIVE_RUNS)
+    print('naive replication: {:.2f} ms per run, {:.3g} runs for 10% relative error'.format(
+            1e3*run_time, (1 - exact)/(exact*0.1**2)))
+
+    # swap the arrival and service rates while the queue is long
+    result = importance_sampling(
+            functools.partial(cafe, arrival_tilt=_lambda - _mu, service_tilt=_mu - _lambda,
+                              tilt_queue=TILT_QUEUE), NUM_IS_RUNS)
+    report(result, exact, run_time)
+    print('  effective number of hits: {:.1f}'.format(result.effective_hits))
+
+    result = fixed_effort_splitting(initial_states, advance_states, queue_length,
+                                    SPLITTING_LEVELS, SPLITTING_EFFORT, NUM_REPETITIONS,
+                                    np.random.default_rng(0))
+    report(result, exact, run_time)
+    print('  conditional probabilities of levels {}:'.format(SPLITTING_LEVELS))
+    print('  ' + ' '.join('{:.3f}'.format(p) for p in result.stage_probabilities))
+
+    print('Factory: P(stockout > 8 h) with S={} spares'.format(NUM_SPARES))
+    factory = functools.partial(run_factory, num_spares=NUM_SPARES,
+                                sim_duration=FACTORY_DURATION)
+    start = time.time()
+    hits = [factory(seed)[0]['hit'] for seed in range(NUM_FACTORY_RUNS)]
+    naive = RareEventResult('naive replication', hits, time.time() - start, sum(hits))
+    run_time = naive.elapsed/NUM_FACTORY_RUNS
+    print(naive)
+    result = importance_sampling(
+            functools.partial(factory, breakdown_tilt=BREAKDOWN_TILT, repair_tilt=REPAIR_TILT,
+                              tilt_duration=TILT_DURATION), NUM_FACTORY_RUNS,
+            first_seed=NUM_FACTORY_RUNS)
+    print(result)
+    # a few large weights (few effective hits) indicate that the tilting does
+    # not favor the paths to the rare event and the relative error is unreliable
+    print('  effective number of hits: {:.1f}'.format(result.effective_hits))
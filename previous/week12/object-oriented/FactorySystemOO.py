@@ -15,9 +15,13 @@ import simpy
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from sys611.fleet import Fleet
+from sys611.generators import Uniform
+from sys611.ledger import Ledger
+from sys611.trace import EVENTS, OFF, Tracer
 
 #%% SECTION TO CONFIGURE SIMULATION
 
@@ -29,34 +33,68 @@ SIM_DURATION = 5*8*52
 NUM_SPARES = 20
 # number of repairers to hire (R)
 NUM_REPAIRERS = 5
+# number of machines
+NUM_MACHINES = 50
+# schedule all breakdowns from one calendar (see `sys611.fleet`) rather than
+# one process per machine (for large numbers of machines)
+USE_FLEET = False
+# trace process events (only for a single run of this script), with the
+# number of spares available after each event
+TRACE = Tracer({'break': 'machine {entity} broke at {time:.2f} ({spares:.0f} spares available)',
+                'replace': 'machine {entity} replaced at {time:.2f}',
+                'repair': 'repair complete at {time:.2f} ({spares:.0f} spares available)'},
+               state=['spares'], level=EVENTS if NUM_RUNS <= 1 and __name__ == '__main__' else OFF)
 
 #%% SECTION TO DEFINE SIMULATION
 
 class Factory(object):
     """ Defines a factory simulation. """
-    def __init__(self, env, num_repairers, num_spares):
+    def __init__(self, env, num_repairers, num_spares, num_machines=50, use_fleet=False):
         """ Initializes this factory.
         
         Args:
             env (simpy.Environment): the simulation environment
             num_repairers (int): the number of repairers to hire
             num_spares (int): the number of spares to purchase
+            num_machines (int): the number of machines
+            use_fleet (bool): True to schedule breakdowns from one calendar
         """
         self.repairers = simpy.Resource(env, capacity=num_repairers) 
         self.spares = simpy.Container(env, init=num_spares, capacity=num_spares)
         self.env = env
-        self.cost = 0
-        self.daily_cost = 3.75*8*num_repairers + 30*num_spares
+        # create the cost streams (hourly costs): daily wages of repairers and
+        # daily cost of spares purchased, out of service machines, and the
+        # spares available (no cost, only recorded for the observed traces)
+        self.ledger = Ledger(env)
+        self.ledger.add_stream('repairers', 3.75, num_repairers)
+        self.ledger.add_stream('spares', 30/8, num_spares)
+        self.ledger.add_stream('downtime', 20)
+        self.ledger.add_stream('available', level=num_spares)
+        self.num_machines = num_machines
+        # the fleet which dispatches all breakdowns (None for machine processes)
+        self.fleet = None
+        if use_fleet:
+            self.fleet = Fleet(env, num_machines, Uniform(132, 182), Uniform(4, 10),
+                               self.repairers, self.spares,
+                               on_break=lambda machine: self.machine_broken(machine+1),
+                               on_replace=lambda machine, time_broken: self.machine_replaced(
+                                       machine+1),
+                               on_repair=self.machine_repaired)
     
+    @property
+    def cost(self):
+        """ float: the total cost accrued until now. """
+        return self.ledger.total()
+
     def run(self):
-        """ Process to run this simulation. """
-        # launch the 50 machine processes
-        for i in range(50):
-            self.env.process(factory.operate_machine(i+1))
-        # update the daily costs each day
-        while True:
-            self.cost += self.daily_cost
-            yield self.env.timeout(8.0)
+        """ Starts this simulation (costs accrue in the ledger without a process). """
+        if self.fleet is not None:
+            # launch the fleet process
+            self.env.process(self.fleet.run())
+        else:
+            # launch the machine processes
+            for i in range(self.num_machines):
+                self.env.process(self.operate_machine(i+1))
     
     def operate_machine(self, machine):
         """ Process to operate a machine.
@@ -67,19 +105,41 @@ class Factory(object):
         while True:
             # wait until the machine breaks
             yield self.env.timeout(np.random.uniform(132,182))
-            time_broken = self.env.now
-            if NUM_RUNS <= 1:
-                print('machine {} broke at {:.2f} ({} spares available)'.format(
-                        machine, time_broken, self.spares.level))
+            self.machine_broken(machine)
             # launch the repair process
             self.env.process(self.repair_machine())
             # wait for a spare to become available
             yield self.spares.get(1)
-            time_replaced = self.env.now
-            if NUM_RUNS <= 1:
-                print('machine {} replaced at {:.2f}'.format(machine, time_replaced))
-            # update the cost for being out of service
-            self.cost += 20*(time_replaced-time_broken)
+            self.machine_replaced(machine)
+
+    def machine_broken(self, machine):
+        """ Accounts a machine breakdown.
+
+        Args:
+            machine (int): the machine number
+        """
+        if TRACE.level >= EVENTS:
+            TRACE.record(self.env.now, machine, 'break', self.spares.level)
+        # accrue the cost for being out of service
+        self.ledger.set_level('downtime', self.ledger.level('downtime') + 1)
+
+    def machine_replaced(self, machine):
+        """ Accounts the replacement of a broken machine with a spare.
+
+        Args:
+            machine (int): the machine number
+        """
+        # stop the cost for being out of service
+        self.ledger.set_level('downtime', self.ledger.level('downtime') - 1)
+        self.ledger.set_level('available', self.spares.level)
+        if TRACE.level >= EVENTS:
+            TRACE.record(self.env.now, machine, 'replace', self.spares.level)
+
+    def machine_repaired(self):
+        """ Accounts a repaired machine put back in the spares pool. """
+        self.ledger.set_level('available', self.spares.level)
+        if TRACE.level >= EVENTS:
+            TRACE.record(self.env.now, -1, 'repair', self.spares.level)
               
     def repair_machine(self):
         """ Process to repair a machine. """
@@ -90,76 +150,90 @@ class Factory(object):
             yield self.env.timeout(np.random.uniform(4,10))
             # put the machine back in the spares pool
             yield self.spares.put(1)
-            if NUM_RUNS <= 1:
-                print('repair complete at {:.2f} ({} spares available)'.format(
-                        self.env.now, self.spares.level))
+            self.machine_repaired()
 
-# arrays to record data
-obs_time = []
-obs_cost = []
-obs_spares = []
+def run_factory(seed, num_repairers=NUM_REPAIRERS, num_spares=NUM_SPARES,
+                sim_duration=SIM_DURATION, num_machines=NUM_MACHINES, use_fleet=USE_FLEET):
+    """ Runs one replication of the factory simulation.
 
-def observe(env, factory):
-    """ Process to observe the factory during a simulation.
-    
     Args:
-        env (simpy.Environment): the simulation environment
-        factory (Factory): the factory
+        seed (int): the random number seed
+        num_repairers (int): the number of repairers to hire (R)
+        num_spares (int): the number of spares to purchase (S)
+        sim_duration (float): the simulation duration (hours)
+        num_machines (int): the number of machines
+        use_fleet (bool): True to schedule all breakdowns from one calendar
+            (see `sys611.fleet`)
+
+    Returns:
+        dict: the summary outputs (total cost and average spares available)
+        dict: the observed traces (hourly time, cost, and spares available)
     """
-    while True:
-        obs_time.append(env.now)
-        obs_cost.append(factory.cost)
-        obs_spares.append(factory.spares.level)
-        yield env.timeout(1.0)
-
-#%% SECTION TO RUN ANALYSIS
-
-# array to store outputs
-COST = []
-
-for i in range(NUM_RUNS):
     # set the random number seed
-    np.random.seed(i)
-    
+    np.random.seed(seed)
+
     # create the simpy environment
     env = simpy.Environment()
     # create the factory
-    factory = Factory(env, NUM_REPAIRERS, NUM_SPARES)
-    # add the factory run process
-    env.process(factory.run())
-    # add the observation process
-    env.process(observe(env, factory))
+    factory = Factory(env, num_repairers, num_spares, num_machines, use_fleet)
+    # start the factory
+    factory.run()
     # run simulation
-    env.run(until=SIM_DURATION)
-    # record the final observed cost
-    COST.append(obs_cost[-1])
+    env.run(until=sim_duration)
+
+    # reconstruct the hourly observations from the ledger
+    obs_time = np.arange(0, sim_duration, 1.0)
+    obs_spares = factory.ledger.levels(obs_time, 'available')
+    summary = {'cost': factory.cost, 'spares': np.mean(obs_spares)}
+    traces = {'time': obs_time, 'cost': factory.ledger.trajectory(obs_time), 'spares': obs_spares}
+    return summary, traces
+
+#%% SECTION TO RUN ANALYSIS
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # array to store outputs
+    COST = []
+
+    for i in range(NUM_RUNS):
+        # run the replication with seed i
+        TRACE.clear()
+        summary, traces = run_factory(i)
+        # record the final observed cost
+        COST.append(summary['cost'])
+        # print out the traced process events
+        for line in TRACE.trace().lines():
+            print(line)
     
-    if NUM_RUNS <= 1:
-        # output the total cost
-        print('Total cost: {:.2f}'.format(factory.cost))
+        if NUM_RUNS <= 1:
+            # output the total cost
+            print('Total cost: {:.2f}'.format(summary['cost']))
         
-        # plot the number of spares available
-        plt.figure()
-        plt.step(obs_time, obs_spares, where='post')
-        plt.xlabel('Time (hour)')
-        plt.ylabel('Number Spares Available')
+            # plot the number of spares available
+            plt.figure()
+            plt.step(traces['time'], traces['spares'], where='post')
+            plt.xlabel('Time (hour)')
+            plt.ylabel('Number Spares Available')
         
-        # plot the total cost accumulation
-        plt.figure()
-        plt.step(obs_time, obs_cost, where='post')
-        plt.xlabel('Time (hour)')
-        plt.ylabel('Total Cost')
+            # plot the total cost accumulation
+            plt.figure()
+            plt.plot(traces['time'], traces['cost'])
+            plt.xlabel('Time (hour)')
+            plt.ylabel('Total Cost')
 
     # print final results to console
     print('Factory costs for N={:} runs with R={:} repairers and S={:} spares:'.format(
             NUM_RUNS, NUM_REPAIRERS, NUM_SPARES))
     print('\n'.join('{:.2f}'.format(i) for i in COST))
 
-#%% SECTION TO WRITE RESULTS TO CSV FILE
+    #%% SECTION TO WRITE RESULTS TO CSV FILE
 
-import csv
+    import csv
 
-with open('factory.csv', 'w') as output:
-    writer = csv.writer(output)
-    for sample in COST:
-        writer.writerow([sample])
\ No newline at end of file
+    with open('factory.csv', 'w') as output:
+        writer = csv.writer(output)
+        for sample in COST:
+            writer.writerow([sample])
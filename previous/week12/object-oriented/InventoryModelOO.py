@@ -15,9 +15,10 @@ import simpy
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from sys611.trace import DETAILS, EVENTS, OFF, Tracer
 
 #%% SECTION TO CONFIGURE SIMULATION
 
@@ -29,6 +30,14 @@ SIM_DURATION = 100
 ORDER_THRESHOLD = 10
 # inventory level to order up to (S)
 ORDER_UP_TO = 20
+# trace process events (orders and deliveries) and details (customers) only
+# for a single run of this script, with the quantity and inventory level
+TRACE = Tracer({'demand': 'Cust {entity} demands {quantity:.0f} at t={time:.2f}',
+                'buy': 'Cust {entity} buys {quantity:.0f} at t={time:.2f} ({inventory:.0f} remaining)',
+                'order': 'order {quantity:.0f} at t={time}',
+                'delivery': 'delivery of {quantity:.0f} at t={time:.2f}'},
+               state=['quantity', 'inventory'],
+               level=DETAILS if NUM_RUNS <= 1 and __name__ == '__main__' else OFF)
 
 #%% SECTION TO DEFINE SIMULATION
 
@@ -70,11 +79,10 @@ class Warehouse(object):
             self.balance -= self.holding_cost*self.inventory*inter_arrival
             # increment a counter
             i += 1
-            customer = 'Cust {}'.format(i)
-            # generate demand
+                # generate demand
             demand = np.random.randint(self.demand_lb, self.demand_ub+1) 
-            if NUM_RUNS <= 1:
-                print('{} demands {} at t={:.2f}'.format(customer, demand, env.now))
+            if TRACE.level >= DETAILS:
+                TRACE.record(self.env.now, i, 'demand', demand, self.inventory)
             # handle demands
             if self.inventory > demand:
                 num_sold = demand
@@ -83,9 +91,8 @@ class Warehouse(object):
             self.balance += self.product_price*num_sold
             self.inventory -= num_sold
             if num_sold > 0:
-                if NUM_RUNS <= 1:
-                    print('{} buys {} at t={:.2f} ({} remaining)'.format(
-                            customer, demand, env.now, self.inventory))
+                if TRACE.level >= DETAILS:
+                    TRACE.record(self.env.now, i, 'buy', demand, self.inventory)
             # check for order
             if self.inventory < self.order_threshold and self.num_ordered == 0:
                 quantity = self.order_up_to - self.inventory
@@ -97,25 +104,27 @@ class Warehouse(object):
         Args:
             quantity (int): the order quantity
         """
-        if NUM_RUNS <= 1:
-            print('order {} at t={}'.format(quantity, env.now))
+        if TRACE.level >= EVENTS:
+            TRACE.record(self.env.now, -1, 'order', quantity, self.inventory)
         self.num_ordered = quantity
         self.balance -= self.product_cost*quantity
         
         # wait for the delivery to arrive
         yield self.env.timeout(self.delivery_delay)
         
-        if NUM_RUNS <= 1:
-            print('delivery of {} at t={:.2f}'.format(quantity, env.now))
+        if TRACE.level >= EVENTS:
+            TRACE.record(self.env.now, -1, 'delivery', quantity, self.inventory)
         self.inventory += quantity
         self.num_ordered = 0
 
-def observe(env, warehouse):
+def observe(env, warehouse, obs_time, inventory_level):
     """ Process to observe the warehouse inventory during a simulation.
     
     Args:
         env (simpy.Environment): the simulation environment
         warehouse (Warehouse): the warehouse
+        obs_time (list): the observation times
+        inventory_level (list): the observed inventory level
     """
     while True:
         # record the observation time and queue length
@@ -123,53 +132,82 @@ def observe(env, warehouse):
         inventory_level.append(warehouse.inventory)
         # wait for the next minute
         yield env.timeout(0.1)
-#%% SECTION TO RUN ANALYSIS
 
-# array to store outputs
-BALANCE = []
+def run_warehouse(seed, order_threshold=ORDER_THRESHOLD, order_up_to=ORDER_UP_TO,
+                  sim_duration=SIM_DURATION):
+    """ Runs one replication of the inventory simulation.
 
-for i in range(NUM_RUNS):
+    Args:
+        seed (int): the random number seed
+        order_threshold (int): the threshold inventory level to place order (Q)
+        order_up_to (int): the target inventory level (S)
+        sim_duration (float): the simulation duration (days)
+
+    Returns:
+        dict: the summary outputs (final net revenue balance)
+        dict: the observed traces (time and inventory level)
+    """
     # arrays to record data
-    queue_wait = []
-    total_wait = []
     obs_time = []
     inventory_level = []
     
     # set the initial seed
-    np.random.seed(i)
+    np.random.seed(seed)
     
     # create the simpy environment
     env = simpy.Environment()
     # create the warehouse
-    warehouse = Warehouse(env, ORDER_THRESHOLD, ORDER_UP_TO)
+    warehouse = Warehouse(env, order_threshold, order_up_to)
     # add the warehouse run process
     env.process(warehouse.run())
     # add the observation process
-    env.process(observe(env, warehouse))
+    env.process(observe(env, warehouse, obs_time, inventory_level))
     # run the simulation
-    env.run(until=SIM_DURATION)
-    # record the final observed net revenue
-    BALANCE.append(warehouse.balance)
+    env.run(until=sim_duration)
+
+    summary = {'balance': warehouse.balance}
+    traces = {'time': obs_time, 'inventory': inventory_level}
+    return summary, traces
+
+#%% SECTION TO RUN ANALYSIS
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # array to store outputs
+    BALANCE = []
+
+    for i in range(NUM_RUNS):
+        # run the replication with seed i
+        TRACE.clear()
+        summary, traces = run_warehouse(i)
+        # record the final observed net revenue
+        BALANCE.append(summary['balance'])
+        # print out the traced process events
+        for line in TRACE.trace().lines():
+            print(line)
     
-    if NUM_RUNS <= 1:
-        print('Final balance: {:.2f}'.format(warehouse.balance))
+        if NUM_RUNS <= 1:
+            print('Final balance: {:.2f}'.format(summary['balance']))
         
-        # plot the inventory over time
-        plt.figure()
-        plt.step(obs_time, inventory_level, where='post')
-        plt.xlabel('Time (day)')
-        plt.ylabel('Inventory Level')
+            # plot the inventory over time
+            plt.figure()
+            plt.step(traces['time'], traces['inventory'], where='post')
+            plt.xlabel('Time (day)')
+            plt.ylabel('Inventory Level')
 
-# print final results to console
-print('Net revenue balance for N={:} runs with Q={:} and S={:}:'.format(
-        NUM_RUNS, ORDER_THRESHOLD, ORDER_UP_TO))
-print('\n'.join('{:.2f}'.format(i) for i in BALANCE))
+    # print final results to console
+    print('Net revenue balance for N={:} runs with Q={:} and S={:}:'.format(
+            NUM_RUNS, ORDER_THRESHOLD, ORDER_UP_TO))
+    print('\n'.join('{:.2f}'.format(i) for i in BALANCE))
 
-#%% SECTION TO WRITE RESULTS TO CSV FILE
+    #%% SECTION TO WRITE RESULTS TO CSV FILE
 
-import csv
+    import csv
 
-with open('inventory.csv', 'w') as output:
-    writer = csv.writer(output)
-    for sample in BALANCE:
-        writer.writerow([sample])
\ No newline at end of file
+    with open('inventory.csv', 'w') as output:
+        writer = csv.writer(output)
+        for sample in BALANCE:
+            writer.writerow([sample])
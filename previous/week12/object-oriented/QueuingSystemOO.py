@@ -15,9 +15,11 @@ import simpy
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from sys611.analysis import running_mean
+from sys611.trace import EVENTS, OFF, Tracer
 
 #%% SECTION TO CONFIGURE SIMULATION
 
@@ -25,6 +27,12 @@ import matplotlib.pyplot as plt
 NUM_RUNS = 1
 # simulation duration (minutes)
 SIM_DURATION = 100
+# trace process events (only for a single run of this script), with the
+# queue length after each event
+TRACE = Tracer({'enter': 'Cust {entity} enters cafe at t={time:.2f}',
+                'service': 'Cust {entity} gets service at t={time:.2f}',
+                'depart': 'Cust {entity} departs cafe at t={time:.2f}'},
+               state=['queue'], level=EVENTS if NUM_RUNS <= 1 and __name__ == '__main__' else OFF)
 
 #%% SECTION TO DEFINE SIMULATION
 
@@ -50,24 +58,24 @@ class CafeJava(object):
         """ Process to handle a customer.
 
         Args:
-            customer (str): the name of the customer
+            customer (int): the customer number
         """
         with self.servers.request() as request:
-            arrival_time = env.now
-            if NUM_RUNS <= 1:
-                print('{} enters cafe at t={:.2f}'.format(customer, arrival_time))
+            arrival_time = self.env.now
+            if TRACE.level >= EVENTS:
+                TRACE.record(arrival_time, customer, 'enter', len(self.servers.queue))
             # wait for the request to be fulfilled
             yield request
-            service_time = env.now
+            service_time = self.env.now
             self.queue_wait.append(service_time - arrival_time)
-            if NUM_RUNS <= 1:
-                print('{} gets service at t={:.2f}'.format(customer, service_time))
+            if TRACE.level >= EVENTS:
+                TRACE.record(service_time, customer, 'service', len(self.servers.queue))
             # wait for the service to complete
             yield self.env.timeout(np.random.exponential(1/self._mu))
-            depart_time = env.now
+            depart_time = self.env.now
             self.total_wait.append(depart_time - arrival_time)
-            if NUM_RUNS <= 1:
-                print('{} departs cafe at t={:.2f}'.format(customer, depart_time))
+            if TRACE.level >= EVENTS:
+                TRACE.record(depart_time, customer, 'depart', len(self.servers.queue))
 
     def run(self):
         """ Process to run this cafe simulation."""
@@ -76,11 +84,11 @@ class CafeJava(object):
         # enter infinite loop
         while True:
             # wait for the next arrival
-            yield env.timeout(np.random.exponential(1/self._lambda))
+            yield self.env.timeout(np.random.exponential(1/self._lambda))
             # increment a counter
             i += 1
             # launch the customer process
-            env.process(self.handle_customer('Cust {}'.format(i)))
+            self.env.process(self.handle_customer(i))
 
 def observe_queue(env, cafe, obs_time, queue_length):
     """ Process to observe the queue length during a simulation.
@@ -98,63 +106,93 @@ def observe_queue(env, cafe, obs_time, queue_length):
         # wait for the next minute
         yield env.timeout(1.0)
 
-#%% SECTION TO RUN ANALYSIS
-
-# array to store outputs
-AVERAGE_WAIT = []
+def run_cafe(seed, _lambda=3.0, _mu=4.0, num_servers=1, sim_duration=SIM_DURATION):
+    """ Runs one replication of the cafe simulation.
 
-for i in range(NUM_RUNS):
+    Args:
+        seed (int): the random number seed
+        _lambda (float): the average inter-arrival rate (customers/minute)
+        _mu (float): the average service rate (customers/minute)
+        num_servers (int): the number of servers
+        sim_duration (float): the simulation duration (minutes)
+
+    Returns:
+        dict: the summary outputs (average total waiting time)
+        dict: the observed traces (queue wait, total wait, time, queue length)
+    """
     # arrays to record data
     obs_time = []
     queue_length = []
 
     # set the initial seed
-    np.random.seed(i)
+    np.random.seed(seed)
 
     # create the simpy environment
     env = simpy.Environment()
-    cafe = CafeJava(env, 1, 3, 4)
+    cafe = CafeJava(env, num_servers, _lambda, _mu)
     # add the cafe process
     env.process(cafe.run())
     # add the observation process
     env.process(observe_queue(env, cafe, obs_time, queue_length))
     # run the simulation
-    env.run(until=SIM_DURATION)
-    # record the final average waiting time
-    AVERAGE_WAIT.append(np.mean(cafe.total_wait))
-
-    if NUM_RUNS <= 1:
-        # create a plot showing the queue length at each time
-        plt.figure()
-        plt.step(obs_time, queue_length, where='post')
-        plt.xlabel('Simulation Time (min)')
-        plt.ylabel('Queue Length')
-
-        # create a plot showing the histogram of waiting time
-        plt.figure()
-        plt.hist(cafe.total_wait)
-        plt.xlabel('Total Waiting Time (min)')
-        plt.ylabel('Number of Customers')
-
-        # create a plot showing the average queue length at each time
-        plt.figure()
-        plt.plot(obs_time, np.divide(np.cumsum(queue_length).astype('float'),
-                                     1+np.arange(len(queue_length))))
-        plt.xlabel('Simulation Time (min)')
-        plt.ylabel('Average Queue Length')
-
-        # create a plot showing the average wait time (queue and total) at each time
-        plt.figure()
-        plt.plot(1+np.arange(len(cafe.queue_wait)),
-                 [np.mean(cafe.queue_wait[0:i]) for i in range(len(cafe.queue_wait))],
-                  label='Wait in Queue')
-        plt.plot(1+np.arange(len(cafe.total_wait)),
-                 [np.mean(cafe.total_wait[0:i]) for i in range(len(cafe.total_wait))],
-                  label='Total Wait')
-        plt.xlabel('Customer')
-        plt.ylabel('Average Wait (min)')
-        plt.legend(loc='best')
-
-# print final results to console
-print('Average waiting time for N={:} runs:'.format(NUM_RUNS))
-print('\n'.join('{:.2f}'.format(i) for i in AVERAGE_WAIT))
+    env.run(until=sim_duration)
+
+    summary = {'wait': np.mean(cafe.total_wait)}
+    traces = {'queue_wait': cafe.queue_wait, 'total_wait': cafe.total_wait,
+              'time': obs_time, 'queue_length': queue_length}
+    return summary, traces
+
+#%% SECTION TO RUN ANALYSIS
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # array to store outputs
+    AVERAGE_WAIT = []
+
+    for i in range(NUM_RUNS):
+        # run the replication with seed i
+        TRACE.clear()
+        summary, traces = run_cafe(i)
+        # record the final average waiting time
+        AVERAGE_WAIT.append(summary['wait'])
+        # print out the traced process events
+        for line in TRACE.trace().lines():
+            print(line)
+
+        if NUM_RUNS <= 1:
+            # create a plot showing the queue length at each time
+            plt.figure()
+            plt.step(traces['time'], traces['queue_length'], where='post')
+            plt.xlabel('Simulation Time (min)')
+            plt.ylabel('Queue Length')
+
+            # create a plot showing the histogram of waiting time
+            plt.figure()
+            plt.hist(traces['total_wait'])
+            plt.xlabel('Total Waiting Time (min)')
+            plt.ylabel('Number of Customers')
+
+            # create a plot showing the average queue length at each time
+            plt.figure()
+            plt.plot(traces['time'], running_mean(traces['queue_length']))
+            plt.xlabel('Simulation Time (min)')
+            plt.ylabel('Average Queue Length')
+
+            # create a plot showing the average wait time (queue and total) at each time
+            plt.figure()
+            plt.plot(1+np.arange(len(traces['queue_wait'])),
+                     running_mean(traces['queue_wait']),
+                      label='Wait in Queue')
+            plt.plot(1+np.arange(len(traces['total_wait'])),
+                     running_mean(traces['total_wait']),
+                      label='Total Wait')
+            plt.xlabel('Customer')
+            plt.ylabel('Average Wait (min)')
+            plt.legend(loc='best')
+
+    # print final results to console
+    print('Average waiting time for N={:} runs:'.format(NUM_RUNS))
+    print('\n'.join('{:.2f}'.format(i) for i in AVERAGE_WAIT))
@@ -66,29 +66,59 @@ def next_round():
     # advance the round_number
     round_number += 1
 
-# main execution loop: continue while the game is not complete
-while not is_complete():
-    # generate the number of red hits
-    red_hits = generate_red_hits()
-    # generate the number of blue hits
-    blue_hits = generate_blue_hits()
-    # red team suffers losses of blue hits
-    red_suffer_losses(blue_hits)
-    # blue team suffers losses of red hits
-    blue_suffer_losses(red_hits)
-    # advance to the next round
-    next_round()
-    # print out the current state for debugging
-    print("Round {}: {} Red, {} Blue".format(
-            round_number, 
-            red_size,
-            blue_size
-        ))
-
-# after main loop exists, check who won (whichever team still has fighters!)
-if red_size > 0:
-	print("Red Wins")
-elif blue_size > 0:
-	print("Blue Wins")
-else:
-	print("Tie - Mutual Destruction!")
+def run_battle(seed=None, verbose=False):
+    """ Runs one battle from the initial state until it is complete.
+
+    Args:
+        seed (int): the random number seed (None to continue the current stream)
+        verbose (bool): True, to print out the state after each round
+
+    Returns:
+        dict: the summary outputs (rounds, final sizes, and red/blue win flags)
+        dict: the traces (none)
+    """
+    # (note: state variables must be declared as global variables to update!)
+    global round_number, red_size, blue_size
+    # set the random number seed
+    if seed is not None:
+        np.random.seed(seed)
+    # reset the state variables to their initial values
+    round_number = 0
+    red_size = 20
+    blue_size = 10
+
+    # main execution loop: continue while the game is not complete
+    while not is_complete():
+        # generate the number of red hits
+        red_hits = generate_red_hits()
+        # generate the number of blue hits
+        blue_hits = generate_blue_hits()
+        # red team suffers losses of blue hits
+        red_suffer_losses(blue_hits)
+        # blue team suffers losses of red hits
+        blue_suffer_losses(red_hits)
+        # advance to the next round
+        next_round()
+        if verbose:
+            # print out the current state for debugging
+            print("Round {}: {} Red, {} Blue".format(
+                    round_number, 
+                    red_size,
+                    blue_size
+                ))
+
+    summary = {'rounds': round_number, 'red': int(red_size), 'blue': int(blue_size),
+               'red_wins': int(red_size > 0), 'blue_wins': int(blue_size > 0)}
+    return summary, {}
+
+if __name__ == '__main__':
+    # run one battle and print out the state after each round
+    run_battle(verbose=True)
+
+    # after main loop exists, check who won (whichever team still has fighters!)
+    if red_size > 0:
+        print("Red Wins")
+    elif blue_size > 0:
+        print("Blue Wins")
+    else:
+        print("Tie - Mutual Destruction!")
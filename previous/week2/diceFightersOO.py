@@ -12,7 +12,9 @@ from __future__ import absolute_import, division, print_function
 import numpy as np
 
 # define a class to model each team
-class Team:
+class Team(object):
+    # define the attributes (using slots avoids a dictionary per instance)
+    __slots__ = ('size', 'chance_hit')
     # define an initialization function
     def __init__(self, size, chance_hit):
         self.size = size
@@ -49,29 +51,59 @@ def next_round():
     # advance the round_number
     round_number += 1
 
-# main execution loop: continue while the game is not complete
-while not is_complete():
-    # generate the number of red hits
-    red_hits = red.generate_hits()
-    # generate the number of blue hits
-    blue_hits = blue.generate_hits()
-    # red team suffers losses of blue hits
-    red.suffer_losses(blue_hits)
-    # blue team suffers losses of red hits
-    blue.suffer_losses(red_hits)
-    # advance to the next round
-    next_round()
-    # print out the current state for debugging
-    print("Round {}: {} Red, {} Blue".format(
-            round_number, 
-            red.size,
-            blue.size
-        ))
+def run_battle(seed=None, verbose=False):
+    """ Runs one battle with new teams until it is complete.
 
-# after main loop exists, check who won (whichever team still has fighters!)
-if red.size > 0:
-	print("Red Wins")
-elif blue.size > 0:
-	print("Blue Wins")
-else:
-	print("Tie - Mutual Destruction!")
+    Args:
+        seed (int): the random number seed (None to continue the current stream)
+        verbose (bool): True, to print out the state after each round
+
+    Returns:
+        dict: the summary outputs (rounds, final sizes, and red/blue win flags)
+        dict: the traces (none)
+    """
+    # (note: state variables must be declared as global variables to update!)
+    global round_number, red, blue
+    # set the random number seed
+    if seed is not None:
+        np.random.seed(seed)
+    # reset the round number and create new teams
+    round_number = 0
+    red = Team(20, 1/6)
+    blue = Team(10, 3/6)
+
+    # main execution loop: continue while the game is not complete
+    while not is_complete():
+        # generate the number of red hits
+        red_hits = red.generate_hits()
+        # generate the number of blue hits
+        blue_hits = blue.generate_hits()
+        # red team suffers losses of blue hits
+        red.suffer_losses(blue_hits)
+        # blue team suffers losses of red hits
+        blue.suffer_losses(red_hits)
+        # advance to the next round
+        next_round()
+        if verbose:
+            # print out the current state for debugging
+            print("Round {}: {} Red, {} Blue".format(
+                    round_number, 
+                    red.size,
+                    blue.size
+                ))
+
+    summary = {'rounds': round_number, 'red': int(red.size), 'blue': int(blue.size),
+               'red_wins': int(red.size > 0), 'blue_wins': int(blue.size > 0)}
+    return summary, {}
+
+if __name__ == '__main__':
+    # run one battle and print out the state after each round
+    run_battle(verbose=True)
+
+    # after main loop exists, check who won (whichever team still has fighters!)
+    if red.size > 0:
+        print("Red Wins")
+    elif blue.size > 0:
+        print("Blue Wins")
+    else:
+        print("Tie - Mutual Destruction!")
@@ -8,9 +8,6 @@ SYS-611: Tic-Tac-Toe Example
 # import the python3 behavior for importing, division, and printing in python2
 from __future__ import absolute_import, division, print_function
 
-# import the pandas library and refer to it as `pd`
-import pandas as pd
-
 # define the game state as a list of lists with 3x3 grid cells
 # initialize the cells to a blank space character
 state = [
@@ -40,6 +37,9 @@ def mark_o(row, col):
 
 # define a function to print out the grid to the console
 def show_grid():
+    # import the pandas library and refer to it as `pd`
+    # (note: imported only when needed because it is slow to load)
+    import pandas as pd
     # use the pandas dataframe to help format the matrix
     print(pd.DataFrame(state))
 
@@ -60,17 +60,18 @@ def is_tie():
 
 #%% example game sequence
 
-mark_x(1, 1)
-show_grid()
+if __name__ == '__main__':
+    mark_x(1, 1)
+    show_grid()
 
-mark_o(0, 2)
-show_grid()
+    mark_o(0, 2)
+    show_grid()
 
-mark_x(0, 0)
-show_grid()
+    mark_x(0, 0)
+    show_grid()
 
-mark_o(2, 2)
-show_grid()
+    mark_o(2, 2)
+    show_grid()
 
-reset_game()
-show_grid()
\ No newline at end of file
+    reset_game()
+    show_grid()
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+SYS-611: Tic-Tac-Toe Monte Carlo Tree Search Example
+
+This example chooses tic-tac-toe moves by simulation using Monte Carlo tree
+search with the upper confidence bound for trees (UCT). Each iteration selects
+a path down the search tree, adds one new child state, and estimates its value
+with a batch of random playouts (simulated at once with numpy arrays). Game
+states are immutable and hashable (see `ticTacToeSolver.State`), so many games
+can be played at once, e.g. self-play games in parallel worker processes.
+
+The strength of the agent is measured against the exact solver: the fraction
+of moves which are optimal and the outcomes of games against random, perfect,
+or other search players.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+import concurrent.futures
+import math
+import time
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+from ticTacToeSolver import Game, State
+
+#%% SECTION TO CONFIGURE AGENTS
+
+# number of random playouts per move
+NUM_PLAYOUTS = 400
+# number of random playouts per search iteration (simulated at once)
+BATCH_SIZE = 8
+# exploration constant of the upper confidence bound
+EXPLORATION = math.sqrt(2)
+
+# the game (a module variable to share solved positions between games)
+GAME = Game(3, 3, 3)
+
+#%% SECTION TO DEFINE AGENTS
+
+class Node(object):
+    """ Defines a node of the search tree. """
+    __slots__ = ('state', 'parent', 'cell', 'children', 'untried',
+                 'outcome', 'visits', 'score')
+
+    def __init__(self, game, state, parent=None, cell=None):
+        """ Initializes this node.
+
+        Args:
+            game (Game): the game
+            state (State): the game state
+            parent (Node): the parent node (None for the root)
+            cell (int): the cell marked to reach this state from the parent
+        """
+        self.state = state
+        self.parent = parent
+        self.cell = cell
+        self.children = []
+        self.outcome = game.outcome(*state)
+        self.untried = game.moves(*state) if self.outcome is None else []
+        # number of playouts and total score for the player who moved last
+        self.visits = 0
+        self.score = 0.0
+
+    def select(self, exploration):
+        """ Selects the child with the highest upper confidence bound.
+
+        Args:
+            exploration (float): the exploration constant
+
+        Returns:
+            Node: the selected child
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.score/child.visits
+                   + exploration*math.sqrt(log_visits/child.visits))
+
+class MCTSAgent(object):
+    """ Defines a player which chooses moves with Monte Carlo tree search. """
+    def __init__(self, game, num_playouts=NUM_PLAYOUTS, batch_size=BATCH_SIZE,
+                 exploration=EXPLORATION):
+        """ Initializes this agent.
+
+        Args:
+            game (Game): the game
+            num_playouts (int): the number of random playouts per move
+            batch_size (int): the number of random playouts per iteration
+            exploration (float): the exploration constant
+        """
+        self.game = game
+        self.num_playouts = num_playouts
+        self.batch_size = batch_size
+        self.exploration = exploration
+        # total number of playouts and search time (seconds) of this agent
+        self.playouts = 0
+        self.search_time = 0.0
+
+    def search(self, state, rng):
+        """ Builds a search tree from a state.
+
+        Args:
+            state (State): the game state
+            rng (numpy.random.Generator): the random number generator
+
+        Returns:
+            Node: the root node
+        """
+        start = time.perf_counter()
+        root = Node(self.game, state)
+        for i in range(max(1, self.num_playouts//self.batch_size)):
+            # select a path down the tree while all children are expanded
+            node = root
+            while not node.untried and node.children:
+                node = node.select(self.exploration)
+            # expand one random untried move
+            if node.untried:
+                cell = node.untried.pop(rng.integers(len(node.untried)))
+                child = Node(self.game, node.state.play(cell), node, cell)
+                node.children.append(child)
+                node = child
+            # simulate a batch of random games from the new state
+            if node.outcome is None:
+                winners, lengths = self.game.random_playouts(
+                        self.batch_size, rng, x=node.state.x, o=node.state.o)
+                self.playouts += self.batch_size
+            else:
+                winners = np.full(self.batch_size, node.outcome)
+            # score 1 for a win, 0.5 for a tie, and 0 for a loss
+            x_score = float(np.sum(winners + 1))/2
+            # back up the scores for the player who moved into each node
+            while node is not None:
+                node.visits += self.batch_size
+                if node.state.player == -1:
+                    node.score += x_score
+                else:
+                    node.score += self.batch_size - x_score
+                node = node.parent
+        self.search_time += time.perf_counter() - start
+        return root
+
+    def choose(self, state, rng):
+        """ Chooses the most visited move after a search.
+
+        Args:
+            state (State): the game state
+            rng (numpy.random.Generator): the random number generator
+
+        Returns:
+            int: the cell to mark
+        """
+        root = self.search(state, rng)
+        return max(root.children, key=lambda child: child.visits).cell
+
+class SolverAgent(object):
+    """ Defines a perfect player which chooses a random optimal move. """
+    def __init__(self, game):
+        """ Initializes this agent.
+
+        Args:
+            game (Game): the game
+        """
+        self.game = game
+
+    def choose(self, state, rng):
+        """ Chooses a random optimal move.
+
+        Args:
+            state (State): the game state
+            rng (numpy.random.Generator): the random number generator
+
+        Returns:
+            int: the cell to mark
+        """
+        cells = self.game.best_moves(*state)
+        return cells[rng.integers(len(cells))]
+
+class RandomAgent(object):
+    """ Defines a player which chooses a random move. """
+    def __init__(self, game):
+        """ Initializes this agent.
+
+        Args:
+            game (Game): the game
+        """
+        self.game = game
+
+    def choose(self, state, rng):
+        """ Chooses a random move.
+
+        Args:
+            state (State): the game state
+            rng (numpy.random.Generator): the random number generator
+
+        Returns:
+            int: the cell to mark
+        """
+        cells = self.game.moves(*state)
+        return cells[rng.integers(len(cells))]
+
+def play_game(game, agents, rng, state=State(0, 0)):
+    """ Plays a game between two agents.
+
+    Args:
+        game (Game): the game
+        agents (tuple): the agents of player x and player o
+        rng (numpy.random.Generator): the random number generator
+        state (State): the starting state
+
+    Returns:
+        int: the winner (1 for x, -1 for o, 0 for tie)
+        list: the states after each move
+    """
+    states = [state]
+    while game.outcome(*state) is None:
+        agent = agents[0] if state.player == 1 else agents[1]
+        state = state.play(agent.choose(state, rng))
+        states.append(state)
+    return game.outcome(*state), states
+
+#%% SECTION TO DEFINE REPLICATIONS
+
+def run_match(seed=None, opponent='solver', mcts_first=True,
+              num_playouts=NUM_PLAYOUTS, batch_size=BATCH_SIZE, exploration=EXPLORATION):
+    """ Plays one game between the search agent and an opponent.
+
+    Args:
+        seed (int): the random number seed
+        opponent (str): the opponent ('solver', 'random', or 'mcts')
+        mcts_first (bool): True, if the search agent plays x (moves first)
+        num_playouts (int): the number of random playouts per move
+        batch_size (int): the number of random playouts per iteration
+        exploration (float): the exploration constant
+
+    Returns:
+        dict: the summary outputs (win, tie, and loss indicators for the
+            search agent, fraction of optimal moves, and playouts per second)
+        dict: the traces (states after each move)
+    """
+    rng = np.random.default_rng(seed)
+    agent = MCTSAgent(GAME, num_playouts, batch_size, exploration)
+    if opponent == 'solver':
+        other = SolverAgent(GAME)
+    elif opponent == 'random':
+        other = RandomAgent(GAME)
+    elif opponent == 'mcts':
+        other = MCTSAgent(GAME, num_playouts, batch_size, exploration)
+    else:
+        raise ValueError('unknown opponent {}'.format(opponent))
+    agents = (agent, other) if mcts_first else (other, agent)
+    player = 1 if mcts_first else -1
+    winner, states = play_game(GAME, agents, rng)
+
+    # compare the moves of the search agent to the optimal moves
+    optimal = []
+    for before, after in zip(states[:-1], states[1:]):
+        if before.player == player:
+            cell = ((before.x ^ after.x) | (before.o ^ after.o)).bit_length() - 1
+            optimal.append(cell in GAME.best_moves(*before))
+    return {
+        'win': int(winner == player),
+        'tie': int(winner == 0),
+        'loss': int(winner == -player),
+        'optimal_moves': np.mean(optimal),
+        'playouts_per_second': agent.playouts/agent.search_time if agent.search_time > 0 else 0.0
+    }, {'states': states}
+
+def _play_chunk(seeds, params):
+    """ Plays games for a chunk of seeds (in a worker process). """
+    return [run_match(seed, **params)[0] for seed in seeds]
+
+def play_games(num_games, first_seed=0, workers=1, chunk_size=None, **params):
+    """ Plays games in parallel worker processes and aggregates the outcomes.
+
+    Args:
+        num_games (int): the number of games
+        first_seed (int): the seed of the first game
+        workers (int): the number of worker processes
+        chunk_size (int): the number of games per task (None for automatic)
+        **params: the parameters of `run_match`
+
+    Returns:
+        dict: the fraction of wins, ties, and losses, the fraction of optimal
+            moves, and the playouts per second (per worker)
+    """
+    seeds = list(range(first_seed, first_seed + num_games))
+    if chunk_size is None:
+        chunk_size = max(1, num_games//(4*max(workers, 1)))
+    chunks = [seeds[i:i+chunk_size] for i in range(0, num_games, chunk_size)]
+    results = []
+    if workers > 1 and len(chunks) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_results in executor.map(_play_chunk, chunks, [params]*len(chunks)):
+                results.extend(chunk_results)
+    else:
+        for chunk in chunks:
+            results.extend(_play_chunk(chunk, params))
+    return {key: np.mean([result[key] for result in results]) for key in results[0]}
+
+#%% example analysis
+
+if __name__ == '__main__':
+    import os
+
+    # number of games per match and number of worker processes
+    NUM_GAMES = 100
+    NUM_WORKERS = os.cpu_count() or 1
+
+    print('{:<24s}{:>8s}{:>8s}{:>8s}{:>10s}{:>14s}'.format(
+            'match (x vs o)', 'win', 'tie', 'loss', 'optimal', 'playouts/s'))
+    for opponent in ['random', 'solver', 'mcts']:
+        # (the search agent plays both sides in self-play games)
+        for mcts_first in ([True] if opponent == 'mcts' else [True, False]):
+            name = 'mcts vs ' + opponent if mcts_first else opponent + ' vs mcts'
+            stats = play_games(NUM_GAMES, workers=NUM_WORKERS,
+                               opponent=opponent, mcts_first=mcts_first)
+            print('{:<24s}{:>8.2f}{:>8.2f}{:>8.2f}{:>10.3f}{:>14.3g}'.format(
+                    name, stats['win'], stats['tie'], stats['loss'],
+                    stats['optimal_moves'], stats['playouts_per_second']))
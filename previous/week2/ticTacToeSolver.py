@@ -0,0 +1,498 @@
+# -*- coding: utf-8 -*-
+"""
+SYS-611: Tic-Tac-Toe Solver Example
+
+This example represents tic-tac-toe boards as two integers (bitboards) with
+one bit per cell for the marks of each player. A win is detected by checking
+if the marks of a player cover any precomputed line mask. The game tree is
+solved exactly using negamax search with alpha-beta pruning and a
+transposition table which stores each position once under the 8 symmetries
+(rotations and reflections) of the board.
+
+The same engine generalizes to m,n,k-games (k in a row on a board with m rows
+and n columns, e.g. 4x4 or 5x5 with k=4) and simulates many random or
+policy-driven games at once using numpy arrays (one row per game).
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+from collections import namedtuple
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# flags for transposition table values (exact value or lower/upper bound)
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class State(namedtuple('State', ['x', 'o'])):
+    """ Defines an immutable (and hashable) game state.
+
+    A state is a tuple of the bitboards of player x and player o, so it can be
+    used as a dictionary key and unpacked as arguments for `Game` methods,
+    e.g. `game.moves(*state)`. Many games can be played at once because no
+    state is shared between games.
+    """
+    __slots__ = ()
+
+    @property
+    def player(self):
+        """ int: the player to move (1 for x, -1 for o). """
+        return 1 if bin(self.x).count('1') == bin(self.o).count('1') else -1
+
+    def play(self, cell):
+        """ Marks a cell for the player to move.
+
+        Args:
+            cell (int): the cell
+
+        Returns:
+            State: the new state (this state is unchanged)
+        """
+        if (self.x | self.o) >> cell & 1:
+            raise ValueError('cell {} is not empty'.format(cell))
+        if self.player == 1:
+            return State(self.x | 1 << cell, self.o)
+        return State(self.x, self.o | 1 << cell)
+
+class Game(object):
+    """ Defines an m,n,k-game (k in a row on an m-by-n board) using bitboards. """
+    def __init__(self, m=3, n=3, k=3):
+        """ Initializes this game.
+
+        Cell (row, col) is stored in bit row*n + col. Player x moves first.
+
+        Args:
+            m (int): the number of rows
+            n (int): the number of columns
+            k (int): the number of marks in a row to win
+        """
+        if k > max(m, n):
+            raise ValueError('k cannot exceed the board size')
+        self.m = m
+        self.n = n
+        self.k = k
+        self.cells = m*n
+        self.full = (1 << self.cells) - 1
+
+        # define the cells of each horizontal, vertical, and diagonal line
+        line_cells = []
+        for row in range(m):
+            for col in range(n):
+                for d_row, d_col in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_row, end_col = row + (k-1)*d_row, col + (k-1)*d_col
+                    if 0 <= end_row < m and 0 <= end_col < n:
+                        line_cells.append([(row + i*d_row)*n + col + i*d_col
+                                           for i in range(k)])
+        self.line_cells = np.array(line_cells, dtype=np.intp)
+        self.lines = [sum(1 << cell for cell in cells) for cells in line_cells]
+
+        # matrix with 1 if a cell is part of a line (one row per line)
+        self.line_matrix = np.zeros((len(self.lines), self.cells), dtype=np.float32)
+        for i, cells in enumerate(line_cells):
+            self.line_matrix[i, cells] = 1
+
+        # search cells on more lines (e.g. the center) first
+        count = self.line_matrix.sum(axis=0)
+        self.order = sorted(range(self.cells), key=lambda cell: -count[cell])
+
+        # define the board symmetries as permutations of cells
+        self.symmetries = []
+        for transform in self._transforms():
+            permutation = []
+            for row in range(m):
+                for col in range(n):
+                    new_row, new_col = transform(row, col)
+                    permutation.append(new_row*n + new_col)
+            if permutation not in self.symmetries:
+                self.symmetries.append(permutation)
+
+        # precompute lookup tables to permute bits one byte at a time
+        self._chunks = (self.cells + 7)//8
+        self._tables = [[[self._permute_bits(byte << 8*chunk, permutation)
+                          for byte in range(256)] for chunk in range(self._chunks)]
+                        for permutation in self.symmetries]
+
+        # transposition table from canonical position to (value, flag)
+        self.table = {}
+
+    def _transforms(self):
+        """ Lists the rotations and reflections which map the board to itself. """
+        m, n = self.m, self.n
+        transforms = [lambda r, c: (r, c),
+                      lambda r, c: (m-1-r, c),
+                      lambda r, c: (r, n-1-c),
+                      lambda r, c: (m-1-r, n-1-c)]
+        if m == n:
+            transforms += [lambda r, c: (c, r),
+                           lambda r, c: (n-1-c, r),
+                           lambda r, c: (c, m-1-r),
+                           lambda r, c: (n-1-c, m-1-r)]
+        return transforms
+
+    def _permute_bits(self, bits, permutation):
+        """ Moves each set bit to its permuted cell. """
+        result = 0
+        for cell in range(self.cells):
+            if bits >> cell & 1:
+                result |= 1 << permutation[cell]
+        return result
+
+    def transform(self, bits, symmetry):
+        """ Applies a board symmetry to a bitboard.
+
+        Args:
+            bits (int): the bitboard
+            symmetry (int): the index of the symmetry
+
+        Returns:
+            int: the transformed bitboard
+        """
+        tables = self._tables[symmetry]
+        result = 0
+        for chunk in range(self._chunks):
+            result |= tables[chunk][bits >> 8*chunk & 255]
+        return result
+
+    def canonical(self, me, opp):
+        """ Computes the canonical key of a position under all board symmetries.
+
+        Args:
+            me (int): the bitboard of the player to move
+            opp (int): the bitboard of the other player
+
+        Returns:
+            int: the smallest combined key of all symmetric positions
+        """
+        return min(self.transform(me, s) << self.cells | self.transform(opp, s)
+                   for s in range(len(self.symmetries)))
+
+    def is_win(self, bits):
+        """ Checks if a bitboard covers any line.
+
+        Args:
+            bits (int): the bitboard
+
+        Returns:
+            bool: True, if the marks cover a line
+        """
+        for line in self.lines:
+            if bits & line == line:
+                return True
+        return False
+
+    def winner(self, x, o):
+        """ Gets the winner of a position.
+
+        Args:
+            x (int): the bitboard of player x
+            o (int): the bitboard of player o
+
+        Returns:
+            int: 1 if x wins, -1 if o wins, otherwise 0
+        """
+        if self.is_win(x):
+            return 1
+        if self.is_win(o):
+            return -1
+        return 0
+
+    def outcome(self, x, o):
+        """ Gets the outcome of a position if the game is over.
+
+        Args:
+            x (int): the bitboard of player x
+            o (int): the bitboard of player o
+
+        Returns:
+            int: 1 if x wins, -1 if o wins, 0 for a tie, or None if not over
+        """
+        winner = self.winner(x, o)
+        if winner != 0 or x | o == self.full:
+            return winner
+        return None
+
+    def to_move(self, x, o):
+        """ Gets the player to move (x moves first).
+
+        Args:
+            x (int): the bitboard of player x
+            o (int): the bitboard of player o
+
+        Returns:
+            int: 1 if x moves next, -1 if o moves next
+        """
+        return 1 if bin(x).count('1') == bin(o).count('1') else -1
+
+    def moves(self, x, o):
+        """ Lists the empty cells (in search order).
+
+        Args:
+            x (int): the bitboard of player x
+            o (int): the bitboard of player o
+
+        Returns:
+            list: the empty cells
+        """
+        occupied = x | o
+        return [cell for cell in self.order if not occupied >> cell & 1]
+
+    def solve(self, x=0, o=0):
+        """ Solves a position with perfect play by both players.
+
+        Args:
+            x (int): the bitboard of player x
+            o (int): the bitboard of player o
+
+        Returns:
+            int: 1 if the player to move wins, -1 if it loses, 0 for a draw
+        """
+        if self.winner(x, o) != 0:
+            # the previous move won the game
+            return -1
+        if self.to_move(x, o) == 1:
+            return self._negamax(x, o, -1, 1)
+        return self._negamax(o, x, -1, 1)
+
+    def best_moves(self, x=0, o=0):
+        """ Finds all optimal moves in a position.
+
+        Args:
+            x (int): the bitboard of player x
+            o (int): the bitboard of player o
+
+        Returns:
+            list: the optimal cells for the player to move
+        """
+        me, opp = (x, o) if self.to_move(x, o) == 1 else (o, x)
+        values = {}
+        for cell in self.moves(x, o):
+            mine = me | 1 << cell
+            if self.is_win(mine):
+                values[cell] = 1
+            elif mine | opp == self.full:
+                values[cell] = 0
+            else:
+                values[cell] = -self._negamax(opp, mine, -1, 1)
+        best = max(values.values()) if values else 0
+        return sorted(cell for cell in values if values[cell] == best)
+
+    def _negamax(self, me, opp, alpha, beta):
+        """ Searches the game tree with alpha-beta pruning.
+
+        The position is never won by the previous move (checked by the caller).
+
+        Args:
+            me (int): the bitboard of the player to move
+            opp (int): the bitboard of the other player
+            alpha (int): the lower bound of values of interest
+            beta (int): the upper bound of values of interest
+
+        Returns:
+            int: the value for the player to move (exact if inside the bounds)
+        """
+        occupied = me | opp
+        if occupied == self.full:
+            return 0
+        # look up the stored value or bounds of this (or a symmetric) position
+        key = self.canonical(me, opp)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+        moves = [1 << cell for cell in self.order if not occupied >> cell & 1]
+        # win immediately if possible
+        for move in moves:
+            if self.is_win(me | move):
+                self.table[key] = (1, EXACT)
+                return 1
+        alpha_0 = alpha
+        best = -1
+        for move in moves:
+            value = -self._negamax(opp, me | move, -beta, -alpha)
+            if value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        if best <= alpha_0:
+            self.table[key] = (best, UPPER)
+        elif best >= beta:
+            self.table[key] = (best, LOWER)
+        else:
+            self.table[key] = (best, EXACT)
+        return best
+
+    def show(self, x, o):
+        """ Formats a position as text.
+
+        Args:
+            x (int): the bitboard of player x
+            o (int): the bitboard of player o
+
+        Returns:
+            str: the board with one row per line
+        """
+        return '\n'.join(' '.join('x' if x >> (row*self.n + col) & 1
+                                  else 'o' if o >> (row*self.n + col) & 1 else '.'
+                                  for col in range(self.n)) for row in range(self.m))
+
+    def random_playouts(self, num_games, rng=None, chunk_size=2**16, x=0, o=0):
+        """ Simulates games with uniform random moves by both players.
+
+        A game of random moves places marks in a random order of all cells,
+        so the times at which cells are marked are a random permutation. Each
+        line is completed when its last cell is marked, if all its cells have
+        the same owner (player x marks at even times). The winner is the first
+        player to complete a line. No loop over moves is required.
+
+        Games can start from a position which is not over, in which case the
+        existing marks are given negative times (-2 for x and -1 for o).
+
+        Args:
+            num_games (int): the number of games
+            rng (numpy.random.Generator): the random number generator
+            chunk_size (int): the maximum number of games simulated at once
+            x (int): the bitboard of player x in the starting position
+            o (int): the bitboard of player o in the starting position
+
+        Returns:
+            numpy.ndarray: the winner of each game (1 for x, -1 for o, 0 for tie)
+            numpy.ndarray: the number of moves in each game
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        winners = np.zeros(num_games, dtype=np.int8)
+        lengths = np.zeros(num_games, dtype=np.int8)
+        never = np.int8(self.cells)
+        empty = np.array([cell for cell in range(self.cells)
+                          if not (x | o) >> cell & 1], dtype=np.intp)
+        marked = self.cells - len(empty)
+        initial = np.array([-2 if x >> cell & 1 else -1 for cell in range(self.cells)],
+                           dtype=np.int8)
+        for start in range(0, num_games, chunk_size):
+            size = min(chunk_size, num_games - start)
+            # time at which each cell is marked (the argsort of random keys is
+            # a random permutation, as is its inverse)
+            order = np.argsort(rng.random((size, len(empty))), axis=1).astype(np.int8)
+            if marked == 0:
+                time = order
+            else:
+                time = np.tile(initial, (size, 1))
+                time[:, empty] = order + np.int8(marked)
+            times = time[:, self.line_cells]
+            # number of cells in each line marked by player o (at odd times)
+            odd = (times & 1).sum(axis=2)
+            complete = times.max(axis=2)
+            # time at which each player first completes a line
+            t_x = np.where(odd == 0, complete, never).min(axis=1)
+            t_o = np.where(odd == self.k, complete, never).min(axis=1)
+            winners[start:start+size] = np.sign(t_o.astype(np.int16) - t_x)
+            lengths[start:start+size] = np.minimum(np.minimum(t_x, t_o) + 1, self.cells)
+        return winners, lengths
+
+    def playouts(self, num_games, policies=(None, None), rng=None, chunk_size=2**16):
+        """ Simulates games with moves chosen by policies for each player.
+
+        Boards are arrays with one row per game and one column per cell (1 for
+        x, -1 for o, and 0 for empty). A policy is called with the game, the
+        boards from the perspective of the player to move (1 for own marks),
+        and the random number generator. It returns a score for each cell and
+        the empty cell with the highest score is marked (None for random moves).
+
+        Args:
+            num_games (int): the number of games
+            policies (tuple): the policies of player x and player o
+            rng (numpy.random.Generator): the random number generator
+            chunk_size (int): the maximum number of games simulated at once
+
+        Returns:
+            numpy.ndarray: the winner of each game (1 for x, -1 for o, 0 for tie)
+            numpy.ndarray: the number of moves in each game
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        winners = np.zeros(num_games, dtype=np.int8)
+        lengths = np.full(num_games, self.cells, dtype=np.int16)
+        for start in range(0, num_games, chunk_size):
+            size = min(chunk_size, num_games - start)
+            board = np.zeros((size, self.cells), dtype=np.int8)
+            active = np.arange(size)
+            for t in range(self.cells):
+                player = 1 if t % 2 == 0 else -1
+                policy = policies[t % 2] or random_policy
+                scores = np.array(policy(self, board[active]*player, rng), dtype=float)
+                scores[board[active] != 0] = -np.inf
+                cell = np.argmax(scores, axis=1)
+                board[active, cell] = player
+                # check for completed lines (sum of k marks of the player)
+                sums = board[active].astype(np.float32) @ self.line_matrix.T
+                won = (sums == player*self.k).any(axis=1)
+                winners[start + active[won]] = player
+                lengths[start + active[won]] = t + 1
+                active = active[~won]
+                if len(active) == 0:
+                    break
+        return winners, lengths
+
+def random_policy(game, boards, rng):
+    """ Scores cells for uniform random moves.
+
+    Args:
+        game (Game): the game
+        boards (numpy.ndarray): the boards from the perspective of the player to move
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        numpy.ndarray: the cell scores
+    """
+    return rng.random(boards.shape)
+
+def greedy_policy(game, boards, rng):
+    """ Scores cells to win if possible, otherwise block, otherwise move randomly.
+
+    Args:
+        game (Game): the game
+        boards (numpy.ndarray): the boards from the perspective of the player to move
+        rng (numpy.random.Generator): the random number generator
+
+    Returns:
+        numpy.ndarray: the cell scores
+    """
+    sums = boards.astype(np.float32) @ game.line_matrix.T
+    # a line with k-1 own (or opponent) marks has exactly one empty cell
+    wins = (sums == game.k - 1).astype(np.float32) @ game.line_matrix
+    blocks = (sums == 1 - game.k).astype(np.float32) @ game.line_matrix
+    return 4*(wins > 0) + 2*(blocks > 0) + rng.random(boards.shape)
+
+#%% example analysis
+
+if __name__ == '__main__':
+    game = Game(3, 3, 3)
+    print('tic-tac-toe value with perfect play: {:d} (0 is a draw)'.format(game.solve()))
+    print('positions in the transposition table: {:d}'.format(len(game.table)))
+    print('optimal first moves: {}'.format(game.best_moves()))
+
+    # x in the center and o on an edge: x wins with perfect play
+    x, o = 1 << 4, 1 << 1
+    print(game.show(x, o))
+    print('value for x to move: {:d}, optimal moves: {}'.format(
+            game.solve(x, o), game.best_moves(x, o)))
+
+    # estimate outcome probabilities for random play
+    rng = np.random.default_rng(0)
+    winners, lengths = game.random_playouts(10**6, rng)
+    print('random play: P(x wins) = {:.4f}, P(o wins) = {:.4f}, P(tie) = {:.4f}'.format(
+            np.mean(winners == 1), np.mean(winners == -1), np.mean(winners == 0)))
+    winners, lengths = game.playouts(10**5, (greedy_policy, random_policy), rng)
+    print('greedy x vs random o: P(x wins) = {:.4f}, P(o wins) = {:.4f}, P(tie) = {:.4f}'.format(
+            np.mean(winners == 1), np.mean(winners == -1), np.mean(winners == 0)))
@@ -14,14 +14,14 @@ from __future__ import absolute_import, division, print_function
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.analysis import state_occupancy
 
 # create a numpy array with the demand sizes
 demands = np.array([0, 1, 2, 3])
 labels = ["None", "Small", "Medium", "Large"]
-print("demands = {}".format(demands))
 
 # create a numpy array with the observed frequencies
 frequency = np.array([8, 10, 22, 10])
@@ -29,32 +29,9 @@ frequency = np.array([8, 10, 22, 10])
 # the probability mass function is the number of demands (frequency) divided
 # by the total number of demands (sum of all frequency)
 pmf = frequency/np.sum(frequency)
-print("pmf = {}".format(pmf))
-
-# create a new figure for a bar plot using the demand indices, pmf values, 
-# desired bar width, and color
-plt.figure()
-bar_width = 0.5
-plt.bar(demands, pmf, bar_width, align='center', color='b')
-plt.ylabel('p(x)')
-plt.ylim([0,1])
-plt.xlabel('Coffee Demand (x)')
-plt.title('PMF for Cafe Java Demand')
-plt.xticks(demands, labels)
 
 # the cumulative distribution function is the cumulative sum of the PDF
 cdf = np.cumsum(pmf)
-print("cdf = {}".format(cdf))
-
-# create a new figure for a step plot using the demand indices, cdf values,
-# desired format (solid red line, -r), and option for post-steps
-plt.figure()
-plt.step(demands, cdf, '-r', where='post')
-plt.ylabel('F(x)')
-plt.ylim([0,1])
-plt.xlabel('Coffee Demand (x)')
-plt.title('CDF for Cafe Java Demand')
-plt.xticks(demands, labels)
 
 # define a function to generate demands following the inverse transform method
 def generate_demand_ivt():
@@ -87,27 +64,73 @@ def generate_demand_ivt():
             return demands[i]
     """
 
-# define number of samples
-num_samples = 1000
+def run_demands(seed, num_samples=1000):
+    """Generates demand samples using the inverse transform method.
+    
+    Args:
+        seed (int): the random number seed
+        num_samples (int): the number of samples
+    
+    Returns:
+        summary (dict): the sample mean and relative frequency of each demand
+        traces (dict): the samples
+    """
+    np.random.seed(seed)
+    samples = [generate_demand_ivt() for i in range(num_samples)]
+    summary = {'mean': np.mean(samples)}
+    for i, frequency_i in enumerate(state_occupancy(samples, len(demands))):
+        summary['p%d' % i] = frequency_i
+    return summary, {'samples': samples}
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+    
+    print("demands = {}".format(demands))
+    print("pmf = {}".format(pmf))
+    print("cdf = {}".format(cdf))
+    
+    # create a new figure for a bar plot using the demand indices, pmf values, 
+    # desired bar width, and color
+    plt.figure()
+    bar_width = 0.5
+    plt.bar(demands, pmf, bar_width, align='center', color='b')
+    plt.ylabel('p(x)')
+    plt.ylim([0,1])
+    plt.xlabel('Coffee Demand (x)')
+    plt.title('PMF for Cafe Java Demand')
+    plt.xticks(demands, labels)
+
+    # create a new figure for a step plot using the demand indices, cdf values,
+    # desired format (solid red line, -r), and option for post-steps
+    plt.figure()
+    plt.step(demands, cdf, '-r', where='post')
+    plt.ylabel('F(x)')
+    plt.ylim([0,1])
+    plt.xlabel('Coffee Demand (x)')
+    plt.title('CDF for Cafe Java Demand')
+    plt.xticks(demands, labels)
 
-# fill the samples arrays with samples from the generators
-samples_ivt = [generate_demand_ivt() for i in range(num_samples)]
+    # define number of samples
+    num_samples = 1000
+
+    # fill the samples arrays with samples from the generators
+    samples_ivt = [generate_demand_ivt() for i in range(num_samples)]
     
-# count the number of each demand: use a generator expression to count the
-# number of samples which match each demand level i
-counts_ivt = np.array([sum(samples_ivt==i) for i in demands])
-frequency_ivt = counts_ivt/np.sum(counts_ivt)
-
-# create a new figure recreating the PMF bar plot
-plt.figure()
-bar_width = 0.3
-plt.bar(demands, pmf, bar_width, align='center', color='k', label='Observed')
-# also display the generated frequency (offset bars by bar_width)
-plt.bar(demands+bar_width, frequency_ivt, 
-        bar_width, color='b', label='Generated (IVT)')
-plt.ylabel('p(x)')
-plt.ylim([0,1])
-plt.xlabel('Coffee Demand (x)')
-plt.title('Cafe Java Demand Process Generator Results (n={})'.format(num_samples))
-plt.xticks(demands + bar_width, labels)
-plt.legend()
\ No newline at end of file
+    # compute the relative frequency of each demand level (0, 1, 2, or 3)
+    frequency_ivt = state_occupancy(samples_ivt, len(demands))
+
+    # create a new figure recreating the PMF bar plot
+    plt.figure()
+    bar_width = 0.3
+    plt.bar(demands, pmf, bar_width, align='center', color='k', label='Observed')
+    # also display the generated frequency (offset bars by bar_width)
+    plt.bar(demands+bar_width, frequency_ivt, 
+            bar_width, color='b', label='Generated (IVT)')
+    plt.ylabel('p(x)')
+    plt.ylim([0,1])
+    plt.xlabel('Coffee Demand (x)')
+    plt.title('Cafe Java Demand Process Generator Results (n={})'.format(num_samples))
+    plt.xticks(demands + bar_width, labels)
+    plt.legend()
@@ -12,18 +12,15 @@ mathematical constant pi.
 # import the python3 behavior for importing, division, and printing in python2
 from __future__ import absolute_import, division, print_function
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
-
-# import the scipy stats package and refer to it as `stats`
-# see http://docs.scipy.org/doc/scipy/reference/stats.html for documentation
-import scipy.stats as stats
-
 # import the numpy package and refer to it as `np`
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.sequential import run_until_precision
+
 # define the line width and needle length for buffon's experiment
 line_width = 3.0
 needle_length = 2.5
@@ -48,64 +45,98 @@ def drop_needle():
     # return the average of the two antithetic variables
     return (x_1+x_2)/2.
 
-# set the random number generator seed to 0
-np.random.seed(0)
-
-# generate 850 samples
-samples = [drop_needle() for i in range(850)]
-
-# compute the lower and upper-bounds using a 95% confidence interval
-confidence_level = 0.05
-z_crit = stats.norm.ppf(1-confidence_level/2)
-
-print('P(X) = {:.3f} +/- {:.3f} (95% CI)'.format(
-        np.average(samples),
-        z_crit*stats.sem(samples)
-    ))
-
-# compute the exact solution, as solved by calculus
-solution = 2*needle_length/(line_width*np.pi)
-
-# compute running statistics for mean and confidence interval
-mean_estimate = np.array([np.average(samples[0:i]) for i in range(len(samples))])
-confidence_int = z_crit*np.array([stats.sem(samples[0:i]) for i in range(len(samples))])
-
-# create a plot to show the mean estimate with 95% confidence interval bounds
-plt.figure()
-plt.plot(range(len(samples)), mean_estimate, 
-         'b', label='Mean Estimate')
-plt.plot(range(len(samples)), mean_estimate-confidence_int, 
-         'g', label='95% CI Lower Bound')
-plt.plot(range(len(samples)), mean_estimate+confidence_int, 
-         'r', label='95% CI Upper Bound')
-plt.plot([0, len(samples)], [solution, solution], 
-          '-k', label='Analytical Solution')
-plt.xlabel('Sample')
-plt.ylabel('Estimate of $P(x)$')
-plt.legend(loc='best')
-
-#%%
-
-# transform the mean estimate to estimate pi using the solution form
-pi_estimate = 2*needle_length/(line_width*mean_estimate)
-pi_lower_bound = 2*needle_length/(line_width*(mean_estimate+confidence_int))
-pi_upper_bound = 2*needle_length/(line_width*(mean_estimate-confidence_int))
-
-print('pi = {:.3f} +/- {:.3f} (95% CI)'.format(
-        pi_estimate[-1],
-        pi_upper_bound[-1] - pi_estimate[-1]
-    ))
-
-# create a plot to show the pi estimate with 95% confidence interval bounds
-plt.figure()
-plt.plot(range(len(samples)), pi_estimate, 
-         'b', label='Mean Estimate')
-plt.plot(range(len(samples)), pi_lower_bound, 
-         'g', label='95% CI Lower Bound')
-plt.plot(range(len(samples)), pi_upper_bound, 
-         'r', label='95% CI Upper Bound')
-plt.plot([0, len(samples)], [np.pi, np.pi], 
-         '-k', label='Analytical Solution')
-plt.xlabel('Sample')
-plt.ylabel('Estimate of $\pi$')
-plt.legend(loc='best')
\ No newline at end of file
+def run_needles(seed, precision=0.01, max_samples=850):
+    """ Drops needles until the 95% confidence interval is precise enough.
+
+    Args:
+        seed (int): the random number seed
+        precision (float): the target 95% confidence interval half-width for p
+        max_samples (int): the maximum number of samples
+
+    Returns:
+        dict: the summary outputs (estimates of p and pi, number of samples)
+        dict: the traces (samples)
+    """
+    # set the random number generator seed
+    np.random.seed(seed)
+    # generate samples until the 95% confidence interval half-width is met
+    # (at least 100 samples so a few equal samples cannot stop it early)
+    result = run_until_precision(lambda i: drop_needle(), abs_precision=precision,
+                                 min_runs=100, max_runs=max_samples)
+    samples = result.samples['value']
+    summary = {'p': np.average(samples),
+               'pi': 2*needle_length/(line_width*np.average(samples)),
+               'samples': len(samples)}
+    return summary, {'samples': samples}
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # import the scipy stats package and refer to it as `stats`
+    # see http://docs.scipy.org/doc/scipy/reference/stats.html for documentation
+    import scipy.stats as stats
+
+    from sys611.analysis import running_mean, running_sem
+
+    # generate samples with seed 0 until the 95% confidence interval
+    # half-width is 0.01 (at most 850 samples)
+    summary, traces = run_needles(0)
+    samples = traces['samples']
+
+    # compute the lower and upper-bounds using a 95% confidence interval
+    confidence_level = 0.05
+    z_crit = stats.norm.ppf(1-confidence_level/2)
+
+    print('P(X) = {:.3f} +/- {:.3f} (95% CI)'.format(
+            np.average(samples),
+            z_crit*stats.sem(samples)
+        ))
+
+    # compute the exact solution, as solved by calculus
+    solution = 2*needle_length/(line_width*np.pi)
+
+    # compute running statistics for mean and confidence interval
+    mean_estimate = running_mean(samples)
+    confidence_int = z_crit*running_sem(samples)
+
+    # create a plot to show the mean estimate with 95% confidence interval bounds
+    plt.figure()
+    plt.plot(1+np.arange(len(samples)), mean_estimate, 
+             'b', label='Mean Estimate')
+    plt.plot(1+np.arange(len(samples)), mean_estimate-confidence_int, 
+             'g', label='95% CI Lower Bound')
+    plt.plot(1+np.arange(len(samples)), mean_estimate+confidence_int, 
+             'r', label='95% CI Upper Bound')
+    plt.plot([0, len(samples)], [solution, solution], 
+              '-k', label='Analytical Solution')
+    plt.xlabel('Sample')
+    plt.ylabel('Estimate of $P(x)$')
+    plt.legend(loc='best')
+
+    #%%
+
+    # transform the mean estimate to estimate pi using the solution form
+    pi_estimate = 2*needle_length/(line_width*mean_estimate)
+    pi_lower_bound = 2*needle_length/(line_width*(mean_estimate+confidence_int))
+    pi_upper_bound = 2*needle_length/(line_width*(mean_estimate-confidence_int))
+
+    print('pi = {:.3f} +/- {:.3f} (95% CI)'.format(
+            pi_estimate[-1],
+            pi_upper_bound[-1] - pi_estimate[-1]
+        ))
+
+    # create a plot to show the pi estimate with 95% confidence interval bounds
+    plt.figure()
+    plt.plot(1+np.arange(len(samples)), pi_estimate, 
+             'b', label='Mean Estimate')
+    plt.plot(1+np.arange(len(samples)), pi_lower_bound, 
+             'g', label='95% CI Lower Bound')
+    plt.plot(1+np.arange(len(samples)), pi_upper_bound, 
+             'r', label='95% CI Upper Bound')
+    plt.plot([0, len(samples)], [np.pi, np.pi], 
+             '-k', label='Analytical Solution')
+    plt.xlabel('Sample')
+    plt.ylabel('Estimate of $\pi$')
+    plt.legend(loc='best')
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+SYS-611: Multi-Team Combat Engine Example
+
+This example generalizes the dice fighters battle to N teams. Each team has
+one or more unit types with different sizes and chances to hit, and a
+targeting matrix defines the fraction of each team's fire directed at each
+other team. Fire is redirected to the remaining targets when a team is
+eliminated, and reinforcements can arrive at scheduled rounds.
+
+Battles are simulated in two modes:
+ * stochastic: many battles at once with numpy arrays (one row per battle).
+   The hits of each unit type are binomial (one draw instead of one roll per
+   die), hits are split among targets with conditional binomial draws
+   (multinomial), and hits on a team are allocated to its unit types with
+   hypergeometric draws (each hit eliminates a random unit).
+ * mean-field: the deterministic Lanchester (aimed fire) differential
+   equations for the expected number of units which give an instant
+   approximation of the battle outcome and duration.
+
+@author: Paul T. Grogan, pgrogan@stevens.edu
+"""
+
+# import the python3 behavior for importing, division, and printing in python2
+from __future__ import absolute_import, division, print_function
+
+# import the numpy package and refer to it as `np`
+# see http://docs.scipy.org/doc/numpy/reference/ for documentation
+import numpy as np
+
+# define a class to model each team
+class Team(object):
+    """ Defines a team with one or more unit types. """
+    __slots__ = ('name', 'sizes', 'chance_hits', 'types')
+
+    def __init__(self, name, sizes, chance_hits, types=None):
+        """ Initializes this team.
+
+        Args:
+            name (str): the team name
+            sizes (int or list): the initial number of units of each type
+            chance_hits (float or list): the chance to hit of each type
+            types (list): the names of each type (None for numbers)
+        """
+        self.name = name
+        self.sizes = tuple(np.atleast_1d(sizes).astype(int))
+        self.chance_hits = tuple(np.broadcast_to(chance_hits, len(self.sizes)).astype(float))
+        self.types = tuple(types) if types is not None else tuple(
+                str(i) for i in range(len(self.sizes)))
+
+    @property
+    def size(self):
+        """ int: the initial number of units of all types. """
+        return sum(self.sizes)
+
+class Combat(object):
+    """ Defines a battle between N teams. """
+    def __init__(self, teams, targeting=None, reinforcements=(), max_rounds=1000):
+        """ Initializes this battle.
+
+        Args:
+            teams (list): the teams
+            targeting (numpy.ndarray): the N-by-N matrix of the fraction of fire
+                of each team (row) directed at each team (column) (None to
+                divide fire equally among all other teams)
+            reinforcements (list): the reinforcements as tuples (round, team
+                index, type index, number of units) which arrive at the start
+                of a round (rounds are numbered from 1)
+            max_rounds (int): the maximum number of rounds per battle
+        """
+        self.teams = list(teams)
+        num_teams = len(self.teams)
+        # define one column per unit type (of all teams)
+        self.team_of = np.array([i for i, team in enumerate(self.teams)
+                                 for size in team.sizes], dtype=np.intp)
+        self.initial = np.array([size for team in self.teams for size in team.sizes],
+                                dtype=np.int64)
+        self.chance_hit = np.array([p for team in self.teams for p in team.chance_hits])
+        # label unit types by team (e.g. red_infantry) or by team name if only one
+        self.types = ['{}_{}'.format(team.name, name) if len(team.types) > 1 else team.name
+                      for team in self.teams for name in team.types]
+        # matrix with 1 if a unit type (row) belongs to a team (column)
+        self.membership = np.zeros((len(self.team_of), num_teams), dtype=np.int64)
+        self.membership[np.arange(len(self.team_of)), self.team_of] = 1
+        if targeting is None:
+            targeting = np.ones((num_teams, num_teams)) - np.eye(num_teams)
+        targeting = np.array(targeting, dtype=float)
+        if targeting.shape != (num_teams, num_teams) or np.any(targeting < 0):
+            raise ValueError('targeting must be a non-negative {0}x{0} matrix'.format(num_teams))
+        self.targeting = targeting*(1 - np.eye(num_teams))
+        # map from round to the number of units of each type to add
+        self.reinforcements = {}
+        offsets = np.cumsum([0] + [len(team.sizes) for team in self.teams])
+        for round_number, team, unit, count in reinforcements:
+            added = self.reinforcements.setdefault(round_number, np.zeros_like(self.initial))
+            added[offsets[team] + unit] += count
+        self.max_rounds = max_rounds
+
+    def fire_fractions(self, alive):
+        """ Computes the fraction of fire of each team directed at each team.
+
+        Fire directed at eliminated teams is redistributed to the remaining
+        targets in proportion to the targeting matrix.
+
+        Args:
+            alive (numpy.ndarray): True for teams with units (one row per battle)
+
+        Returns:
+            numpy.ndarray: the fractions of fire (battle, attacker, target)
+        """
+        weights = self.targeting[np.newaxis, :, :]*alive[:, np.newaxis, :]
+        totals = weights.sum(axis=2, keepdims=True)
+        return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+    def simulate(self, num_battles, rng=None, sizes=None, chunk_size=2**17):
+        """ Simulates independent battles at once.
+
+        A battle ends when at most one team has units (later reinforcements do
+        not arrive) or after the maximum number of rounds.
+
+        Args:
+            num_battles (int): the number of battles
+            rng (numpy.random.Generator): the random number generator
+            sizes (numpy.ndarray): the initial number of units of each type (one
+                row per battle for parameter sweeps, None for the team sizes)
+            chunk_size (int): the maximum number of battles simulated at once
+
+        Returns:
+            numpy.ndarray: the winning team of each battle (-1 for no winner)
+            numpy.ndarray: the number of rounds of each battle
+            numpy.ndarray: the final number of units of each team (one row per battle)
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        num_teams = len(self.teams)
+        sizes = np.broadcast_to(self.initial if sizes is None else sizes,
+                                (num_battles, len(self.initial)))
+        winners = np.full(num_battles, -1, dtype=np.int8)
+        rounds = np.zeros(num_battles, dtype=np.int32)
+        final = np.zeros((num_battles, num_teams), dtype=np.int64)
+        for start in range(0, num_battles, chunk_size):
+            counts = np.array(sizes[start:start+chunk_size], dtype=np.int64)
+            active = np.arange(start, start + len(counts))
+            for round_number in range(self.max_rounds + 1):
+                # record the battles which are complete
+                team_sizes = counts @ self.membership
+                alive = team_sizes > 0
+                done = (alive.sum(axis=1) <= 1) | (round_number == self.max_rounds)
+                if np.any(done):
+                    single = alive[done].sum(axis=1) == 1
+                    winners[active[done]] = np.where(
+                            single, np.argmax(alive[done], axis=1), -1)
+                    rounds[active[done]] = round_number
+                    final[active[done]] = team_sizes[done]
+                    counts, team_sizes, alive = counts[~done], team_sizes[~done], alive[~done]
+                    active = active[~done]
+                if len(active) == 0:
+                    break
+                # add reinforcements arriving at the start of the next round
+                if round_number + 1 in self.reinforcements:
+                    counts += self.reinforcements[round_number + 1]
+                    team_sizes = counts @ self.membership
+                    alive = team_sizes > 0
+                # generate the number of hits of each unit type (all teams fire at once)
+                team_hits = rng.binomial(counts, self.chance_hit) @ self.membership
+                fractions = self.fire_fractions(alive)
+                # split hits among targets (multinomial as conditional binomials)
+                incoming = np.zeros_like(team_sizes)
+                for i in range(num_teams):
+                    targets = [j for j in range(num_teams) if self.targeting[i, j] > 0]
+                    remaining = team_hits[:, i]*(fractions[:, i, :].sum(axis=1) > 0)
+                    remaining_fraction = np.ones(len(active))
+                    for j in targets[:-1]:
+                        p = np.divide(fractions[:, i, j], remaining_fraction,
+                                      out=np.zeros(len(active)), where=remaining_fraction > 0)
+                        hits = rng.binomial(remaining, np.clip(p, 0, 1))
+                        incoming[:, j] += hits
+                        remaining = remaining - hits
+                        remaining_fraction = remaining_fraction - fractions[:, i, j]
+                    # the last target receives all remaining hits
+                    if targets:
+                        incoming[:, targets[-1]] += remaining
+                # allocate losses to random units of each target team
+                losses = np.minimum(incoming, team_sizes)
+                for j in range(num_teams):
+                    remaining = losses[:, j]
+                    others = team_sizes[:, j].copy()
+                    units = np.flatnonzero(self.team_of == j)
+                    for u in units[:-1]:
+                        others -= counts[:, u]
+                        kills = rng.hypergeometric(counts[:, u], others, remaining)
+                        counts[:, u] -= kills
+                        remaining = remaining - kills
+                    # the last unit type suffers all remaining losses
+                    counts[:, units[-1]] -= remaining
+        return winners, rounds, final
+
+    def mean_field(self, sizes=None, dt=0.05):
+        """ Solves the Lanchester (aimed fire) equations for the expected units.
+
+        Each unit type is lost at the rate of fire directed at its team times
+        its share of the team units. A team is eliminated when it has less
+        than half a unit. The equations are integrated with the fourth-order
+        Runge-Kutta method (time in rounds).
+
+        Args:
+            sizes (numpy.ndarray): the initial number of units of each type (one
+                row per scenario for parameter sweeps, None for the team sizes)
+            dt (float): the time step (rounds)
+
+        Returns:
+            numpy.ndarray: the winning team of each scenario (-1 for no winner)
+            numpy.ndarray: the duration of each scenario (rounds)
+            numpy.ndarray: the final number of units of each team (one row per scenario)
+        """
+        counts = np.array(self.initial if sizes is None else sizes, dtype=float)
+        single = counts.ndim == 1
+        counts = np.atleast_2d(counts).copy()
+        num_scenarios = len(counts)
+        duration = np.full(num_scenarios, float(self.max_rounds))
+        running = np.ones(num_scenarios, dtype=bool)
+
+        def rates(counts, alive):
+            team_sizes = counts @ self.membership
+            fire = (counts*self.chance_hit) @ self.membership
+            incoming = np.einsum('bi,bij->bj', fire, self.fire_fractions(alive))
+            share = np.divide(counts, team_sizes[:, self.team_of],
+                              out=np.zeros_like(counts), where=team_sizes[:, self.team_of] > 0)
+            return -incoming[:, self.team_of]*share
+
+        steps = int(round(1/dt))
+        for round_number in range(self.max_rounds):
+            if round_number + 1 in self.reinforcements:
+                counts[running] += self.reinforcements[round_number + 1]
+            for step in range(steps):
+                alive = (counts @ self.membership) >= 0.5
+                # eliminate teams with less than half a unit
+                counts[~alive[:, self.team_of]] = 0
+                ended = running & (alive.sum(axis=1) <= 1)
+                duration[ended] = round_number + step*dt
+                running &= ~ended
+                if not np.any(running):
+                    break
+                x = counts[running]
+                a = alive[running]
+                k1 = rates(x, a)
+                k2 = rates(np.maximum(x + dt/2*k1, 0), a)
+                k3 = rates(np.maximum(x + dt/2*k2, 0), a)
+                k4 = rates(np.maximum(x + dt*k3, 0), a)
+                counts[running] = np.maximum(x + dt/6*(k1 + 2*k2 + 2*k3 + k4), 0)
+            if not np.any(running):
+                break
+        team_sizes = counts @ self.membership
+        alive = team_sizes >= 0.5
+        winners = np.where(alive.sum(axis=1) == 1, np.argmax(alive, axis=1), -1)
+        if single:
+            return winners[0], duration[0], team_sizes[0]
+        return winners, duration, team_sizes
+
+#%% SECTION TO DEFINE EXAMPLE BATTLE
+
+def example_combat():
+    """ Creates an example battle between three teams.
+
+    Returns:
+        Combat: the battle
+    """
+    red = Team('red', [20, 4], [1/6, 3/6], types=['infantry', 'archers'])
+    blue = Team('blue', 10, 3/6)
+    green = Team('green', [12, 2], [2/6, 5/6], types=['infantry', 'knights'])
+    # red and blue focus on each other, green attacks blue
+    targeting = [[0, 0.75, 0.25],
+                 [0.75, 0, 0.25],
+                 [0.25, 0.75, 0]]
+    # two blue units arrive in round 3
+    return Combat([red, blue, green], targeting, reinforcements=[(3, 1, 0, 2)])
+
+def run_combat(seed=None, num_battles=10000):
+    """ Simulates independent battles of the example three-team battle.
+
+    Args:
+        seed (int): the random number seed
+        num_battles (int): the number of battles
+
+    Returns:
+        dict: the summary outputs (probability each team wins or no team
+            wins and the mean number of rounds)
+        dict: the traces (winner and rounds of each battle)
+    """
+    combat = example_combat()
+    winners, rounds, final = combat.simulate(num_battles, np.random.default_rng(seed))
+    summary = {team.name: np.mean(winners == i) for i, team in enumerate(combat.teams)}
+    summary['tie'] = np.mean(winners == -1)
+    summary['rounds'] = np.mean(rounds)
+    return summary, {'winners': winners, 'rounds': rounds}
+
+#%% example analysis
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    # the original two-team battle (compare to diceFightersMC.py)
+    combat = Combat([Team('red', 20, 1/6), Team('blue', 10, 3/6)])
+    winners, rounds, final = combat.simulate(10**6, rng)
+    winner, duration, sizes = combat.mean_field()
+    print('two teams: P(red) = {:.4f}, P(tie) = {:.4f}, E[rounds] = {:.2f}'.format(
+            np.mean(winners == 0), np.mean(winners == -1), np.mean(rounds)))
+    print('  mean-field: winner {}, {:.2f} rounds, final sizes {}'.format(
+            combat.teams[winner].name if winner >= 0 else 'none', duration,
+            np.round(sizes, 2)))
+
+    # the example three-team battle
+    summary, traces = run_combat(0, 10**6)
+    combat = example_combat()
+    winner, duration, sizes = combat.mean_field()
+    print('three teams: ' + ', '.join('P({}) = {:.4f}'.format(key, summary[key])
+                                      for key in ['red', 'blue', 'green', 'tie'])
+          + ', E[rounds] = {:.2f}'.format(summary['rounds']))
+    print('  mean-field: winner {}, {:.2f} rounds, final sizes {}'.format(
+            combat.teams[winner].name if winner >= 0 else 'none', duration,
+            np.round(sizes, 2)))
+
+    # sweep the initial size of blue infantry (one battle per row)
+    blue_sizes = np.arange(5, 21)
+    sizes = np.tile(combat.initial, (len(blue_sizes), 1))
+    sizes[:, combat.types.index('blue')] = blue_sizes
+    mf_winners, mf_durations, mf_sizes = combat.mean_field(sizes)
+    winners, rounds, final = combat.simulate(len(blue_sizes)*10**4, rng,
+                                             np.repeat(sizes, 10**4, axis=0))
+    winners = winners.reshape(len(blue_sizes), -1)
+    print('{:>6s}{:>10s}{:>10s}{:>10s}{:>14s}'.format(
+            'blue', 'P(red)', 'P(blue)', 'P(green)', 'mean-field'))
+    for i, blue_size in enumerate(blue_sizes):
+        print('{:>6d}{:>10.3f}{:>10.3f}{:>10.3f}{:>14s}'.format(
+                blue_size, np.mean(winners[i] == 0), np.mean(winners[i] == 1),
+                np.mean(winners[i] == 2),
+                combat.teams[mf_winners[i]].name if mf_winners[i] >= 0 else 'none'))
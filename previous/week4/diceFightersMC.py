@@ -8,18 +8,16 @@ SYS-611: Dice Fighters Monte Carlo Simulation Example
 # import the python3 behavior for importing, division, and printing in python2
 from __future__ import absolute_import, division, print_function
 
-# import the matplotlib pyplot package and refer to it as `plt`
-# see http://matplotlib.org/api/pyplot_api.html for documentation
-import matplotlib.pyplot as plt
-
-# import the scipy stats package and refer to it as `stats`
-# see http://docs.scipy.org/doc/scipy/reference/stats.html for documentation
-import scipy.stats as stats
-
 # import the numpy package and refer to it as `np`
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
 
+from math import comb
+
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
 # define the red_chance_hit state variable, initialize to 1/6 
 red_chance_hit = 1/6
 # define the blue_chance_hit state variable, initialize to 3/6
@@ -84,40 +82,116 @@ def gen_battle():
     
     # after main loop exists, check who won (whichever team still has fighters!)
     if red_size > 0:
-        	return 'red'
+        return 'red'
     elif blue_size > 0:
-        	return 'blue'
+        return 'blue'
     else:
-        	return 'tie'
-
-# seed the random number generator for consistent results
-np.random.seed(0)
-
-# generate samples and store in a numpy array
-samples = np.array([gen_battle() for i in range(10000)])
-
-# compute the lower and upper-bounds using a 95% confidence interval
-confidence_level = 0.05
-z_crit = stats.norm.ppf(1-confidence_level/2)
-
-# compute running statistics for mean and confidence interval
-win_red_mean = np.array([np.average(samples[0:i]=='red') for i in range(len(samples))])
-win_red_ci = z_crit*np.array([stats.sem(samples[0:i]=='red') for i in range(len(samples))])
-
-# create a plot to show the mean estimate with 95% confidence interval bounds
-plt.figure()
-plt.plot(range(len(samples)), win_red_mean, 
-         'b', label='Mean Estimate')
-plt.plot(range(len(samples)), win_red_mean-win_red_ci, 
-         'g', label='95% CI Lower Bound')
-plt.plot(range(len(samples)), win_red_mean+win_red_ci, 
-         'r', label='95% CI Upper Bound')
-plt.xlabel('Sample')
-plt.ylabel('Estimate of $P(W=red)$')
-plt.legend(loc='best')
-
-# just for fun, compute the 95% confidence interval for tie games
-print('P(W=tie) = {:.3f} +/- {:.3f} (95% CI)'.format(
-        np.average(samples=='tie'),
-        z_crit*stats.sem(samples=='tie')
-    ))
\ No newline at end of file
+        return 'tie'
+
+# maximum number of rounds of vectorized battles (unfinished battles are not
+# red wins; battles rarely last more than 10 rounds)
+MAX_ROUNDS = 40
+
+def binomial_cdf(max_trials, chance):
+    """ Tabulates the binomial cumulative distribution functions.
+
+    Args:
+        max_trials (int): the maximum number of trials
+        chance (float): the probability of success
+
+    Returns:
+        numpy.ndarray: P(X <= k) in row n (trials) and column k (successes)
+    """
+    table = np.ones((max_trials+1, max_trials+1))
+    for n in range(max_trials+1):
+        pmf = [comb(n, k)*chance**k*(1-chance)**(n-k) for k in range(n)]
+        table[n,:n] = np.cumsum(pmf)
+    return table
+
+def red_wins(u):
+    """ Determines if the red team wins battles (vectorized over random numbers).
+
+    Each round uses two random numbers to generate the red and blue hits by
+    the inverse transform method (the smallest number of hits k for which
+    P(X <= k) is at least the random number).
+
+    Args:
+        u (numpy.ndarray): the random numbers (one row per battle with two
+            columns per round, up to MAX_ROUNDS rounds)
+
+    Returns:
+        numpy.ndarray: 1 if the red team wins, otherwise 0
+    """
+    red_size = np.full(len(u), 20)
+    blue_size = np.full(len(u), 10)
+    red_cdf = binomial_cdf(20, red_chance_hit)
+    blue_cdf = binomial_cdf(10, blue_chance_hit)
+    for round_number in range(MAX_ROUNDS):
+        active = np.logical_and(red_size > 0, blue_size > 0)
+        if not np.any(active):
+            break
+        red_hits = np.sum(red_cdf[np.maximum(red_size, 0)] < u[:,2*round_number,None], axis=1)
+        blue_hits = np.sum(blue_cdf[np.maximum(blue_size, 0)] < u[:,2*round_number+1,None], axis=1)
+        red_size = np.where(active, red_size - blue_hits, red_size)
+        blue_size = np.where(active, blue_size - red_hits, blue_size)
+    return np.logical_and(red_size > 0, blue_size <= 0).astype(float)
+
+def run_battles(seed, num_battles=10000):
+    """ Generates samples of independent battles.
+
+    Args:
+        seed (int): the random number seed
+        num_battles (int): the number of battles
+
+    Returns:
+        dict: the summary outputs (probability of red win and tie)
+        dict: the traces (winner of each battle)
+    """
+    # seed the random number generator for consistent results
+    np.random.seed(seed)
+    # generate samples and store in a numpy array
+    samples = np.array([gen_battle() for i in range(num_battles)])
+    summary = {'red': np.average(samples=='red'),
+               'tie': np.average(samples=='tie')}
+    return summary, {'samples': samples}
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it as `plt`
+    # see http://matplotlib.org/api/pyplot_api.html for documentation
+    import matplotlib.pyplot as plt
+
+    # import the scipy stats package and refer to it as `stats`
+    # see http://docs.scipy.org/doc/scipy/reference/stats.html for documentation
+    import scipy.stats as stats
+
+    from sys611.analysis import running_mean, running_sem
+
+    # generate 10000 samples with seed 0
+    summary, traces = run_battles(0)
+    samples = traces['samples']
+
+    # compute the lower and upper-bounds using a 95% confidence interval
+    confidence_level = 0.05
+    z_crit = stats.norm.ppf(1-confidence_level/2)
+
+    # compute running statistics for mean and confidence interval
+    win_red_mean = running_mean(samples=='red')
+    win_red_ci = z_crit*running_sem(samples=='red')
+
+    # create a plot to show the mean estimate with 95% confidence interval bounds
+    plt.figure()
+    plt.plot(1+np.arange(len(samples)), win_red_mean, 
+             'b', label='Mean Estimate')
+    plt.plot(1+np.arange(len(samples)), win_red_mean-win_red_ci, 
+             'g', label='95% CI Lower Bound')
+    plt.plot(1+np.arange(len(samples)), win_red_mean+win_red_ci, 
+             'r', label='95% CI Upper Bound')
+    plt.xlabel('Sample')
+    plt.ylabel('Estimate of $P(W=red)$')
+    plt.legend(loc='best')
+
+    # just for fun, compute the 95% confidence interval for tie games
+    print('P(W=tie) = {:.3f} +/- {:.3f} (95% CI)'.format(
+            np.average(samples=='tie'),
+            z_crit*stats.sem(samples=='tie')
+        ))
\ No newline at end of file
@@ -10,8 +10,12 @@ from __future__ import absolute_import, division, print_function
 
 # import the numpy package and refer to it is `np`
 import numpy as np
-# import the matplotlib pyplot package and refer to it is `plt`
-import matplotlib.pyplot as plt
+
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.jumpchain import jump_chain
+from sys611.trace import EVENTS, Tracer
 
 _lambda = 1/1.5 # arrival rate, 1.5 minutes per customer or 2/3 customer per minute
 _mu = 1/0.75 # service rate, 0.75 minutes per customer or 4/3 customer per minute
@@ -32,40 +36,110 @@ def gen_t_service():
     
 # define the number of events
 NUM_EVENTS = 1000
-# create lists to store variables of interest
-t = np.zeros(NUM_EVENTS+1) # time
-q = np.zeros(NUM_EVENTS+1) # number of customers in system
-t_arrival = np.zeros(NUM_EVENTS) # sampled inter-arrival durations
-t_service = np.zeros(NUM_EVENTS) # sampled service durations
-delta_t = np.zeros(NUM_EVENTS) # duration of each event
-
-# initialize time and state variables
-t[0] = 0
-q[0] = 0
-
-for i in range(NUM_EVENTS):
-    # generate samples for inter-arrival and service durations
-    t_arrival[i] = gen_t_arrival()
-    t_service[i] = gen_t_service()
-    # process state transitions / updates for q and t
-    if q[i] == 0 or t_arrival[i] < t_service[i]:
-        # if no customers in queue or arrival happens before service
-        # event is an arrival
-        delta_t[i] = t_arrival[i]
-        q[i+1] = q[i] + 1
+# path of a file to trace events (replay with `python -m sys611.trace`), or
+# None to print out each event
+TRACE_FILE = None
+
+def create_tracer(path=None):
+    """ Creates a tracer of each event (see `run_queue`).
+
+    Args:
+        path (str): the trace file (None to keep records in memory)
+
+    Returns:
+        Tracer: the tracer (formatting records as rows of an event table)
+    """
+    row = ('{entity:10.0f}{time:10.2f}{q:10.0f}{t_arrival:10.2f}{t_service:10.2f}'
+           '{delta_t:10.2f}{q_next:10.0f}')
+    return Tracer({'arrival': row, 'service': row},
+                  state=['q', 't_arrival', 't_service', 'delta_t', 'q_next'], path=path,
+                  header='{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
+                          'i', 't(i)', 'q(i)', 't_arrival', 't_service', 'delta_t', 'q(i+1)'))
+
+def run_queue(seed=None, num_events=NUM_EVENTS, tracer=None, vectorized=False):
+    """ Generates a state trajectory of the queuing markov model.
+
+    Args:
+        seed (int): the random number seed (None to continue the current stream)
+        num_events (int): the number of events
+        tracer (Tracer): records each event (None to not record, see
+            `create_tracer`)
+        vectorized (bool): True to generate all events at once as a reflected
+            random walk (see `sys611.jumpchain`, the same trajectory as the
+            loop for the same seed)
+
+    Returns:
+        dict: the summary outputs (time and customers at the end, mean customers)
+        dict: the traces (time, customers, sampled durations)
+    """
+    # set the random number seed
+    if seed is not None:
+        np.random.seed(seed)
+    if vectorized:
+        traces = jump_chain(_lambda, _mu, num_events)
+        t, q, delta_t = traces['t'], traces['q'], traces['delta_t']
+        if tracer is not None and tracer.level >= EVENTS:
+            for i in range(num_events):
+                tracer.record(t[i], i, 'arrival' if q[i+1] > q[i] else 'service', q[i],
+                              traces['t_arrival'][i], traces['t_service'][i], delta_t[i],
+                              q[i+1])
+        q_mean = np.sum(q[:-1]*delta_t)/t[-1] if t[-1] > 0 else 0.0
+        return {'time': t[-1], 'customers': q[-1], 'mean_customers': q_mean}, traces
+
+    # create lists to store variables of interest
+    t = np.zeros(num_events+1) # time
+    q = np.zeros(num_events+1) # number of customers in system
+    t_arrival = np.zeros(num_events) # sampled inter-arrival durations
+    t_service = np.zeros(num_events) # sampled service durations
+    delta_t = np.zeros(num_events) # duration of each event
+
+    # initialize time and state variables
+    t[0] = 0
+    q[0] = 0
+    tracing = tracer is not None and tracer.level >= EVENTS
+
+    for i in range(num_events):
+        # generate samples for inter-arrival and service durations
+        t_arrival[i] = gen_t_arrival()
+        t_service[i] = gen_t_service()
+        # process state transitions / updates for q and t
+        if q[i] == 0 or t_arrival[i] < t_service[i]:
+            # if no customers in queue or arrival happens before service
+            # event is an arrival
+            delta_t[i] = t_arrival[i]
+            q[i+1] = q[i] + 1
+        else:
+            # otherwise event is a service
+            delta_t[i] = t_service[i]
+            q[i+1] = q[i] - 1
+        t[i+1] = t[i] + delta_t[i]
+        if tracing:
+            tracer.record(t[i], i, 'arrival' if q[i+1] > q[i] else 'service', q[i],
+                          t_arrival[i], t_service[i], delta_t[i], q[i+1])
+
+    # compute the time-average number of customers in system
+    q_mean = np.sum(q[:-1]*delta_t)/t[-1] if t[-1] > 0 else 0.0
+    summary = {'time': t[-1], 'customers': q[-1], 'mean_customers': q_mean}
+    traces = {'t': t, 'q': q, 't_arrival': t_arrival, 't_service': t_service,
+              'delta_t': delta_t}
+    return summary, traces
+
+if __name__ == '__main__':
+    # import the matplotlib pyplot package and refer to it is `plt`
+    import matplotlib.pyplot as plt
+
+    # generate and trace the state trajectory
+    tracer = create_tracer(TRACE_FILE)
+    summary, traces = run_queue(tracer=tracer)
+    t, q = traces['t'], traces['q']
+    if TRACE_FILE is None:
+        # print out each event
+        for line in tracer.trace().lines():
+            print(line)
     else:
-        # otherwise event is a service
-        delta_t[i] = t_service[i]
-        q[i+1] = q[i] - 1
-    t[i+1] = t[i] + delta_t[i]
-
-print('{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
-        'i', 't(i)', 'q(i)', 't_arrival', 't_service', 'delta_t', 'q(i+1)'))
-for i in range(NUM_EVENTS):
-    print('{:10.0f}{:10.2f}{:10.0f}{:10.2f}{:10.2f}{:10.2f}{:10.0f}'.format(
-            i, t[i], q[i], t_arrival[i], t_service[i], delta_t[i], q[i+1]))
+        print('{} events traced to {}'.format(tracer.count, TRACE_FILE))
     
-plt.figure()
-plt.xlabel('Time, $t$')
-plt.ylabel('Customers in System, $q$')
-plt.step(t,q,'-r',where='post')
\ No newline at end of file
+    plt.figure()
+    plt.xlabel('Time, $t$')
+    plt.ylabel('Customers in System, $q$')
+    plt.step(t,q,'-r',where='post')
\ No newline at end of file
@@ -11,8 +11,11 @@ from __future__ import absolute_import, division, print_function
 # import the numpy package and refer to it as `np`
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
-# import the matplotlib.pyplot package and refer to it as `plt`
-import matplotlib.pyplot as plt
+
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.analysis import state_occupancy
 
 # define the state transition function
 def next_state(q):
@@ -51,45 +54,63 @@ def next_state(q):
             # another snowy day
             return 2
 
-# define the number of samples and create a state trajectory
-num_samples = 100
-np.random.seed(0)
-q = np.zeros(num_samples)
-# perform all the state transitions
-for t in range(num_samples - 1):
-    q[t+1] = next_state(q[t])
-
-# create a plot of the state trajectory
-plt.figure()
-plt.step(range(num_samples), q, '-r')
-plt.xlabel('Time ($t$)')
-plt.ylabel('State ($q$)')
-
-# estimate the stationary distribution from the samples
-pi = np.zeros(3)
-for i in range(3):
-    pi[i] = np.sum(q==i)/num_samples
-
-print('estimated stationary distribution (solved using simulation):')
-print(' P(q=0) = {:.3f} (clear day)'.format(pi[0]))
-print(' P(q=1) = {:.3f} (rainy day)'.format(pi[1]))
-print(' P(q=2) = {:.3f} (snowy day)'.format(pi[2]))
-
-#%% steady-state analysis
-
-# formal state transition matrix
-P = [[186/250, 47/250, 17/250], 
-     [47/89, 40/89, 2/89],
-     [16/25, 3/25, 6/25]]
-
-# compute the eigenvalues and eigenvectors of the transpose of P
-w,v = np.linalg.eig(np.transpose(P))
-
-# the stationary distribution is the normalized eigenvector 
-# corresponding to the eigenvalue of 1
-pi_exact = v[:,0]/np.sum(v[:,0])
-
-print('exact stationary distribution (solved using eigenvectors):')
-print(' P(q=0) = {:.3f} (clear day)'.format(pi_exact[0]))
-print(' P(q=1) = {:.3f} (rainy day)'.format(pi_exact[1]))
-print(' P(q=2) = {:.3f} (snowy day)'.format(pi_exact[2]))
\ No newline at end of file
+def run_weather(seed, num_samples=100):
+    """ Generates a state trajectory of the weather markov model.
+
+    Args:
+        seed (int): the random number seed
+        num_samples (int): the number of samples (days)
+
+    Returns:
+        dict: the summary outputs (estimated stationary distribution)
+        dict: the traces (state trajectory)
+    """
+    np.random.seed(seed)
+    q = np.zeros(num_samples)
+    # perform all the state transitions
+    for t in range(num_samples - 1):
+        q[t+1] = next_state(q[t])
+    # estimate the stationary distribution from the fraction of samples in each state
+    pi = state_occupancy(q.astype(int), 3)
+    summary = {'p0': pi[0], 'p1': pi[1], 'p2': pi[2]}
+    return summary, {'q': q}
+
+if __name__ == '__main__':
+    # import the matplotlib.pyplot package and refer to it as `plt`
+    import matplotlib.pyplot as plt
+
+    # define the number of samples and create a state trajectory
+    num_samples = 100
+    summary, traces = run_weather(0, num_samples)
+    q = traces['q']
+    pi = [summary['p0'], summary['p1'], summary['p2']]
+
+    # create a plot of the state trajectory
+    plt.figure()
+    plt.step(range(num_samples), q, '-r')
+    plt.xlabel('Time ($t$)')
+    plt.ylabel('State ($q$)')
+
+    print('estimated stationary distribution (solved using simulation):')
+    print(' P(q=0) = {:.3f} (clear day)'.format(pi[0]))
+    print(' P(q=1) = {:.3f} (rainy day)'.format(pi[1]))
+    print(' P(q=2) = {:.3f} (snowy day)'.format(pi[2]))
+
+    #%% steady-state analysis
+
+    # formal state transition matrix
+    P = [[186/250, 47/250, 17/250], 
+         [47/89, 40/89, 2/89],
+         [16/25, 3/25, 6/25]]
+
+    # compute the eigenvalues and eigenvectors of the transpose of P
+    w,v = np.linalg.eig(np.transpose(P))
+
+    # the stationary distribution is the normalized eigenvector 
+    # corresponding to the eigenvalue of 1
+    pi_exact = v[:,0]/np.sum(v[:,0])
+
+    print('exact stationary distribution (solved using eigenvectors):')
+    print(' P(q=0) = {:.3f} (clear day)'.format(pi_exact[0]))
+    print(' P(q=1) = {:.3f} (rainy day)'.format(pi_exact[1]))
+    print(' P(q=2) = {:.3f} (snowy day)'.format(pi_exact[2]))
\ No newline at end of file
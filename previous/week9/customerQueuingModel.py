@@ -10,57 +10,89 @@ from __future__ import absolute_import, division, print_function
 # import the numpy package and refer to it as `np`
 # see http://docs.scipy.org/doc/numpy/reference/ for documentation
 import numpy as np
-    
+
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.generators import Exponential
+
+# define the arrival rate and service rate
+_lambda = 1/1.5
+_mu = 1/0.75
+
+# define inverse transform process generators for x and y
+x_generator = Exponential(_lambda)
+y_generator = Exponential(_mu)
+
 # define process generator for x
 def generate_x():
-    # define the arrival rate
-    _lambda = 1/1.5
-    return -np.log(1-np.random.rand())/_lambda
+    return x_generator.sample()
 
 # define process generator for y
 def generate_y():
-    # define the service rate
-    _mu = 1/0.75
-    return -np.log(1-np.random.rand())/_mu
-
-# set random number seed
-np.random.seed(0)
-
-# define the number of customers and create arrays to store results
-num_customers = 1000
-x = [generate_x() for i in range(num_customers)]
-y = [generate_y() for i in range(num_customers)]
-t_enter = np.zeros(num_customers)
-q_length = np.zeros(num_customers)
-t_served = np.zeros(num_customers)
-q_wait = np.zeros(num_customers)
-t_exit = np.zeros(num_customers)
-total_wait = np.zeros(num_customers)
-
-# loop over each  customer
-for i in range(num_customers):
-    # entry time is appended to the previous entry time
-    # or equal to arrival time for first customer
-    t_enter[i] = t_enter[i-1] + x[i] if i > 0 else x[i]
-    # queue length is the number of customers who have not yet exited
-    # or zero for the first customer
-    q_length[i] = np.sum(t_exit[0:i] > t_enter[i]) if i > 0 else 0
-    # time served is the exit time of previous customer if in queue
-    # or entry time if no queue
-    t_served[i] = t_exit[i-1] if q_length[i] > 0 else t_enter[i]
-    # waiting time in queue is service time minus entry time
-    q_wait[i] = t_served[i]-t_enter[i]
-    # exit time is time served plus service time
-    t_exit[i] = t_served[i] + y[i]
-    # total wait is exit time minus entry time
-    total_wait[i] = t_exit[i] - t_enter[i]
-
-print('{:>4s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
-        'i', 't_enter', 'L_q', 't_served', 'W_q', 't_exit', 'W'))
-for i in range(num_customers):
-    print('{:4d}{:10.2f}{:10.0f}{:10.2f}{:10.2f}{:10.2f}{:10.2f}'.format(
-            i+1, t_enter[i], q_length[i], t_served[i], 
-            q_wait[i], t_exit[i], total_wait[i]))
-print('L_q_bar = {:.2f}'.format(np.mean(q_length)))
-print('W_q_bar = {:.2f}'.format(np.mean(q_wait)))
-print('W_bar = {:.2f}'.format(np.mean(total_wait)))
\ No newline at end of file
+    return y_generator.sample()
+
+def run_customers(seed, num_customers=1000):
+    """ Simulates a sequence of customers in a single-server queue.
+
+    Args:
+        seed (int): the random number seed
+        num_customers (int): the number of customers
+
+    Returns:
+        dict: the summary outputs (average queue length, queue wait, and wait)
+        dict: the traces (customer times, queue lengths, and waits)
+    """
+    # set random number seed
+    np.random.seed(seed)
+
+    # create arrays to store results
+    x = x_generator.sample(num_customers)
+    y = y_generator.sample(num_customers)
+    t_enter = np.zeros(num_customers)
+    q_length = np.zeros(num_customers)
+    t_served = np.zeros(num_customers)
+    q_wait = np.zeros(num_customers)
+    t_exit = np.zeros(num_customers)
+    total_wait = np.zeros(num_customers)
+
+    # loop over each  customer
+    for i in range(num_customers):
+        # entry time is appended to the previous entry time
+        # or equal to arrival time for first customer
+        t_enter[i] = t_enter[i-1] + x[i] if i > 0 else x[i]
+        # queue length is the number of customers who have not yet exited
+        # or zero for the first customer
+        q_length[i] = np.sum(t_exit[0:i] > t_enter[i]) if i > 0 else 0
+        # time served is the exit time of previous customer if in queue
+        # or entry time if no queue
+        t_served[i] = t_exit[i-1] if q_length[i] > 0 else t_enter[i]
+        # waiting time in queue is service time minus entry time
+        q_wait[i] = t_served[i]-t_enter[i]
+        # exit time is time served plus service time
+        t_exit[i] = t_served[i] + y[i]
+        # total wait is exit time minus entry time
+        total_wait[i] = t_exit[i] - t_enter[i]
+
+    summary = {'L_q_bar': np.mean(q_length), 'W_q_bar': np.mean(q_wait),
+               'W_bar': np.mean(total_wait)}
+    traces = {'t_enter': t_enter, 'q_length': q_length, 't_served': t_served,
+              'q_wait': q_wait, 't_exit': t_exit, 'total_wait': total_wait}
+    return summary, traces
+
+if __name__ == '__main__':
+    # define the number of customers and simulate with seed 0
+    num_customers = 1000
+    summary, traces = run_customers(0, num_customers)
+    t_enter, q_length, t_served = traces['t_enter'], traces['q_length'], traces['t_served']
+    q_wait, t_exit, total_wait = traces['q_wait'], traces['t_exit'], traces['total_wait']
+
+    print('{:>4s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
+            'i', 't_enter', 'L_q', 't_served', 'W_q', 't_exit', 'W'))
+    for i in range(num_customers):
+        print('{:4d}{:10.2f}{:10.0f}{:10.2f}{:10.2f}{:10.2f}{:10.2f}'.format(
+                i+1, t_enter[i], q_length[i], t_served[i], 
+                q_wait[i], t_exit[i], total_wait[i]))
+    print('L_q_bar = {:.2f}'.format(np.mean(q_length)))
+    print('W_q_bar = {:.2f}'.format(np.mean(q_wait)))
+    print('W_bar = {:.2f}'.format(np.mean(total_wait)))
\ No newline at end of file
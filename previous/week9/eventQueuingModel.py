@@ -9,74 +9,146 @@ from __future__ import absolute_import, division, print_function
 
 # import the numpy package and refer to it as `np`
 import numpy as np
-# import the matplotlib.pyplot package and refer to it as `plt`
-import matplotlib.pyplot as plt
-    
+
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.generators import Exponential
+from sys611.trace import EVENTS, Tracer
+
+# path of a file to trace events (replay with `python -m sys611.trace`), or
+# None to print out the state after each event
+TRACE_FILE = None
+
+# define the arrival rate and service rate
+_lambda = 1/1.5
+_mu = 1/0.75
+
+# define inverse transform process generators for x and y
+# (streams draw random numbers in blocks and return one variate per call)
+x_generator = Exponential(_lambda)
+y_generator = Exponential(_mu)
+x_stream = x_generator.stream()
+y_stream = y_generator.stream()
+
 # define process generator for x
 def generate_x():
-    # define the arrival rate
-    _lambda = 1/1.5
-    return -np.log(1-np.random.rand())/_lambda
+    return next(x_stream)
 
 # define process generator for y
 def generate_y():
-    # define the service rate
-    _mu = 1/0.75
-    return -np.log(1-np.random.rand())/_mu 
-
-# initialize variables
-t = 0
-t_A = generate_x()
-t_D = np.inf
-N = 0
-N_A = 0
-N_D = 0
-W = 0
-
-# initialize data lists for plotting
-plot_t = []
-plot_N = []
-
-print('{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
-        't', 't_A', 't_D', 'N', 'N_A', 'N_D', 'W'))
-print('{:10.2f}{:10.2f}{:10.2f}{:10.0f}{:10.0f}{:10.0f}{:10.2f}'.format(
-        t, t_A, t_D, N, N_A, N_D, W))
-
-# loop until simulation ends
-while t_A < np.inf or t_D < np.inf:
-    # update the total waiting time
-    W += N*(min(t_A,t_D)-t)
-    # update the simulation time
-    t = min(t_A,t_D)
+    return next(y_stream)
+
+def create_tracer(path=None):
+    """ Creates a tracer of the state after each event (see `run_events`).
+
+    Args:
+        path (str): the trace file (None to keep records in memory)
+
+    Returns:
+        Tracer: the tracer (formatting records as rows of a state table)
+    """
+    row = '{time:10.2f}{t_A:10.2f}{t_D:10.2f}{N:10.0f}{N_A:10.0f}{N_D:10.0f}{W:10.2f}'
+    return Tracer({'init': row, 'arrival': row, 'departure': row},
+                  state=['t_A', 't_D', 'N', 'N_A', 'N_D', 'W'], path=path,
+                  header='{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
+                          't', 't_A', 't_D', 'N', 'N_A', 'N_D', 'W'))
+
+def run_events(seed=None, duration=1000, tracer=None):
+    """ Simulates the event-based queuing model.
+
+    Args:
+        seed (int): the random number seed (None to continue the current stream)
+        duration (float): the time after which no more customers arrive (minutes)
+        tracer (Tracer): records the state after each event (None to not
+            record, see `create_tracer`)
+
+    Returns:
+        dict: the summary outputs (average wait and customer counts)
+        dict: the traces (time and number of customers after each event)
+    """
+    # (note: streams must be declared as global variables to update!)
+    global x_stream, y_stream
+    # set the random number seed
+    if seed is not None:
+        np.random.seed(seed)
+    # restart the streams (discarding random numbers drawn before seeding)
+    x_stream = x_generator.stream()
+    y_stream = y_generator.stream()
+
+    # initialize variables
+    t = 0
+    t_A = generate_x()
+    t_D = np.inf
+    N = 0
+    N_A = 0
+    N_D = 0
+    W = 0
+
+    # initialize data lists for plotting
+    plot_t = []
+    plot_N = []
+
+    tracing = tracer is not None and tracer.level >= EVENTS
+    if tracing:
+        tracer.record(t, -1, 'init', t_A, t_D, N, N_A, N_D, W)
+
+    # loop until simulation ends
+    while t_A < np.inf or t_D < np.inf:
+        # update the total waiting time
+        W += N*(min(t_A,t_D)-t)
+        # update the simulation time
+        t = min(t_A,t_D)
     
-    if t_A <= t_D:
-        # this is an arrival - increment the state variable
-        N += 1
-        # record an arrival
-        N_A += 1
-        if N <= 1:
-            # schedule the departure
-            t_D = t + generate_y()
-        # schedule another arrival as long as < 1000 minutes
-        t_A = t + generate_x() if t < 1000 else np.inf
-    else:
-        # this is a departure - decrement the state variable
-        N -= 1
-        # record a departure
-        N_D += 1
-        # schedule the next departure if there are more in the system
-        t_D = t + generate_y() if N > 0 else np.inf
+        if t_A <= t_D:
+            # this is an arrival - increment the state variable
+            N += 1
+            # record an arrival
+            N_A += 1
+            event, customer = 'arrival', N_A
+            if N <= 1:
+                # schedule the departure
+                t_D = t + generate_y()
+            # schedule another arrival as long as < duration (1000 minutes)
+            t_A = t + generate_x() if t < duration else np.inf
+        else:
+            # this is a departure - decrement the state variable
+            N -= 1
+            # record a departure
+            N_D += 1
+            event, customer = 'departure', N_D
+            # schedule the next departure if there are more in the system
+            t_D = t + generate_y() if N > 0 else np.inf
     
-    # append data for plotting
-    plot_t.append(t)
-    plot_N.append(N)
+        # append data for plotting
+        plot_t.append(t)
+        plot_N.append(N)
     
-    # display current state
-    print('{:10.2f}{:10.2f}{:10.2f}{:10.0f}{:10.0f}{:10.0f}{:10.2f}'.format(
-            t, t_A, t_D, N, N_A, N_D, W))
-print('W_bar = {:.2f}'.format(W/N_A))
-
-plt.figure()
-plt.plot(plot_t, plot_N, '-r')
-plt.xlabel('Time ($t$)')
-plt.ylabel('Number Customers ($N$)')
\ No newline at end of file
+        if tracing:
+            # record the current state (and the arriving or departing customer)
+            tracer.record(t, customer, event, t_A, t_D, N, N_A, N_D, W)
+
+    summary = {'W_bar': W/N_A, 'N_A': N_A, 'N_D': N_D}
+    traces = {'t': plot_t, 'N': plot_N}
+    return summary, traces
+
+if __name__ == '__main__':
+    # import the matplotlib.pyplot package and refer to it as `plt`
+    import matplotlib.pyplot as plt
+
+    # simulate and trace the state after each event
+    tracer = create_tracer(TRACE_FILE)
+    summary, traces = run_events(tracer=tracer)
+    if TRACE_FILE is None:
+        # print out the state after each event
+        for line in tracer.trace().lines():
+            print(line)
+    else:
+        print('{} events traced to {}'.format(tracer.count, TRACE_FILE))
+    plot_t, plot_N = traces['t'], traces['N']
+    print('W_bar = {:.2f}'.format(summary['W_bar']))
+
+    plt.figure()
+    plt.plot(plot_t, plot_N, '-r')
+    plt.xlabel('Time ($t$)')
+    plt.ylabel('Number Customers ($N$)')
\ No newline at end of file
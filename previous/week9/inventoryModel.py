@@ -9,8 +9,6 @@ from __future__ import absolute_import, division, print_function
 
 # import the numpy package and refer to it as `np`
 import numpy as np
-# import the matplotlib.pyplot package and refer to it as `plt`
-import matplotlib.pyplot as plt
 
 # define simulation parameters
 product_price = 100.00 # dollars per item
@@ -31,20 +29,16 @@ def generate_demand():
     # generates a customer demand
     return np.random.randint(demand_lb, demand_ub+1)
 
-# initialize simulation variables
+# define the state variables (initialized by `run_inventory`)
 t = 0.0
 inventory = order_target
 num_ordered = 0
 cost_orders = 0.0
 cost_holding = 0.0
 revenue = 0.0
-t_customer = generate_interarrival()
+t_customer = float('inf')
 t_delivery = float('inf')
 
-# initialize data lists for plotting
-plot_t = []
-plot_P = []
-
 def print_state():
     """Prints this simulation state."""
     print('Time = {:.2f}'.format(t))
@@ -56,60 +50,108 @@ def print_state():
     print('Holding Costs = {:.2f}'.format(cost_holding))
     print('Revenue = {:.2f}'.format(revenue))
     print('')
+
+def run_inventory(seed=None, duration=14.0, verbose=False):
+    """ Simulates the inventory model.
+
+    Args:
+        seed (int): the random number seed (None to continue the current stream)
+        duration (float): the simulation duration (days)
+        verbose (bool): True, to print out the state for the first 2.0 days
+
+    Returns:
+        dict: the summary outputs (revenue, costs, and profit)
+        dict: the traces (time and profit after each event)
+    """
+    # (note: state variables must be declared as global variables to update!)
+    global t, inventory, num_ordered, cost_orders, cost_holding, revenue
+    global t_customer, t_delivery
+    # set the random number seed
+    if seed is not None:
+        np.random.seed(seed)
+
+    # initialize simulation variables
+    t = 0.0
+    inventory = order_target
+    num_ordered = 0
+    cost_orders = 0.0
+    cost_holding = 0.0
+    revenue = 0.0
+    t_customer = generate_interarrival()
+    t_delivery = float('inf')
+
+    # initialize data lists for plotting
+    plot_t = []
+    plot_P = []
+
+    # print the simulation state
+    if verbose:
+        print_state()
+
+    # iterate over the first 14.0 days (duration)
+    while t < duration:
+        # compute the holding costs for current inventory since last time
+        cost_holding += holding_cost*inventory*(min(t_customer, t_delivery) - t)
+        # update the simulation time
+        t = min(t_customer, t_delivery)
     
-# print the simulation state
-print_state()
-
-# iterate over the first 14.0 days
-while t < 14.0:
-    # compute the holding costs for current inventory since last time
-    cost_holding += holding_cost*inventory*(min(t_customer, t_delivery) - t)
-    # update the simulation time
-    t = min(t_customer, t_delivery)
-    
-    # check if this is a customer event (the tie-breaker if same time)
-    if t == t_customer:
-        # generate the customer demand
-        demand = generate_demand()
+        # check if this is a customer event (the tie-breaker if same time)
+        if t == t_customer:
+            # generate the customer demand
+            demand = generate_demand()
         
-        # check if inventory exceeds demands - can meet all demand
-        if inventory > demand:
-            # update revenue and inventory levels after sale
-            revenue += product_price*demand
-            inventory -= demand
-        # otherwise can only meet partial demand
-        else:
-            # update revenue and inventory levels after sale
-            revenue += product_price*inventory
-            inventory = 0
+            # check if inventory exceeds demands - can meet all demand
+            if inventory > demand:
+                # update revenue and inventory levels after sale
+                revenue += product_price*demand
+                inventory -= demand
+            # otherwise can only meet partial demand
+            else:
+                # update revenue and inventory levels after sale
+                revenue += product_price*inventory
+                inventory = 0
         
-        # check if inventory falls below order trigger and no order in progress
-        if inventory < order_trigger and num_ordered == 0:
-            # place an order, update costs and delivery event time
-            num_ordered = order_target - inventory
-            cost_orders += product_cost*num_ordered
-            t_delivery = t + delivery_delay
+            # check if inventory falls below order trigger and no order in progress
+            if inventory < order_trigger and num_ordered == 0:
+                # place an order, update costs and delivery event time
+                num_ordered = order_target - inventory
+                cost_orders += product_cost*num_ordered
+                t_delivery = t + delivery_delay
         
-        # generate the next customer arrival
-        t_customer += generate_interarrival()
-    # check if this is a delivery event
-    else:
-        # add the ordered products to the inventory        
-        inventory += num_ordered
+            # generate the next customer arrival
+            t_customer += generate_interarrival()
+        # check if this is a delivery event
+        else:
+            # add the ordered products to the inventory        
+            inventory += num_ordered
         
-        # reset the number ordered and delivery time
-        num_ordered = 0
-        t_delivery = float('inf')
-    
-    # print the simulation state for first 2.0 days
-    if t < 2.0:
-        print_state()
+            # reset the number ordered and delivery time
+            num_ordered = 0
+            t_delivery = float('inf')
     
-    # append data for plotting
-    plot_t.append(t)
-    plot_P.append(revenue-cost_orders-cost_holding)
+        # print the simulation state for first 2.0 days
+        if verbose and t < 2.0:
+            print_state()
     
-plt.figure()
-plt.plot(plot_t, plot_P, '-r')
-plt.xlabel('Time ($t$)')
-plt.ylabel('Profit')
\ No newline at end of file
+        # append data for plotting
+        plot_t.append(t)
+        plot_P.append(revenue-cost_orders-cost_holding)
+
+    summary = {'revenue': revenue, 'cost_orders': cost_orders,
+               'cost_holding': cost_holding,
+               'profit': revenue-cost_orders-cost_holding}
+    traces = {'t': plot_t, 'P': plot_P}
+    return summary, traces
+
+if __name__ == '__main__':
+    # import the matplotlib.pyplot package and refer to it as `plt`
+    import matplotlib.pyplot as plt
+
+    # simulate and print out the state for the first 2.0 days
+    summary, traces = run_inventory(verbose=True)
+    plot_t, plot_P = traces['t'], traces['P']
+
+    plt.figure()
+    plt.plot(plot_t, plot_P, '-r')
+    plt.xlabel('Time ($t$)')
+    plt.ylabel('Profit')
\ No newline at end of file
@@ -9,20 +9,30 @@ from __future__ import absolute_import, division, print_function
 
 # import the numpy package and refer to it as `np`
 import numpy as np
-# import the matplotlib.pyplot package and refer to it as `plt`
-import matplotlib.pyplot as plt
-    
+
+# add the parent directory to the search path to import the sys611 package
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sys611.generators import Exponential
+
+# define the arrival rate and service rate
+_lambda = 1/1.5
+_mu = 1/0.75
+
+# define inverse transform process generators for x and y
+# (streams draw random numbers in blocks and return one variate per call)
+x_generator = Exponential(_lambda)
+y_generator = Exponential(_mu)
+x_stream = x_generator.stream()
+y_stream = y_generator.stream()
+
 # define process generator for x
 def generate_x():
-    # define the arrival rate
-    _lambda = 1/1.5
-    return -np.log(1-np.random.rand())/_lambda
+    return next(x_stream)
 
 # define process generator for y
 def generate_y():
-    # define the service rate
-    _mu = 1/0.75
-    return -np.log(1-np.random.rand())/_mu 
+    return next(y_stream)
 
 # define process generator for balk
 def generate_b(N):
@@ -32,66 +42,103 @@ def generate_b(N):
     else:
         return False
 
-# initialize variables
-t = 0
-t_A = generate_x()
-t_D = np.inf
-N = 0
-N_A = 0
-N_B = 0
-N_D = 0
-W = 0
-
-# initialize data lists for plotting
-plot_t = []
-plot_N = []
-plot_B = []
-
-print('{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
-        'i', 't', 't_A', 't_D', 'N', 'N_A', 'N_D', 'N_B', 'W'))
-print('{:10.2f}{:10.2f}{:10.2f}{:10.0f}{:10.0f}{:10.0f}{:10.0f}{:10.2f}'.format(
-        t, t_A, t_D, N, N_A, N_D, N_B, W))
-
-# loop until simulation ends
-while t_A < np.inf or t_D < np.inf:
-    # update the total waiting time
-    W += N*(min(t_A,t_D)-t)
-    # update the simulation time
-    t = min(t_A,t_D)
+def run_cafe(seed=None, duration=1000, verbose=False):
+    """ Simulates the cafe queuing model with balking customers.
+
+    Args:
+        seed (int): the random number seed (None to continue the current stream)
+        duration (float): the time after which no more customers arrive (minutes)
+        verbose (bool): True, to print out the state after each event
+
+    Returns:
+        dict: the summary outputs (average wait and customer counts)
+        dict: the traces (time and number of customers after each event)
+    """
+    # (note: streams must be declared as global variables to update!)
+    global x_stream, y_stream
+    # set the random number seed
+    if seed is not None:
+        np.random.seed(seed)
+    # restart the streams (discarding random numbers drawn before seeding)
+    x_stream = x_generator.stream()
+    y_stream = y_generator.stream()
+
+    # initialize variables
+    t = 0
+    t_A = generate_x()
+    t_D = np.inf
+    N = 0
+    N_A = 0
+    N_B = 0
+    N_D = 0
+    W = 0
+
+    # initialize data lists for plotting
+    plot_t = []
+    plot_N = []
+    plot_B = []
+
+    if verbose:
+        print('{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}{:>10s}'.format(
+                'i', 't', 't_A', 't_D', 'N', 'N_A', 'N_D', 'N_B', 'W'))
+        print('{:10.2f}{:10.2f}{:10.2f}{:10.0f}{:10.0f}{:10.0f}{:10.0f}{:10.2f}'.format(
+                t, t_A, t_D, N, N_A, N_D, N_B, W))
+
+    # loop until simulation ends
+    while t_A < np.inf or t_D < np.inf:
+        # update the total waiting time
+        W += N*(min(t_A,t_D)-t)
+        # update the simulation time
+        t = min(t_A,t_D)
     
-    if t_A <= t_D:
-        if generate_b(N):
-            N_B += 1
+        if t_A <= t_D:
+            if generate_b(N):
+                N_B += 1
+            else:
+                # this is an arrival - increment the state variable
+                N += 1
+                # record an arrival
+                N_A += 1
+                if N <= 1:
+                    # schedule the departure
+                    t_D = t + generate_y()
+            # schedule another arrival as long as < duration (1000 minutes)
+            t_A = t + generate_x() if t < duration else np.inf
         else:
-            # this is an arrival - increment the state variable
-            N += 1
-            # record an arrival
-            N_A += 1
-            if N <= 1:
-                # schedule the departure
-                t_D = t + generate_y()
-        # schedule another arrival as long as < 1000 minutes
-        t_A = t + generate_x() if t < 1000 else np.inf
-    else:
-        # this is a departure - decrement the state variable
-        N -= 1
-        # record a departure
-        N_D += 1
-        # schedule the next departure if there are more in the system
-        t_D = t + generate_y() if N > 0 else np.inf
+            # this is a departure - decrement the state variable
+            N -= 1
+            # record a departure
+            N_D += 1
+            # schedule the next departure if there are more in the system
+            t_D = t + generate_y() if N > 0 else np.inf
     
-    # append data for plotting
-    plot_t.append(t)
-    plot_N.append(N)
-    plot_B.append(N_B)
-
-    print('{:10.2f}{:10.2f}{:10.2f}{:10.0f}{:10.0f}{:10.0f}{:10.0f}{:10.2f}'.format(
-            t, t_A, t_D, N, N_A, N_D, N_B, W))
-print('W_bar = {:.2f}'.format(W/N_A))
-
-plt.figure()
-plt.plot(plot_t, plot_N, '-r', label="$N$")
-plt.plot(plot_t, plot_B, '-b', label="$N_B$")
-plt.xlabel('Time ($t$)')
-plt.ylabel('Number Customers')
-plt.legend(loc='best')
\ No newline at end of file
+        # append data for plotting
+        plot_t.append(t)
+        plot_N.append(N)
+        plot_B.append(N_B)
+
+        if verbose:
+            # display current state
+            print('{:10.2f}{:10.2f}{:10.2f}{:10.0f}{:10.0f}{:10.0f}{:10.0f}{:10.2f}'.format(
+                    t, t_A, t_D, N, N_A, N_D, N_B, W))
+
+    summary = {'W_bar': W/N_A, 'N_A': N_A, 'N_D': N_D, 'N_B': N_B}
+    traces = {'t': plot_t, 'N': plot_N, 'B': plot_B}
+    return summary, traces
+
+if __name__ == '__main__':
+    # import the matplotlib.pyplot package and refer to it as `plt`
+    import matplotlib.pyplot as plt
+
+    # simulate and print out the state after each event
+    summary, traces = run_cafe(verbose=True)
+    plot_t, plot_N = traces['t'], traces['N']
+    plot_B = traces['B']
+    print('W_bar = {:.2f}'.format(summary['W_bar']))
+
+    plt.figure()
+    plt.plot(plot_t, plot_N, '-r', label="$N$")
+    plt.plot(plot_t, plot_B, '-b', label="$N_B$")
+    plt.xlabel('Time ($t$)')
+    plt.ylabel('Number Customers')
+    plt.legend(loc='best')
\ No newline at end of file